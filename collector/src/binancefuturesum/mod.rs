@@ -1,9 +1,11 @@
 mod http;
+mod normalize;
 
 use std::collections::HashMap;
 
 use chrono::{DateTime, Utc};
 pub use http::{fetch_depth_snapshot, keep_connection};
+pub use normalize::normalize;
 use tokio::sync::mpsc::{unbounded_channel, UnboundedSender};
 use tokio_tungstenite::tungstenite::Utf8Bytes;
 use tracing::{error, warn};
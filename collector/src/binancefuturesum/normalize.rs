@@ -0,0 +1,215 @@
+use hftbacktest::types::{
+    Event,
+    BUY_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    SELL_EVENT,
+    TRADE_EVENT,
+};
+use serde::Deserialize;
+use tracing::warn;
+
+use crate::error::ConnectorError;
+
+/// Either a message from the combined stream or a depth snapshot fetched from the REST API.
+#[derive(Deserialize, Debug)]
+struct Message {
+    data: Option<Stream>,
+    #[serde(rename = "T")]
+    transaction_time: Option<i64>,
+    bids: Option<Vec<(String, String)>>,
+    asks: Option<Vec<(String, String)>>,
+    code: Option<i64>,
+    msg: Option<String>,
+}
+
+#[derive(Deserialize, Debug)]
+#[serde(tag = "e")]
+enum Stream {
+    #[serde(rename = "trade")]
+    Trade {
+        #[serde(rename = "T")]
+        transaction_time: i64,
+        #[serde(rename = "p")]
+        price: String,
+        #[serde(rename = "q")]
+        qty: String,
+        #[serde(rename = "X")]
+        order_type: String,
+        #[serde(rename = "m")]
+        is_the_buyer_the_market_maker: bool,
+    },
+    #[serde(rename = "depthUpdate")]
+    Depth {
+        #[serde(rename = "T")]
+        transaction_time: i64,
+        #[serde(rename = "b")]
+        bids: Vec<(String, String)>,
+        #[serde(rename = "a")]
+        asks: Vec<(String, String)>,
+    },
+    #[serde(other)]
+    Other,
+}
+
+fn parse(s: &str) -> Result<f64, ConnectorError> {
+    s.parse().map_err(|_| ConnectorError::FormatError)
+}
+
+fn event(ev: u64, exch_ts: i64, local_ts: i64, px: f64, qty: f64) -> Event {
+    Event {
+        ev,
+        exch_ts,
+        local_ts,
+        px,
+        qty,
+        order_id: 0,
+        ival: 0,
+        fval: 0.0,
+    }
+}
+
+/// Normalizes a message of the Binance Futures combined stream, or a depth snapshot, into events
+/// in the same way as `hftbacktest.data.utils.binancefutures.convert` does, except that the event
+/// order is corrected by [`EventOrder`](crate::event::EventOrder). `local_ts` is the time at
+/// which the message is received in nanoseconds.
+pub fn normalize(local_ts: i64, data: &str, events: &mut Vec<Event>) -> Result<(), ConnectorError> {
+    let message: Message = serde_json::from_str(data)?;
+    match message.data {
+        Some(Stream::Trade {
+            transaction_time,
+            price,
+            qty,
+            order_type,
+            is_the_buyer_the_market_maker,
+        }) => {
+            if order_type != "MARKET" {
+                return Ok(());
+            }
+            // The side is the trade initiator's side.
+            let side = if is_the_buyer_the_market_maker {
+                SELL_EVENT
+            } else {
+                BUY_EVENT
+            };
+            events.push(event(
+                TRADE_EVENT | side,
+                transaction_time * 1_000_000,
+                local_ts,
+                parse(&price)?,
+                parse(&qty)?,
+            ));
+        }
+        Some(Stream::Depth {
+            transaction_time,
+            bids,
+            asks,
+        }) => {
+            let exch_ts = transaction_time * 1_000_000;
+            for (side, levels) in [(BUY_EVENT, bids), (SELL_EVENT, asks)] {
+                for (px, qty) in levels {
+                    events.push(event(
+                        DEPTH_EVENT | side,
+                        exch_ts,
+                        local_ts,
+                        parse(&px)?,
+                        parse(&qty)?,
+                    ));
+                }
+            }
+        }
+        Some(Stream::Other) => {}
+        None => {
+            if let Some(code) = message.code {
+                warn!(%code, msg = message.msg, "the depth snapshot is an error.");
+                return Ok(());
+            }
+            let exch_ts = message
+                .transaction_time
+                .ok_or(ConnectorError::FormatError)?
+                * 1_000_000;
+            let bids = message.bids.ok_or(ConnectorError::FormatError)?;
+            let asks = message.asks.ok_or(ConnectorError::FormatError)?;
+            for (side, levels) in [(BUY_EVENT, bids), (SELL_EVENT, asks)] {
+                let Some((clear_upto, _)) = levels.last() else {
+                    continue;
+                };
+                // Clears the existing market depth up to the prices in the snapshot.
+                events.push(event(
+                    DEPTH_CLEAR_EVENT | side,
+                    exch_ts,
+                    local_ts,
+                    parse(clear_upto)?,
+                    0.0,
+                ));
+                // Inserts the snapshot.
+                for (px, qty) in &levels {
+                    events.push(event(
+                        DEPTH_SNAPSHOT_EVENT | side,
+                        exch_ts,
+                        local_ts,
+                        parse(px)?,
+                        parse(qty)?,
+                    ));
+                }
+            }
+        }
+    }
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_normalize() {
+        let mut events = Vec::new();
+        normalize(
+            1_000,
+            r#"{"stream":"btcusdt@depth@0ms","data":{"e":"depthUpdate","E":1660228023941,"T":1660228023931,"s":"BTCUSDT","U":1801732831593,"u":1801732832589,"pu":1801732831561,"b":[["24644.00","44.832"]],"a":[["24653.60","0.000"],["24671.00","20.812"]]}}"#,
+            &mut events,
+        )
+        .unwrap();
+        normalize(
+            2_000,
+            r#"{"stream":"btcusdt@trade","data":{"e":"trade","E":1660228023980,"T":1660228023973,"s":"BTCUSDT","t":2691833663,"p":"24670.90","q":"0.022","X":"MARKET","m":true}}"#,
+            &mut events,
+        )
+        .unwrap();
+        normalize(
+            3_000,
+            r#"{"stream":"btcusdt@bookTicker","data":{"e":"bookTicker","u":4456408609867,"s":"BTCUSDT","b":"142.4440","B":"50","a":"142.4450","A":"3","T":1713571200009,"E":1713571200010}}"#,
+            &mut events,
+        )
+        .unwrap();
+        normalize(
+            4_000,
+            r#"{"lastUpdateId":1801732831593,"E":1660228023941,"T":1660228023931,"bids":[["24644.00","44.832"],["24643.00","1.000"]],"asks":[]}"#,
+            &mut events,
+        )
+        .unwrap();
+
+        let ev: Vec<_> = events.iter().map(|event| event.ev).collect();
+        assert_eq!(
+            ev,
+            [
+                DEPTH_EVENT | BUY_EVENT,
+                DEPTH_EVENT | SELL_EVENT,
+                DEPTH_EVENT | SELL_EVENT,
+                TRADE_EVENT | SELL_EVENT,
+                DEPTH_CLEAR_EVENT | BUY_EVENT,
+                DEPTH_SNAPSHOT_EVENT | BUY_EVENT,
+                DEPTH_SNAPSHOT_EVENT | BUY_EVENT,
+            ]
+        );
+        assert_eq!(events[0].exch_ts, 1660228023931_000_000);
+        assert_eq!(events[0].local_ts, 1_000);
+        assert_eq!(events[2].px, 24671.0);
+        assert_eq!(events[2].qty, 20.812);
+        assert_eq!(events[3].px, 24670.9);
+        assert_eq!(events[4].px, 24643.0);
+        assert_eq!(events[4].qty, 0.0);
+    }
+}
@@ -0,0 +1,461 @@
+use std::{
+    cmp::Reverse,
+    collections::{BinaryHeap, HashMap, VecDeque},
+    fs::File,
+    io,
+    io::{BufWriter, ErrorKind},
+    mem,
+    thread,
+    thread::JoinHandle,
+};
+
+use chrono::{DateTime, NaiveDate, Utc};
+use hftbacktest::{
+    backtest::data::{CompressedNpyWriter, Compression},
+    types::{Event, EXCH_EVENT, LOCAL_EVENT},
+};
+use tracing::{error, info, warn};
+
+use crate::{
+    error::ConnectorError,
+    file::{FeedWriter, WriterQueue, WriterQueueReceiver},
+};
+
+/// Normalizes a received message into events. The first argument is the local timestamp at which
+/// the message is received in nanoseconds.
+pub type Normalize = fn(i64, &str, &mut Vec<Event>) -> Result<(), ConnectorError>;
+
+/// The time in nanoseconds for which the events are held to be ordered. It should be greater than
+/// the feed latency, the time between the exchange timestamp and the local timestamp.
+const REORDER_WINDOW: i64 = 10_000_000_000;
+
+/// The number of events sent to the file writer thread at once.
+const BATCH_SIZE: usize = 4096;
+
+/// The number of batches that can be queued for the file writer thread.
+const QUEUE_CAPACITY: usize = 256;
+
+/// The size of a block to be compressed, which is the same as the default of
+/// `hftbacktest.data.write_npy_compressed`.
+const BLOCK_SIZE: usize = 1 << 22;
+
+/// The `zstd` compression level, which favors speed since the feed is compressed as it arrives.
+const COMPRESSION_LEVEL: i32 = 1;
+
+const EXCH_PENDING: u8 = 1;
+const LOCAL_PENDING: u8 = 2;
+
+/// Corrects the order of the events as they arrive, in the same way as
+/// `hftbacktest.data.correct_event_order`, so that the events flagged with `EXCH_EVENT` are in
+/// the order of the exchange timestamp and the events flagged with `LOCAL_EVENT` are in the order
+/// of the local timestamp, splitting an event into two if it is out of order.
+///
+/// Unlike `correct_event_order`, which sorts the whole data, the events are held for the reorder
+/// window since no event arriving later can have an exchange timestamp earlier than the latest
+/// local timestamp minus the feed latency. An event whose feed latency exceeds the window can no
+/// longer be put in the order of the exchange timestamp, and is flagged with `LOCAL_EVENT` only.
+pub struct EventOrder {
+    window: i64,
+    /// The events that are not yet emitted for both timestamps and the flags of the timestamps
+    /// that are pending, ordered by arrival.
+    rows: VecDeque<(Event, u8)>,
+    /// The sequence number of the first row.
+    base: u64,
+    by_exch: BinaryHeap<Reverse<(i64, u64)>>,
+    by_local: BinaryHeap<Reverse<(i64, u64)>>,
+    max_local_ts: i64,
+    last_exch_ts: i64,
+    num_late: usize,
+}
+
+impl EventOrder {
+    /// Constructs an `EventOrder` with the reorder window in nanoseconds.
+    pub fn new(window: i64) -> Self {
+        Self {
+            window,
+            rows: Default::default(),
+            base: 0,
+            by_exch: Default::default(),
+            by_local: Default::default(),
+            max_local_ts: i64::MIN,
+            last_exch_ts: i64::MIN,
+            num_late: 0,
+        }
+    }
+
+    /// Returns the number of events that arrived too late to be ordered by the exchange timestamp.
+    pub fn num_late(&self) -> usize {
+        self.num_late
+    }
+
+    /// Adds the event, and appends the events that can no longer be preceded by an event arriving
+    /// later to `out`.
+    pub fn push(&mut self, event: Event, out: &mut Vec<Event>) {
+        let seq = self.base + self.rows.len() as u64;
+        let mut pending = LOCAL_PENDING;
+        if event.exch_ts >= self.last_exch_ts {
+            pending |= EXCH_PENDING;
+            self.by_exch.push(Reverse((event.exch_ts, seq)));
+        } else {
+            self.num_late += 1;
+        }
+        self.by_local.push(Reverse((event.local_ts, seq)));
+        self.max_local_ts = self.max_local_ts.max(event.local_ts);
+        self.rows.push_back((event, pending));
+        self.emit(out, self.max_local_ts.saturating_sub(self.window));
+    }
+
+    /// Appends all the remaining events to `out`.
+    pub fn flush(&mut self, out: &mut Vec<Event>) {
+        self.emit(out, i64::MAX);
+    }
+
+    fn emit(&mut self, out: &mut Vec<Event>, cutoff: i64) {
+        loop {
+            let exch = self.by_exch.peek().map(|&Reverse((_, seq))| seq);
+            let local = self.by_local.peek().map(|&Reverse((_, seq))| seq);
+            let (seq, flag) = match (exch, local) {
+                (None, None) => break,
+                (Some(e), None) => {
+                    if self.row(e).exch_ts >= cutoff {
+                        break;
+                    }
+                    (e, EXCH_PENDING)
+                }
+                (None, Some(l)) => {
+                    if self.row(l).local_ts >= cutoff {
+                        break;
+                    }
+                    (l, LOCAL_PENDING)
+                }
+                (Some(e), Some(l)) => {
+                    let (e_row, l_row) = (self.row(e), self.row(l));
+                    if e_row.exch_ts >= cutoff || l_row.local_ts >= cutoff {
+                        break;
+                    }
+                    if e == l {
+                        (e, EXCH_PENDING | LOCAL_PENDING)
+                    } else if e_row.exch_ts < l_row.exch_ts
+                        || (e_row.exch_ts == l_row.exch_ts && e_row.local_ts < l_row.local_ts)
+                    {
+                        (e, EXCH_PENDING)
+                    } else {
+                        (l, LOCAL_PENDING)
+                    }
+                }
+            };
+
+            if flag & EXCH_PENDING != 0 {
+                self.by_exch.pop();
+            }
+            if flag & LOCAL_PENDING != 0 {
+                self.by_local.pop();
+            }
+            let (event, pending) = &mut self.rows[(seq - self.base) as usize];
+            *pending &= !flag;
+            let mut event = event.clone();
+            if flag & EXCH_PENDING != 0 {
+                event.ev |= EXCH_EVENT;
+                self.last_exch_ts = event.exch_ts;
+            }
+            if flag & LOCAL_PENDING != 0 {
+                event.ev |= LOCAL_EVENT;
+            }
+            out.push(event);
+
+            while matches!(self.rows.front(), Some((_, 0))) {
+                self.rows.pop_front();
+                self.base += 1;
+            }
+        }
+    }
+
+    fn row(&self, seq: u64) -> &Event {
+        &self.rows[(seq - self.base) as usize].0
+    }
+}
+
+enum Command {
+    /// Creates the file for the ID, `{prefix}_{date}.npy.zst`.
+    Open {
+        id: usize,
+        prefix: String,
+        date: String,
+    },
+    Write(usize, Vec<Event>),
+    Close(usize),
+}
+
+/// Creates a new file, adding a suffix to the filename if it already exists so that the data
+/// collected earlier on the same day is not overwritten.
+fn create_file(prefix: &str, date: &str) -> Result<(String, File), io::Error> {
+    let mut filepath = format!("{prefix}_{date}.npy.zst");
+    let mut n = 0;
+    loop {
+        match File::create_new(&filepath) {
+            Ok(file) => return Ok((filepath, file)),
+            Err(error) if error.kind() == ErrorKind::AlreadyExists => {
+                n += 1;
+                filepath = format!("{prefix}_{date}_{n}.npy.zst");
+            }
+            Err(error) => return Err(error),
+        }
+    }
+}
+
+/// Writes the events to the files on a dedicated thread, so that compression does not delay
+/// receiving the feed.
+fn run_file_writer(rx: WriterQueueReceiver<Command>) {
+    let mut files = HashMap::new();
+    while let Ok(command) = rx.recv() {
+        match command {
+            Command::Open { id, prefix, date } => {
+                let result = create_file(&prefix, &date).and_then(|(filepath, file)| {
+                    info!(%filepath, "event file is created");
+                    CompressedNpyWriter::<_, Event>::new(
+                        BufWriter::new(file),
+                        Compression::Zstd,
+                        BLOCK_SIZE,
+                        COMPRESSION_LEVEL,
+                    )
+                });
+                match result {
+                    Ok(writer) => {
+                        files.insert(id, writer);
+                    }
+                    Err(error) => {
+                        error!(?error, %prefix, "couldn't create the event file.");
+                    }
+                }
+            }
+            Command::Write(id, events) => {
+                if let Some(writer) = files.get_mut(&id) {
+                    if let Err(error) = writer.write(&events) {
+                        error!(?error, "couldn't write the events.");
+                        files.remove(&id);
+                    }
+                }
+            }
+            Command::Close(id) => {
+                if let Some(writer) = files.remove(&id) {
+                    if let Err(error) = writer.finish() {
+                        error!(?error, "couldn't finish the event file.");
+                    }
+                }
+            }
+        }
+    }
+}
+
+struct RotatingEventFile {
+    id: usize,
+    date: NaiveDate,
+    order: EventOrder,
+    out: Vec<Event>,
+}
+
+/// Normalizes the received messages into events and writes them to a block-compressed `numpy`
+/// file, `.npy.zst`, per symbol and day, which the backtester reads directly without conversion.
+/// The events are in the order corrected by [`EventOrder`] but the local timestamps are not
+/// corrected for negative feed latency.
+pub struct EventWriter {
+    path: String,
+    normalize: Normalize,
+    files: HashMap<String, RotatingEventFile>,
+    next_id: usize,
+    events: Vec<Event>,
+    queue: WriterQueue<Command>,
+    handle: Option<JoinHandle<()>>,
+}
+
+impl EventWriter {
+    pub fn new(path: &str, normalize: Normalize) -> Self {
+        let (queue, rx) = WriterQueue::new(QUEUE_CAPACITY);
+        let handle = thread::Builder::new()
+            .name("event-file-writer".to_string())
+            .spawn(move || run_file_writer(rx))
+            .unwrap();
+        Self {
+            path: path.to_string(),
+            normalize,
+            files: Default::default(),
+            next_id: 0,
+            events: Vec::new(),
+            queue,
+            handle: Some(handle),
+        }
+    }
+
+    fn open(
+        &mut self,
+        datetime: DateTime<Utc>,
+        symbol: &str,
+    ) -> Result<RotatingEventFile, anyhow::Error> {
+        let id = self.next_id;
+        self.next_id += 1;
+        let path = self.path.as_str();
+        self.queue.send(Command::Open {
+            id,
+            prefix: format!("{path}/{symbol}"),
+            date: datetime.date_naive().format("%Y%m%d").to_string(),
+        })?;
+        Ok(RotatingEventFile {
+            id,
+            date: datetime.date_naive(),
+            order: EventOrder::new(REORDER_WINDOW),
+            out: Vec::with_capacity(BATCH_SIZE),
+        })
+    }
+
+    fn close(&mut self, mut file: RotatingEventFile) -> Result<(), anyhow::Error> {
+        file.order.flush(&mut file.out);
+        if file.order.num_late() > 0 {
+            warn!(
+                num_late = file.order.num_late(),
+                "some events arrived too late to be ordered by the exchange timestamp."
+            );
+        }
+        self.queue.send(Command::Write(file.id, file.out))?;
+        self.queue.send(Command::Close(file.id))
+    }
+}
+
+impl FeedWriter for EventWriter {
+    fn write(
+        &mut self,
+        recv_time: DateTime<Utc>,
+        symbol: String,
+        data: String,
+    ) -> Result<(), anyhow::Error> {
+        let local_ts = recv_time.timestamp_nanos_opt().unwrap();
+        let mut events = mem::take(&mut self.events);
+        events.clear();
+        if let Err(error) = (self.normalize)(local_ts, &data, &mut events) {
+            error!(?error, %symbol, "couldn't normalize the received data.");
+        }
+
+        let symbol = symbol.to_lowercase();
+        let date = recv_time.date_naive();
+        let mut file = match self.files.remove(&symbol) {
+            Some(file) if file.date != date => {
+                self.close(file)?;
+                info!(%date, %self.path, %symbol, "date is changed");
+                self.open(recv_time, &symbol)?
+            }
+            Some(file) => file,
+            None => self.open(recv_time, &symbol)?,
+        };
+        for event in events.drain(..) {
+            file.order.push(event, &mut file.out);
+        }
+        if file.out.len() >= BATCH_SIZE {
+            let out = mem::replace(&mut file.out, Vec::with_capacity(BATCH_SIZE));
+            self.queue.send(Command::Write(file.id, out))?;
+        }
+        self.files.insert(symbol, file);
+        self.events = events;
+        Ok(())
+    }
+}
+
+impl Drop for EventWriter {
+    fn drop(&mut self) {
+        for (_, file) in mem::take(&mut self.files) {
+            let _ = self.close(file);
+        }
+        // Disconnects the queue so that the file writer thread finishes the files and exits.
+        let (queue, _) = WriterQueue::new(0);
+        drop(mem::replace(&mut self.queue, queue));
+        if let Some(handle) = self.handle.take() {
+            let _ = handle.join();
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use hftbacktest::types::DEPTH_EVENT;
+
+    use super::*;
+
+    /// Ports `hftbacktest.data.correct_event_order`, which sorts the whole data.
+    fn correct_event_order(data: &[Event]) -> Vec<Event> {
+        let mut by_exch: Vec<_> = (0..data.len()).collect();
+        by_exch.sort_by_key(|&i| data[i].exch_ts);
+        let mut by_local: Vec<_> = (0..data.len()).collect();
+        by_local.sort_by_key(|&i| data[i].local_ts);
+
+        let mut out = Vec::new();
+        let (mut e, mut l) = (0, 0);
+        while e < data.len() || l < data.len() {
+            let exch = by_exch.get(e).map(|&i| &data[i]);
+            let local = by_local.get(l).map(|&i| &data[i]);
+            match (exch, local) {
+                (Some(x), Some(y)) if x.exch_ts == y.exch_ts && x.local_ts == y.local_ts => {
+                    let mut event = x.clone();
+                    event.ev |= EXCH_EVENT | LOCAL_EVENT;
+                    out.push(event);
+                    e += 1;
+                    l += 1;
+                }
+                (Some(x), Some(y))
+                    if x.exch_ts < y.exch_ts
+                        || (x.exch_ts == y.exch_ts && x.local_ts < y.local_ts) =>
+                {
+                    let mut event = x.clone();
+                    event.ev |= EXCH_EVENT;
+                    out.push(event);
+                    e += 1;
+                }
+                (_, Some(y)) => {
+                    let mut event = y.clone();
+                    event.ev |= LOCAL_EVENT;
+                    out.push(event);
+                    l += 1;
+                }
+                (Some(x), None) => {
+                    let mut event = x.clone();
+                    event.ev |= EXCH_EVENT;
+                    out.push(event);
+                    e += 1;
+                }
+                (None, None) => unreachable!(),
+            }
+        }
+        out
+    }
+
+    #[test]
+    fn test_event_order() {
+        // The latency varies so that the exchange timestamps are often out of order, and several
+        // events share the timestamps as the levels of a depth update do.
+        let mut data = Vec::new();
+        let mut seed = 1u64;
+        for i in 0..10_000i64 {
+            seed = seed
+                .wrapping_mul(6364136223846793005)
+                .wrapping_add(1442695040888963407);
+            let local_ts = i / 3 * 1_000;
+            let latency = ((seed >> 33) % 5_000) as i64;
+            data.push(Event {
+                ev: DEPTH_EVENT,
+                exch_ts: local_ts - latency + i % 3,
+                local_ts,
+                px: i as f64,
+                qty: 1.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            });
+        }
+
+        let mut order = EventOrder::new(10_000);
+        let mut out = Vec::new();
+        for event in &data {
+            order.push(event.clone(), &mut out);
+        }
+        order.flush(&mut out);
+        assert_eq!(order.num_late(), 0);
+        assert_eq!(out, correct_event_order(&data));
+    }
+}
@@ -1,92 +1,483 @@
 use std::{
-    collections::{hash_map::Entry, HashMap},
+    collections::HashMap,
     fs::File,
     io,
-    io::Write,
+    io::{BufWriter, Write},
+    mem,
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        mpsc::{sync_channel, Receiver, RecvError, SyncSender, TrySendError},
+        Arc,
+    },
+    thread,
+    thread::JoinHandle,
+    time::{Duration, Instant},
 };
 
+use anyhow::anyhow;
 use chrono::{DateTime, NaiveDate, Utc};
-use flate2::{write::GzEncoder, Compression};
-use tracing::info;
+use clap::ValueEnum;
+use flate2::write::GzEncoder;
+use tracing::{error, info, warn};
+
+/// The number of batches that can be queued for the file writer thread. Once the queue is full,
+/// the receiving path stalls until the thread catches up.
+const QUEUE_CAPACITY: usize = 1024;
+
+/// The size at which a batch of messages is sent to the file writer thread.
+const BATCH_SIZE: usize = 1 << 16;
+
+/// The longest time for which a batch is held before being sent to the file writer thread, so that
+/// the messages of an inactive symbol are not held indefinitely.
+const BATCH_TIMEOUT: Duration = Duration::from_secs(1);
+
+/// The interval at which the queue metrics are logged.
+const METRICS_INTERVAL: Duration = Duration::from_secs(60);
+
+/// Compression of the raw files. The Python converters choose the decompression by the extension,
+/// through `hftbacktest.data.open_raw`.
+#[derive(ValueEnum, Clone, Copy, PartialEq, Eq, Debug)]
+pub enum Codec {
+    /// gzip at the default level, `.gz`.
+    Gzip,
+    /// gzip at the fastest level, `.gz`. It compresses less but uses several times less CPU.
+    GzipFast,
+    /// zstd at level 1, `.zst`, which compresses better than gzip at the default level and uses
+    /// less CPU than gzip at the fastest level.
+    Zstd,
+    /// LZ4, `.lz4`, which uses the least CPU but compresses the least.
+    Lz4,
+}
+
+impl Codec {
+    fn extension(&self) -> &'static str {
+        match self {
+            Codec::Gzip | Codec::GzipFast => "gz",
+            Codec::Zstd => "zst",
+            Codec::Lz4 => "lz4",
+        }
+    }
+}
+
+enum Encoder {
+    Gzip(GzEncoder<File>),
+    Zstd(zstd::stream::Encoder<'static, File>),
+    Lz4(lz4_flex::frame::FrameEncoder<BufWriter<File>>),
+}
+
+impl Encoder {
+    fn new(file: File, codec: Codec) -> Result<Self, io::Error> {
+        Ok(match codec {
+            Codec::Gzip => Encoder::Gzip(GzEncoder::new(file, flate2::Compression::default())),
+            Codec::GzipFast => Encoder::Gzip(GzEncoder::new(file, flate2::Compression::fast())),
+            Codec::Zstd => Encoder::Zstd(zstd::stream::Encoder::new(file, 1)?),
+            Codec::Lz4 => Encoder::Lz4(lz4_flex::frame::FrameEncoder::new(BufWriter::new(file))),
+        })
+    }
+
+    fn write_all(&mut self, buf: &[u8]) -> Result<(), io::Error> {
+        match self {
+            Encoder::Gzip(encoder) => encoder.write_all(buf),
+            Encoder::Zstd(encoder) => encoder.write_all(buf),
+            Encoder::Lz4(encoder) => encoder.write_all(buf),
+        }
+    }
+
+    fn finish(self) -> Result<(), io::Error> {
+        match self {
+            Encoder::Gzip(encoder) => encoder.finish().map(|_| ()),
+            Encoder::Zstd(encoder) => encoder.finish().map(|_| ()),
+            Encoder::Lz4(encoder) => encoder.finish().map_err(io::Error::other)?.flush(),
+        }
+    }
+}
+
+/// The sending half of the bounded queue to a file writer thread, which keeps track of the queue
+/// depth and of the stalls that occur when the queue is full.
+pub struct WriterQueue<T> {
+    tx: SyncSender<T>,
+    depth: Arc<AtomicUsize>,
+    max_depth: usize,
+    num_stalls: usize,
+    stall_time: Duration,
+    since: Instant,
+}
+
+/// The receiving half of [`WriterQueue`].
+pub struct WriterQueueReceiver<T> {
+    rx: Receiver<T>,
+    depth: Arc<AtomicUsize>,
+}
+
+impl<T> WriterQueue<T> {
+    pub fn new(capacity: usize) -> (Self, WriterQueueReceiver<T>) {
+        let (tx, rx) = sync_channel(capacity);
+        let depth: Arc<AtomicUsize> = Default::default();
+        (
+            Self {
+                tx,
+                depth: depth.clone(),
+                max_depth: 0,
+                num_stalls: 0,
+                stall_time: Duration::ZERO,
+                since: Instant::now(),
+            },
+            WriterQueueReceiver { rx, depth },
+        )
+    }
+
+    /// Sends the item, waiting if the queue is full.
+    pub fn send(&mut self, item: T) -> Result<(), anyhow::Error> {
+        let depth = self.depth.fetch_add(1, Ordering::Relaxed) + 1;
+        self.max_depth = self.max_depth.max(depth);
+        match self.tx.try_send(item) {
+            Ok(()) => {}
+            Err(TrySendError::Full(item)) => {
+                let stall_start = Instant::now();
+                self.tx
+                    .send(item)
+                    .map_err(|_| anyhow!("the file writer has stopped."))?;
+                let stall_time = stall_start.elapsed();
+                self.num_stalls += 1;
+                self.stall_time += stall_time;
+                warn!(?stall_time, "the file writer queue is full.");
+            }
+            Err(TrySendError::Disconnected(_)) => {
+                return Err(anyhow!("the file writer has stopped."));
+            }
+        }
+        if self.since.elapsed() >= METRICS_INTERVAL {
+            info!(
+                depth = self.depth.load(Ordering::Relaxed),
+                max_depth = self.max_depth,
+                num_stalls = self.num_stalls,
+                stall_time = ?self.stall_time,
+                "file writer queue"
+            );
+            self.max_depth = 0;
+            self.num_stalls = 0;
+            self.stall_time = Duration::ZERO;
+            self.since = Instant::now();
+        }
+        Ok(())
+    }
+}
+
+impl<T> WriterQueueReceiver<T> {
+    /// Receives an item, waiting until one is sent. Returns an error once all the senders are
+    /// dropped and the queue is empty.
+    pub fn recv(&self) -> Result<T, RecvError> {
+        let item = self.rx.recv()?;
+        self.depth.fetch_sub(1, Ordering::Relaxed);
+        Ok(item)
+    }
+}
+
+enum Command {
+    Open {
+        id: usize,
+        filepath: String,
+        codec: Codec,
+    },
+    Write(usize, Vec<u8>),
+    Close(usize),
+}
+
+/// Compresses and writes the batches on a dedicated thread, so that compression does not delay
+/// receiving the feed, which would skew the local timestamps.
+fn run_file_writer(rx: WriterQueueReceiver<Command>) {
+    let mut files = HashMap::new();
+    while let Ok(command) = rx.recv() {
+        match command {
+            Command::Open {
+                id,
+                filepath,
+                codec,
+            } => {
+                let result = File::options()
+                    .create(true)
+                    .write(true)
+                    .open(&filepath)
+                    .and_then(|file| Encoder::new(file, codec));
+                match result {
+                    Ok(encoder) => {
+                        files.insert(id, encoder);
+                    }
+                    Err(error) => {
+                        error!(?error, %filepath, "couldn't create the file.");
+                    }
+                }
+            }
+            Command::Write(id, batch) => {
+                if let Some(encoder) = files.get_mut(&id) {
+                    if let Err(error) = encoder.write_all(&batch) {
+                        error!(?error, "couldn't write the data.");
+                        files.remove(&id);
+                    }
+                }
+            }
+            Command::Close(id) => {
+                if let Some(encoder) = files.remove(&id) {
+                    if let Err(error) = encoder.finish() {
+                        error!(?error, "couldn't finish the file.");
+                    }
+                }
+            }
+        }
+    }
+}
 
 pub struct RotatingFile {
+    id: usize,
     date: NaiveDate,
     path: String,
-    file: Option<GzEncoder<File>>,
+    batch: Vec<u8>,
+    batch_start: Instant,
 }
 
 impl RotatingFile {
-    fn create(datetime: DateTime<Utc>, path: &str) -> Result<GzEncoder<File>, io::Error> {
+    fn open(
+        id: usize,
+        datetime: DateTime<Utc>,
+        path: String,
+        codec: Codec,
+        queue: &mut WriterQueue<Command>,
+    ) -> Result<Self, anyhow::Error> {
         let date = datetime.date_naive().format("%Y%m%d");
-        let file = File::options()
-            .create(true)
-            .write(true)
-            .open(format!("{path}_{date}.gz"))?;
-        Ok(GzEncoder::new(file, Compression::default()))
-    }
-
-    pub fn new(datetime: DateTime<Utc>, path: String) -> Result<Self, io::Error> {
+        let ext = codec.extension();
+        queue.send(Command::Open {
+            id,
+            filepath: format!("{path}_{date}.{ext}"),
+            codec,
+        })?;
         Ok(Self {
+            id,
             date: datetime.date_naive(),
-            file: Some(Self::create(datetime, &path)?),
             path,
+            batch: Vec::with_capacity(BATCH_SIZE),
+            batch_start: Instant::now(),
         })
     }
 
-    pub fn write(&mut self, datetime: DateTime<Utc>, data: String) -> Result<(), io::Error> {
-        let date = datetime.date_naive();
-        if date != self.date {
-            let file = self.file.take().unwrap();
-            let _ = file.finish();
-            self.file = Some(Self::create(datetime, &self.path)?);
-            self.date = date;
-            info!(%date, %self.path, "date is changed");
+    fn write(&mut self, datetime: DateTime<Utc>, data: &str) {
+        if self.batch.is_empty() {
+            self.batch_start = Instant::now();
         }
         let timestamp = datetime.timestamp_nanos_opt().unwrap();
-        self.file
-            .as_mut()
-            .unwrap()
-            .write_all(format!("{timestamp} {data}\n").as_bytes())
+        let _ = writeln!(self.batch, "{timestamp} {data}");
     }
-}
 
-impl Drop for RotatingFile {
-    fn drop(&mut self) {
-        let _ = self.file.take().unwrap().finish();
+    fn flush(&mut self, queue: &mut WriterQueue<Command>) -> Result<(), anyhow::Error> {
+        if !self.batch.is_empty() {
+            let batch = mem::replace(&mut self.batch, Vec::with_capacity(BATCH_SIZE));
+            queue.send(Command::Write(self.id, batch))?;
+        }
+        Ok(())
+    }
+
+    fn close(mut self, queue: &mut WriterQueue<Command>) -> Result<(), anyhow::Error> {
+        self.flush(queue)?;
+        queue.send(Command::Close(self.id))
     }
 }
 
+/// Writes the messages received from the exchange.
+pub trait FeedWriter {
+    /// Writes the message for the symbol received at `recv_time`.
+    fn write(
+        &mut self,
+        recv_time: DateTime<Utc>,
+        symbol: String,
+        data: String,
+    ) -> Result<(), anyhow::Error>;
+}
+
+/// Writes the messages as they are, prefixed with the local timestamp at which they are received,
+/// to a compressed text file per symbol and day. The messages are batched and sent to a dedicated
+/// thread that compresses and writes them.
 pub struct Writer {
     path: String,
+    codec: Codec,
     file: HashMap<String, RotatingFile>,
+    next_id: usize,
+    last_flush: Instant,
+    queue: WriterQueue<Command>,
+    handle: Option<JoinHandle<()>>,
 }
 
 impl Writer {
-    pub fn new(path: &str) -> Self {
+    pub fn new(path: &str, codec: Codec) -> Self {
+        let (queue, rx) = WriterQueue::new(QUEUE_CAPACITY);
+        let handle = thread::Builder::new()
+            .name("file-writer".to_string())
+            .spawn(move || run_file_writer(rx))
+            .unwrap();
         Self {
             path: path.to_string(),
+            codec,
             file: Default::default(),
+            next_id: 0,
+            last_flush: Instant::now(),
+            queue,
+            handle: Some(handle),
         }
     }
 
-    pub fn write(
+    /// Sends the batches that have been held for longer than the timeout.
+    fn flush_expired(&mut self) -> Result<(), anyhow::Error> {
+        for file in self.file.values_mut() {
+            if !file.batch.is_empty() && file.batch_start.elapsed() >= BATCH_TIMEOUT {
+                file.flush(&mut self.queue)?;
+            }
+        }
+        self.last_flush = Instant::now();
+        Ok(())
+    }
+}
+
+impl FeedWriter for Writer {
+    fn write(
         &mut self,
         recv_time: DateTime<Utc>,
         symbol: String,
         data: String,
     ) -> Result<(), anyhow::Error> {
-        match self.file.entry(symbol.to_lowercase()) {
-            Entry::Occupied(mut entry) => {
-                entry.get_mut().write(recv_time, data)?;
+        let symbol = symbol.to_lowercase();
+        let date = recv_time.date_naive();
+        let mut file = match self.file.remove(&symbol) {
+            Some(file) if file.date != date => {
+                let path = file.path.clone();
+                file.close(&mut self.queue)?;
+                info!(%date, %path, "date is changed");
+                self.next_id += 1;
+                RotatingFile::open(self.next_id, recv_time, path, self.codec, &mut self.queue)?
             }
-            Entry::Vacant(entry) => {
-                let symbol = entry.key().clone();
+            Some(file) => file,
+            None => {
                 let path = self.path.as_str();
-                entry
-                    .insert(RotatingFile::new(recv_time, format!("{path}/{symbol}"))?)
-                    .write(recv_time, data)?;
+                self.next_id += 1;
+                RotatingFile::open(
+                    self.next_id,
+                    recv_time,
+                    format!("{path}/{symbol}"),
+                    self.codec,
+                    &mut self.queue,
+                )?
             }
+        };
+        file.write(recv_time, &data);
+        if file.batch.len() >= BATCH_SIZE {
+            file.flush(&mut self.queue)?;
+        }
+        self.file.insert(symbol, file);
+
+        if self.last_flush.elapsed() >= BATCH_TIMEOUT {
+            self.flush_expired()?;
         }
         Ok(())
     }
 }
+
+impl Drop for Writer {
+    fn drop(&mut self) {
+        for (_, file) in mem::take(&mut self.file) {
+            let _ = file.close(&mut self.queue);
+        }
+        // Disconnects the queue so that the file writer thread finishes the files and exits.
+        let (queue, _) = WriterQueue::new(0);
+        drop(mem::replace(&mut self.queue, queue));
+        if let Some(handle) = self.handle.take() {
+            let _ = handle.join();
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::io::Read;
+
+    use super::*;
+
+    #[test]
+    fn test_writer_queue_depth_and_stalls() {
+        let (mut queue, rx) = WriterQueue::new(2);
+        queue.send(1).unwrap();
+        queue.send(2).unwrap();
+        assert_eq!(queue.depth.load(Ordering::Relaxed), 2);
+        assert_eq!(queue.max_depth, 2);
+        assert_eq!(queue.num_stalls, 0);
+        assert_eq!(queue.stall_time, Duration::ZERO);
+
+        // The queue is full, so the next item waits until the receiver takes one.
+        let handle = thread::spawn(move || {
+            thread::sleep(Duration::from_millis(50));
+            let item = rx.recv().unwrap();
+            (item, rx)
+        });
+        queue.send(3).unwrap();
+        let (item, rx) = handle.join().unwrap();
+        assert_eq!(item, 1);
+        assert_eq!(queue.max_depth, 3);
+        assert_eq!(queue.num_stalls, 1);
+        assert!(queue.stall_time > Duration::ZERO);
+        assert_eq!(queue.depth.load(Ordering::Relaxed), 2);
+
+        assert_eq!(rx.recv().unwrap(), 2);
+        assert_eq!(rx.recv().unwrap(), 3);
+        assert_eq!(queue.depth.load(Ordering::Relaxed), 0);
+
+        // The receiver fails once the sender is dropped and the queue is drained.
+        drop(queue);
+        assert!(rx.recv().is_err());
+    }
+
+    #[test]
+    fn test_writer_queue_disconnected() {
+        let (mut queue, rx) = WriterQueue::new(1);
+        drop(rx);
+        assert!(queue.send(1).is_err());
+    }
+
+    #[test]
+    fn test_encoder_round_trip() {
+        let data: Vec<u8> = (0..10_000)
+            .flat_map(|i| {
+                format!("{} {{\"e\":\"trade\",\"p\":\"{}\"}}\n", 1_000 * i, i % 7).into_bytes()
+            })
+            .collect();
+        for codec in [Codec::Gzip, Codec::GzipFast, Codec::Zstd, Codec::Lz4] {
+            let filepath = std::env::temp_dir().join(format!(
+                "collector-{}-{:?}.{}",
+                std::process::id(),
+                codec,
+                codec.extension()
+            ));
+            let mut encoder = Encoder::new(File::create(&filepath).unwrap(), codec).unwrap();
+            // The batches are written as they are sent to the file writer thread.
+            for batch in data.chunks(4096) {
+                encoder.write_all(batch).unwrap();
+            }
+            encoder.finish().unwrap();
+
+            let file = File::open(&filepath).unwrap();
+            let mut decoded = Vec::new();
+            match codec {
+                Codec::Gzip | Codec::GzipFast => {
+                    flate2::read::GzDecoder::new(file)
+                        .read_to_end(&mut decoded)
+                        .unwrap();
+                }
+                Codec::Zstd => {
+                    decoded = zstd::stream::decode_all(file).unwrap();
+                }
+                Codec::Lz4 => {
+                    lz4_flex::frame::FrameDecoder::new(file)
+                        .read_to_end(&mut decoded)
+                        .unwrap();
+                }
+            }
+            std::fs::remove_file(&filepath).unwrap();
+            assert_eq!(decoded, data, "{codec:?}");
+        }
+    }
+}
@@ -1,15 +1,19 @@
 use anyhow::anyhow;
-use clap::Parser;
+use clap::{Parser, ValueEnum};
 use tokio::{self, select, signal, sync::mpsc::unbounded_channel};
 use tracing::{error, info};
 
-use crate::file::Writer;
+use crate::{
+    event::EventWriter,
+    file::{Codec, FeedWriter, Writer},
+};
 
 mod binance;
 mod binancefuturescm;
 mod binancefuturesum;
 mod bybit;
 mod error;
+mod event;
 mod file;
 mod throttler;
 
@@ -24,6 +28,24 @@ struct Args {
 
     /// Symbols for which data will be collected.
     symbols: Vec<String>,
+
+    /// Format of the files.
+    #[arg(long, value_enum, default_value_t = Format::Raw)]
+    format: Format,
+
+    /// Compression of the files in the raw format.
+    #[arg(long, value_enum, default_value_t = Codec::Gzip)]
+    compression: Codec,
+}
+
+#[derive(ValueEnum, Clone, Copy, Debug)]
+enum Format {
+    /// Writes the received messages as they are to `{symbol}_{date}.gz`, or `.zst` or `.lz4`
+    /// depending on the compression.
+    Raw,
+    /// Normalizes the received messages into events and writes them to `{symbol}_{date}.npy.zst`,
+    /// which the backtester reads directly.
+    Event,
 }
 
 #[tokio::main(flavor = "multi_thread")]
@@ -32,6 +54,21 @@ async fn main() -> Result<(), anyhow::Error> {
 
     tracing_subscriber::fmt::init();
 
+    let mut writer: Box<dyn FeedWriter> = match args.format {
+        Format::Raw => Box::new(Writer::new(&args.path, args.compression)),
+        Format::Event => {
+            let normalize = match args.exchange.as_str() {
+                "binancefutures" | "binancefuturesum" | "binancefuturescm" => {
+                    binancefuturesum::normalize
+                }
+                exchange => {
+                    return Err(anyhow!("{exchange} does not support the event format."));
+                }
+            };
+            Box::new(EventWriter::new(&args.path, normalize))
+        }
+    };
+
     let (writer_tx, mut writer_rx) = unbounded_channel();
 
     let handle = match args.exchange.as_str() {
@@ -95,13 +132,24 @@ async fn main() -> Result<(), anyhow::Error> {
         }
     };
 
-    let mut writer = Writer::new(&args.path);
+    // Stops on SIGTERM as well as ctrl-c, so that the files are finished when the collector is
+    // stopped by a service manager. SIGTERM exists only on Unix, so elsewhere it never arrives.
+    #[cfg(unix)]
+    let mut sigterm = signal::unix::signal(signal::unix::SignalKind::terminate())?;
     loop {
+        #[cfg(unix)]
+        let terminate = sigterm.recv();
+        #[cfg(not(unix))]
+        let terminate = std::future::pending::<Option<()>>();
         select! {
             _ = signal::ctrl_c() => {
                 info!("ctrl-c received");
                 break;
             }
+            _ = terminate => {
+                info!("SIGTERM received");
+                break;
+            }
             r = writer_rx.recv() => match r {
                 Some((recv_time, symbol, data)) => {
                     if let Err(error) = writer.write(recv_time, symbol, data) {
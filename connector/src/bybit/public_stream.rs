@@ -2,16 +2,19 @@ use std::time::Duration;
 
 use chrono::Utc;
 use futures_util::{SinkExt, StreamExt};
-use hftbacktest::prelude::{
-    Event,
-    LiveEvent,
-    Side,
-    LOCAL_ASK_DEPTH_BBO_EVENT,
-    LOCAL_ASK_DEPTH_EVENT,
-    LOCAL_BID_DEPTH_BBO_EVENT,
-    LOCAL_BID_DEPTH_EVENT,
-    LOCAL_BUY_TRADE_EVENT,
-    LOCAL_SELL_TRADE_EVENT,
+use hftbacktest::{
+    live::ipc::TO_ALL,
+    prelude::{
+        Event,
+        LiveEvent,
+        Side,
+        LOCAL_ASK_DEPTH_BBO_EVENT,
+        LOCAL_ASK_DEPTH_EVENT,
+        LOCAL_BID_DEPTH_BBO_EVENT,
+        LOCAL_BID_DEPTH_EVENT,
+        LOCAL_BUY_TRADE_EVENT,
+        LOCAL_SELL_TRADE_EVENT,
+    },
 };
 use tokio::{
     select,
@@ -58,6 +61,8 @@ impl PublicStream {
                     let data: OrderBook = serde_json::from_value(stream.data)?;
                     let (bids, asks) = parse_depth(data.bids, data.asks)?;
 
+                    self.ev_tx.send(PublishEvent::BatchStart(TO_ALL)).unwrap();
+
                     for (px, qty) in bids {
                         self.ev_tx
                             .send(PublishEvent::LiveEvent(LiveEvent::Feed {
@@ -93,10 +98,14 @@ impl PublicStream {
                             }))
                             .unwrap();
                     }
+
+                    self.ev_tx.send(PublishEvent::BatchEnd(TO_ALL)).unwrap();
                 } else if stream.topic.starts_with("orderbook") {
                     let data: OrderBook = serde_json::from_value(stream.data)?;
                     let (bids, asks) = parse_depth(data.bids, data.asks)?;
 
+                    self.ev_tx.send(PublishEvent::BatchStart(TO_ALL)).unwrap();
+
                     for (px, qty) in bids {
                         self.ev_tx
                             .send(PublishEvent::LiveEvent(LiveEvent::Feed {
@@ -132,6 +141,8 @@ impl PublicStream {
                             }))
                             .unwrap();
                     }
+
+                    self.ev_tx.send(PublishEvent::BatchEnd(TO_ALL)).unwrap();
                 } else if stream.topic.starts_with("publicTrade") {
                     let data: Vec<msg::Trade> = serde_json::from_value(stream.data)?;
                     for item in data {
@@ -48,6 +48,57 @@ fn depth_above(depth: &HashMap<i64, QtyTimestamp>, start: i64, end: i64) -> i64
     INVALID_MAX
 }
 
+/// Returns up to `max_levels` levels with quantity between `best_tick` and `worst_tick`, inclusive,
+/// as `(price, qty)`, ordered from `best_tick`.
+///
+/// The ticks in between are looked up one by one only if there are no more of them than the price
+/// levels in the map. Otherwise, such as when a stale level is far from the best, the levels in the
+/// map are selected and sorted instead, so the cost is bounded by the number of levels rather than
+/// by the distance between them.
+fn best_levels(
+    depth: &HashMap<i64, QtyTimestamp>,
+    tick_size: f64,
+    best_tick: i64,
+    worst_tick: i64,
+    max_levels: usize,
+) -> Vec<(f64, f64)> {
+    // The distance from the best tick, which increases toward the worst tick on both sides.
+    let dir = if worst_tick < best_tick { -1 } else { 1 };
+    let distance = (worst_tick - best_tick) * dir;
+
+    if (distance as u64) < depth.len() as u64 {
+        let mut levels = Vec::with_capacity(max_levels.min(depth.len()));
+        for i in 0..=distance {
+            if levels.len() >= max_levels {
+                break;
+            }
+            let t = best_tick + i * dir;
+            if let Some(q) = depth.get(&t).filter(|q| q.qty > 0f64) {
+                levels.push((t as f64 * tick_size, q.qty));
+            }
+        }
+        levels
+    } else {
+        let mut levels = depth
+            .iter()
+            .filter(|(&t, q)| q.qty > 0f64 && (0..=distance).contains(&((t - best_tick) * dir)))
+            .map(|(&t, q)| ((t - best_tick) * dir, q.qty))
+            .collect::<Vec<_>>();
+        if levels.len() > max_levels {
+            if max_levels == 0 {
+                return Vec::new();
+            }
+            levels.select_nth_unstable_by_key(max_levels - 1, |level| level.0);
+            levels.truncate(max_levels);
+        }
+        levels.sort_unstable_by_key(|level| level.0);
+        levels
+            .into_iter()
+            .map(|(i, qty)| ((best_tick + i * dir) as f64 * tick_size, qty))
+            .collect()
+    }
+}
+
 impl FusedHashMapMarketDepth {
     /// Constructs an instance of `FusedHashMapMarketDepth`.
     pub fn new(tick_size: f64) -> Self {
@@ -228,6 +279,35 @@ impl FusedHashMapMarketDepth {
         events
     }
 
+    /// Returns up to `max_levels` bid levels, as `(price, qty)`, from the best bid downward.
+    pub fn bid_levels(&self, max_levels: usize) -> Vec<(f64, f64)> {
+        if self.best_bid_tick == INVALID_MIN {
+            return Vec::new();
+        }
+        // The best bid can be set by the BBO stream without extending the lowest bid.
+        best_levels(
+            &self.bid_depth,
+            self.tick_size,
+            self.best_bid_tick,
+            self.low_bid_tick.min(self.best_bid_tick),
+            max_levels,
+        )
+    }
+
+    /// Returns up to `max_levels` ask levels, as `(price, qty)`, from the best ask upward.
+    pub fn ask_levels(&self, max_levels: usize) -> Vec<(f64, f64)> {
+        if self.best_ask_tick == INVALID_MAX {
+            return Vec::new();
+        }
+        best_levels(
+            &self.ask_depth,
+            self.tick_size,
+            self.best_ask_tick,
+            self.high_ask_tick.max(self.best_ask_tick),
+            max_levels,
+        )
+    }
+
     pub fn update_best_bid(&mut self, px: f64, qty: f64, timestamp: i64) -> bool {
         let price_tick = (px / self.tick_size).round() as i64;
         let depth = self.bid_depth.entry(price_tick).or_default();
@@ -353,6 +433,42 @@ mod tests {
         assert_eq!(depth.best_ask_tick, 103);
     }
 
+    #[test]
+    fn test_levels() {
+        let mut depth = FusedHashMapMarketDepth::new(0.1);
+        assert_eq!(depth.bid_levels(2).len(), 0);
+        assert_eq!(depth.ask_levels(2).len(), 0);
+
+        depth.update_bid_depth(10.0, 0.01, 1);
+        depth.update_bid_depth(10.2, 0.02, 1);
+        depth.update_bid_depth(10.3, 0.03, 1);
+        depth.update_bid_depth(10.3, 0.0, 2);
+        depth.update_ask_depth(10.5, 0.04, 1);
+        depth.update_ask_depth(10.7, 0.05, 1);
+
+        let bids = depth.bid_levels(2);
+        assert_eq!(bids.len(), 2);
+        assert!((bids[0].0 - 10.2).abs() < 1e-9 && bids[0].1 == 0.02);
+        assert!((bids[1].0 - 10.0).abs() < 1e-9 && bids[1].1 == 0.01);
+
+        let asks = depth.ask_levels(5);
+        assert_eq!(asks.len(), 2);
+        assert!((asks[0].0 - 10.5).abs() < 1e-9 && asks[0].1 == 0.04);
+        assert!((asks[1].0 - 10.7).abs() < 1e-9 && asks[1].1 == 0.05);
+
+        // Levels far from the best are found without scanning every tick in between.
+        depth.update_bid_depth(0.1, 0.06, 1);
+        depth.update_ask_depth(1000.0, 0.07, 1);
+        assert_eq!(depth.bid_levels(2), bids);
+        let bids = depth.bid_levels(5);
+        assert_eq!(bids.len(), 3);
+        assert!((bids[2].0 - 0.1).abs() < 1e-9 && bids[2].1 == 0.06);
+        let asks = depth.ask_levels(5);
+        assert_eq!(asks.len(), 3);
+        assert!((asks[2].0 - 1000.0).abs() < 1e-9 && asks[2].1 == 0.07);
+        assert_eq!(depth.ask_levels(0).len(), 0);
+    }
+
     #[test]
     fn test_update_best_bid() {
         let mut depth = FusedHashMapMarketDepth::new(0.1);
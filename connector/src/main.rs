@@ -12,6 +12,7 @@ use clap::Parser;
 use hftbacktest::{
     live::ipc::{
         iceoryx::{ChannelError, IceoryxBuilder},
+        shm::{shared_book_path, SharedBookWriter},
         TO_ALL,
     },
     prelude::*,
@@ -106,10 +107,19 @@ async fn run_publish_task(
     name: &str,
     order_manager: Arc<Mutex<dyn GetOrders>>,
     mut rx: UnboundedReceiver<PublishEvent>,
+    book_levels: usize,
+    book_dir: &str,
 ) -> Result<(), ChannelError> {
     let mut depth = HashMap::new();
+    let mut books: HashMap<String, SharedBookWriter> = HashMap::new();
     let mut position: HashMap<String, Position> = HashMap::new();
     let bot_tx = IceoryxBuilder::new(name).bot(false).sender()?;
+    // A depth message is sent as a batch of feed events, one per level, so the shared books updated
+    // by the batch are published once at its end, after all of its levels are applied, with the
+    // exchange timestamp of the latest event. Batches from different streams can overlap, so the
+    // books are published when the last open batch ends.
+    let mut updated_books: HashMap<String, i64> = HashMap::new();
+    let mut open_batches = 0usize;
 
     while let Some(msg) = rx.recv().await {
         match msg {
@@ -158,6 +168,17 @@ async fn run_publish_task(
                         }
                     }
                     Entry::Vacant(entry) => {
+                        if book_levels > 0 {
+                            let path = shared_book_path(book_dir, name, entry.key());
+                            match SharedBookWriter::create(&path, book_levels, tick_size) {
+                                Ok(book) => {
+                                    books.insert(entry.key().clone(), book);
+                                }
+                                Err(error) => {
+                                    error!(?error, ?path, "Couldn't create the shared book.");
+                                }
+                            }
+                        }
                         entry.insert(FusedHashMapMarketDepth::new(tick_size));
                     }
                 }
@@ -167,13 +188,35 @@ async fn run_publish_task(
             PublishEvent::LiveEvent(ev) => {
                 // The live event will only be published if the result is true.
                 if handle_ev(&ev, &mut depth, &mut position) {
+                    if let LiveEvent::Feed { symbol, event } = &ev {
+                        if !event.is(TRADE_EVENT) && books.contains_key(symbol) {
+                            match updated_books.get_mut(symbol) {
+                                Some(exch_ts) => *exch_ts = event.exch_ts,
+                                None => {
+                                    updated_books.insert(symbol.clone(), event.exch_ts);
+                                }
+                            }
+                            if open_batches == 0 {
+                                publish_books(&mut updated_books, &mut books, &depth, book_levels);
+                            }
+                        }
+                    }
                     bot_tx.send(TO_ALL, &ev)?;
                 }
             }
             PublishEvent::BatchStart(id) => {
+                if id == TO_ALL {
+                    open_batches += 1;
+                }
                 bot_tx.send(id, &LiveEvent::BatchStart)?;
             }
             PublishEvent::BatchEnd(id) => {
+                if id == TO_ALL {
+                    open_batches = open_batches.saturating_sub(1);
+                    if open_batches == 0 {
+                        publish_books(&mut updated_books, &mut books, &depth, book_levels);
+                    }
+                }
                 bot_tx.send(id, &LiveEvent::BatchEnd)?;
             }
         }
@@ -181,6 +224,24 @@ async fn run_publish_task(
     Ok(())
 }
 
+/// Publishes the market depth snapshots of the updated instruments to their shared books.
+fn publish_books(
+    updated_books: &mut HashMap<String, i64>,
+    books: &mut HashMap<String, SharedBookWriter>,
+    depth: &HashMap<String, FusedHashMapMarketDepth>,
+    book_levels: usize,
+) {
+    for (symbol, exch_ts) in updated_books.drain() {
+        if let (Some(book), Some(depth_)) = (books.get_mut(&symbol), depth.get(&symbol)) {
+            book.write(
+                exch_ts,
+                depth_.bid_levels(book_levels),
+                depth_.ask_levels(book_levels),
+            );
+        }
+    }
+}
+
 /// Maintains the market depth for all added instruments, allowing another bot to request the same
 /// instrument and publishing the market depth snapshot, and fuses the market depth from different
 /// streams, such as L1 or L2 with varying depths and update frequencies, to provide the most
@@ -280,6 +341,16 @@ struct Args {
 
     /// Connector's configuration file path.
     config: String,
+
+    /// Number of levels per side of the market depth snapshot published to the shared memory for
+    /// each instrument, which bots on the same host can read without maintaining the market depth.
+    /// 0 disables it.
+    #[arg(long, default_value_t = 0)]
+    book_levels: usize,
+
+    /// Directory of the shared memory files of the market depth snapshots.
+    #[arg(long, default_value = "/dev/shm")]
+    book_dir: String,
 }
 
 #[tokio::main]
@@ -333,12 +404,14 @@ async fn main() {
     };
 
     let name = args.name.clone();
+    let book_levels = args.book_levels;
+    let book_dir = args.book_dir.clone();
     let order_manager = connector.order_manager();
     let handle = thread::spawn(move || {
         let rt = Builder::new_current_thread().enable_all().build().unwrap();
 
         rt.block_on(async move {
-            run_publish_task(&name, order_manager, pub_rx)
+            run_publish_task(&name, order_manager, pub_rx, book_levels, &book_dir)
                 .await
                 .map_err(|error: ChannelError| {
                     error!(
@@ -232,23 +232,60 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                             (Ident::new("Local", Span::call_site()), em_ident.clone())
                         };
 
+                        let lm_construct = if lm_ident == "IntpOrderLatency" {
+                            // The last argument is the resolution of the optional lookup grid.
+                            let Some((lookup_resolution, lm_new_args)) = lm_args.split_last()
+                            else {
+                                return Error::new(
+                                    lm_ident.span(),
+                                    "`IntpOrderLatency` requires the resolution of the lookup grid as \
+                                     its last field",
+                                )
+                                .to_compile_error()
+                                .into();
+                            };
+                            quote! {
+                                #lm_ident::new(#(#lm_new_args.clone()),*)
+                                    .with_lookup_grid(*#lookup_resolution)
+                            }
+                        } else {
+                            quote! {
+                                #lm_ident::new(#(#lm_args.clone()),*)
+                            }
+                        };
+
                         let depth_construct = match marketdepth.to_string().as_str() {
-                            "HashMapMarketDepth" => {
+                            "HashMapMarketDepth"
+                            | "BTreeMarketDepth"
+                            | "FusedHashMapMarketDepth" => {
                                 quote! {
                                     #marketdepth::new(#asset.tick_size, #asset.lot_size);
                                 }
                             }
                             "ROIVectorMarketDepth" => {
                                 quote! {
-                                    #marketdepth::new(
-                                        #asset.tick_size,
-                                        #asset.lot_size,
-                                        #asset.roi_lb,
-                                        #asset.roi_ub
-                                    );
+                                    {
+                                        let depth = #marketdepth::new(
+                                            #asset.tick_size,
+                                            #asset.lot_size,
+                                            #asset.roi_lb,
+                                            #asset.roi_ub
+                                        );
+                                        match #asset.roi_recenter_threshold {
+                                            Some(threshold) => depth.with_recentering(threshold),
+                                            None => depth,
+                                        }
+                                    };
                                 }
                             }
-                            _ => panic!(),
+                            _ => {
+                                return Error::new(
+                                    marketdepth.span(),
+                                    format!("unsupported market depth `{marketdepth}`"),
+                                )
+                                .to_compile_error()
+                                .into();
+                            }
                         };
 
                         arms.push(quote! {
@@ -262,12 +299,18 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                             let reader = if #asset.latency_offset == 0 {
                                 Reader::builder()
                                     .parallel_load(#asset.parallel_load)
+                                    .prefetch(#asset.prefetch)
+                                    .block_size(#asset.block_size)
+                                    .prefetch_depth(#asset.prefetch_depth)
                                     .data(#asset.data.clone())
                                     .build()
                                     .unwrap()
                             } else {
                                 Reader::builder()
                                     .parallel_load(#asset.parallel_load)
+                                    .prefetch(#asset.prefetch)
+                                    .block_size(#asset.block_size)
+                                    .prefetch_depth(#asset.prefetch_depth)
                                     .data(#asset.data.clone())
                                     .preprocessor(FeedLatencyAdjustment::new(#asset.latency_offset))
                                     .build()
@@ -278,13 +321,13 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                             let ob_exch_to_local = OrderBus::new();
 
                             let asset_type = #at_ident::new(#(#at_args.clone()),*);
-                            let latency_model = #lm_ident::new(#(#lm_args.clone()),*);
+                            let latency_model = #lm_construct;
                             let fee_model = #fm_ident::new(#(#fm_args.clone()),*);
 
                             let mut market_depth = #depth_construct;
                             match #asset.initial_snapshot.as_ref() {
                                 Some(DataSource::File(file)) => {
-                                    let data = read_npz_file(&file, "data").unwrap();
+                                    let data = read_data_file(&file, None).unwrap();
                                     market_depth.apply_snapshot(&data);
                                 }
                                 Some(DataSource::Data(data)) => {
@@ -305,7 +348,7 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
                             let mut market_depth = #depth_construct;
                             match #asset.initial_snapshot.as_ref() {
                                 Some(DataSource::File(file)) => {
-                                    let data = read_npz_file(&file, "data").unwrap();
+                                    let data = read_data_file(&file, None).unwrap();
                                     market_depth.apply_snapshot(&data);
                                 }
                                 Some(DataSource::Data(data)) => {
@@ -347,6 +390,13 @@ pub fn build_asset(input: TokenStream) -> TokenStream {
             &#asset.fee_model,
         ) {
             #(#arms)*
+            // Combinations that are not listed, such as a queue model the market depth doesn't
+            // support, must be rejected by the caller before building the asset.
+            #[allow(unreachable_patterns)]
+            _ => unreachable!(
+                "the models are not supported by {}",
+                stringify!(#marketdepth)
+            ),
         }
     };
 
@@ -0,0 +1,750 @@
+use std::{
+    collections::HashMap,
+    fs::File,
+    io::{Error, ErrorKind, Read, Write},
+    mem::size_of,
+    sync::Mutex,
+    thread,
+};
+
+use crate::backtest::data::{
+    npy::{check_field_consistency, DType, Field, NpyDTyped},
+    Data,
+    DataPtr,
+};
+
+const MAGIC: &[u8; 7] = b"\x93HBTCOL";
+const VERSION: u8 = 1;
+
+/// The number of bytes of a column chunk entry in the block index: the encoding, the parameter,
+/// and the length of the payload.
+const CHUNK_ENTRY_SIZE: usize = 1 + 8 + 8;
+
+/// The largest dictionary that can be used to encode a column chunk.
+const MAX_DICTIONARY_LEN: usize = 1 << 16;
+
+/// Encodings of a column chunk. Every payload, except for [`Encoding::Constant`] which has none, is
+/// compressed by `zstd`.
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+#[repr(u8)]
+enum Encoding {
+    /// The values are stored as they are, with their bytes shuffled.
+    Raw = 0,
+    /// All values are equal to the parameter, so nothing is stored.
+    Constant = 1,
+    /// The differences between consecutive integer values are stored as zigzag-encoded integers,
+    /// with their bytes shuffled.
+    Delta = 2,
+    /// The distinct values are stored followed by the index of each value, which is a `u8` if there
+    /// are at most 256 distinct values and a `u16` otherwise.
+    Dictionary = 3,
+    /// Floating-point values are converted into integers by multiplying them by the scale given as
+    /// the parameter, which are then stored as in [`Encoding::Delta`]. The values are decoded by
+    /// dividing the integers by the scale, and the encoding is used only if it reproduces every
+    /// value exactly.
+    FixedPoint = 4,
+}
+
+impl TryFrom<u8> for Encoding {
+    type Error = Error;
+
+    fn try_from(value: u8) -> Result<Self, Self::Error> {
+        match value {
+            0 => Ok(Encoding::Raw),
+            1 => Ok(Encoding::Constant),
+            2 => Ok(Encoding::Delta),
+            3 => Ok(Encoding::Dictionary),
+            4 => Ok(Encoding::FixedPoint),
+            _ => Err(Error::new(
+                ErrorKind::InvalidData,
+                format!("unknown column encoding {value}"),
+            )),
+        }
+    }
+}
+
+/// Options for [`write_columnar`].
+#[derive(Clone, Debug)]
+pub struct ColumnarOptions {
+    block_rows: usize,
+    level: i32,
+    scales: HashMap<String, f64>,
+}
+
+impl Default for ColumnarOptions {
+    fn default() -> Self {
+        Self {
+            block_rows: 1 << 20,
+            level: 3,
+            scales: Default::default(),
+        }
+    }
+}
+
+impl ColumnarOptions {
+    /// Constructs `ColumnarOptions` with the default options.
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    /// Sets the number of rows in a block. Blocks are compressed and decompressed independently,
+    /// so they can be decoded in parallel. The default value is `1048576`.
+    pub fn block_rows(self, block_rows: usize) -> Self {
+        Self {
+            block_rows: block_rows.max(1),
+            ..self
+        }
+    }
+
+    /// Sets the `zstd` compression level. The default value is `3`.
+    pub fn level(self, level: i32) -> Self {
+        Self { level, ..self }
+    }
+
+    /// Stores the floating-point field as fixed-point integers in units of `unit`, such as the tick
+    /// size for the price or the lot size for the quantity. A block whose values cannot be
+    /// reproduced exactly falls back to another encoding, so this never loses precision.
+    pub fn fixed_point(mut self, field: &str, unit: f64) -> Self {
+        self.scales.insert(field.to_string(), scale_of(unit));
+        self
+    }
+}
+
+/// Returns the scale that converts the value into an integer in units of `unit`. If the reciprocal
+/// of the unit is an integer, such as `100` for a unit of `0.01`, it is rounded so that dividing by
+/// it reproduces the decimal values exactly.
+fn scale_of(unit: f64) -> f64 {
+    let scale = 1.0 / unit;
+    let rounded = scale.round();
+    if rounded >= 1.0 && ((scale - rounded) / rounded).abs() < 1e-9 {
+        rounded
+    } else {
+        scale
+    }
+}
+
+/// Returns the byte offsets of the fields, which must all be 8-byte values.
+pub(super) fn field_offsets(descr: &DType, size: usize) -> std::io::Result<Vec<usize>> {
+    let mut offsets = Vec::with_capacity(descr.len());
+    for (i, field) in descr.iter().enumerate() {
+        if !matches!(field.ty.get(1..), Some("i8" | "u8" | "f8")) {
+            return Err(Error::new(
+                ErrorKind::InvalidData,
+                format!(
+                    "unsupported field type '{}: {}', only 8-byte fields are supported",
+                    field.name, field.ty
+                ),
+            ));
+        }
+        offsets.push(i * 8);
+    }
+    if offsets.len() * 8 > size {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "the fields exceed the size of the struct",
+        ));
+    }
+    Ok(offsets)
+}
+
+/// Transposes the bytes of the values so that the same byte of every value is adjacent, which
+/// makes the slowly varying high bytes compress well.
+fn shuffle(values: &[u64]) -> Vec<u8> {
+    let n = values.len();
+    let mut out = vec![0u8; n * 8];
+    for (i, value) in values.iter().enumerate() {
+        for (k, byte) in value.to_le_bytes().into_iter().enumerate() {
+            out[k * n + i] = byte;
+        }
+    }
+    out
+}
+
+fn unshuffle(bytes: &[u8], out: &mut [u64]) {
+    let n = out.len();
+    for (i, value) in out.iter_mut().enumerate() {
+        let mut b = [0u8; 8];
+        for (k, byte) in b.iter_mut().enumerate() {
+            *byte = bytes[k * n + i];
+        }
+        *value = u64::from_le_bytes(b);
+    }
+}
+
+fn delta_encode(values: &[i64]) -> Vec<u64> {
+    let mut prev = 0i64;
+    values
+        .iter()
+        .map(|&value| {
+            let delta = value.wrapping_sub(prev);
+            prev = value;
+            ((delta << 1) ^ (delta >> 63)) as u64
+        })
+        .collect()
+}
+
+fn delta_decode(encoded: &mut [u64]) {
+    let mut prev = 0i64;
+    for value in encoded.iter_mut() {
+        let delta = ((*value >> 1) as i64) ^ -((*value & 1) as i64);
+        prev = prev.wrapping_add(delta);
+        *value = prev as u64;
+    }
+}
+
+fn compress(bytes: &[u8], level: i32) -> std::io::Result<Vec<u8>> {
+    zstd::bulk::compress(bytes, level)
+}
+
+/// Encodes a column chunk, choosing the encoding that produces the smallest payload.
+fn encode_chunk(
+    values: &[u64],
+    ty: &str,
+    scale: Option<f64>,
+    level: i32,
+) -> std::io::Result<(Encoding, u64, Vec<u8>)> {
+    if values.iter().all(|&value| value == values[0]) {
+        return Ok((Encoding::Constant, values[0], Vec::new()));
+    }
+
+    let mut candidates = vec![(Encoding::Raw, 0, compress(&shuffle(values), level)?)];
+
+    if ty.ends_with("f8") {
+        if let Some(scale) = scale {
+            let mut ticks = Vec::with_capacity(values.len());
+            for &value in values {
+                let value = f64::from_bits(value);
+                let tick = (value * scale).round() as i64;
+                if (tick as f64 / scale).to_bits() != value.to_bits() {
+                    break;
+                }
+                ticks.push(tick);
+            }
+            if ticks.len() == values.len() {
+                candidates.push((
+                    Encoding::FixedPoint,
+                    scale.to_bits(),
+                    compress(&shuffle(&delta_encode(&ticks)), level)?,
+                ));
+            }
+        }
+    } else {
+        let ints: Vec<i64> = values.iter().map(|&value| value as i64).collect();
+        candidates.push((
+            Encoding::Delta,
+            0,
+            compress(&shuffle(&delta_encode(&ints)), level)?,
+        ));
+    }
+
+    let mut dictionary: HashMap<u64, usize> = HashMap::new();
+    let mut indices = Vec::with_capacity(values.len());
+    for &value in values {
+        let len = dictionary.len();
+        let index = *dictionary.entry(value).or_insert(len);
+        if dictionary.len() > MAX_DICTIONARY_LEN {
+            break;
+        }
+        indices.push(index);
+    }
+    if indices.len() == values.len() {
+        let mut entries = vec![0u64; dictionary.len()];
+        for (&value, &index) in &dictionary {
+            entries[index] = value;
+        }
+        let mut bytes = Vec::with_capacity(4 + entries.len() * 8 + indices.len() * 2);
+        bytes.extend_from_slice(&(entries.len() as u32).to_le_bytes());
+        for entry in &entries {
+            bytes.extend_from_slice(&entry.to_le_bytes());
+        }
+        if entries.len() <= 256 {
+            bytes.extend(indices.iter().map(|&index| index as u8));
+        } else {
+            for &index in &indices {
+                bytes.extend_from_slice(&(index as u16).to_le_bytes());
+            }
+        }
+        candidates.push((Encoding::Dictionary, 0, compress(&bytes, level)?));
+    }
+
+    Ok(candidates
+        .into_iter()
+        .min_by_key(|(_, _, payload)| payload.len())
+        .unwrap())
+}
+
+fn decode_chunk(
+    encoding: Encoding,
+    param: u64,
+    payload: &[u8],
+    out: &mut [u64],
+) -> std::io::Result<()> {
+    let n = out.len();
+    match encoding {
+        Encoding::Constant => out.fill(param),
+        Encoding::Raw | Encoding::Delta | Encoding::FixedPoint => {
+            let bytes = zstd::bulk::decompress(payload, n * 8)?;
+            if bytes.len() != n * 8 {
+                return Err(Error::new(ErrorKind::InvalidData, "invalid column chunk"));
+            }
+            unshuffle(&bytes, out);
+            if encoding != Encoding::Raw {
+                delta_decode(out);
+            }
+            if encoding == Encoding::FixedPoint {
+                let scale = f64::from_bits(param);
+                for value in out.iter_mut() {
+                    *value = (*value as i64 as f64 / scale).to_bits();
+                }
+            }
+        }
+        Encoding::Dictionary => {
+            let bytes = zstd::bulk::decompress(payload, 4 + MAX_DICTIONARY_LEN * 8 + n * 2)?;
+            let invalid = || Error::new(ErrorKind::InvalidData, "invalid column chunk");
+            let len = u32::from_le_bytes(bytes.get(0..4).ok_or_else(invalid)?.try_into().unwrap())
+                as usize;
+            let width = if len <= 256 { 1 } else { 2 };
+            if bytes.len() != 4 + len * 8 + n * width {
+                return Err(invalid());
+            }
+            let entries: Vec<u64> = bytes[4..4 + len * 8]
+                .chunks_exact(8)
+                .map(|b| u64::from_le_bytes(b.try_into().unwrap()))
+                .collect();
+            let indices = &bytes[4 + len * 8..];
+            for (i, value) in out.iter_mut().enumerate() {
+                let index = if width == 1 {
+                    indices[i] as usize
+                } else {
+                    u16::from_le_bytes([indices[2 * i], indices[2 * i + 1]]) as usize
+                };
+                *value = *entries.get(index).ok_or_else(invalid)?;
+            }
+        }
+    }
+    Ok(())
+}
+
+/// Writes the structured array in the columnar format.
+///
+/// The rows are divided into blocks of [`ColumnarOptions::block_rows`] rows, and each column of a
+/// block is encoded by the encoding that produces the smallest output, after which it is
+/// compressed by `zstd`. Timestamps are stored as deltas, fields with a few distinct values such
+/// as the event flags as a dictionary, fields set by [`ColumnarOptions::fixed_point`] such as the
+/// prices as fixed-point integers, and fields with a single value, such as the unused
+/// `order_id`, `ival`, and `fval` of L2 data, take no space.
+pub fn write_columnar<W: Write, D: NpyDTyped>(
+    write: &mut W,
+    data: &[D],
+    options: &ColumnarOptions,
+) -> std::io::Result<()> {
+    let descr = D::descr();
+    let offsets = field_offsets(&descr, size_of::<D>())?;
+    let bytes =
+        unsafe { std::slice::from_raw_parts(data.as_ptr() as *const u8, size_of_val(data)) };
+
+    write.write_all(MAGIC)?;
+    write.write_all(&[VERSION])?;
+    write.write_all(&(descr.len() as u32).to_le_bytes())?;
+    for Field { name, ty } in &descr {
+        write.write_all(&(name.len() as u16).to_le_bytes())?;
+        write.write_all(name.as_bytes())?;
+        write.write_all(&(ty.len() as u16).to_le_bytes())?;
+        write.write_all(ty.as_bytes())?;
+    }
+    write.write_all(&(data.len() as u64).to_le_bytes())?;
+    write.write_all(&(options.block_rows as u64).to_le_bytes())?;
+
+    let mut index = Vec::new();
+    let mut payloads = Vec::new();
+    let mut values = Vec::with_capacity(options.block_rows.min(data.len()));
+    for start in (0..data.len()).step_by(options.block_rows) {
+        let end = (start + options.block_rows).min(data.len());
+        for (field, &offset) in descr.iter().zip(offsets.iter()) {
+            values.clear();
+            values.extend((start..end).map(|row| {
+                let i = row * size_of::<D>() + offset;
+                u64::from_le_bytes(bytes[i..i + 8].try_into().unwrap())
+            }));
+            let (encoding, param, payload) = encode_chunk(
+                &values,
+                &field.ty,
+                options.scales.get(&field.name).copied(),
+                options.level,
+            )?;
+            index.push(encoding as u8);
+            index.extend_from_slice(&param.to_le_bytes());
+            index.extend_from_slice(&(payload.len() as u64).to_le_bytes());
+            payloads.push(payload);
+        }
+    }
+    write.write_all(&index)?;
+    for payload in payloads {
+        write.write_all(&payload)?;
+    }
+    Ok(())
+}
+
+struct Chunk<'a> {
+    encoding: Encoding,
+    param: u64,
+    payload: &'a [u8],
+}
+
+fn read_exact<'a>(buf: &'a [u8], pos: &mut usize, len: usize) -> std::io::Result<&'a [u8]> {
+    let bytes = buf
+        .get(*pos..*pos + len)
+        .ok_or_else(|| Error::new(ErrorKind::UnexpectedEof, "truncated columnar file"))?;
+    *pos += len;
+    Ok(bytes)
+}
+
+fn read_u16(buf: &[u8], pos: &mut usize) -> std::io::Result<u16> {
+    Ok(u16::from_le_bytes(
+        read_exact(buf, pos, 2)?.try_into().unwrap(),
+    ))
+}
+
+fn read_u32(buf: &[u8], pos: &mut usize) -> std::io::Result<u32> {
+    Ok(u32::from_le_bytes(
+        read_exact(buf, pos, 4)?.try_into().unwrap(),
+    ))
+}
+
+fn read_u64(buf: &[u8], pos: &mut usize) -> std::io::Result<u64> {
+    Ok(u64::from_le_bytes(
+        read_exact(buf, pos, 8)?.try_into().unwrap(),
+    ))
+}
+
+fn read_string(buf: &[u8], pos: &mut usize) -> std::io::Result<String> {
+    let len = read_u16(buf, pos)? as usize;
+    String::from_utf8(read_exact(buf, pos, len)?.to_vec())
+        .map_err(|err| Error::new(ErrorKind::InvalidData, err.to_string()))
+}
+
+/// The layout of a file in the columnar format in memory.
+struct Layout<'a> {
+    num_rows: usize,
+    block_rows: usize,
+    blocks: Vec<Vec<Chunk<'a>>>,
+    offsets: Vec<usize>,
+    selected: Vec<bool>,
+}
+
+impl Layout<'_> {
+    /// Decodes the block into its rows, `out`, which are zeroed beforehand.
+    fn decode_block(
+        &self,
+        chunks: &[Chunk],
+        out: &mut [u8],
+        size: usize,
+        values: &mut Vec<u64>,
+    ) -> std::io::Result<()> {
+        let rows = out.len() / size;
+        values.resize(rows, 0);
+        for (i, chunk) in chunks.iter().enumerate() {
+            if !self.selected[i] {
+                continue;
+            }
+            decode_chunk(chunk.encoding, chunk.param, chunk.payload, values)?;
+            for (row, value) in values.iter().enumerate() {
+                let at = row * size + self.offsets[i];
+                out[at..at + 8].copy_from_slice(&value.to_le_bytes());
+            }
+        }
+        Ok(())
+    }
+}
+
+fn parse_layout<'a, D: NpyDTyped>(
+    buf: &'a [u8],
+    projection: Option<&[String]>,
+) -> std::io::Result<Layout<'a>> {
+    let mut pos = 0;
+    if read_exact(buf, &mut pos, MAGIC.len())? != MAGIC {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "must start with \\x93HBTCOL",
+        ));
+    }
+    let version = read_exact(buf, &mut pos, 1)?[0];
+    if version != VERSION {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            format!("unsupported version {version}"),
+        ));
+    }
+
+    let num_fields = read_u32(buf, &mut pos)? as usize;
+    let mut descr = Vec::with_capacity(num_fields);
+    for _ in 0..num_fields {
+        let name = read_string(buf, &mut pos)?;
+        let ty = read_string(buf, &mut pos)?;
+        descr.push(Field { name, ty });
+    }
+    if D::descr().len() != descr.len() {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            format!(
+                "Field count mismatch: expected {}, but found {}",
+                D::descr().len(),
+                descr.len()
+            ),
+        ));
+    }
+    if D::descr() != descr {
+        match check_field_consistency(&D::descr(), &descr) {
+            Ok(diff) => {
+                println!("Warning: Field name mismatch - {diff:?}");
+            }
+            Err(err) => {
+                return Err(Error::new(ErrorKind::InvalidData, err));
+            }
+        }
+    }
+    let offsets = field_offsets(&descr, size_of::<D>())?;
+    // Fields outside the projection are left zero.
+    let selected: Vec<bool> = D::descr()
+        .iter()
+        .map(|field| projection.is_none_or(|projection| projection.contains(&field.name)))
+        .collect();
+
+    let num_rows = read_u64(buf, &mut pos)? as usize;
+    let block_rows = read_u64(buf, &mut pos)? as usize;
+    if num_rows > 0 && block_rows == 0 {
+        return Err(Error::new(ErrorKind::InvalidData, "invalid block size"));
+    }
+    let num_blocks = if num_rows > 0 {
+        num_rows.div_ceil(block_rows)
+    } else {
+        0
+    };
+
+    let index = read_exact(buf, &mut pos, num_blocks * num_fields * CHUNK_ENTRY_SIZE)?;
+    let mut blocks = Vec::with_capacity(num_blocks);
+    let mut entries = index.chunks_exact(CHUNK_ENTRY_SIZE);
+    for _ in 0..num_blocks {
+        let mut chunks = Vec::with_capacity(num_fields);
+        for _ in 0..num_fields {
+            let entry = entries.next().unwrap();
+            let encoding = Encoding::try_from(entry[0])?;
+            let param = u64::from_le_bytes(entry[1..9].try_into().unwrap());
+            let len = u64::from_le_bytes(entry[9..17].try_into().unwrap()) as usize;
+            let payload = read_exact(buf, &mut pos, len)?;
+            chunks.push(Chunk {
+                encoding,
+                param,
+                payload,
+            });
+        }
+        blocks.push(chunks);
+    }
+
+    Ok(Layout {
+        num_rows,
+        block_rows,
+        blocks,
+        offsets,
+        selected,
+    })
+}
+
+/// Reads the structured array from the columnar format in memory. See [`read_columnar_file`].
+pub fn read_columnar<D: NpyDTyped + Clone>(
+    buf: &[u8],
+    projection: Option<&[String]>,
+) -> std::io::Result<Data<D>> {
+    let layout = parse_layout::<D>(buf, projection)?;
+    if layout.num_rows == 0 {
+        return Ok(Data::empty());
+    }
+
+    let size = size_of::<D>();
+    let mut ptr = DataPtr::new(layout.num_rows * size);
+    ptr[..].fill(0);
+
+    // Each block is decoded into its own rows of the output, so blocks are decoded in parallel.
+    let work = Mutex::new(
+        layout
+            .blocks
+            .iter()
+            .zip(ptr[..].chunks_mut(layout.block_rows * size)),
+    );
+    let num_workers = thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(layout.blocks.len());
+    thread::scope(|scope| {
+        let workers: Vec<_> = (0..num_workers)
+            .map(|_| {
+                scope.spawn(|| -> std::io::Result<()> {
+                    let mut values = Vec::new();
+                    loop {
+                        let Some((chunks, out)) = work.lock().unwrap().next() else {
+                            return Ok(());
+                        };
+                        layout.decode_block(chunks, out, size, &mut values)?;
+                    }
+                })
+            })
+            .collect();
+        workers
+            .into_iter()
+            .try_for_each(|worker| worker.join().unwrap())
+    })?;
+
+    Ok(unsafe { Data::from_data_ptr(ptr, 0) })
+}
+
+/// Reads the structured array from the columnar format in memory in blocks of `block_size` rows,
+/// calling `sink` with each block in order. The blocks of the file are decoded one at a time, so
+/// only the compressed file and the blocks being decoded are held in memory. Reading stops early
+/// if `sink` returns `false`.
+pub(super) fn read_columnar_blocks<D, F>(
+    buf: &[u8],
+    projection: Option<&[String]>,
+    block_size: usize,
+    mut sink: F,
+) -> std::io::Result<()>
+where
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    let layout = parse_layout::<D>(buf, projection)?;
+    let size = size_of::<D>();
+    let block_size = block_size.max(1);
+
+    let mut decoded = vec![0u8; layout.block_rows.min(layout.num_rows) * size];
+    let mut values = Vec::new();
+    let mut out: Option<(DataPtr, usize)> = None;
+    let mut remaining = layout.num_rows;
+    for chunks in &layout.blocks {
+        let rows = layout.block_rows.min(remaining);
+        remaining -= rows;
+        let decoded = &mut decoded[..rows * size];
+        decoded.fill(0);
+        layout.decode_block(chunks, decoded, size, &mut values)?;
+
+        // Copies the decoded rows into the output blocks, emitting each one once it is full.
+        let mut src = &decoded[..];
+        while !src.is_empty() {
+            let (ptr, filled) = out.get_or_insert_with(|| {
+                let rows = block_size.min((src.len() / size) + remaining);
+                (DataPtr::new(rows * size), 0)
+            });
+            let n = (ptr.len() - *filled).min(src.len());
+            ptr[*filled..*filled + n].copy_from_slice(&src[..n]);
+            *filled += n;
+            src = &src[n..];
+            if *filled == ptr.len() {
+                let (ptr, _) = out.take().unwrap();
+                if !sink(unsafe { Data::from_data_ptr(ptr, 0) }) {
+                    return Ok(());
+                }
+            }
+        }
+    }
+    Ok(())
+}
+
+/// Reads a structured array from a file in the columnar format written by [`write_columnar`] or by
+/// `hftbacktest.data.utils.columnar` in Python. The blocks are decoded in parallel.
+///
+/// If `projection` is given, only the listed fields are decoded and the others are left zero,
+/// which saves decoding the fields that are not used.
+pub fn read_columnar_file<D: NpyDTyped + Clone>(
+    filepath: &str,
+    projection: Option<&[String]>,
+) -> std::io::Result<Data<D>> {
+    let mut file = File::open(filepath)?;
+    let mut buf = Vec::new();
+    file.read_to_end(&mut buf)?;
+    read_columnar(&buf, projection)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::types::{Event, BUY_EVENT, DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT, TRADE_EVENT};
+
+    fn events(n: usize) -> Vec<Event> {
+        let mut events = Vec::with_capacity(n);
+        let mut state = 0x9e3779b97f4a7c15u64;
+        let mut px_tick = 100_000i64;
+        for i in 0..n {
+            state ^= state << 13;
+            state ^= state >> 7;
+            state ^= state << 17;
+            px_tick += (state % 7) as i64 - 3;
+            let ev = if state % 10 == 0 {
+                EXCH_EVENT | LOCAL_EVENT | TRADE_EVENT
+            } else {
+                EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | BUY_EVENT
+            };
+            events.push(Event {
+                ev,
+                exch_ts: 1_700_000_000_000_000_000 + 1_000 * i as i64,
+                local_ts: 1_700_000_000_000_000_000 + 1_000 * i as i64 + (state % 5_000) as i64,
+                px: px_tick as f64 / 100.0,
+                qty: (state % 1_000) as f64 * 0.001,
+                order_id: 0,
+                ival: 0,
+                fval: if i == n / 2 { 0.1 } else { 0.0 },
+            });
+        }
+        events
+    }
+
+    #[test]
+    fn test_round_trip() {
+        let events = events(10_000);
+        let options = ColumnarOptions::new()
+            .block_rows(3_000)
+            .fixed_point("px", 0.01)
+            .fixed_point("qty", 0.001);
+        let mut buf = Vec::new();
+        write_columnar(&mut buf, &events, &options).unwrap();
+        assert!(buf.len() < events.len() * size_of::<Event>() / 5);
+
+        let data = read_columnar::<Event>(&buf, None).unwrap();
+        assert_eq!(data.len(), events.len());
+        for (i, event) in events.iter().enumerate() {
+            assert_eq!(&data[i], event);
+        }
+
+        // The price can be encoded as fixed-point integers in ticks, but not in coarser units.
+        let options = ColumnarOptions::new().fixed_point("px", 0.1);
+        let mut buf = Vec::new();
+        write_columnar(&mut buf, &events, &options).unwrap();
+        let data = read_columnar::<Event>(&buf, None).unwrap();
+        for (i, event) in events.iter().enumerate() {
+            assert_eq!(data[i].px.to_bits(), event.px.to_bits());
+        }
+    }
+
+    #[test]
+    fn test_projection() {
+        let events = events(1_000);
+        let mut buf = Vec::new();
+        write_columnar(&mut buf, &events, &ColumnarOptions::new()).unwrap();
+
+        let projection = vec!["ev".to_string(), "exch_ts".to_string(), "px".to_string()];
+        let data = read_columnar::<Event>(&buf, Some(&projection)).unwrap();
+        for (i, event) in events.iter().enumerate() {
+            assert_eq!(data[i].ev, event.ev);
+            assert_eq!(data[i].exch_ts, event.exch_ts);
+            assert_eq!(data[i].px, event.px);
+            assert_eq!(data[i].local_ts, 0);
+            assert_eq!(data[i].qty, 0.0);
+        }
+    }
+
+    #[test]
+    fn test_empty() {
+        let mut buf = Vec::new();
+        write_columnar::<_, Event>(&mut buf, &[], &ColumnarOptions::new()).unwrap();
+        let data = read_columnar::<Event>(&buf, None).unwrap();
+        assert!(data.is_empty());
+    }
+}
@@ -0,0 +1,674 @@
+use std::{
+    fs,
+    io::{BufReader, Error, ErrorKind, Read, Seek, SeekFrom, Write},
+    marker::PhantomData,
+    mem::size_of,
+    sync::Mutex,
+    thread,
+};
+
+use crate::backtest::data::{
+    npy::{
+        parse_npy,
+        read_npy_blocks,
+        read_npy_blocks_to_end,
+        vec_as_bytes,
+        write_npy,
+        write_npy_header,
+        NpyDTyped,
+    },
+    Data,
+    DataPtr,
+};
+
+/// The magic number of the skippable frame that holds the seek table. Skippable frames are ignored
+/// by both `zstd` and `lz4` decoders, so a compressed file remains a valid stream of concatenated
+/// frames that the standard tools can decompress.
+const SKIPPABLE_MAGIC: u32 = 0x184D2A5E;
+/// The magic number at the end of the seek table, following the `zstd` seekable format.
+const SEEKABLE_MAGIC: u32 = 0x8F92EAB1;
+/// The size of the seek table footer: the number of frames, the descriptor, and the magic number.
+const SEEK_TABLE_FOOTER_SIZE: usize = 9;
+/// The magic number of a `zstd` frame.
+const ZSTD_MAGIC: u32 = 0xFD2FB528;
+
+/// Compression algorithms for block-compressed `numpy` files.
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+pub enum Compression {
+    /// `zstd`, which is used for files ending with `.npy.zst`.
+    Zstd,
+    /// `LZ4`, which is used for files ending with `.npy.lz4`. It compresses less than `zstd` but
+    /// decompresses faster.
+    Lz4,
+}
+
+impl Compression {
+    /// Returns the compression algorithm for the file extension, or `None` if it is not a
+    /// block-compressed `numpy` file.
+    pub fn from_path(filepath: &str) -> Option<Self> {
+        if filepath.ends_with(".npy.zst") {
+            Some(Compression::Zstd)
+        } else if filepath.ends_with(".npy.lz4") {
+            Some(Compression::Lz4)
+        } else {
+            None
+        }
+    }
+
+    fn compress(&self, block: &[u8], level: i32) -> std::io::Result<Vec<u8>> {
+        match self {
+            Compression::Zstd => zstd::bulk::compress(block, level),
+            Compression::Lz4 => {
+                let mut encoder = lz4_flex::frame::FrameEncoder::new(Vec::new());
+                encoder.write_all(block)?;
+                encoder.finish().map_err(Error::other)
+            }
+        }
+    }
+
+    fn decompress_to(&self, frame: &[u8], out: &mut [u8]) -> std::io::Result<()> {
+        match self {
+            Compression::Zstd => {
+                let size = zstd::bulk::decompress_to_buffer(frame, out)?;
+                if size != out.len() {
+                    return Err(Error::new(
+                        ErrorKind::InvalidData,
+                        "frame size mismatches the seek table",
+                    ));
+                }
+                Ok(())
+            }
+            Compression::Lz4 => lz4_flex::frame::FrameDecoder::new(frame).read_exact(out),
+        }
+    }
+
+    fn decompress_all(&self, buf: &[u8]) -> std::io::Result<Vec<u8>> {
+        match self {
+            Compression::Zstd => zstd::stream::decode_all(buf),
+            Compression::Lz4 => {
+                let mut out = Vec::new();
+                lz4_flex::frame::FrameDecoder::new(buf).read_to_end(&mut out)?;
+                Ok(out)
+            }
+        }
+    }
+}
+
+/// Reads the content of concatenated `zstd` frames, decompressing one frame at a time. Each frame
+/// records its own size, so the frames are found without a seek table. An incomplete frame at the
+/// end, which is left when the writer is interrupted, is ignored along with anything after it.
+struct ZstdFrames {
+    buf: Vec<u8>,
+    offset: usize,
+    frame: Vec<u8>,
+    pos: usize,
+}
+
+impl ZstdFrames {
+    fn new(buf: Vec<u8>) -> Self {
+        Self {
+            buf,
+            offset: 0,
+            frame: Vec::new(),
+            pos: 0,
+        }
+    }
+}
+
+impl Read for ZstdFrames {
+    fn read(&mut self, out: &mut [u8]) -> std::io::Result<usize> {
+        while self.pos == self.frame.len() {
+            let rest = &self.buf[self.offset..];
+            if rest.is_empty() {
+                return Ok(0);
+            }
+            let Ok(size) = zstd::zstd_safe::find_frame_compressed_size(rest) else {
+                self.offset = self.buf.len();
+                return Ok(0);
+            };
+            self.frame = zstd::stream::decode_all(&rest[..size])?;
+            self.pos = 0;
+            self.offset += size;
+        }
+        let n = (self.frame.len() - self.pos).min(out.len());
+        out[..n].copy_from_slice(&self.frame[self.pos..self.pos + n]);
+        self.pos += n;
+        Ok(n)
+    }
+}
+
+/// Returns `true` if the file ends with a seek table, which is written last, once all the rows
+/// have been written.
+fn has_seek_table(file: &mut fs::File) -> std::io::Result<bool> {
+    if file.metadata()?.len() < SEEK_TABLE_FOOTER_SIZE as u64 {
+        return Ok(false);
+    }
+    let mut footer = [0; SEEK_TABLE_FOOTER_SIZE];
+    file.seek(SeekFrom::End(-(SEEK_TABLE_FOOTER_SIZE as i64)))?;
+    file.read_exact(&mut footer)?;
+    file.seek(SeekFrom::Start(0))?;
+    Ok(u32::from_le_bytes(footer[5..9].try_into().unwrap()) == SEEKABLE_MAGIC)
+}
+
+/// Returns the compressed and decompressed sizes of the frames from the seek table at the end of
+/// the file, or `None` if there is no seek table.
+fn seek_table(buf: &[u8]) -> std::io::Result<Option<Vec<(usize, usize)>>> {
+    if buf.len() < SEEK_TABLE_FOOTER_SIZE {
+        return Ok(None);
+    }
+    let footer = &buf[buf.len() - SEEK_TABLE_FOOTER_SIZE..];
+    if u32::from_le_bytes(footer[5..9].try_into().unwrap()) != SEEKABLE_MAGIC {
+        return Ok(None);
+    }
+    let num_frames = u32::from_le_bytes(footer[0..4].try_into().unwrap()) as usize;
+    let descriptor = footer[4];
+    let entry_size = if descriptor & 0x80 != 0 { 12 } else { 8 };
+
+    let invalid = || Error::new(ErrorKind::InvalidData, "invalid seek table");
+    let frame_size = num_frames * entry_size + SEEK_TABLE_FOOTER_SIZE;
+    let start = buf.len().checked_sub(frame_size + 8).ok_or_else(invalid)?;
+    let header = &buf[start..start + 8];
+    if u32::from_le_bytes(header[0..4].try_into().unwrap()) != SKIPPABLE_MAGIC
+        || u32::from_le_bytes(header[4..8].try_into().unwrap()) as usize != frame_size
+    {
+        return Err(invalid());
+    }
+
+    let mut frames = Vec::with_capacity(num_frames);
+    let mut compressed_total = 0;
+    for entry in buf[start + 8..start + 8 + num_frames * entry_size].chunks_exact(entry_size) {
+        let compressed = u32::from_le_bytes(entry[0..4].try_into().unwrap()) as usize;
+        let decompressed = u32::from_le_bytes(entry[4..8].try_into().unwrap()) as usize;
+        compressed_total += compressed;
+        frames.push((compressed, decompressed));
+    }
+    if compressed_total != start {
+        return Err(invalid());
+    }
+    Ok(Some(frames))
+}
+
+/// Decompresses the file in memory into a buffer aligned to the cache line size.
+fn decompress(buf: &[u8], compression: Compression) -> std::io::Result<DataPtr> {
+    let Some(frames) = seek_table(buf)? else {
+        // Without a seek table, such as a file compressed by the standard tools or one whose
+        // writer was interrupted, the frames are decompressed sequentially. The rows are then
+        // counted from the decompressed size, since an interrupted writer leaves the number of
+        // rows in the header short.
+        let decompressed = match compression {
+            Compression::Zstd => {
+                let mut decompressed = Vec::new();
+                ZstdFrames::new(buf.to_vec()).read_to_end(&mut decompressed)?;
+                decompressed
+            }
+            Compression::Lz4 => compression.decompress_all(buf)?,
+        };
+        if decompressed.is_empty() {
+            return Err(Error::new(ErrorKind::UnexpectedEof, "empty file"));
+        }
+        let mut ptr = DataPtr::new(decompressed.len());
+        ptr[..].copy_from_slice(&decompressed);
+        return Ok(ptr);
+    };
+
+    let size: usize = frames.iter().map(|(_, decompressed)| decompressed).sum();
+    if size == 0 {
+        return Err(Error::new(ErrorKind::UnexpectedEof, "empty file"));
+    }
+    let mut ptr = DataPtr::new(size);
+
+    let mut work = Vec::with_capacity(frames.len());
+    let mut src = buf;
+    let mut dst = &mut ptr[..];
+    for &(compressed, decompressed) in &frames {
+        let (frame, rest) = src.split_at(compressed);
+        let (out, rest_out) = std::mem::take(&mut dst).split_at_mut(decompressed);
+        work.push((frame, out));
+        src = rest;
+        dst = rest_out;
+    }
+
+    // Each frame is decompressed into its own part of the output, so frames are decompressed in
+    // parallel.
+    let num_workers = thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(work.len());
+    let work = Mutex::new(work.into_iter());
+    thread::scope(|scope| {
+        let workers: Vec<_> = (0..num_workers)
+            .map(|_| {
+                scope.spawn(|| -> std::io::Result<()> {
+                    loop {
+                        let Some((frame, out)) = work.lock().unwrap().next() else {
+                            return Ok(());
+                        };
+                        compression.decompress_to(frame, out)?;
+                    }
+                })
+            })
+            .collect();
+        workers
+            .into_iter()
+            .try_for_each(|worker| worker.join().unwrap())
+    })?;
+    Ok(ptr)
+}
+
+/// Reads a structured array `numpy` file compressed by `zstd` or `LZ4`, `.npy.zst` or `.npy.lz4`.
+///
+/// The file is a sequence of independently compressed frames, each holding a fixed-size block of
+/// the `numpy` file, followed by a seek table in the `zstd` seekable format, which allows the
+/// frames to be decompressed in parallel directly into place. It is written by
+/// [`write_compressed_npy`] or by `hftbacktest.data.write_npy_compressed` in Python. A file
+/// without a seek table, such as one compressed by the standard `zstd` or `lz4` tool, is
+/// decompressed sequentially.
+///
+/// A `zstd` file left unfinished by [`CompressedNpyWriter`], because the process was killed, has no
+/// seek table either. All the complete frames of such a file are read, and the number of rows is
+/// counted from them rather than taken from the header.
+pub fn read_compressed_npy_file<D: NpyDTyped + Clone>(
+    filepath: &str,
+    compression: Compression,
+) -> std::io::Result<Data<D>> {
+    let buf = fs::read(filepath)?;
+    parse_npy(decompress(&buf, compression)?)
+}
+
+/// Reads a structured array `numpy` file compressed by `zstd` or `LZ4` in blocks of `block_size`
+/// rows, decompressing the file as a stream so that only the block being read is held in memory.
+/// Reading stops early if `sink` returns `false`.
+pub(super) fn read_compressed_npy_blocks<D, F>(
+    filepath: &str,
+    compression: Compression,
+    block_size: usize,
+    sink: F,
+) -> std::io::Result<()>
+where
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    let mut file = fs::File::open(filepath)?;
+    match compression {
+        Compression::Zstd if !has_seek_table(&mut file)? => {
+            // The file may be left unfinished, so the rows are read up to the last complete frame.
+            // See `read_compressed_npy_file`.
+            let mut buf = Vec::new();
+            file.read_to_end(&mut buf)?;
+            read_npy_blocks_to_end(&mut ZstdFrames::new(buf), block_size, sink)
+        }
+        Compression::Zstd => {
+            read_npy_blocks(&mut zstd::stream::Decoder::new(file)?, block_size, sink)
+        }
+        Compression::Lz4 => read_npy_blocks(
+            &mut lz4_flex::frame::FrameDecoder::new(BufReader::new(file)),
+            block_size,
+            sink,
+        ),
+    }
+}
+
+/// Writes the structured array as a block-compressed `numpy` file. See
+/// [`read_compressed_npy_file`].
+///
+/// The blocks of `block_size` bytes are compressed in parallel. `level` is the compression level
+/// for `zstd` and is ignored for `LZ4`.
+pub fn write_compressed_npy<W: Write, D: NpyDTyped>(
+    write: &mut W,
+    data: &[D],
+    compression: Compression,
+    block_size: usize,
+    level: i32,
+) -> std::io::Result<()> {
+    let mut npy = Vec::new();
+    write_npy(&mut npy, data)?;
+
+    // The seek table stores the sizes as u32.
+    let block_size = block_size.clamp(1, u32::MAX as usize / 2);
+    let blocks: Vec<&[u8]> = npy.chunks(block_size).collect();
+    let mut frames: Vec<std::io::Result<Vec<u8>>> = Vec::new();
+    frames.resize_with(blocks.len(), || Ok(Vec::new()));
+
+    let num_workers = thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(blocks.len());
+    let work = Mutex::new(blocks.iter().zip(frames.iter_mut()));
+    thread::scope(|scope| {
+        for _ in 0..num_workers {
+            scope.spawn(|| loop {
+                let Some((block, frame)) = work.lock().unwrap().next() else {
+                    return;
+                };
+                *frame = compression.compress(block, level);
+            });
+        }
+    });
+
+    let mut seek_table = Vec::with_capacity(blocks.len() * 8 + SEEK_TABLE_FOOTER_SIZE);
+    for (block, frame) in blocks.iter().zip(frames) {
+        let frame = frame?;
+        if frame.len() > u32::MAX as usize {
+            return Err(Error::new(
+                ErrorKind::InvalidData,
+                "compressed frame is too large",
+            ));
+        }
+        write.write_all(&frame)?;
+        seek_table.extend_from_slice(&(frame.len() as u32).to_le_bytes());
+        seek_table.extend_from_slice(&(block.len() as u32).to_le_bytes());
+    }
+    seek_table.extend_from_slice(&(blocks.len() as u32).to_le_bytes());
+    seek_table.push(0);
+    seek_table.extend_from_slice(&SEEKABLE_MAGIC.to_le_bytes());
+
+    write.write_all(&SKIPPABLE_MAGIC.to_le_bytes())?;
+    write.write_all(&(seek_table.len() as u32).to_le_bytes())?;
+    write.write_all(&seek_table)?;
+    Ok(())
+}
+
+/// Returns a `zstd` frame that stores the content uncompressed, which can be overwritten in place
+/// by content of the same length.
+fn zstd_raw_frame(content: &[u8]) -> Vec<u8> {
+    let mut frame = Vec::with_capacity(content.len() + 12);
+    frame.extend_from_slice(&ZSTD_MAGIC.to_le_bytes());
+    // The frame header descriptor: a single segment with a 4-byte content size.
+    frame.push(0xA0);
+    frame.extend_from_slice(&(content.len() as u32).to_le_bytes());
+    // The block header: the last block, stored raw.
+    frame.extend_from_slice(&(((content.len() as u32) << 3) | 1).to_le_bytes()[..3]);
+    frame.extend_from_slice(content);
+    frame
+}
+
+/// Writes a structured array as a block-compressed `numpy` file incrementally, for the cases where
+/// the rows are not known in advance, such as when the feed is being collected. The file is the
+/// same as one written by [`write_compressed_npy`], except that the `numpy` header is stored
+/// uncompressed in its own frame so that the number of rows can be filled in.
+///
+/// Each block is compressed on the thread calling [`CompressedNpyWriter::write`] once it is full,
+/// and written and flushed as a frame that records its own size. The number of rows in the header
+/// is updated after each frame, and the seek table is written by [`CompressedNpyWriter::finish`].
+/// So if the process is killed before finishing the file, the file still holds every block
+/// written so far, and [`read_compressed_npy_file`] reads them without the seek table. Only the
+/// rows in the block being filled are lost.
+///
+/// Only `zstd` is supported.
+pub struct CompressedNpyWriter<W: Write + Seek, D: NpyDTyped> {
+    write: W,
+    block_size: usize,
+    level: i32,
+    header_pos: u64,
+    header_len: usize,
+    block: Vec<u8>,
+    len: usize,
+    written: usize,
+    frames: Vec<(u32, u32)>,
+    _d: PhantomData<D>,
+}
+
+impl<W, D> CompressedNpyWriter<W, D>
+where
+    W: Write + Seek,
+    D: NpyDTyped,
+{
+    /// Constructs a `CompressedNpyWriter` and writes the `numpy` header. `level` is the `zstd`
+    /// compression level.
+    pub fn new(
+        mut write: W,
+        compression: Compression,
+        block_size: usize,
+        level: i32,
+    ) -> std::io::Result<Self> {
+        if compression != Compression::Zstd {
+            return Err(Error::new(
+                ErrorKind::Unsupported,
+                "incremental writing supports zstd only",
+            ));
+        }
+        let mut header = Vec::new();
+        write_npy_header::<_, D>(&mut header, 0)?;
+        let frame = zstd_raw_frame(&header);
+        let header_pos = write.stream_position()? + (frame.len() - header.len()) as u64;
+        write.write_all(&frame)?;
+        Ok(Self {
+            write,
+            // The seek table stores the sizes as u32.
+            block_size: block_size.clamp(1, u32::MAX as usize / 2),
+            level,
+            header_pos,
+            header_len: header.len(),
+            block: Vec::with_capacity(block_size),
+            len: 0,
+            written: 0,
+            frames: vec![(frame.len() as u32, header.len() as u32)],
+            _d: Default::default(),
+        })
+    }
+
+    /// Returns the number of rows written.
+    pub fn len(&self) -> usize {
+        self.len
+    }
+
+    /// Returns `true` if no rows have been written.
+    pub fn is_empty(&self) -> bool {
+        self.len == 0
+    }
+
+    /// Appends the rows.
+    pub fn write(&mut self, data: &[D]) -> std::io::Result<()> {
+        let mut bytes = vec_as_bytes(data);
+        while !bytes.is_empty() {
+            let n = (self.block_size - self.block.len()).min(bytes.len());
+            self.block.extend_from_slice(&bytes[..n]);
+            bytes = &bytes[n..];
+            if self.block.len() == self.block_size {
+                self.write_block()?;
+            }
+        }
+        self.len += data.len();
+        Ok(())
+    }
+
+    fn write_block(&mut self) -> std::io::Result<()> {
+        let frame = Compression::Zstd.compress(&self.block, self.level)?;
+        if frame.len() > u32::MAX as usize {
+            return Err(Error::new(
+                ErrorKind::InvalidData,
+                "compressed frame is too large",
+            ));
+        }
+        self.write.write_all(&frame)?;
+        self.frames
+            .push((frame.len() as u32, self.block.len() as u32));
+        self.written += self.block.len();
+        self.block.clear();
+
+        // Only counts the rows that are entirely in the written frames, as a block can end in the
+        // middle of a row.
+        let end = self.write.stream_position()?;
+        self.write_header(self.written / size_of::<D>(), end)?;
+        self.write.flush()
+    }
+
+    fn write_header(&mut self, len: usize, end: u64) -> std::io::Result<()> {
+        let mut header = Vec::with_capacity(self.header_len);
+        write_npy_header::<_, D>(&mut header, len)?;
+        debug_assert_eq!(header.len(), self.header_len);
+        self.write.seek(SeekFrom::Start(self.header_pos))?;
+        self.write.write_all(&header)?;
+        self.write.seek(SeekFrom::Start(end))?;
+        Ok(())
+    }
+
+    /// Writes the remaining rows and the seek table, and fills in the final number of rows in the
+    /// `numpy` header. Returns the underlying writer.
+    pub fn finish(mut self) -> std::io::Result<W> {
+        if !self.block.is_empty() {
+            self.write_block()?;
+        }
+
+        let mut seek_table = Vec::with_capacity(self.frames.len() * 8 + SEEK_TABLE_FOOTER_SIZE);
+        for (compressed, decompressed) in &self.frames {
+            seek_table.extend_from_slice(&compressed.to_le_bytes());
+            seek_table.extend_from_slice(&decompressed.to_le_bytes());
+        }
+        seek_table.extend_from_slice(&(self.frames.len() as u32).to_le_bytes());
+        seek_table.push(0);
+        seek_table.extend_from_slice(&SEEKABLE_MAGIC.to_le_bytes());
+
+        self.write.write_all(&SKIPPABLE_MAGIC.to_le_bytes())?;
+        self.write
+            .write_all(&(seek_table.len() as u32).to_le_bytes())?;
+        self.write.write_all(&seek_table)?;
+
+        let end = self.write.stream_position()?;
+        self.write_header(self.len, end)?;
+        self.write.flush()?;
+        Ok(self.write)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::types::{Event, DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT};
+
+    fn events(n: usize) -> Vec<Event> {
+        (0..n)
+            .map(|i| Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT,
+                exch_ts: 1_000 * i as i64,
+                local_ts: 1_000 * i as i64 + 500,
+                px: (10_000 + (i % 17) as i64) as f64 * 0.1,
+                qty: (i % 5) as f64,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect()
+    }
+
+    #[test]
+    fn test_round_trip() {
+        let events = events(10_000);
+        for compression in [Compression::Zstd, Compression::Lz4] {
+            let mut buf = Vec::new();
+            write_compressed_npy(&mut buf, &events, compression, 4096, 3).unwrap();
+            assert!(buf.len() < events.len() * size_of::<Event>() / 2);
+            assert_eq!(
+                seek_table(&buf).unwrap().unwrap().len(),
+                10_000 * 64 / 4096 + 1
+            );
+
+            let data = parse_npy::<Event>(decompress(&buf, compression).unwrap()).unwrap();
+            assert_eq!(data.len(), events.len());
+            for (i, event) in events.iter().enumerate() {
+                assert_eq!(&data[i], event);
+            }
+
+            // Without the seek table, the frames are decompressed sequentially.
+            let table_size = seek_table(&buf).unwrap().unwrap().len() * 8 + 8 + 9;
+            let data = parse_npy::<Event>(
+                decompress(&buf[..buf.len() - table_size], compression).unwrap(),
+            )
+            .unwrap();
+            assert_eq!(data.len(), events.len());
+            assert_eq!(&data[events.len() - 1], &events[events.len() - 1]);
+        }
+    }
+
+    #[test]
+    fn test_incremental_writer() {
+        let events = events(10_000);
+        let mut writer = CompressedNpyWriter::<_, Event>::new(
+            std::io::Cursor::new(Vec::new()),
+            Compression::Zstd,
+            4096,
+            1,
+        )
+        .unwrap();
+        for chunk in events.chunks(333) {
+            writer.write(chunk).unwrap();
+        }
+        assert_eq!(writer.len(), events.len());
+        let buf = writer.finish().unwrap().into_inner();
+
+        let data = parse_npy::<Event>(decompress(&buf, Compression::Zstd).unwrap()).unwrap();
+        assert_eq!(data.len(), events.len());
+        for (i, event) in events.iter().enumerate() {
+            assert_eq!(&data[i], event);
+        }
+
+        // The file is also a valid zstd stream.
+        let npy = zstd::stream::decode_all(&buf[..]).unwrap();
+        let mut expected = Vec::new();
+        write_npy(&mut expected, &events).unwrap();
+        assert_eq!(npy.len(), expected.len());
+        let data = parse_npy::<Event>({
+            let mut ptr = DataPtr::new(npy.len());
+            ptr[..].copy_from_slice(&npy);
+            ptr
+        })
+        .unwrap();
+        assert_eq!(&data[events.len() - 1], &events[events.len() - 1]);
+    }
+
+    #[test]
+    fn test_unfinished_writer() {
+        let events = events(10_001);
+        // The block size is not a multiple of the row size, so a block can end in a partial row.
+        let mut writer = CompressedNpyWriter::<_, Event>::new(
+            std::io::Cursor::new(Vec::new()),
+            Compression::Zstd,
+            4000,
+            1,
+        )
+        .unwrap();
+        writer.write(&events).unwrap();
+        let mut buf = writer.write.into_inner();
+
+        // The header counts the rows in the written frames, leaving out the last row that is still
+        // in the block being filled.
+        let mut header = vec![0; writer.header_len];
+        ZstdFrames::new(buf.clone())
+            .read_exact(&mut header)
+            .unwrap();
+        let mut expected = Vec::new();
+        write_npy_header::<_, Event>(&mut expected, 10_000).unwrap();
+        assert_eq!(header, expected);
+
+        // The writer is dropped without finishing, as if the process were killed, and the last
+        // frame is cut off in the middle.
+        let last_frame = writer.frames.last().unwrap().0 as usize;
+        buf.truncate(buf.len() - last_frame / 2);
+        let complete = 159 * 4000 / size_of::<Event>();
+
+        let data = parse_npy::<Event>(decompress(&buf, Compression::Zstd).unwrap()).unwrap();
+        assert_eq!(data.len(), complete);
+        for i in 0..complete {
+            assert_eq!(&data[i], &events[i]);
+        }
+
+        let filepath =
+            std::env::temp_dir().join(format!("unfinished-{}.npy.zst", std::process::id()));
+        fs::write(&filepath, &buf).unwrap();
+        let mut read = Vec::new();
+        read_compressed_npy_blocks::<Event, _>(
+            filepath.to_str().unwrap(),
+            Compression::Zstd,
+            1000,
+            |data| {
+                for i in 0..data.len() {
+                    read.push(data[i].clone());
+                }
+                true
+            },
+        )
+        .unwrap();
+        fs::remove_file(&filepath).unwrap();
+        assert_eq!(&read[..], &events[..complete]);
+    }
+}
@@ -1,7 +1,13 @@
+mod columnar;
+mod compressed;
 mod npy;
+mod pool;
 mod reader;
+#[cfg(feature = "parquet")]
+mod table;
 
 use std::{
+    fs,
     marker::PhantomData,
     mem::size_of,
     ops::{Index, IndexMut},
@@ -10,11 +16,86 @@ use std::{
     slice::SliceIndex,
 };
 
+pub use columnar::{read_columnar, read_columnar_file, write_columnar, ColumnarOptions};
+pub use compressed::{
+    read_compressed_npy_file,
+    write_compressed_npy,
+    CompressedNpyWriter,
+    Compression,
+};
 pub use npy::{read_npy_file, read_npz_file, write_npy, Field, NpyDTyped, NpyHeader};
 pub use reader::{Cache, DataPreprocess, DataSource, FeedLatencyAdjustment, Reader, ReaderBuilder};
+#[cfg(feature = "parquet")]
+pub use table::{is_table_file, read_table_file};
 
 use crate::utils::{AlignedArray, CACHE_LINE_SIZE};
 
+/// Reads a structured array from the file, choosing the format by the file extension: `numpy`
+/// files, `.npy` and `.npz`, block-compressed `numpy` files, `.npy.zst` and `.npy.lz4`, and the
+/// columnar format, `.hbtc`. For an `.npz` file, the array named `data` is read. With the `parquet`
+/// feature, Parquet files, `.parquet`, and Arrow IPC files, `.arrow`, `.feather`, and `.arrows`,
+/// are also read, mapping their columns to the fields by name. See [`read_table_file`].
+///
+/// If `projection` is given, only the listed fields are decoded from a file in the columnar format
+/// or a Parquet or Arrow IPC file and the others are left zero. It has no effect on the other
+/// formats.
+pub fn read_data_file<D: NpyDTyped + Clone>(
+    filepath: &str,
+    projection: Option<&[String]>,
+) -> std::io::Result<Data<D>> {
+    #[cfg(feature = "parquet")]
+    if is_table_file(filepath) {
+        return read_table_file(filepath, projection);
+    }
+    if filepath.ends_with(".npy") {
+        read_npy_file(filepath)
+    } else if filepath.ends_with(".npz") {
+        read_npz_file(filepath, "data")
+    } else if filepath.ends_with(".hbtc") {
+        read_columnar_file(filepath, projection)
+    } else if let Some(compression) = Compression::from_path(filepath) {
+        read_compressed_npy_file(filepath, compression)
+    } else {
+        Err(std::io::Error::new(
+            std::io::ErrorKind::InvalidData,
+            "unsupported data type",
+        ))
+    }
+}
+
+/// Reads a structured array from the file in blocks of `block_size` rows, calling `sink` with each
+/// block in order, so that the whole array never has to be held in memory. The formats are the
+/// same as [`read_data_file`]. Reading stops early if `sink` returns `false`.
+pub fn read_data_file_blocks<D, F>(
+    filepath: &str,
+    projection: Option<&[String]>,
+    block_size: usize,
+    sink: F,
+) -> std::io::Result<()>
+where
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    #[cfg(feature = "parquet")]
+    if is_table_file(filepath) {
+        return table::read_table_blocks(filepath, projection, block_size, sink);
+    }
+    if filepath.ends_with(".npy") {
+        npy::read_npy_blocks(&mut fs::File::open(filepath)?, block_size, sink)
+    } else if filepath.ends_with(".npz") {
+        npy::read_npz_blocks(filepath, "data", block_size, sink)
+    } else if filepath.ends_with(".hbtc") {
+        columnar::read_columnar_blocks(&fs::read(filepath)?, projection, block_size, sink)
+    } else if let Some(compression) = Compression::from_path(filepath) {
+        compressed::read_compressed_npy_blocks(filepath, compression, block_size, sink)
+    } else {
+        Err(std::io::Error::new(
+            std::io::ErrorKind::InvalidData,
+            "unsupported data type",
+        ))
+    }
+}
+
 /// Marker trait for C representation plain old data.
 ///
 /// # Safety
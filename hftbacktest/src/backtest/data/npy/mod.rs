@@ -1,6 +1,7 @@
 use std::{
     fs::File,
     io::{Error, ErrorKind, Read, Write},
+    mem::size_of,
 };
 
 use crate::{
@@ -119,17 +120,21 @@ impl NpyHeader {
     }
 
     fn to_string_padding(&self) -> String {
+        self.to_string_reserving(0)
+    }
+
+    /// Formats the header padded as in [`NpyHeader::to_string_padding`], leaving room for
+    /// `reserved` more characters so that a header with a longer shape has the same length.
+    fn to_string_reserving(&self, reserved: usize) -> String {
         let descr = self.descr();
         let fortran_order = self.fortran_order();
         let shape = self.shape();
         let mut header =
             format!("{{'descr': {descr}, 'fortran_order': {fortran_order}, 'shape': {shape}}}");
         let header_len = 10 + header.len() + 1;
-        if header_len % 64 != 0 {
-            let padding = (header_len / 64 + 1) * 64 - header_len;
-            for _ in 0..padding {
-                header += " ";
-            }
+        let padded_len = (header_len + reserved).div_ceil(64) * 64;
+        for _ in header_len..padded_len {
+            header += " ";
         }
         header += "\n";
         header
@@ -138,12 +143,12 @@ impl NpyHeader {
 
 #[allow(dead_code)]
 #[derive(Debug)]
-struct FieldCheckResult {
+pub(super) struct FieldCheckResult {
     expected: String,
     found: String,
 }
 
-fn check_field_consistency(
+pub(super) fn check_field_consistency(
     expected_types: &DType,
     found_types: &DType,
 ) -> Result<Vec<FieldCheckResult>, String> {
@@ -176,6 +181,35 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
         read_size += reader.read(&mut buf[read_size..])?;
     }
 
+    parse_npy(buf)
+}
+
+/// Parses the `numpy` file loaded in the buffer, returning [`Data`] that refers to the array in
+/// place.
+pub(super) fn parse_npy<D: NpyDTyped + Clone>(buf: DataPtr) -> std::io::Result<Data<D>> {
+    if buf.len() < 10 {
+        return Err(Error::new(ErrorKind::UnexpectedEof, "truncated numpy file"));
+    }
+    let header_len = u16::from_le_bytes(buf[8..10].try_into().unwrap()) as usize;
+    if buf.len() < 10 + header_len {
+        return Err(Error::new(ErrorKind::UnexpectedEof, "truncated numpy file"));
+    }
+    parse_header::<D>(&buf[0..(10 + header_len)])?;
+
+    if (10 + header_len) % CACHE_LINE_SIZE != 0 {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            format!("Not aligned with cache line size ({CACHE_LINE_SIZE} bytes)."),
+        ));
+    }
+
+    let data = unsafe { Data::from_data_ptr(buf, 10 + header_len) };
+    Ok(data)
+}
+
+/// Parses and validates the `numpy` file header, which consists of the magic string, the version,
+/// the header length, and the header itself.
+fn parse_header<D: NpyDTyped>(buf: &[u8]) -> std::io::Result<NpyHeader> {
     if buf[0..6].to_vec() != b"\x93NUMPY" {
         return Err(Error::new(
             ErrorKind::InvalidData,
@@ -188,8 +222,7 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
             "support only version 1.0",
         ));
     }
-    let header_len = u16::from_le_bytes(buf[8..10].try_into().unwrap()) as usize;
-    let header = String::from_utf8(buf[10..(10 + header_len)].to_vec())
+    let header = String::from_utf8(buf[10..].to_vec())
         .map_err(|err| Error::new(ErrorKind::InvalidData, err.to_string()))?;
     let header = NpyHeader::from_header(&header).unwrap();
 
@@ -214,16 +247,91 @@ pub fn read_npy<R: Read, D: NpyDTyped + Clone>(
     if header.shape.len() != 1 {
         return Err(Error::new(ErrorKind::InvalidData, "only 1-d is supported"));
     }
+    Ok(header)
+}
 
-    if (10 + header_len) % CACHE_LINE_SIZE != 0 {
-        return Err(Error::new(
-            ErrorKind::InvalidData,
-            format!("Not aligned with cache line size ({CACHE_LINE_SIZE} bytes)."),
-        ));
+/// Reads a structured array `numpy` file from the stream in blocks of `block_size` rows, calling
+/// `sink` with each block in order. Only the block being read is held in memory. Reading stops
+/// early if `sink` returns `false`.
+pub(super) fn read_npy_blocks<R, D, F>(
+    reader: &mut R,
+    block_size: usize,
+    mut sink: F,
+) -> std::io::Result<()>
+where
+    R: Read,
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    let header = read_header::<_, D>(reader)?;
+
+    let size = size_of::<D>();
+    let block_size = block_size.max(1);
+    let mut remaining = header.shape[0];
+    while remaining > 0 {
+        let rows = remaining.min(block_size);
+        let mut ptr = DataPtr::new(rows * size);
+        reader.read_exact(&mut ptr[..])?;
+        if !sink(unsafe { Data::from_data_ptr(ptr, 0) }) {
+            break;
+        }
+        remaining -= rows;
+    }
+    Ok(())
+}
+
+/// Reads a structured array `numpy` file from the stream in blocks of `block_size` rows in the
+/// same way as [`read_npy_blocks`], but reads the rows until the end of the stream regardless of
+/// the number of rows in the header, which can be short if the file is not finished. A partial row
+/// at the end is ignored.
+pub(super) fn read_npy_blocks_to_end<R, D, F>(
+    reader: &mut R,
+    block_size: usize,
+    mut sink: F,
+) -> std::io::Result<()>
+where
+    R: Read,
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    read_header::<_, D>(reader)?;
+
+    let size = size_of::<D>();
+    let block_size = block_size.max(1);
+    loop {
+        let mut ptr = DataPtr::new(block_size * size);
+        let mut read_size = 0;
+        while read_size < ptr.len() {
+            match reader.read(&mut ptr[read_size..]) {
+                Ok(0) => break,
+                Ok(n) => read_size += n,
+                Err(error) if error.kind() == ErrorKind::Interrupted => {}
+                Err(error) => return Err(error),
+            }
+        }
+        let rows = read_size / size;
+        if rows == 0 {
+            break;
+        }
+        if rows < block_size {
+            let mut last = DataPtr::new(rows * size);
+            last[..].copy_from_slice(&ptr[..rows * size]);
+            ptr = last;
+        }
+        if !sink(unsafe { Data::from_data_ptr(ptr, 0) }) || rows < block_size {
+            break;
+        }
     }
+    Ok(())
+}
 
-    let data = unsafe { Data::from_data_ptr(buf, 10 + header_len) };
-    Ok(data)
+fn read_header<R: Read, D: NpyDTyped>(reader: &mut R) -> std::io::Result<NpyHeader> {
+    let mut buf = vec![0; 10];
+    reader.read_exact(&mut buf)?;
+    let header_len = u16::from_le_bytes(buf[8..10].try_into().unwrap()) as usize;
+    buf.resize(10 + header_len, 0);
+    reader.read_exact(&mut buf[10..])?;
+    parse_header::<D>(&buf)
 }
 
 /// Reads a structured array `numpy` file. Currently, it doesn't check if the data structure is the
@@ -248,6 +356,24 @@ pub fn read_npz_file<D: NpyDTyped + Clone>(filepath: &str, name: &str) -> std::i
     read_npy(&mut file, size)
 }
 
+/// Reads a structured array `numpy` zip archived file in blocks of `block_size` rows. See
+/// [`read_npy_blocks`].
+pub(super) fn read_npz_blocks<D, F>(
+    filepath: &str,
+    name: &str,
+    block_size: usize,
+    sink: F,
+) -> std::io::Result<()>
+where
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    let mut archive = zip::ZipArchive::new(File::open(filepath)?)?;
+
+    let mut file = archive.by_name(&format!("{}.npy", name))?;
+    read_npy_blocks(&mut file, block_size, sink)
+}
+
 pub fn write_npy<W: Write, T: NpyDTyped>(write: &mut W, data: &[T]) -> std::io::Result<()> {
     let descr = T::descr();
     let header = NpyHeader {
@@ -265,7 +391,28 @@ pub fn write_npy<W: Write, T: NpyDTyped>(write: &mut W, data: &[T]) -> std::io::
     Ok(())
 }
 
-fn vec_as_bytes<T>(vec: &[T]) -> &[u8] {
+/// Writes the header of a structured array `numpy` file of `len` rows. The header has the same
+/// length regardless of `len`, so that it can be overwritten once the number of rows is known.
+pub(super) fn write_npy_header<W: Write, T: NpyDTyped>(
+    write: &mut W,
+    len: usize,
+) -> std::io::Result<()> {
+    let header = NpyHeader {
+        descr: T::descr(),
+        fortran_order: false,
+        shape: vec![len],
+    };
+
+    write.write_all(b"\x93NUMPY\x01\x00")?;
+    let reserved = u64::MAX.to_string().len() - len.to_string().len();
+    let header_str = header.to_string_reserving(reserved);
+    let len = header_str.len() as u16;
+    write.write_all(&len.to_le_bytes())?;
+    write.write_all(header_str.as_bytes())?;
+    Ok(())
+}
+
+pub(super) fn vec_as_bytes<T>(vec: &[T]) -> &[u8] {
     let len = std::mem::size_of_val(vec);
     let ptr = vec.as_ptr() as *const u8;
     unsafe { std::slice::from_raw_parts(ptr, len) }
@@ -0,0 +1,118 @@
+use std::{
+    collections::VecDeque,
+    sync::{Arc, Condvar, Mutex, OnceLock},
+    thread,
+};
+
+type Job = Box<dyn FnOnce() + Send + 'static>;
+
+/// A job that loads a file. It is run by whichever comes first: a thread of the [`LoaderPool`],
+/// or the reader that needs the file before any thread of the pool picks it up. The latter keeps
+/// the reader from waiting behind the files prefetched by the other readers.
+#[derive(Clone)]
+pub(super) struct LoadTask(Arc<Mutex<Option<Job>>>);
+
+impl LoadTask {
+    /// Constructs a `LoadTask`.
+    pub fn new<F>(job: F) -> Self
+    where
+        F: FnOnce() + Send + 'static,
+    {
+        Self(Arc::new(Mutex::new(Some(Box::new(job)))))
+    }
+
+    /// Runs the job on the current thread unless it has already been run.
+    pub fn run(&self) {
+        let job = self.0.lock().unwrap().take();
+        if let Some(job) = job {
+            job();
+        }
+    }
+}
+
+struct Queue {
+    tasks: Mutex<VecDeque<LoadTask>>,
+    available: Condvar,
+}
+
+/// A pool of loader threads shared by all the readers. The number of files being loaded at the
+/// same time, and therefore the memory used for decompression, is bounded by the number of
+/// threads regardless of the number of assets, and the threads are not created for every file.
+pub(super) struct LoaderPool {
+    queue: Arc<Queue>,
+}
+
+impl LoaderPool {
+    /// Returns the pool shared by all the readers, which has as many threads as the available
+    /// parallelism.
+    pub fn global() -> &'static LoaderPool {
+        static POOL: OnceLock<LoaderPool> = OnceLock::new();
+        POOL.get_or_init(|| {
+            let num_threads = thread::available_parallelism()
+                .map(|n| n.get())
+                .unwrap_or(1);
+            LoaderPool::new(num_threads)
+        })
+    }
+
+    fn new(num_threads: usize) -> Self {
+        let queue = Arc::new(Queue {
+            tasks: Mutex::new(VecDeque::new()),
+            available: Condvar::new(),
+        });
+        for i in 0..num_threads {
+            let queue = queue.clone();
+            let _ = thread::Builder::new()
+                .name(format!("hftbacktest-loader-{i}"))
+                .spawn(move || loop {
+                    let task = {
+                        let mut tasks = queue.tasks.lock().unwrap();
+                        loop {
+                            match tasks.pop_front() {
+                                Some(task) => break task,
+                                None => tasks = queue.available.wait(tasks).unwrap(),
+                            }
+                        }
+                    };
+                    task.run();
+                });
+        }
+        Self { queue }
+    }
+
+    /// Queues the task, which is run in the order it is submitted.
+    pub fn submit(&self, task: LoadTask) {
+        self.queue.tasks.lock().unwrap().push_back(task);
+        self.queue.available.notify_one();
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::sync::mpsc::channel;
+
+    use super::*;
+
+    #[test]
+    fn test_pool() {
+        let pool = LoaderPool::new(2);
+        let (tx, rx) = channel();
+        let tasks: Vec<_> = (0..10)
+            .map(|i| {
+                let tx = tx.clone();
+                LoadTask::new(move || tx.send(i).unwrap())
+            })
+            .collect();
+        for task in &tasks {
+            pool.submit(task.clone());
+        }
+        // Running a task that has already been run or is being run by the pool does nothing.
+        for task in &tasks {
+            task.run();
+        }
+        let mut results: Vec<i32> = (0..10).map(|_| rx.recv().unwrap()).collect();
+        results.sort();
+        assert_eq!(results, (0..10).collect::<Vec<_>>());
+        assert!(rx.try_recv().is_err());
+    }
+}
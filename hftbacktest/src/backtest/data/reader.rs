@@ -4,7 +4,7 @@ use std::{
     io::{Error as IoError, ErrorKind},
     rc::Rc,
     sync::{
-        mpsc::{channel, Receiver, Sender},
+        mpsc::{channel, sync_channel, Receiver, Sender},
         Arc,
     },
     thread,
@@ -12,10 +12,16 @@ use std::{
 
 use uuid::Uuid;
 
+#[cfg(feature = "parquet")]
+use crate::backtest::data::is_table_file;
 use crate::{
     backtest::{
         data::{
-            npy::{read_npy_file, read_npz_file, NpyDTyped},
+            npy::NpyDTyped,
+            pool::{LoadTask, LoaderPool},
+            read_data_file,
+            read_data_file_blocks,
+            Compression,
             Data,
             POD,
         },
@@ -30,7 +36,8 @@ pub enum DataSource<D>
 where
     D: POD + Clone,
 {
-    /// Data needs to be loaded from the specified file. This should be a `numpy` file.
+    /// Data needs to be loaded from the specified file. See [`read_data_file`] for the supported
+    /// formats.
     ///
     /// It will be loaded when needed and released
     /// when no [Processor](`crate::backtest::proc::Processor`) is reading the data.
@@ -215,7 +222,11 @@ where
     cache: Cache<D>,
     temporary_data: HashMap<String, Data<D>>,
     parallel_load: bool,
+    prefetch: usize,
     preprocessor: Option<Arc<Box<dyn DataPreprocess<D> + Sync + Send + 'static>>>,
+    projection: Option<Arc<Vec<String>>>,
+    block_size: usize,
+    prefetch_depth: usize,
 }
 
 impl<D> Default for ReaderBuilder<D>
@@ -228,7 +239,11 @@ where
             cache: Default::default(),
             temporary_data: Default::default(),
             parallel_load: false,
+            prefetch: 1,
             preprocessor: None,
+            projection: None,
+            block_size: 0,
+            prefetch_depth: 2,
         }
     }
 }
@@ -245,7 +260,10 @@ where
     /// Sets whether to load the next data in parallel. This allows [`Reader`] to not only load the
     /// next data but also preload subsequent data, ensuring it is ready in advance.
     ///
-    /// Loading is performed by spawning a separate thread.
+    /// Loading is performed by a pool of loader threads shared by all the readers, so the number
+    /// of files being loaded at the same time is bounded by the number of threads regardless of
+    /// the number of assets. If a file is needed before any thread picks it up, the reader loads
+    /// it by itself rather than waiting behind the files prefetched by the other readers.
     ///
     /// The default value is `true`.
     pub fn parallel_load(self, parallel_load: bool) -> Self {
@@ -255,6 +273,17 @@ where
         }
     }
 
+    /// Sets the number of files loaded in advance of the file being read if `parallel_load` is
+    /// enabled. Prefetching more files hides the loading time at file boundaries when the files
+    /// are short relative to the time to load them, at the cost of holding up to that many more
+    /// files in memory per reader. A reader never loads more than that many files ahead, which
+    /// bounds the memory used.
+    ///
+    /// The default value is `1`.
+    pub fn prefetch(self, prefetch: usize) -> Self {
+        Self { prefetch, ..self }
+    }
+
     /// Sets a [`DataPreprocess`].
     pub fn preprocessor<Preprocessor>(self, preprocessor: Preprocessor) -> Self
     where
@@ -266,6 +295,42 @@ where
         }
     }
 
+    /// Sets the fields to be decoded when reading files in the columnar format, `.hbtc`. The other
+    /// fields are left zero, which saves decoding the fields that are not used. It has no effect
+    /// on the other formats.
+    pub fn projection(self, fields: Vec<String>) -> Self {
+        Self {
+            projection: Some(Arc::new(fields)),
+            ..self
+        }
+    }
+
+    /// Sets the number of rows in a block to read the files in blocks instead of as a whole. Each
+    /// file is read by a separate thread that streams the blocks ahead of the backtest, so only a
+    /// few blocks of each file are held in memory at a time regardless of the file size, which
+    /// bounds the memory usage of backtests over many assets. If `parallel_load` is enabled, the
+    /// first blocks of the next file are also loaded in advance.
+    ///
+    /// The data set by the user through [`DataSource::Data`] is still read as a whole.
+    ///
+    /// The default value is `0`, which reads each file as a whole.
+    pub fn block_size(self, block_size: usize) -> Self {
+        Self { block_size, ..self }
+    }
+
+    /// Sets the number of blocks loaded in advance of the block being read when reading the files
+    /// in blocks. The loading thread also prepares one more block while it waits, so with a
+    /// depth of `1`, the next block is loaded while the current one is being read, which is double
+    /// buffering. Only valid if `block_size` is set.
+    ///
+    /// The default value is `2`.
+    pub fn prefetch_depth(self, prefetch_depth: usize) -> Self {
+        Self {
+            prefetch_depth,
+            ..self
+        }
+    }
+
     /// Sets the data to be read by [`Reader`]. The items in the `data` vector should be arranged in
     /// the chronological order.
     pub fn data(self, data: Vec<DataSource<D>>) -> Self {
@@ -308,11 +373,63 @@ where
             tx,
             rx: Rc::new(rx),
             parallel_load: self.parallel_load,
+            prefetch: self.prefetch,
             preprocessor: self.preprocessor.clone(),
+            projection: self.projection.clone(),
+            block_size: self.block_size,
+            prefetch_depth: self.prefetch_depth,
+            block_num: 0,
+            streams: Rc::new(RefCell::new(Streams::new())),
+            tasks: Default::default(),
         })
     }
 }
 
+/// A stream of the blocks of a file, which are read by a separate thread.
+struct BlockStream<D>
+where
+    D: NpyDTyped + Clone,
+{
+    rx: Receiver<Result<DataSend<D>, IoError>>,
+    received: usize,
+}
+
+/// A block that is kept until all the readers sharing it release it.
+struct CachedBlock<D>
+where
+    D: NpyDTyped + Clone,
+{
+    data: Data<D>,
+    pending: usize,
+}
+
+/// The state of reading the files in blocks, which is shared by the clones of a [`Reader`].
+struct Streams<D>
+where
+    D: NpyDTyped + Clone,
+{
+    /// The streams of the files being read, by the position of the file in the data list.
+    streams: HashMap<usize, BlockStream<D>>,
+    /// The blocks that are not yet released by all the readers, by the positions of the file and
+    /// the block.
+    blocks: HashMap<(usize, usize), CachedBlock<D>>,
+    /// The number of blocks of the files that are read to the end.
+    num_blocks: HashMap<usize, usize>,
+}
+
+impl<D> Streams<D>
+where
+    D: NpyDTyped + Clone,
+{
+    fn new() -> Self {
+        Self {
+            streams: HashMap::new(),
+            blocks: HashMap::new(),
+            num_blocks: HashMap::new(),
+        }
+    }
+}
+
 /// Provides `Data` reading based on the given sequence of data through `Cache`.
 #[derive(Clone)]
 pub struct Reader<D>
@@ -325,7 +442,14 @@ where
     tx: Sender<LoadDataResult<D>>,
     rx: Rc<Receiver<LoadDataResult<D>>>,
     parallel_load: bool,
+    prefetch: usize,
     preprocessor: Option<Arc<Box<dyn DataPreprocess<D> + Sync + Send + 'static>>>,
+    projection: Option<Arc<Vec<String>>>,
+    block_size: usize,
+    prefetch_depth: usize,
+    block_num: usize,
+    streams: Rc<RefCell<Streams<D>>>,
+    tasks: Rc<RefCell<HashMap<String, LoadTask>>>,
 }
 
 impl<D> Reader<D>
@@ -340,22 +464,47 @@ where
     /// Releases this [`Data`] from the `Cache`. The `Cache` will delete the [`Data`] if there are
     /// no readers accessing it.
     pub fn release(&mut self, data: Data<D>) {
+        if self.block_size > 0 {
+            let mut streams = self.streams.borrow_mut();
+            if let Some((&key, block)) = streams
+                .blocks
+                .iter_mut()
+                .find(|(_, block)| block.data.data_eq(&data))
+            {
+                block.pending -= 1;
+                if block.pending == 0 {
+                    streams.blocks.remove(&key);
+                }
+                return;
+            }
+        }
         self.cache.remove(data);
     }
 
-    /// Retrieves the next [`Data`] based on the order of your additions.
+    /// Retrieves the next [`Data`] based on the order of your additions. If the block size is set,
+    /// the files are delivered in blocks.
     pub fn next_data(&mut self) -> Result<Data<D>, BacktestError> {
+        if self.block_size > 0 {
+            return self.next_block();
+        }
         if self.data_num < self.data_key_list.len() {
             let key = self.data_key_list.get(self.data_num).cloned().unwrap();
             self.load_data(&key)?;
 
             if self.parallel_load {
-                let next_key = self.data_key_list.get(self.data_num + 1).cloned();
-                if let Some(next_key) = next_key {
+                let end = (self.data_num + 1 + self.prefetch).min(self.data_key_list.len());
+                for i in (self.data_num + 1)..end {
+                    let next_key = self.data_key_list[i].clone();
                     self.load_data(&next_key)?;
                 }
             }
 
+            // Loads the data on this thread if no loader thread has picked it up yet.
+            let task = self.tasks.borrow_mut().remove(&key);
+            if let Some(task) = task {
+                task.run();
+            }
+
             while !self.cache.is_ready(&key) {
                 match self.rx.recv().unwrap() {
                     LoadDataResult {
@@ -380,69 +529,232 @@ where
         }
     }
 
-    fn load_data(&mut self, key: &str) -> Result<(), BacktestError> {
-        if !self.cache.contains(key) {
-            self.cache.prepare(key.to_string());
+    fn next_block(&mut self) -> Result<Data<D>, BacktestError> {
+        while self.data_num < self.data_key_list.len() {
+            let key = self.data_key_list[self.data_num].clone();
+            if self.cache.contains(&key) {
+                // The data set by the user is already in memory, so it is delivered as a whole.
+                self.data_num += 1;
+                self.block_num = 0;
+                return Ok(self.cache.get(&key));
+            }
 
-            if key.ends_with(".npy") {
-                let tx = self.tx.clone();
-                let filepath = key.to_string();
-                let preprocessor = self.preprocessor.clone();
+            match self.block(self.data_num, self.block_num)? {
+                Some(data) => {
+                    self.block_num += 1;
+                    return Ok(data);
+                }
+                None => {
+                    self.data_num += 1;
+                    self.block_num = 0;
+                }
+            }
+        }
+        Err(BacktestError::EndOfData)
+    }
 
-                let _ = thread::spawn(move || {
-                    let load_data = |filepath: &str| {
-                        let mut data = read_npy_file::<D>(filepath)?;
-                        if let Some(preprocessor) = &preprocessor {
-                            preprocessor.preprocess(&mut data)?;
-                        }
-                        Ok(data)
-                    };
-                    // SendError occurs only if Reader is already destroyed. Since no data is needed
-                    // once the Reader is destroyed, SendError is safely suppressed.
-                    match load_data(&filepath) {
-                        Ok(data) => {
-                            let _ = tx.send(LoadDataResult::ok(filepath, data));
-                        }
-                        Err(err) => {
-                            let _ = tx.send(LoadDataResult::err(filepath, err));
-                        }
-                    }
-                });
-            } else if key.ends_with(".npz") {
-                let tx = self.tx.clone();
-                let filepath = key.to_string();
-                let preprocessor = self.preprocessor.clone();
-
-                let _ = thread::spawn(move || {
-                    let load_data = |filepath: &str| {
-                        let mut data = read_npz_file::<D>(filepath, "data")?;
-                        if let Some(preprocessor) = &preprocessor {
-                            preprocessor.preprocess(&mut data)?;
-                        }
-                        Ok(data)
-                    };
-                    // SendError occurs only if Reader is already destroyed. Since no data is needed
-                    // once the Reader is destroyed, SendError is safely suppressed.
-                    match load_data(&filepath) {
-                        Ok(data) => {
-                            let _ = tx.send(LoadDataResult::ok(filepath, data));
-                        }
-                        Err(err) => {
-                            let _ = tx.send(LoadDataResult::err(filepath, err));
+    /// Returns the block of the file, or `None` if the file has no more blocks.
+    fn block(&self, data_num: usize, block_num: usize) -> Result<Option<Data<D>>, BacktestError> {
+        // Every clone of the reader reads every block, so a block is kept until all of them
+        // release it.
+        let consumers = Rc::strong_count(&self.streams);
+        let mut streams = self.streams.borrow_mut();
+        let Streams {
+            streams,
+            blocks,
+            num_blocks,
+        } = &mut *streams;
+
+        if let Some(block) = blocks.get(&(data_num, block_num)) {
+            return Ok(Some(block.data.clone()));
+        }
+        if let Some(&num_blocks) = num_blocks.get(&data_num) {
+            if block_num >= num_blocks {
+                return Ok(None);
+            }
+            return self.read_block(data_num, block_num);
+        }
+
+        self.open_stream(streams, data_num)?;
+        if self.parallel_load {
+            let end = (data_num + 1 + self.prefetch).min(self.data_key_list.len());
+            for next in (data_num + 1)..end {
+                if !self.cache.contains(&self.data_key_list[next])
+                    && !num_blocks.contains_key(&next)
+                {
+                    self.open_stream(streams, next)?;
+                }
+            }
+        }
+
+        let stream = streams.get_mut(&data_num).unwrap();
+        if block_num < stream.received {
+            return self.read_block(data_num, block_num);
+        }
+        while stream.received <= block_num {
+            match stream.rx.recv() {
+                Ok(Ok(data)) => {
+                    blocks.insert(
+                        (data_num, stream.received),
+                        CachedBlock {
+                            data: data.unwrap(),
+                            pending: consumers,
+                        },
+                    );
+                    stream.received += 1;
+                }
+                Ok(Err(err)) => {
+                    streams.remove(&data_num);
+                    return Err(BacktestError::DataError(err));
+                }
+                Err(_) => {
+                    // The loading thread has finished reading the file.
+                    num_blocks.insert(data_num, stream.received);
+                    streams.remove(&data_num);
+                    return Ok(None);
+                }
+            }
+        }
+        Ok(Some(blocks[&(data_num, block_num)].data.clone()))
+    }
+
+    /// Spawns a thread that reads the file in blocks, staying up to `prefetch_depth` blocks ahead
+    /// of the readers.
+    fn open_stream(
+        &self,
+        streams: &mut HashMap<usize, BlockStream<D>>,
+        data_num: usize,
+    ) -> Result<(), BacktestError> {
+        if streams.contains_key(&data_num) {
+            return Ok(());
+        }
+        let filepath = self.data_key_list[data_num].clone();
+        if !is_supported(&filepath) {
+            return Err(BacktestError::DataError(IoError::new(
+                ErrorKind::InvalidData,
+                "unsupported data type",
+            )));
+        }
+
+        let (tx, rx) = sync_channel(self.prefetch_depth);
+        let preprocessor = self.preprocessor.clone();
+        let projection = self.projection.clone();
+        let block_size = self.block_size;
+
+        let _ = thread::spawn(move || {
+            let mut error = None;
+            let result = read_data_file_blocks::<D, _>(
+                &filepath,
+                projection.as_deref().map(Vec::as_slice),
+                block_size,
+                |mut data| {
+                    if let Some(preprocessor) = &preprocessor {
+                        if let Err(err) = preprocessor.preprocess(&mut data) {
+                            error = Some(err);
+                            return false;
                         }
                     }
-                });
-            } else {
+                    // SendError occurs only if Reader is already destroyed. Since no data is
+                    // needed once the Reader is destroyed, reading stops.
+                    tx.send(Ok(DataSend(data))).is_ok()
+                },
+            );
+            if let Some(err) = error.or(result.err()) {
+                let _ = tx.send(Err(err));
+            }
+        });
+
+        streams.insert(data_num, BlockStream { rx, received: 0 });
+        Ok(())
+    }
+
+    /// Reads the block again from the file. This happens only if a reader falls behind the others
+    /// after they have released the block, such as a clone of the reader that starts late.
+    fn read_block(
+        &self,
+        data_num: usize,
+        block_num: usize,
+    ) -> Result<Option<Data<D>>, BacktestError> {
+        let mut block = None;
+        let mut i = 0;
+        read_data_file_blocks::<D, _>(
+            &self.data_key_list[data_num],
+            self.projection.as_deref().map(Vec::as_slice),
+            self.block_size,
+            |data| {
+                if i == block_num {
+                    block = Some(data);
+                    return false;
+                }
+                i += 1;
+                true
+            },
+        )?;
+        if let (Some(preprocessor), Some(data)) = (&self.preprocessor, block.as_mut()) {
+            preprocessor.preprocess(data)?;
+        }
+        Ok(block)
+    }
+
+    fn load_data(&mut self, key: &str) -> Result<(), BacktestError> {
+        if !self.cache.contains(key) {
+            if !is_supported(key) {
                 return Err(BacktestError::DataError(IoError::new(
                     ErrorKind::InvalidData,
                     "unsupported data type",
                 )));
             }
+
+            self.cache.prepare(key.to_string());
+
+            let tx = self.tx.clone();
+            let filepath = key.to_string();
+            let preprocessor = self.preprocessor.clone();
+            let projection = self.projection.clone();
+
+            let task = LoadTask::new(move || {
+                let load_data = |filepath: &str| {
+                    let mut data =
+                        read_data_file::<D>(filepath, projection.as_deref().map(Vec::as_slice))?;
+                    if let Some(preprocessor) = &preprocessor {
+                        preprocessor.preprocess(&mut data)?;
+                    }
+                    Ok(data)
+                };
+                // SendError occurs only if Reader is already destroyed. Since no data is needed
+                // once the Reader is destroyed, SendError is safely suppressed.
+                match load_data(&filepath) {
+                    Ok(data) => {
+                        let _ = tx.send(LoadDataResult::ok(filepath, data));
+                    }
+                    Err(err) => {
+                        let _ = tx.send(LoadDataResult::err(filepath, err));
+                    }
+                }
+            });
+            self.tasks
+                .borrow_mut()
+                .insert(key.to_string(), task.clone());
+            LoaderPool::global().submit(task);
         }
         Ok(())
     }
 }
 
+/// Returns `true` if the file extension is one of the formats supported by [`read_data_file`].
+fn is_supported(filepath: &str) -> bool {
+    filepath.ends_with(".npy")
+        || filepath.ends_with(".npz")
+        || filepath.ends_with(".hbtc")
+        || Compression::from_path(filepath).is_some()
+        || is_table_file(filepath)
+}
+
+#[cfg(not(feature = "parquet"))]
+fn is_table_file(_filepath: &str) -> bool {
+    false
+}
+
 /// `DataPreprocess` offers a function to preprocess data before it is fed into the backtesting.
 /// This feature is primarily introduced to adjust timestamps, making it particularly useful when
 /// backtesting the market from a location different from where your order latency was originally
@@ -489,3 +801,161 @@ impl DataPreprocess<Event> for FeedLatencyAdjustment {
         Ok(())
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use std::{fs::File, path::PathBuf};
+
+    use super::*;
+    use crate::{
+        backtest::data::{write_columnar, write_compressed_npy, write_npy, ColumnarOptions},
+        types::{DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT},
+    };
+
+    fn events(n: usize) -> Vec<Event> {
+        (0..n)
+            .map(|i| Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT,
+                exch_ts: i as i64,
+                local_ts: i as i64 + 1,
+                px: (i % 100) as f64,
+                qty: 1.0,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            })
+            .collect()
+    }
+
+    fn write_files(name: &str, events: &[Event]) -> Vec<String> {
+        let dir = std::env::temp_dir();
+        let path = |ext: &str| -> PathBuf { dir.join(format!("hftbacktest_reader_{name}{ext}")) };
+
+        let npy = path(".npy");
+        write_npy(&mut File::create(&npy).unwrap(), events).unwrap();
+        let hbtc = path(".hbtc");
+        write_columnar(
+            &mut File::create(&hbtc).unwrap(),
+            events,
+            &ColumnarOptions::new().block_rows(700),
+        )
+        .unwrap();
+        let zst = path(".npy.zst");
+        write_compressed_npy(
+            &mut File::create(&zst).unwrap(),
+            events,
+            Compression::Zstd,
+            1 << 16,
+            1,
+        )
+        .unwrap();
+
+        [npy, hbtc, zst]
+            .iter()
+            .map(|path| path.to_str().unwrap().to_string())
+            .collect()
+    }
+
+    #[test]
+    fn test_prefetch() {
+        let events = events(1_000);
+        let mut files = write_files("prefetch", &events);
+        files.extend(files.clone());
+        let mut reader = Reader::<Event>::builder()
+            .data(files.iter().cloned().map(DataSource::File).collect())
+            .parallel_load(true)
+            .prefetch(2)
+            .build()
+            .unwrap();
+        let mut other = reader.clone();
+
+        let mut data = Data::empty();
+        for _ in 0..files.len() {
+            let next = reader.next_data().unwrap();
+            assert_eq!(next.len(), events.len());
+            assert_eq!(&next[999], &events[999]);
+            // The files are loaded up to two files ahead.
+            assert!(reader.cache.0.borrow().len() <= 4);
+
+            let other_data = other.next_data().unwrap();
+            assert!(other_data.data_eq(&next));
+            other.release(other_data);
+            reader.release(std::mem::replace(&mut data, next));
+        }
+        assert!(matches!(reader.next_data(), Err(BacktestError::EndOfData)));
+    }
+
+    #[test]
+    fn test_block_reading() {
+        let events = events(10_000);
+        let files = write_files("block_reading", &events);
+        let mut reader = Reader::<Event>::builder()
+            .data(files.iter().cloned().map(DataSource::File).collect())
+            .block_size(1_000)
+            .prefetch_depth(1)
+            .parallel_load(true)
+            .build()
+            .unwrap();
+        let mut lagging = reader.clone();
+
+        // The lagging reader reads every block two blocks behind the leading reader, as the local
+        // processor does behind the exchange processor.
+        let mut leading_data = Data::empty();
+        let mut lagging_data = Data::empty();
+        let mut read = Vec::new();
+        for i in 0.. {
+            match reader.next_data() {
+                Ok(data) => {
+                    assert!(data.len() <= 1_000);
+                    reader.release(std::mem::replace(&mut leading_data, data));
+                }
+                Err(BacktestError::EndOfData) => {}
+                Err(err) => panic!("{err:?}"),
+            }
+            if i >= 2 {
+                match lagging.next_data() {
+                    Ok(data) => {
+                        for j in 0..data.len() {
+                            read.push(data[j].clone());
+                        }
+                        lagging.release(std::mem::replace(&mut lagging_data, data));
+                    }
+                    Err(BacktestError::EndOfData) => break,
+                    Err(err) => panic!("{err:?}"),
+                }
+            }
+            assert!(reader.streams.borrow().blocks.len() <= 4);
+        }
+
+        assert_eq!(read.len(), events.len() * files.len());
+        for (i, event) in read.iter().enumerate() {
+            assert_eq!(event, &events[i % events.len()]);
+        }
+    }
+
+    #[test]
+    fn test_read_released_block() {
+        let events = events(5_000);
+        let files = write_files("released_block", &events);
+        let mut reader = Reader::<Event>::builder()
+            .data(vec![DataSource::File(files[2].clone())])
+            .block_size(1_000)
+            .build()
+            .unwrap();
+        for _ in 0..3 {
+            let data = reader.next_data().unwrap();
+            reader.release(data);
+        }
+        assert!(reader.streams.borrow().blocks.is_empty());
+
+        // A reader that starts after the blocks are released reads them again from the file.
+        let mut late = reader.clone();
+        late.block_num = 0;
+        for i in 0..5 {
+            let data = late.next_data().unwrap();
+            assert_eq!(data.len(), 1_000);
+            assert_eq!(&data[0], &events[i * 1_000]);
+        }
+        assert!(matches!(late.next_data(), Err(BacktestError::EndOfData)));
+    }
+}
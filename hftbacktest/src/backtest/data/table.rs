@@ -0,0 +1,509 @@
+use std::{
+    fs::File,
+    io::{BufReader, Error, ErrorKind},
+    mem::size_of,
+};
+
+use arrow::{
+    array::{Array, AsArray, RecordBatch},
+    compute::cast,
+    datatypes::{DataType, Float64Type, Int64Type, SchemaRef, UInt64Type},
+    ipc::reader::{FileReader, StreamReader},
+};
+use parquet::arrow::{arrow_reader::ParquetRecordBatchReaderBuilder, ProjectionMask};
+
+use crate::backtest::data::{columnar::field_offsets, npy::NpyDTyped, Data, DataPtr};
+
+/// The number of rows decoded at a time when a table is read as a whole.
+const BATCH_SIZE: usize = 1 << 16;
+
+/// The format of a table file whose columns map to the fields of the structured array.
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+enum Table {
+    /// Parquet, `.parquet`.
+    Parquet,
+    /// Arrow IPC file format, also known as Feather V2, `.arrow` or `.feather`.
+    ArrowFile,
+    /// Arrow IPC streaming format, `.arrows`.
+    ArrowStream,
+}
+
+impl Table {
+    fn from_path(filepath: &str) -> Option<Self> {
+        if filepath.ends_with(".parquet") {
+            Some(Table::Parquet)
+        } else if filepath.ends_with(".arrow") || filepath.ends_with(".feather") {
+            Some(Table::ArrowFile)
+        } else if filepath.ends_with(".arrows") {
+            Some(Table::ArrowStream)
+        } else {
+            None
+        }
+    }
+}
+
+/// Returns `true` if the file is a Parquet or Arrow IPC file, which can be read by
+/// [`read_table_file`].
+pub fn is_table_file(filepath: &str) -> bool {
+    Table::from_path(filepath).is_some()
+}
+
+/// Maps the fields of the structured array to the columns of a table.
+struct Mapping {
+    /// The name, type, and byte offset of the fields to be read.
+    fields: Vec<(String, String, usize)>,
+}
+
+impl Mapping {
+    fn new<D: NpyDTyped>(projection: Option<&[String]>) -> std::io::Result<Self> {
+        let descr = D::descr();
+        let offsets = field_offsets(&descr, size_of::<D>())?;
+        let fields = descr
+            .into_iter()
+            .zip(offsets)
+            .filter(|(field, _)| {
+                projection.is_none_or(|projection| projection.contains(&field.name))
+            })
+            .map(|(field, offset)| (field.name, field.ty, offset))
+            .collect();
+        Ok(Self { fields })
+    }
+
+    /// Returns the indices of the columns to be read, which are those named after the fields.
+    fn columns(&self, schema: &SchemaRef) -> Vec<usize> {
+        let mut columns: Vec<usize> = self
+            .fields
+            .iter()
+            .filter_map(|(name, _, _)| schema.index_of(name).ok())
+            .collect();
+        columns.sort();
+        columns
+    }
+
+    /// Writes the rows of the batch into `out`, which must be zeroed beforehand. Fields without a
+    /// matching column and null values are left zero.
+    fn write_rows(&self, batch: &RecordBatch, out: &mut [u8], size: usize) -> std::io::Result<()> {
+        for (name, ty, offset) in &self.fields {
+            let Some(column) = batch.column_by_name(name) else {
+                continue;
+            };
+            let mut write = |row: usize, value: u64| {
+                let at = row * size + offset;
+                out[at..at + 8].copy_from_slice(&value.to_le_bytes());
+            };
+            match ty.get(1..) {
+                Some("i8") => {
+                    let column = cast(column, &DataType::Int64).map_err(Error::other)?;
+                    for (row, value) in column.as_primitive::<Int64Type>().iter().enumerate() {
+                        write(row, value.unwrap_or(0) as u64);
+                    }
+                }
+                Some("u8") => {
+                    let column = cast(column, &DataType::UInt64).map_err(Error::other)?;
+                    for (row, value) in column.as_primitive::<UInt64Type>().iter().enumerate() {
+                        write(row, value.unwrap_or(0));
+                    }
+                }
+                Some("f8") => {
+                    let column = cast(column, &DataType::Float64).map_err(Error::other)?;
+                    for (row, value) in column.as_primitive::<Float64Type>().iter().enumerate() {
+                        write(row, value.unwrap_or(0.0).to_bits());
+                    }
+                }
+                _ => {
+                    return Err(Error::new(
+                        ErrorKind::InvalidData,
+                        format!("unsupported field type '{name}: {ty}'"),
+                    ));
+                }
+            }
+        }
+        Ok(())
+    }
+
+    /// Converts the batch into [`Data`].
+    fn to_data<D: NpyDTyped + Clone>(&self, batch: &RecordBatch) -> std::io::Result<Data<D>> {
+        let size = size_of::<D>();
+        let mut ptr = DataPtr::new(batch.num_rows() * size);
+        ptr[..].fill(0);
+        self.write_rows(batch, &mut ptr[..], size)?;
+        Ok(unsafe { Data::from_data_ptr(ptr, 0) })
+    }
+}
+
+/// Opens the table, reading only the columns named after the fields, and returns an iterator over
+/// its record batches. Parquet files are decoded `batch_size` rows at a time, row group by row
+/// group.
+fn open_table(
+    filepath: &str,
+    table: Table,
+    mapping: &Mapping,
+    batch_size: usize,
+) -> std::io::Result<Box<dyn Iterator<Item = std::io::Result<RecordBatch>>>> {
+    match table {
+        Table::Parquet => {
+            let builder = ParquetRecordBatchReaderBuilder::try_new(File::open(filepath)?)
+                .map_err(Error::other)?;
+            let mask =
+                ProjectionMask::roots(builder.parquet_schema(), mapping.columns(builder.schema()));
+            let reader = builder
+                .with_projection(mask)
+                .with_batch_size(batch_size)
+                .build()
+                .map_err(Error::other)?;
+            Ok(Box::new(reader.map(|batch| batch.map_err(Error::other))))
+        }
+        Table::ArrowFile => {
+            // The schema is read first to find the columns to be read.
+            let schema = FileReader::try_new(BufReader::new(File::open(filepath)?), None)
+                .map_err(Error::other)?
+                .schema();
+            let reader = FileReader::try_new(
+                BufReader::new(File::open(filepath)?),
+                Some(mapping.columns(&schema)),
+            )
+            .map_err(Error::other)?;
+            Ok(Box::new(reader.map(|batch| batch.map_err(Error::other))))
+        }
+        Table::ArrowStream => {
+            let schema = StreamReader::try_new(BufReader::new(File::open(filepath)?), None)
+                .map_err(Error::other)?
+                .schema();
+            let reader = StreamReader::try_new(
+                BufReader::new(File::open(filepath)?),
+                Some(mapping.columns(&schema)),
+            )
+            .map_err(Error::other)?;
+            Ok(Box::new(reader.map(|batch| batch.map_err(Error::other))))
+        }
+    }
+}
+
+/// Reads a structured array from a Parquet file, `.parquet`, or an Arrow IPC file, `.arrow` or
+/// `.feather` for the file format and `.arrows` for the streaming format.
+///
+/// The columns are mapped to the fields of the structured array by name, so a table with the
+/// columns of `event_dtype`, `ev`, `exch_ts`, `local_ts`, `px`, `qty`, `order_id`, `ival`, and
+/// `fval`, can be read as [`Event`](crate::types::Event). The columns are cast to the type of the
+/// field, so that, for example, a timestamp column can be read into an `i64` field. Only the
+/// columns named after the fields are read, and the fields without a matching column, such as
+/// `order_id`, `ival`, and `fval` of L2 data that does not have them, and null values are left
+/// zero.
+///
+/// If `projection` is given, only the listed fields are read and the others are left zero.
+pub fn read_table_file<D: NpyDTyped + Clone>(
+    filepath: &str,
+    projection: Option<&[String]>,
+) -> std::io::Result<Data<D>> {
+    let table = Table::from_path(filepath)
+        .ok_or_else(|| Error::new(ErrorKind::InvalidData, "unsupported data type"))?;
+    let mapping = Mapping::new::<D>(projection)?;
+    let batches =
+        open_table(filepath, table, &mapping, BATCH_SIZE)?.collect::<std::io::Result<Vec<_>>>()?;
+
+    let num_rows: usize = batches.iter().map(|batch| batch.num_rows()).sum();
+    if num_rows == 0 {
+        return Ok(Data::empty());
+    }
+    let size = size_of::<D>();
+    let mut ptr = DataPtr::new(num_rows * size);
+    ptr[..].fill(0);
+    let mut start = 0;
+    for batch in &batches {
+        let end = start + batch.num_rows() * size;
+        mapping.write_rows(batch, &mut ptr[start..end], size)?;
+        start = end;
+    }
+    Ok(unsafe { Data::from_data_ptr(ptr, 0) })
+}
+
+/// Reads a structured array from a Parquet or Arrow IPC file in blocks of at most `block_size`
+/// rows, calling `sink` with each block in order. See [`read_table_file`]. Parquet files are
+/// decoded a block at a time, and Arrow IPC files a record batch at a time. Reading stops early if
+/// `sink` returns `false`.
+pub(super) fn read_table_blocks<D, F>(
+    filepath: &str,
+    projection: Option<&[String]>,
+    block_size: usize,
+    mut sink: F,
+) -> std::io::Result<()>
+where
+    D: NpyDTyped + Clone,
+    F: FnMut(Data<D>) -> bool,
+{
+    let table = Table::from_path(filepath)
+        .ok_or_else(|| Error::new(ErrorKind::InvalidData, "unsupported data type"))?;
+    let mapping = Mapping::new::<D>(projection)?;
+    let block_size = block_size.max(1);
+    for batch in open_table(filepath, table, &mapping, block_size)? {
+        let batch = batch?;
+        let mut offset = 0;
+        while offset < batch.num_rows() {
+            let len = block_size.min(batch.num_rows() - offset);
+            if !sink(mapping.to_data(&batch.slice(offset, len))?) {
+                return Ok(());
+            }
+            offset += len;
+        }
+    }
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use std::sync::Arc;
+
+    use arrow::{
+        array::{ArrayRef, Float64Array, Int64Array, TimestampNanosecondArray, UInt64Array},
+        ipc::writer::FileWriter,
+    };
+    use parquet::{arrow::ArrowWriter, file::properties::WriterProperties};
+    use zip::{write::SimpleFileOptions, ZipWriter};
+
+    use super::*;
+    use crate::{
+        backtest::data::{read_data_file, read_data_file_blocks, write_npy},
+        types::{Event, BUY_EVENT, DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT, SELL_EVENT, TRADE_EVENT},
+    };
+
+    fn batch(n: usize) -> RecordBatch {
+        let ev = EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | BUY_EVENT;
+        // The L2 data has neither `order_id`, `ival`, nor `fval`, and stores the exchange
+        // timestamp as a timestamp and the quantity with a null.
+        RecordBatch::try_from_iter([
+            ("ev", Arc::new(UInt64Array::from(vec![ev; n])) as ArrayRef),
+            (
+                "exch_ts",
+                Arc::new(TimestampNanosecondArray::from(
+                    (0..n as i64).collect::<Vec<_>>(),
+                )) as ArrayRef,
+            ),
+            (
+                "local_ts",
+                Arc::new(Int64Array::from(
+                    (0..n as i64).map(|i| i + 10).collect::<Vec<_>>(),
+                )) as ArrayRef,
+            ),
+            (
+                "px",
+                Arc::new(Float64Array::from(
+                    (0..n).map(|i| i as f64 * 0.5).collect::<Vec<_>>(),
+                )) as ArrayRef,
+            ),
+            (
+                "qty",
+                Arc::new(Float64Array::from(
+                    (0..n)
+                        .map(|i| if i == 1 { None } else { Some(1.0) })
+                        .collect::<Vec<_>>(),
+                )) as ArrayRef,
+            ),
+        ])
+        .unwrap()
+    }
+
+    fn check(data: &Data<Event>, start: usize, px: bool) {
+        for i in 0..data.len() {
+            let row = start + i;
+            assert_eq!(
+                data[i].ev,
+                EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | BUY_EVENT
+            );
+            assert_eq!(data[i].exch_ts, row as i64);
+            assert_eq!(data[i].local_ts, row as i64 + 10);
+            assert_eq!(data[i].px, if px { row as f64 * 0.5 } else { 0.0 });
+            assert_eq!(data[i].qty, if row == 1 { 0.0 } else { 1.0 });
+            assert_eq!(data[i].order_id, 0);
+        }
+    }
+
+    fn write_files(name: &str, n: usize) -> Vec<String> {
+        let dir = std::env::temp_dir();
+        let batch = batch(n);
+
+        let parquet_file = dir.join(format!("hftbacktest_table_{name}.parquet"));
+        let props = WriterProperties::builder()
+            .set_max_row_group_size(1_000)
+            .build();
+        let mut writer = ArrowWriter::try_new(
+            File::create(&parquet_file).unwrap(),
+            batch.schema(),
+            Some(props),
+        )
+        .unwrap();
+        writer.write(&batch).unwrap();
+        writer.close().unwrap();
+
+        let arrow_file = dir.join(format!("hftbacktest_table_{name}.arrow"));
+        let mut writer =
+            FileWriter::try_new(File::create(&arrow_file).unwrap(), &batch.schema()).unwrap();
+        writer.write(&batch.slice(0, n / 2)).unwrap();
+        writer.write(&batch.slice(n / 2, n - n / 2)).unwrap();
+        writer.finish().unwrap();
+
+        [parquet_file, arrow_file]
+            .iter()
+            .map(|path| path.to_str().unwrap().to_string())
+            .collect()
+    }
+
+    #[test]
+    fn test_read_table() {
+        for file in write_files("read", 2_500) {
+            let data = read_table_file::<Event>(&file, None).unwrap();
+            assert_eq!(data.len(), 2_500);
+            check(&data, 0, true);
+
+            let projection = ["ev", "exch_ts", "local_ts", "qty"].map(String::from);
+            let data = read_table_file::<Event>(&file, Some(&projection)).unwrap();
+            check(&data, 0, false);
+        }
+    }
+
+    #[test]
+    fn test_read_table_blocks() {
+        for file in write_files("blocks", 2_500) {
+            let mut start = 0;
+            read_table_blocks::<Event, _>(&file, None, 700, |data| {
+                assert!(data.len() <= 700);
+                check(&data, start, true);
+                start += data.len();
+                true
+            })
+            .unwrap();
+            assert_eq!(start, 2_500);
+        }
+    }
+
+    fn events(n: usize) -> Vec<Event> {
+        (0..n)
+            .map(|i| Event {
+                ev: EXCH_EVENT
+                    | LOCAL_EVENT
+                    | if i % 3 == 0 {
+                        TRADE_EVENT | SELL_EVENT
+                    } else {
+                        DEPTH_EVENT | BUY_EVENT
+                    },
+                exch_ts: 1_000_000 * i as i64,
+                local_ts: 1_000_000 * i as i64 + 12_345,
+                px: 100.0 + (i % 17) as f64 * 0.1,
+                qty: (i % 5) as f64 * 0.001,
+                order_id: i as u64 * 7,
+                ival: -(i as i64),
+                fval: i as f64 * 0.25,
+            })
+            .collect()
+    }
+
+    fn to_batch(events: &[Event]) -> RecordBatch {
+        RecordBatch::try_from_iter([
+            (
+                "ev",
+                Arc::new(UInt64Array::from_iter_values(events.iter().map(|e| e.ev))) as ArrayRef,
+            ),
+            (
+                "exch_ts",
+                Arc::new(Int64Array::from_iter_values(
+                    events.iter().map(|e| e.exch_ts),
+                )) as ArrayRef,
+            ),
+            (
+                "local_ts",
+                Arc::new(Int64Array::from_iter_values(
+                    events.iter().map(|e| e.local_ts),
+                )) as ArrayRef,
+            ),
+            (
+                "px",
+                Arc::new(Float64Array::from_iter_values(events.iter().map(|e| e.px))) as ArrayRef,
+            ),
+            (
+                "qty",
+                Arc::new(Float64Array::from_iter_values(events.iter().map(|e| e.qty))) as ArrayRef,
+            ),
+            (
+                "order_id",
+                Arc::new(UInt64Array::from_iter_values(
+                    events.iter().map(|e| e.order_id),
+                )) as ArrayRef,
+            ),
+            (
+                "ival",
+                Arc::new(Int64Array::from_iter_values(events.iter().map(|e| e.ival))) as ArrayRef,
+            ),
+            (
+                "fval",
+                Arc::new(Float64Array::from_iter_values(
+                    events.iter().map(|e| e.fval),
+                )) as ArrayRef,
+            ),
+        ])
+        .unwrap()
+    }
+
+    #[test]
+    fn test_round_trip_npz() {
+        let n = 2_500;
+        let events = events(n);
+        let batch = to_batch(&events);
+        let dir = std::env::temp_dir();
+
+        let npz_file = dir.join("hftbacktest_table_round_trip.npz");
+        let mut zip = ZipWriter::new(File::create(&npz_file).unwrap());
+        zip.start_file("data.npy", SimpleFileOptions::default())
+            .unwrap();
+        write_npy(&mut zip, &events).unwrap();
+        zip.finish().unwrap();
+
+        let parquet_file = dir.join("hftbacktest_table_round_trip.parquet");
+        let props = WriterProperties::builder()
+            .set_max_row_group_size(1_000)
+            .build();
+        let mut writer = ArrowWriter::try_new(
+            File::create(&parquet_file).unwrap(),
+            batch.schema(),
+            Some(props),
+        )
+        .unwrap();
+        writer.write(&batch).unwrap();
+        writer.close().unwrap();
+
+        let arrow_file = dir.join("hftbacktest_table_round_trip.arrow");
+        let mut writer =
+            FileWriter::try_new(File::create(&arrow_file).unwrap(), &batch.schema()).unwrap();
+        writer.write(&batch.slice(0, 1_200)).unwrap();
+        writer.write(&batch.slice(1_200, n - 1_200)).unwrap();
+        writer.finish().unwrap();
+
+        let npz_file = npz_file.to_str().unwrap();
+        let expected = read_data_file::<Event>(npz_file, None).unwrap();
+        assert_eq!(expected.len(), n);
+        for i in 0..n {
+            assert_eq!(expected[i], events[i]);
+        }
+
+        for file in [parquet_file, arrow_file] {
+            let file = file.to_str().unwrap();
+
+            // The table is read the same as the `.npz` file holding the same events, both at once
+            // and in blocks that don't line up with the row groups or the record batches.
+            let data = read_data_file::<Event>(file, None).unwrap();
+            assert_eq!(data.len(), n);
+            for i in 0..n {
+                assert_eq!(data[i], expected[i], "{file}, row {i}");
+            }
+
+            let mut start = 0;
+            read_data_file_blocks::<Event, _>(file, None, 700, |data| {
+                for i in 0..data.len() {
+                    assert_eq!(data[i], expected[start + i], "{file}, row {}", start + i);
+                }
+                start += data.len();
+                true
+            })
+            .unwrap();
+            assert_eq!(start, n);
+        }
+    }
+}
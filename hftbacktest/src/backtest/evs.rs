@@ -21,34 +21,48 @@ pub enum EventIntentKind {
     ExchOrder = 3,
 }
 
+/// Event queue implementation used by the backtester to find the next event.
+#[derive(Eq, PartialEq, Clone, Copy, Debug, Default)]
+pub enum EventQueueKind {
+    /// Scans the timestamps of all event sources, `4 × num_assets`, to find the earliest one. It
+    /// has the lowest constant overhead, so it is the fastest for a small number of assets.
+    #[default]
+    Linear,
+    /// Maintains a tournament tree over the event sources. Finding the earliest event is O(1) and
+    /// updating a timestamp is O(log n), so it is faster for a larger number of assets. The
+    /// crossover is typically between 4 and 8 assets; see the `evs_crossover` benchmark.
+    TournamentTree,
+}
+
 /// Manages the event timestamps to determine the next event to be processed.
-pub struct EventSet {
-    timestamp: AlignedArray<i64, CACHE_LINE_SIZE>,
+pub enum EventSet {
+    Linear(LinearEventSet),
+    TournamentTree(TournamentTreeEventSet),
 }
 
 impl EventSet {
-    /// Constructs an instance of `EventSet`.
+    /// Constructs an instance of `EventSet` using the linear scan.
     pub fn new(num_assets: usize) -> Self {
-        if num_assets == 0 {
-            panic!();
-        }
-        let mut timestamp = AlignedArray::<i64, CACHE_LINE_SIZE>::new(num_assets * 4);
-        for i in 0..(num_assets * 4) {
-            timestamp[i] = i64::MAX;
+        Self::with_kind(num_assets, EventQueueKind::Linear)
+    }
+
+    /// Constructs an instance of `EventSet` using the given event queue implementation.
+    pub fn with_kind(num_assets: usize, kind: EventQueueKind) -> Self {
+        match kind {
+            EventQueueKind::Linear => Self::Linear(LinearEventSet::new(num_assets)),
+            EventQueueKind::TournamentTree => {
+                Self::TournamentTree(TournamentTreeEventSet::new(num_assets))
+            }
         }
-        Self { timestamp }
     }
 
     /// Returns the next event to be processed, which has the earliest timestamp.
+    #[inline]
     pub fn next(&self) -> Option<EventIntent> {
-        let mut evst_no = 0;
-        let mut timestamp = unsafe { *self.timestamp.get_unchecked(0) };
-        for (i, &ev_timestamp) in self.timestamp[1..].iter().enumerate() {
-            if ev_timestamp < timestamp {
-                timestamp = ev_timestamp;
-                evst_no = i + 1;
-            }
-        }
+        let (evst_no, timestamp) = match self {
+            Self::Linear(evs) => evs.earliest(),
+            Self::TournamentTree(evs) => evs.earliest(),
+        };
         // Returns None if no valid events are found.
         if timestamp == i64::MAX {
             return None;
@@ -64,8 +78,32 @@ impl EventSet {
 
     #[inline]
     fn update(&mut self, evst_no: usize, timestamp: i64) {
-        let item = unsafe { self.timestamp.get_unchecked_mut(evst_no) };
-        *item = timestamp;
+        match self {
+            Self::Linear(evs) => evs.update(evst_no, timestamp),
+            Self::TournamentTree(evs) => evs.update(evst_no, timestamp),
+        }
+    }
+
+    #[inline]
+    fn timestamp(&self, evst_no: usize) -> i64 {
+        match self {
+            Self::Linear(evs) => evs.timestamp[evst_no],
+            Self::TournamentTree(evs) => evs.timestamp[evst_no],
+        }
+    }
+
+    /// Copies the event timestamps of `num_assets` assets, starting from the asset `src_asset_no`
+    /// of `src`, to those starting from the asset `asset_no`.
+    pub fn copy_from(
+        &mut self,
+        asset_no: usize,
+        src: &EventSet,
+        src_asset_no: usize,
+        num_assets: usize,
+    ) {
+        for i in 0..(4 * num_assets) {
+            self.update(4 * asset_no + i, src.timestamp(4 * src_asset_no + i));
+        }
     }
 
     #[inline]
@@ -89,18 +127,225 @@ impl EventSet {
     }
 
     #[inline]
-    fn invalidate(&mut self, evst_no: usize) {
+    pub fn invalidate_local_data(&mut self, asset_no: usize) {
+        self.update(4 * asset_no, i64::MAX);
+    }
+
+    #[inline]
+    pub fn invalidate_exch_data(&mut self, asset_no: usize) {
+        self.update(4 * asset_no + 2, i64::MAX);
+    }
+}
+
+/// Finds the earliest event by scanning all event timestamps.
+pub struct LinearEventSet {
+    timestamp: AlignedArray<i64, CACHE_LINE_SIZE>,
+}
+
+impl LinearEventSet {
+    fn new(num_assets: usize) -> Self {
+        if num_assets == 0 {
+            panic!();
+        }
+        let mut timestamp = AlignedArray::<i64, CACHE_LINE_SIZE>::new(num_assets * 4);
+        for i in 0..(num_assets * 4) {
+            timestamp[i] = i64::MAX;
+        }
+        Self { timestamp }
+    }
+
+    #[inline]
+    fn earliest(&self) -> (usize, i64) {
+        let mut evst_no = 0;
+        let mut timestamp = unsafe { *self.timestamp.get_unchecked(0) };
+        for (i, &ev_timestamp) in self.timestamp[1..].iter().enumerate() {
+            if ev_timestamp < timestamp {
+                timestamp = ev_timestamp;
+                evst_no = i + 1;
+            }
+        }
+        (evst_no, timestamp)
+    }
+
+    #[inline]
+    fn update(&mut self, evst_no: usize, timestamp: i64) {
         let item = unsafe { self.timestamp.get_unchecked_mut(evst_no) };
-        *item = i64::MAX;
+        *item = timestamp;
+    }
+}
+
+/// Finds the earliest event using a tournament tree, a complete binary tree whose leaves are the
+/// event timestamps and whose internal nodes hold the winner, the event with the earlier
+/// timestamp, of their two children. Ties are won by the lower event number, so the order in
+/// which events are processed is identical to [`LinearEventSet`].
+pub struct TournamentTreeEventSet {
+    /// The number of leaves, which is the number of events rounded up to a power of two.
+    size: usize,
+    timestamp: Vec<i64>,
+    /// `winner[1]` is the root and the children of `winner[i]` are `winner[2i]` and
+    /// `winner[2i + 1]`. `winner[size + i]` is the leaf of the event `i`.
+    winner: Vec<usize>,
+}
+
+impl TournamentTreeEventSet {
+    fn new(num_assets: usize) -> Self {
+        if num_assets == 0 {
+            panic!();
+        }
+        let size = (num_assets * 4).next_power_of_two();
+        let mut winner = vec![0; 2 * size];
+        for i in 0..size {
+            winner[size + i] = i;
+        }
+        for node in (1..size).rev() {
+            winner[node] = winner[2 * node];
+        }
+        Self {
+            size,
+            timestamp: vec![i64::MAX; size],
+            winner,
+        }
     }
 
     #[inline]
-    pub fn invalidate_local_data(&mut self, asset_no: usize) {
-        self.invalidate(4 * asset_no);
+    fn earliest(&self) -> (usize, i64) {
+        let evst_no = unsafe { *self.winner.get_unchecked(1) };
+        (evst_no, unsafe { *self.timestamp.get_unchecked(evst_no) })
     }
 
     #[inline]
-    pub fn invalidate_exch_data(&mut self, asset_no: usize) {
-        self.invalidate(4 * asset_no + 2);
+    fn update(&mut self, evst_no: usize, timestamp: i64) {
+        let item = unsafe { self.timestamp.get_unchecked_mut(evst_no) };
+        if *item == timestamp {
+            return;
+        }
+        *item = timestamp;
+
+        let mut node = (self.size + evst_no) >> 1;
+        while node > 0 {
+            unsafe {
+                let left = *self.winner.get_unchecked(2 * node);
+                let right = *self.winner.get_unchecked(2 * node + 1);
+                *self.winner.get_unchecked_mut(node) =
+                    if *self.timestamp.get_unchecked(right) < *self.timestamp.get_unchecked(left) {
+                        right
+                    } else {
+                        left
+                    };
+            }
+            node >>= 1;
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use std::{hint::black_box, time::Instant};
+
+    use super::*;
+
+    /// A simple xorshift generator to produce deterministic test inputs.
+    struct XorShift(u64);
+
+    impl XorShift {
+        fn next(&mut self) -> u64 {
+            self.0 ^= self.0 << 13;
+            self.0 ^= self.0 >> 7;
+            self.0 ^= self.0 << 17;
+            self.0
+        }
+    }
+
+    fn next_eq(a: &EventSet, b: &EventSet) -> bool {
+        match (a.next(), b.next()) {
+            (Some(a), Some(b)) => {
+                a.timestamp == b.timestamp && a.asset_no == b.asset_no && a.kind == b.kind
+            }
+            (None, None) => true,
+            _ => false,
+        }
+    }
+
+    #[test]
+    fn test_tournament_tree_matches_linear() {
+        for num_assets in [1, 2, 3, 5, 64, 100] {
+            let mut linear = EventSet::with_kind(num_assets, EventQueueKind::Linear);
+            let mut tree = EventSet::with_kind(num_assets, EventQueueKind::TournamentTree);
+            assert!(linear.next().is_none());
+            assert!(tree.next().is_none());
+
+            let mut rng = XorShift(0x9e3779b97f4a7c15);
+            for _ in 0..10_000 {
+                let asset_no = rng.next() as usize % num_assets;
+                // A narrow range of timestamps produces many ties, which both must break the same
+                // way.
+                let timestamp = (rng.next() % 16) as i64;
+                match rng.next() % 6 {
+                    0 => {
+                        linear.update_local_data(asset_no, timestamp);
+                        tree.update_local_data(asset_no, timestamp);
+                    }
+                    1 => {
+                        linear.update_local_order(asset_no, timestamp);
+                        tree.update_local_order(asset_no, timestamp);
+                    }
+                    2 => {
+                        linear.update_exch_data(asset_no, timestamp);
+                        tree.update_exch_data(asset_no, timestamp);
+                    }
+                    3 => {
+                        linear.update_exch_order(asset_no, timestamp);
+                        tree.update_exch_order(asset_no, timestamp);
+                    }
+                    4 => {
+                        linear.invalidate_local_data(asset_no);
+                        tree.invalidate_local_data(asset_no);
+                    }
+                    _ => {
+                        linear.invalidate_exch_data(asset_no);
+                        tree.invalidate_exch_data(asset_no);
+                    }
+                }
+                assert!(next_eq(&linear, &tree));
+            }
+        }
+    }
+
+    /// Measures the cost of finding and advancing the next event for both implementations to find
+    /// the crossover point. Run with
+    /// `cargo test --release -p hftbacktest evs_crossover -- --ignored --nocapture`.
+    #[test]
+    #[ignore]
+    fn evs_crossover() {
+        const ITERATIONS: usize = 1_000_000;
+        for num_assets in [1, 2, 4, 8, 16, 32, 64, 128, 256, 512] {
+            let mut elapsed = Vec::new();
+            for kind in [EventQueueKind::Linear, EventQueueKind::TournamentTree] {
+                let mut evs = EventSet::with_kind(num_assets, kind);
+                let mut rng = XorShift(0x2545f4914f6cdd1d);
+                for asset_no in 0..num_assets {
+                    evs.update_local_data(asset_no, (rng.next() % 1_000_000) as i64);
+                    evs.update_exch_data(asset_no, (rng.next() % 1_000_000) as i64);
+                }
+                let start = Instant::now();
+                for _ in 0..ITERATIONS {
+                    let ev = evs.next().unwrap();
+                    // Advances the processed event source as the backtester does.
+                    let next_ts = ev.timestamp + (rng.next() % 1_000) as i64;
+                    match ev.kind {
+                        EventIntentKind::LocalData => evs.update_local_data(ev.asset_no, next_ts),
+                        EventIntentKind::ExchData => evs.update_exch_data(ev.asset_no, next_ts),
+                        _ => unreachable!(),
+                    }
+                    evs.update_local_order(ev.asset_no, i64::MAX);
+                    black_box(&evs);
+                }
+                elapsed.push(start.elapsed().as_nanos() as f64 / ITERATIONS as f64);
+            }
+            println!(
+                "num_assets={num_assets:>4} linear={:>8.2}ns/event tournament_tree={:>8.2}ns/event",
+                elapsed[0], elapsed[1]
+            );
+        }
     }
 }
@@ -2,12 +2,20 @@ use std::{
     collections::HashMap,
     io::Error as IoError,
     marker::PhantomData,
+    mem,
     ops::{Deref, DerefMut},
+    panic::{self, AssertUnwindSafe},
+    sync::mpsc::{channel, Receiver, Sender},
+    thread::{self, JoinHandle},
 };
 
 pub use data::DataSource;
 use data::Reader;
+pub use evs::EventQueueKind;
 use models::FeeModel;
+use profile::ProfileRecord;
+#[cfg(feature = "profile")]
+use profile::{Profile, Profiled, Stage};
 use thiserror::Error;
 
 pub use crate::backtest::{
@@ -40,6 +48,10 @@ use crate::{
     types::{BuildError, Event},
 };
 
+/// Opt-in profiling of the backtest engine.
+#[macro_use]
+pub mod profile;
+
 /// Provides asset types.
 pub mod assettype;
 
@@ -137,6 +149,9 @@ pub struct L2AssetBuilder<LM, AT, QM, MD, FM> {
     asset_type: Option<AT>,
     data: Vec<DataSource<Event>>,
     parallel_load: bool,
+    prefetch: usize,
+    block_size: usize,
+    prefetch_depth: usize,
     latency_offset: i64,
     fee_model: Option<FM>,
     exch_kind: ExchangeKind,
@@ -160,6 +175,9 @@ where
             asset_type: None,
             data: vec![],
             parallel_load: false,
+            prefetch: 1,
+            block_size: 0,
+            prefetch_depth: 2,
             latency_offset: 0,
             fee_model: None,
             exch_kind: ExchangeKind::NoPartialFillExchange,
@@ -184,6 +202,31 @@ where
         }
     }
 
+    /// Sets the number of files loaded in advance if `parallel_load` is enabled. See
+    /// [`ReaderBuilder::prefetch`](crate::backtest::data::ReaderBuilder::prefetch).
+    /// The default value is `1`.
+    pub fn prefetch(self, prefetch: usize) -> Self {
+        Self { prefetch, ..self }
+    }
+
+    /// Sets the number of events in a block to read the feed data files in blocks instead of as
+    /// a whole, which keeps only a few blocks in memory regardless of the file size. See
+    /// [`ReaderBuilder::block_size`](crate::backtest::data::ReaderBuilder::block_size).
+    /// The default value is `0`, which reads each file as a whole.
+    pub fn block_size(self, block_size: usize) -> Self {
+        Self { block_size, ..self }
+    }
+
+    /// Sets the number of blocks loaded in advance when reading the feed data files in blocks.
+    /// See [`ReaderBuilder::prefetch_depth`](crate::backtest::data::ReaderBuilder::prefetch_depth).
+    /// The default value is `2`.
+    pub fn prefetch_depth(self, prefetch_depth: usize) -> Self {
+        Self {
+            prefetch_depth,
+            ..self
+        }
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
@@ -256,12 +299,18 @@ where
         let reader = if self.latency_offset == 0 {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .prefetch(self.prefetch)
+                .block_size(self.block_size)
+                .prefetch_depth(self.prefetch_depth)
                 .data(self.data)
                 .build()
                 .map_err(|err| BuildError::Error(err.into()))?
         } else {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .prefetch(self.prefetch)
+                .block_size(self.block_size)
+                .prefetch_depth(self.prefetch_depth)
                 .data(self.data)
                 .preprocessor(FeedLatencyAdjustment::new(self.latency_offset))
                 .build()
@@ -279,6 +328,8 @@ where
             .latency_model
             .clone()
             .ok_or(BuildError::BuilderIncomplete("order_latency"))?;
+        #[cfg(feature = "profile")]
+        let order_latency = Profiled(order_latency);
         let asset_type = self
             .asset_type
             .clone()
@@ -301,9 +352,13 @@ where
             .latency_model
             .clone()
             .ok_or(BuildError::BuilderIncomplete("order_latency"))?;
+        #[cfg(feature = "profile")]
+        let order_latency = Profiled(order_latency);
         let queue_model = self
             .queue_model
             .ok_or(BuildError::BuilderIncomplete("queue_model"))?;
+        #[cfg(feature = "profile")]
+        let queue_model = Profiled(queue_model);
         let asset_type = self
             .asset_type
             .clone()
@@ -369,6 +424,9 @@ pub struct L3AssetBuilder<LM, AT, QM, MD, FM> {
     asset_type: Option<AT>,
     data: Vec<DataSource<Event>>,
     parallel_load: bool,
+    prefetch: usize,
+    block_size: usize,
+    prefetch_depth: usize,
     latency_offset: i64,
     fee_model: Option<FM>,
     exch_kind: ExchangeKind,
@@ -393,6 +451,9 @@ where
             asset_type: None,
             data: vec![],
             parallel_load: false,
+            prefetch: 1,
+            block_size: 0,
+            prefetch_depth: 2,
             latency_offset: 0,
             fee_model: None,
             exch_kind: ExchangeKind::NoPartialFillExchange,
@@ -417,6 +478,31 @@ where
         }
     }
 
+    /// Sets the number of files loaded in advance if `parallel_load` is enabled. See
+    /// [`ReaderBuilder::prefetch`](crate::backtest::data::ReaderBuilder::prefetch).
+    /// The default value is `1`.
+    pub fn prefetch(self, prefetch: usize) -> Self {
+        Self { prefetch, ..self }
+    }
+
+    /// Sets the number of events in a block to read the feed data files in blocks instead of as
+    /// a whole, which keeps only a few blocks in memory regardless of the file size. See
+    /// [`ReaderBuilder::block_size`](crate::backtest::data::ReaderBuilder::block_size).
+    /// The default value is `0`, which reads each file as a whole.
+    pub fn block_size(self, block_size: usize) -> Self {
+        Self { block_size, ..self }
+    }
+
+    /// Sets the number of blocks loaded in advance when reading the feed data files in blocks.
+    /// See [`ReaderBuilder::prefetch_depth`](crate::backtest::data::ReaderBuilder::prefetch_depth).
+    /// The default value is `2`.
+    pub fn prefetch_depth(self, prefetch_depth: usize) -> Self {
+        Self {
+            prefetch_depth,
+            ..self
+        }
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
@@ -489,12 +575,18 @@ where
         let reader = if self.latency_offset == 0 {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .prefetch(self.prefetch)
+                .block_size(self.block_size)
+                .prefetch_depth(self.prefetch_depth)
                 .data(self.data)
                 .build()
                 .map_err(|err| BuildError::Error(err.into()))?
         } else {
             Reader::builder()
                 .parallel_load(self.parallel_load)
+                .prefetch(self.prefetch)
+                .block_size(self.block_size)
+                .prefetch_depth(self.prefetch_depth)
                 .data(self.data)
                 .preprocessor(FeedLatencyAdjustment::new(self.latency_offset))
                 .build()
@@ -512,6 +604,8 @@ where
             .latency_model
             .clone()
             .ok_or(BuildError::BuilderIncomplete("order_latency"))?;
+        #[cfg(feature = "profile")]
+        let order_latency = Profiled(order_latency);
         let asset_type = self
             .asset_type
             .clone()
@@ -534,9 +628,13 @@ where
             .latency_model
             .clone()
             .ok_or(BuildError::BuilderIncomplete("order_latency"))?;
+        #[cfg(feature = "profile")]
+        let order_latency = Profiled(order_latency);
         let queue_model = self
             .queue_model
             .ok_or(BuildError::BuilderIncomplete("queue_model"))?;
+        #[cfg(feature = "profile")]
+        let queue_model = Profiled(queue_model);
         let asset_type = self
             .asset_type
             .clone()
@@ -588,6 +686,8 @@ where
 pub struct BacktestBuilder<MD> {
     local: Vec<BacktestProcessorState<Box<dyn LocalProcessor<MD>>>>,
     exch: Vec<BacktestProcessorState<Box<dyn Processor>>>,
+    event_queue: EventQueueKind,
+    num_partitions: usize,
 }
 
 impl<MD> BacktestBuilder<MD> {
@@ -604,17 +704,60 @@ impl<MD> BacktestBuilder<MD> {
         self_
     }
 
+    /// Sets the event queue implementation used to find the next event. The default value is
+    /// [`EventQueueKind::Linear`]. Use [`EventQueueKind::TournamentTree`] for backtesting a large
+    /// number of assets.
+    pub fn event_queue(self, event_queue: EventQueueKind) -> Self {
+        Self {
+            event_queue,
+            ..self
+        }
+    }
+
+    /// Partitions the assets into up to `num_partitions` groups of consecutive assets, each of
+    /// which is processed in its own thread while the backtest elapses. The default value is 1,
+    /// which processes all assets in the calling thread.
+    ///
+    /// The assets are independent of each other between the calls from the strategy, so each
+    /// partition processes the events of its assets up to the timestamp to which the backtest
+    /// elapses, and the strategy sees all the assets at the same timestamp when the call returns.
+    /// The results are identical to those without partitioning. However,
+    /// [`wait_next_feed`](Bot::wait_next_feed) and waiting for an order response need the next
+    /// event across all assets, so they process the assets in the calling thread.
+    ///
+    /// The threads are spawned once when the backtest is built and wait between the calls, so each
+    /// call costs waking them up and waiting for the slowest partition. This pays off when there
+    /// are many assets and the strategy elapses at intervals long enough to amortize it, such as
+    /// portfolio strategies that rebalance periodically.
+    ///
+    /// # Safety
+    ///
+    /// The processors and the data reader of an asset must not share state with those of other
+    /// assets, since they are moved to another thread together with the state they share. The
+    /// assets built by [`L2AssetBuilder`] and [`L3AssetBuilder`] satisfy this.
+    pub unsafe fn partitions(self, num_partitions: usize) -> Self {
+        Self {
+            num_partitions,
+            ..self
+        }
+    }
+
     /// Builds [`Backtest`].
     pub fn build(self) -> Result<Backtest<MD>, BuildError> {
         let num_assets = self.local.len();
         if self.local.len() != num_assets || self.exch.len() != num_assets {
             panic!();
         }
+        let num_partitions = self.num_partitions.min(num_assets);
         Ok(Backtest {
             cur_ts: i64::MAX,
-            evs: EventSet::new(num_assets),
+            evs: EventSet::with_kind(num_assets, self.event_queue),
+            partitions: (num_partitions > 1)
+                .then(|| Partitions::new(num_assets, num_partitions, self.event_queue)),
             local: self.local,
             exch: self.exch,
+            #[cfg(feature = "profile")]
+            profile: Profile::new(num_assets),
         })
     }
 }
@@ -625,8 +768,11 @@ impl<MD> BacktestBuilder<MD> {
 pub struct Backtest<MD> {
     cur_ts: i64,
     evs: EventSet,
+    partitions: Option<Partitions>,
     local: Vec<BacktestProcessorState<Box<dyn LocalProcessor<MD>>>>,
     exch: Vec<BacktestProcessorState<Box<dyn Processor>>>,
+    #[cfg(feature = "profile")]
+    profile: Profile,
 }
 
 impl<P: Processor> Deref for BacktestProcessorState<P> {
@@ -684,7 +830,7 @@ impl<P: Processor> BacktestProcessorState<P> {
                 }
             }
 
-            let next = self.reader.next_data()?;
+            let next = profiled_nested!(Stage::DataLoad, self.reader.next_data())?;
 
             self.reader.release(std::mem::replace(&mut self.data, next));
             self.row = None;
@@ -700,6 +846,8 @@ where
         BacktestBuilder {
             local: vec![],
             exch: vec![],
+            event_queue: EventQueueKind::default(),
+            num_partitions: 1,
         }
     }
 
@@ -729,12 +877,32 @@ where
             exch,
             cur_ts: i64::MAX,
             evs: EventSet::new(num_assets),
+            partitions: None,
+            #[cfg(feature = "profile")]
+            profile: Profile::new(num_assets),
+        }
+    }
+
+    /// Returns the profiling statistics, a [`ProfileRecord`] for each [`Stage`](profile::Stage) of each asset,
+    /// followed by those not specific to an asset. The statistics are collected only if the
+    /// `profile` feature is enabled; otherwise, it is empty. See [`profile`].
+    pub fn profile_stats(&self) -> &[ProfileRecord] {
+        #[cfg(feature = "profile")]
+        {
+            self.profile.records()
+        }
+        #[cfg(not(feature = "profile"))]
+        {
+            &[]
         }
     }
 
     fn initialize_evs(&mut self) -> Result<(), BacktestError> {
         for (asset_no, local) in self.local.iter_mut().enumerate() {
-            match local.advance() {
+            let result = local.advance();
+            #[cfg(feature = "profile")]
+            self.profile.drain(asset_no);
+            match result {
                 Ok(ts) => self.evs.update_local_data(asset_no, ts),
                 Err(BacktestError::EndOfData) => {
                     self.evs.invalidate_local_data(asset_no);
@@ -745,7 +913,10 @@ where
             }
         }
         for (asset_no, exch) in self.exch.iter_mut().enumerate() {
-            match exch.advance() {
+            let result = exch.advance();
+            #[cfg(feature = "profile")]
+            self.profile.drain(asset_no);
+            match result {
                 Ok(ts) => self.evs.update_exch_data(asset_no, ts),
                 Err(BacktestError::EndOfData) => {
                     self.evs.invalidate_exch_data(asset_no);
@@ -778,6 +949,155 @@ where
         timestamp: i64,
         wait_order_response: WaitOrderResponse,
     ) -> Result<bool, BacktestError> {
+        #[cfg(feature = "profile")]
+        self.profile.enter();
+        let result = self.goto_::<WAIT_NEXT_FEED>(timestamp, wait_order_response);
+        #[cfg(feature = "profile")]
+        self.profile.exit();
+        result
+    }
+
+    fn goto_<const WAIT_NEXT_FEED: bool>(
+        &mut self,
+        timestamp: i64,
+        wait_order_response: WaitOrderResponse,
+    ) -> Result<bool, BacktestError> {
+        if self.partitions.is_some()
+            && !WAIT_NEXT_FEED
+            && wait_order_response == WaitOrderResponse::None
+        {
+            return self.goto_partitioned(timestamp);
+        }
+        if let Some(partitions) = self.partitions.as_mut() {
+            // Waiting for an event needs the next event across all assets, so the assets are
+            // processed in this thread.
+            partitions.deactivate(&mut self.evs);
+        }
+
+        let mut partition = Partition {
+            offset: 0,
+            evs: &mut self.evs,
+            local: &mut self.local,
+            exch: &mut self.exch,
+            #[cfg(feature = "profile")]
+            profile: &mut self.profile,
+        };
+        match partition.goto::<WAIT_NEXT_FEED>(timestamp, wait_order_response)? {
+            Some(timestamp) => {
+                self.cur_ts = timestamp;
+                Ok(true)
+            }
+            None => Ok(false),
+        }
+    }
+
+    /// Processes the events until the given timestamp with each partition in a separate thread.
+    fn goto_partitioned(&mut self, timestamp: i64) -> Result<bool, BacktestError> {
+        let partitions = self.partitions.as_mut().unwrap();
+        partitions.activate(&self.evs);
+
+        let size = partitions.size;
+        let num_partitions = partitions.evs.len();
+        let mut local = self.local.chunks_mut(size);
+        let mut exch = self.exch.chunks_mut(size);
+        #[cfg(feature = "profile")]
+        let mut profile = partitions.profile.iter_mut();
+        let mut parts = partitions
+            .evs
+            .iter_mut()
+            .enumerate()
+            .map(|(i, evs)| Partition {
+                offset: i * size,
+                evs,
+                local: local.next().unwrap(),
+                exch: exch.next().unwrap(),
+                #[cfg(feature = "profile")]
+                profile: profile.next().unwrap(),
+            });
+
+        // The first partition is processed in the calling thread and the others by the workers.
+        let mut first = parts.next().unwrap();
+        let mut results: Vec<Option<Result<Option<i64>, BacktestError>>> =
+            (0..num_partitions).map(|_| None).collect();
+        let (first_result, rest) = results.split_first_mut().unwrap();
+        let mut sent = 0;
+        for ((mut part, result), worker) in parts.zip(rest.iter_mut()).zip(&partitions.workers) {
+            let job: Box<dyn FnOnce() + Send + '_> = Box::new(move || {
+                *result = Some(part.goto::<false>(timestamp, WaitOrderResponse::None));
+            });
+            // SAFETY: The job borrows the assets of the partition and its result, which outlive
+            // it, since the workers that have been sent a job are waited for below before
+            // returning, even if processing the first partition panics.
+            let job = unsafe { mem::transmute::<Box<dyn FnOnce() + Send + '_>, Job>(job) };
+            if worker.tx.send(job).is_err() {
+                break;
+            }
+            sent += 1;
+        }
+        let first_panic = panic::catch_unwind(AssertUnwindSafe(|| {
+            *first_result = Some(first.goto::<false>(timestamp, WaitOrderResponse::None));
+        }))
+        .err();
+        // The jobs that have been sent borrow the partitions, so they are waited for before resuming
+        // a panic.
+        let mut panic = first_panic;
+        for worker in &partitions.workers[..sent] {
+            if let Ok(Err(payload)) = worker.done.recv() {
+                panic.get_or_insert(payload);
+            }
+        }
+        if let Some(payload) = panic {
+            panic::resume_unwind(payload);
+        }
+
+        #[cfg(feature = "profile")]
+        for (i, profile) in partitions.profile.iter_mut().enumerate() {
+            let end = ((i + 1) * size).min(self.local.len());
+            self.profile.merge(profile, i * size..end);
+        }
+
+        // The first error in the order of the assets is returned so that the results are
+        // deterministic.
+        let mut remaining = false;
+        for result in results {
+            remaining |= result
+                .expect("the partition worker has stopped.")?
+                .is_some();
+        }
+        if remaining {
+            self.cur_ts = timestamp;
+        }
+        Ok(remaining)
+    }
+}
+
+/// The consecutive assets of a [`Backtest`] that are processed together in a thread.
+struct Partition<'a, MD> {
+    /// The asset number of the first asset.
+    offset: usize,
+    evs: &'a mut EventSet,
+    local: &'a mut [BacktestProcessorState<Box<dyn LocalProcessor<MD>>>],
+    exch: &'a mut [BacktestProcessorState<Box<dyn Processor>>],
+    #[cfg(feature = "profile")]
+    profile: &'a mut Profile,
+}
+
+// SAFETY: The processors and the reader of an asset share state only with each other, so all the
+// state of the assets in a partition is moved to another thread together. This is the contract of
+// `BacktestBuilder::partitions`.
+unsafe impl<MD> Send for Partition<'_, MD> {}
+
+impl<MD> Partition<'_, MD>
+where
+    MD: MarketDepth,
+{
+    /// Processes the events until the given timestamp, and returns the timestamp at which it
+    /// stops, or `None` if the end of the data is reached.
+    fn goto<const WAIT_NEXT_FEED: bool>(
+        &mut self,
+        timestamp: i64,
+        wait_order_response: WaitOrderResponse,
+    ) -> Result<Option<i64>, BacktestError> {
         let mut timestamp = timestamp;
         for (asset_no, local) in self.local.iter().enumerate() {
             self.evs
@@ -789,16 +1109,24 @@ where
             match self.evs.next() {
                 Some(ev) => {
                     if ev.timestamp > timestamp {
-                        self.cur_ts = timestamp;
-                        return Ok(true);
+                        return Ok(Some(timestamp));
                     }
+                    let asset_no = self.offset + ev.asset_no;
                     match ev.kind {
                         EventIntentKind::LocalData => {
                             let local = unsafe { self.local.get_unchecked_mut(ev.asset_no) };
                             let next = local.next_row().and_then(|row| {
-                                local.processor.process(&local.data[row])?;
+                                let event = &local.data[row];
+                                profiled!(
+                                    self.profile,
+                                    asset_no,
+                                    Stage::local_event(event.ev),
+                                    local.processor.process(event)
+                                )?;
                                 local.advance()
                             });
+                            #[cfg(feature = "profile")]
+                            self.profile.drain(asset_no);
 
                             match next {
                                 Ok(next_ts) => {
@@ -821,12 +1149,18 @@ where
                                 WaitOrderResponse::Specified {
                                     asset_no: wait_order_asset_no,
                                     order_id: wait_order_id,
-                                } if ev.asset_no == wait_order_asset_no => Some(wait_order_id),
+                                } if asset_no == wait_order_asset_no => Some(wait_order_id),
                                 _ => None,
                             };
-                            if local.process_recv_order(ev.timestamp, wait_order_resp_id)?
-                                || wait_order_response == WaitOrderResponse::Any
-                            {
+                            let received = profiled!(
+                                self.profile,
+                                asset_no,
+                                Stage::OrderResponse,
+                                local.process_recv_order(ev.timestamp, wait_order_resp_id)
+                            )?;
+                            #[cfg(feature = "profile")]
+                            self.profile.drain(asset_no);
+                            if received || wait_order_response == WaitOrderResponse::Any {
                                 timestamp = ev.timestamp;
                             }
                             self.evs.update_local_order(
@@ -837,9 +1171,17 @@ where
                         EventIntentKind::ExchData => {
                             let exch = unsafe { self.exch.get_unchecked_mut(ev.asset_no) };
                             let next = exch.next_row().and_then(|row| {
-                                exch.processor.process(&exch.data[row])?;
+                                let event = &exch.data[row];
+                                profiled!(
+                                    self.profile,
+                                    asset_no,
+                                    Stage::exch_event(event.ev),
+                                    exch.processor.process(event)
+                                )?;
                                 exch.advance()
                             });
+                            #[cfg(feature = "profile")]
+                            self.profile.drain(asset_no);
 
                             match next {
                                 Ok(next_ts) => {
@@ -859,7 +1201,14 @@ where
                         }
                         EventIntentKind::ExchOrder => {
                             let exch = unsafe { self.exch.get_unchecked_mut(ev.asset_no) };
-                            let _ = exch.process_recv_order(ev.timestamp, None)?;
+                            let _ = profiled!(
+                                self.profile,
+                                asset_no,
+                                Stage::OrderRequest,
+                                exch.process_recv_order(ev.timestamp, None)
+                            )?;
+                            #[cfg(feature = "profile")]
+                            self.profile.drain(asset_no);
                             self.evs.update_exch_order(
                                 ev.asset_no,
                                 exch.earliest_recv_order_timestamp(),
@@ -872,9 +1221,119 @@ where
                     }
                 }
                 None => {
-                    return Ok(false);
+                    return Ok(None);
+                }
+            }
+        }
+    }
+}
+
+/// The event sets of the partitions of the assets of a [`Backtest`]. See
+/// [`BacktestBuilder::partitions`].
+struct Partitions {
+    num_assets: usize,
+    /// The number of assets in each partition, except for the last one.
+    size: usize,
+    evs: Vec<EventSet>,
+    /// Whether the event sets of the partitions hold the next events, instead of the event set of
+    /// the backtest.
+    active: bool,
+    /// The workers that process the partitions except for the first one, which is processed in the
+    /// calling thread.
+    workers: Vec<Worker>,
+    #[cfg(feature = "profile")]
+    profile: Vec<Profile>,
+}
+
+/// A job that processes a partition in a [`Worker`].
+type Job = Box<dyn FnOnce() + Send>;
+
+/// A thread that processes a partition whenever the backtest elapses. It is spawned once with the
+/// backtest and blocks on its channel between the calls, so that a thread is not spawned on every
+/// call.
+struct Worker {
+    tx: Sender<Job>,
+    /// Receives the outcome of each job, which is an error if the job panics.
+    done: Receiver<thread::Result<()>>,
+    handle: Option<JoinHandle<()>>,
+}
+
+impl Worker {
+    fn spawn(name: String) -> Self {
+        let (tx, rx) = channel::<Job>();
+        let (done_tx, done) = channel();
+        let handle = thread::Builder::new()
+            .name(name)
+            .spawn(move || {
+                while let Ok(job) = rx.recv() {
+                    if done_tx
+                        .send(panic::catch_unwind(AssertUnwindSafe(job)))
+                        .is_err()
+                    {
+                        break;
+                    }
                 }
+            })
+            .unwrap();
+        Self {
+            tx,
+            done,
+            handle: Some(handle),
+        }
+    }
+}
+
+impl Drop for Worker {
+    fn drop(&mut self) {
+        // Disconnects the channel so that the thread exits.
+        let (tx, _) = channel();
+        drop(mem::replace(&mut self.tx, tx));
+        if let Some(handle) = self.handle.take() {
+            let _ = handle.join();
+        }
+    }
+}
+
+impl Partitions {
+    fn new(num_assets: usize, num_partitions: usize, event_queue: EventQueueKind) -> Self {
+        let size = num_assets.div_ceil(num_partitions);
+        let num_partitions = num_assets.div_ceil(size);
+        Self {
+            num_assets,
+            size,
+            evs: (0..num_partitions)
+                .map(|i| EventSet::with_kind(size.min(num_assets - i * size), event_queue))
+                .collect(),
+            active: false,
+            workers: (1..num_partitions)
+                .map(|i| Worker::spawn(format!("backtest-partition-{i}")))
+                .collect(),
+            #[cfg(feature = "profile")]
+            profile: (0..num_partitions)
+                .map(|_| Profile::new(num_assets))
+                .collect(),
+        }
+    }
+
+    /// Moves the next events from the event set of the backtest to those of the partitions.
+    fn activate(&mut self, evs: &EventSet) {
+        if !self.active {
+            for (i, part_evs) in self.evs.iter_mut().enumerate() {
+                let offset = i * self.size;
+                part_evs.copy_from(0, evs, offset, self.size.min(self.num_assets - offset));
             }
+            self.active = true;
+        }
+    }
+
+    /// Moves the next events from the event sets of the partitions to that of the backtest.
+    fn deactivate(&mut self, evs: &mut EventSet) {
+        if self.active {
+            for (i, part_evs) in self.evs.iter().enumerate() {
+                let offset = i * self.size;
+                evs.copy_from(offset, part_evs, 0, self.size.min(self.num_assets - offset));
+            }
+            self.active = false;
         }
     }
 }
@@ -945,15 +1404,22 @@ where
         wait: bool,
     ) -> Result<bool, Self::Error> {
         let local = self.local.get_mut(asset_no).unwrap();
-        local.submit_order(
-            order_id,
-            Side::Buy,
-            price,
-            qty,
-            order_type,
-            time_in_force,
-            self.cur_ts,
+        profiled!(
+            self.profile,
+            asset_no,
+            Stage::Submit,
+            local.submit_order(
+                order_id,
+                Side::Buy,
+                price,
+                qty,
+                order_type,
+                time_in_force,
+                self.cur_ts,
+            )
         )?;
+        #[cfg(feature = "profile")]
+        self.profile.drain(asset_no);
 
         if wait {
             return self.goto::<false>(
@@ -976,15 +1442,22 @@ where
         wait: bool,
     ) -> Result<bool, Self::Error> {
         let local = self.local.get_mut(asset_no).unwrap();
-        local.submit_order(
-            order_id,
-            Side::Sell,
-            price,
-            qty,
-            order_type,
-            time_in_force,
-            self.cur_ts,
+        profiled!(
+            self.profile,
+            asset_no,
+            Stage::Submit,
+            local.submit_order(
+                order_id,
+                Side::Sell,
+                price,
+                qty,
+                order_type,
+                time_in_force,
+                self.cur_ts,
+            )
         )?;
+        #[cfg(feature = "profile")]
+        self.profile.drain(asset_no);
 
         if wait {
             return self.goto::<false>(
@@ -1002,15 +1475,22 @@ where
         wait: bool,
     ) -> Result<bool, Self::Error> {
         let local = self.local.get_mut(asset_no).unwrap();
-        local.submit_order(
-            order.order_id,
-            Side::Sell,
-            order.price,
-            order.qty,
-            order.order_type,
-            order.time_in_force,
-            self.cur_ts,
+        profiled!(
+            self.profile,
+            asset_no,
+            Stage::Submit,
+            local.submit_order(
+                order.order_id,
+                Side::Sell,
+                order.price,
+                order.qty,
+                order.order_type,
+                order.time_in_force,
+                self.cur_ts,
+            )
         )?;
+        #[cfg(feature = "profile")]
+        self.profile.drain(asset_no);
 
         if wait {
             return self.goto::<false>(
@@ -1032,7 +1512,14 @@ where
         wait: bool,
     ) -> Result<bool, Self::Error> {
         let local = self.local.get_mut(asset_no).unwrap();
-        local.cancel(order_id, self.cur_ts)?;
+        profiled!(
+            self.profile,
+            asset_no,
+            Stage::Cancel,
+            local.cancel(order_id, self.cur_ts)
+        )?;
+        #[cfg(feature = "profile")]
+        self.profile.drain(asset_no);
 
         if wait {
             return self.goto::<false>(
@@ -1138,6 +1625,7 @@ where
 pub struct MultiAssetSingleExchangeBacktestBuilder<Local: Processor, Exchange: Processor> {
     local: Vec<BacktestProcessorState<Local>>,
     exch: Vec<BacktestProcessorState<Exchange>>,
+    event_queue: EventQueueKind,
 }
 
 impl<Local, Exchange> MultiAssetSingleExchangeBacktestBuilder<Local, Exchange>
@@ -1159,6 +1647,16 @@ where
         self_
     }
 
+    /// Sets the event queue implementation used to find the next event. The default value is
+    /// [`EventQueueKind::Linear`]. Use [`EventQueueKind::TournamentTree`] for backtesting a large
+    /// number of assets.
+    pub fn event_queue(self, event_queue: EventQueueKind) -> Self {
+        Self {
+            event_queue,
+            ..self
+        }
+    }
+
     /// Builds [`MultiAssetSingleExchangeBacktest`].
     pub fn build(
         self,
@@ -1170,7 +1668,7 @@ where
         }
         Ok(MultiAssetSingleExchangeBacktest {
             cur_ts: i64::MAX,
-            evs: EventSet::new(num_assets),
+            evs: EventSet::with_kind(num_assets, self.event_queue),
             local: self.local,
             exch: self.exch,
             _md_marker: Default::default(),
@@ -1205,6 +1703,7 @@ where
         MultiAssetSingleExchangeBacktestBuilder {
             local: vec![],
             exch: vec![],
+            event_queue: EventQueueKind::default(),
         }
     }
 
@@ -1642,9 +2141,9 @@ mod test {
             ExchangeKind::NoPartialFillExchange,
             L2AssetBuilder,
         },
-        depth::HashMapMarketDepth,
-        prelude::{Bot, Event},
-        types::{EXCH_EVENT, LOCAL_EVENT},
+        depth::{HashMapMarketDepth, MarketDepth},
+        prelude::{Bot, Event, OrdType, TimeInForce},
+        types::{BUY_EVENT, DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT, SELL_EVENT, TRADE_EVENT},
     };
 
     #[test]
@@ -1721,4 +2220,140 @@ mod test {
 
         Ok(())
     }
+    fn feed(asset_no: usize, num_steps: usize) -> Data<Event> {
+        let mut events = Vec::new();
+        let mut seed = 0x9e3779b97f4a7c15u64 ^ asset_no as u64;
+        let mut bid_tick = 10_000i64;
+        let event = |ev: u64, exch_ts: i64, px: f64, qty: f64| Event {
+            ev: EXCH_EVENT | LOCAL_EVENT | ev,
+            exch_ts,
+            local_ts: exch_ts + 10,
+            px,
+            qty,
+            order_id: 0,
+            ival: 0,
+            fval: 0.0,
+        };
+        for step in 0..num_steps {
+            seed ^= seed << 13;
+            seed ^= seed >> 7;
+            seed ^= seed << 17;
+            let ts = (step * 1_000 + asset_no * 7) as i64;
+            let new_bid_tick = bid_tick + (seed % 3) as i64 - 1;
+            if step > 0 {
+                events.push(event(
+                    DEPTH_EVENT | BUY_EVENT,
+                    ts,
+                    bid_tick as f64 * 0.01,
+                    0.0,
+                ));
+                events.push(event(
+                    DEPTH_EVENT | SELL_EVENT,
+                    ts,
+                    (bid_tick + 1) as f64 * 0.01,
+                    0.0,
+                ));
+            }
+            bid_tick = new_bid_tick;
+            events.push(event(
+                DEPTH_EVENT | BUY_EVENT,
+                ts,
+                bid_tick as f64 * 0.01,
+                1.0,
+            ));
+            events.push(event(
+                DEPTH_EVENT | SELL_EVENT,
+                ts,
+                (bid_tick + 1) as f64 * 0.01,
+                1.0,
+            ));
+            let (side, px) = if seed % 2 == 0 {
+                (SELL_EVENT, (bid_tick - 1) as f64 * 0.01)
+            } else {
+                (BUY_EVENT, (bid_tick + 2) as f64 * 0.01)
+            };
+            events.push(event(TRADE_EVENT | side, ts + 500, px, 1.0));
+        }
+        Data::from_data(&events)
+    }
+
+    fn run(num_partitions: usize) -> Result<Vec<(i64, Vec<(f64, f64)>)>, Box<dyn Error>> {
+        let mut builder = Backtest::builder();
+        for asset_no in 0..5 {
+            builder = builder.add_asset(
+                L2AssetBuilder::default()
+                    .data(vec![DataSource::Data(feed(asset_no, 500))])
+                    .latency_model(ConstantLatency::new(50, 50))
+                    .asset_type(LinearAsset::new(1.0))
+                    .fee_model(TradingValueFeeModel::new(CommonFees::new(0.0, 0.0)))
+                    .queue_model(ProbQueueModel::new(PowerProbQueueFunc3::new(3.0)))
+                    .exchange(NoPartialFillExchange)
+                    .depth(|| HashMapMarketDepth::new(0.01, 1.0))
+                    .build()?,
+            );
+        }
+        let mut backtester = unsafe { builder.partitions(num_partitions) }.build()?;
+
+        let mut order_id = 0;
+        let mut states = Vec::new();
+        for step in 0.. {
+            let more = if step % 10 == 9 {
+                backtester.wait_next_feed(true, 5_000)?
+            } else {
+                backtester.elapse(3_000)?
+            };
+            if !more {
+                break;
+            }
+            states.push((
+                backtester.current_timestamp(),
+                (0..5)
+                    .map(|asset_no| {
+                        let state_values = backtester.state_values(asset_no);
+                        (state_values.position, state_values.balance)
+                    })
+                    .collect(),
+            ));
+            for asset_no in 0..5 {
+                backtester.clear_inactive_orders(Some(asset_no));
+                if backtester.orders(asset_no).is_empty() {
+                    let depth = backtester.depth(asset_no);
+                    let (best_bid, best_ask) = (depth.best_bid(), depth.best_ask());
+                    order_id += 1;
+                    backtester.submit_buy_order(
+                        asset_no,
+                        order_id,
+                        best_bid,
+                        1.0,
+                        TimeInForce::GTC,
+                        OrdType::Limit,
+                        false,
+                    )?;
+                    order_id += 1;
+                    backtester.submit_sell_order(
+                        asset_no,
+                        order_id,
+                        best_ask,
+                        1.0,
+                        TimeInForce::GTC,
+                        OrdType::Limit,
+                        false,
+                    )?;
+                }
+            }
+        }
+        Ok(states)
+    }
+
+    #[test]
+    fn partitioned_matches_sequential() -> Result<(), Box<dyn Error>> {
+        let sequential = run(1)?;
+        assert!(sequential
+            .iter()
+            .any(|(_, values)| values.iter().any(|(position, _)| *position != 0.0)));
+        for num_partitions in [2, 3, 5, 8] {
+            assert_eq!(sequential, run(num_partitions)?);
+        }
+        Ok(())
+    }
 }
@@ -85,6 +85,14 @@ unsafe impl POD for OrderLatencyRow {}
 /// exchange, and its value represents the latency that the local experiences when receiving the
 /// rejection notification.
 ///
+/// The row bracketing the given timestamp is found by galloping forward from the previously found
+/// row, so a lookup costs `O(log n)` in the number of rows skipped, even after a long idle period.
+/// For very dense latency data, [with_lookup_grid()](Self::with_lookup_grid()) additionally
+/// precomputes where each fixed-size time bucket starts, making the lookup nearly constant time.
+/// Both assume that the rows are sorted by timestamp, in which case they return the same latency as
+/// scanning row by row. If the exchange timestamps are slightly out of order, for example, due to
+/// latency jitter, a different pair of rows bracketing the timestamp may be interpolated.
+///
 /// **Example**
 /// ```
 /// use hftbacktest::backtest::{DataSource, models::IntpOrderLatency};
@@ -101,6 +109,9 @@ pub struct IntpOrderLatency {
     reader: Reader<OrderLatencyRow>,
     data: Data<OrderLatencyRow>,
     next_data: Data<OrderLatencyRow>,
+    lookup_resolution: i64,
+    entry_grid: Option<LookupGrid>,
+    resp_grid: Option<LookupGrid>,
 }
 
 impl IntpOrderLatency {
@@ -138,9 +149,37 @@ impl IntpOrderLatency {
             reader,
             data,
             next_data,
+            lookup_resolution: 0,
+            entry_grid: None,
+            resp_grid: None,
         })
     }
 
+    /// Precomputes a lookup grid at the given time resolution for each loaded chunk of latency
+    /// data, which maps each time bucket to the row where the search for a timestamp in that
+    /// bucket starts. The grid takes `(last timestamp - first timestamp) / resolution` entries per
+    /// chunk, so the resolution should be coarse relative to the span of a chunk, such as one
+    /// second for daily files in nanoseconds. A `resolution` of `0` disables the grid.
+    pub fn with_lookup_grid(mut self, resolution: i64) -> Self {
+        self.lookup_resolution = resolution.max(0);
+        self.build_lookup_grid();
+        self
+    }
+
+    fn build_lookup_grid(&mut self) {
+        if self.lookup_resolution > 0 {
+            self.entry_grid = Some(LookupGrid::new(&self.data, self.lookup_resolution, |row| {
+                row.req_ts
+            }));
+            self.resp_grid = Some(LookupGrid::new(&self.data, self.lookup_resolution, |row| {
+                row.exch_ts
+            }));
+        } else {
+            self.entry_grid = None;
+            self.resp_grid = None;
+        }
+    }
+
     /// Constructs an `IntpOrderLatency` with default options.
     pub fn new(data: Vec<DataSource<OrderLatencyRow>>, latency_offset: i64) -> Self {
         Self::build(data, true, latency_offset).unwrap()
@@ -160,6 +199,7 @@ impl IntpOrderLatency {
             let next_data = mem::replace(&mut self.next_data, next_data);
             let data = mem::replace(&mut self.data, next_data);
             self.reader.release(data);
+            self.build_lookup_grid();
             Ok(true)
         } else {
             Ok(false)
@@ -175,6 +215,13 @@ impl LatencyModel for IntpOrderLatency {
         }
 
         loop {
+            self.entry_rn = seek(
+                &self.data,
+                self.entry_grid.as_ref(),
+                self.entry_rn,
+                timestamp,
+                |row| row.req_ts,
+            );
             let row = &self.data[self.entry_rn];
             let next_row = if self.entry_rn + 1 < self.data.len() {
                 &self.data[self.entry_rn + 1]
@@ -240,6 +287,13 @@ impl LatencyModel for IntpOrderLatency {
         }
 
         loop {
+            self.resp_rn = seek(
+                &self.data,
+                self.resp_grid.as_ref(),
+                self.resp_rn,
+                timestamp,
+                |row| row.exch_ts,
+            );
             let row = &self.data[self.resp_rn];
             let next_row = if self.resp_rn + 1 < self.data.len() {
                 &self.data[self.resp_rn + 1]
@@ -273,6 +327,103 @@ impl LatencyModel for IntpOrderLatency {
     }
 }
 
+/// Returns the last row, at or after `rn`, whose timestamp given by `key` is less than or equal to
+/// `timestamp`, or `rn` if there is no such row. It starts from the row given by the lookup grid
+/// if it is ahead, and then gallops forward and binary-searches the bracketed range, assuming that
+/// the timestamps are sorted.
+#[inline]
+fn seek<F>(
+    data: &Data<OrderLatencyRow>,
+    grid: Option<&LookupGrid>,
+    rn: usize,
+    timestamp: i64,
+    key: F,
+) -> usize
+where
+    F: Fn(&OrderLatencyRow) -> i64,
+{
+    let len = data.len();
+    let mut lo = match grid {
+        Some(grid) => rn.max(grid.start(timestamp)),
+        None => rn,
+    };
+    let mut step = 1;
+    let mut hi = loop {
+        let probe = lo + step;
+        if probe >= len {
+            break len;
+        }
+        if key(&data[probe]) > timestamp {
+            break probe;
+        }
+        lo = probe;
+        step *= 2;
+    };
+    while hi - lo > 1 {
+        let mid = lo + (hi - lo) / 2;
+        if key(&data[mid]) <= timestamp {
+            lo = mid;
+        } else {
+            hi = mid;
+        }
+    }
+    lo
+}
+
+/// Maps fixed-size time buckets to the last row whose timestamp is less than or equal to the start
+/// of each bucket.
+#[derive(Clone)]
+struct LookupGrid {
+    origin: i64,
+    resolution: i64,
+    rows: Vec<usize>,
+}
+
+impl LookupGrid {
+    fn new<F>(data: &Data<OrderLatencyRow>, resolution: i64, key: F) -> Self
+    where
+        F: Fn(&OrderLatencyRow) -> i64,
+    {
+        // The exchange timestamp of a rejected request is zero, so it is excluded from the range.
+        let mut origin = i64::MAX;
+        let mut end = i64::MIN;
+        for rn in 0..data.len() {
+            let ts = key(&data[rn]);
+            if ts > 0 {
+                origin = origin.min(ts);
+                end = end.max(ts);
+            }
+        }
+        let mut rows = Vec::new();
+        if origin <= end {
+            let num_buckets = ((end - origin) / resolution) as usize + 1;
+            rows.reserve_exact(num_buckets);
+            let mut rn = 0;
+            for bucket in 0..num_buckets {
+                let bucket_ts = origin + bucket as i64 * resolution;
+                while rn + 1 < data.len() && key(&data[rn + 1]) <= bucket_ts {
+                    rn += 1;
+                }
+                rows.push(rn);
+            }
+        }
+        Self {
+            origin,
+            resolution,
+            rows,
+        }
+    }
+
+    #[inline]
+    fn start(&self, timestamp: i64) -> usize {
+        if self.rows.is_empty() || timestamp < self.origin {
+            return 0;
+        }
+        let bucket = ((timestamp - self.origin) / self.resolution) as usize;
+        unsafe { *self.rows.get_unchecked(bucket.min(self.rows.len() - 1)) }
+    }
+}
+
 #[derive(Clone)]
 struct OrderLatencyAdjustment {
     latency_offset: i64,
@@ -293,3 +444,117 @@ impl DataPreprocess<OrderLatencyRow> for OrderLatencyAdjustment {
         Ok(())
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::types::{OrdType, Side, TimeInForce};
+
+    fn rows(n: usize, seed: u64) -> Vec<OrderLatencyRow> {
+        let mut x = seed;
+        let mut next = move || {
+            x ^= x << 13;
+            x ^= x >> 7;
+            x ^= x << 17;
+            x
+        };
+        let mut rows = Vec::with_capacity(n);
+        let mut req_ts = 1_000;
+        let mut exch_ts = 0;
+        for _ in 0..n {
+            // Includes the duplicate timestamps and long gaps.
+            req_ts += match next() % 10 {
+                0 => 0,
+                1 => 100_000,
+                _ => (next() % 100) as i64,
+            };
+            exch_ts = (req_ts + 10 + (next() % 50) as i64).max(exch_ts);
+            let resp_ts = exch_ts + 10 + (next() % 50) as i64;
+            rows.push(OrderLatencyRow {
+                req_ts,
+                exch_ts,
+                resp_ts,
+                _padding: 0,
+            });
+        }
+        rows
+    }
+
+    fn intp(x: i64, x1: i64, y1: i64, x2: i64, y2: i64) -> i64 {
+        (((y2 - y1) as f64) / ((x2 - x1) as f64) * ((x - x1) as f64)) as i64 + y1
+    }
+
+    /// Finds the bracketing rows by scanning all rows.
+    fn expected(rows: &[OrderLatencyRow], timestamp: i64, entry: bool) -> i64 {
+        let key = |row: &OrderLatencyRow| if entry { row.req_ts } else { row.exch_ts };
+        let lat = |row: &OrderLatencyRow| {
+            if entry {
+                row.exch_ts - row.req_ts
+            } else {
+                row.resp_ts - row.exch_ts
+            }
+        };
+        if timestamp < key(&rows[0]) {
+            return lat(&rows[0]);
+        }
+        for i in 0..(rows.len() - 1) {
+            if key(&rows[i]) <= timestamp && timestamp < key(&rows[i + 1]) {
+                return intp(
+                    timestamp,
+                    key(&rows[i]),
+                    lat(&rows[i]),
+                    key(&rows[i + 1]),
+                    lat(&rows[i + 1]),
+                );
+            }
+        }
+        lat(&rows[rows.len() - 1])
+    }
+
+    #[test]
+    fn test_lookup_matches_scan() {
+        let rows = rows(5_000, 0x9e3779b97f4a7c15);
+        let (chunk1, chunk2) = rows.split_at(2_345);
+        let order = Order::new(0, 0, 1.0, 1.0, Side::Buy, OrdType::Limit, TimeInForce::GTC);
+        let build = |resolution| {
+            IntpOrderLatency::build(
+                vec![
+                    DataSource::Data(Data::from_data(chunk1)),
+                    DataSource::Data(Data::from_data(chunk2)),
+                ],
+                false,
+                0,
+            )
+            .unwrap()
+            .with_lookup_grid(resolution)
+        };
+
+        for resolution in [0, 100, 100_000] {
+            // Entry and response lookups share the loaded chunk, so they are checked separately.
+            let mut entry_model = build(resolution);
+            let mut resp_model = build(resolution);
+
+            let end = rows[rows.len() - 1].resp_ts + 1_000;
+            let mut timestamp = 0;
+            let mut x: u64 = 0x2545f4914f6cdd1d;
+            while timestamp < end {
+                assert_eq!(
+                    entry_model.entry(timestamp, &order),
+                    expected(&rows, timestamp, true)
+                );
+                assert_eq!(
+                    resp_model.response(timestamp, &order),
+                    expected(&rows, timestamp, false)
+                );
+                x ^= x << 13;
+                x ^= x >> 7;
+                x ^= x << 17;
+                timestamp += if x % 8 == 0 {
+                    (x % 1_000_000) as i64
+                } else {
+                    (x % 200) as i64
+                };
+            }
+        }
+    }
+}
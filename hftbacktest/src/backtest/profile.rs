@@ -0,0 +1,440 @@
+//! Opt-in profiling of the backtest engine.
+//!
+//! With the `profile` feature, [`Backtest`](super::Backtest) counts the events it processes by type
+//! and asset and measures the time spent on each, along with the time spent in the queue model, the
+//! order latency model, loading data, submitting and canceling orders, and in the strategy between
+//! calls. The results are available from [`Backtest::profile_stats`](super::Backtest::profile_stats).
+//! Without the feature, the instrumentation compiles to nothing and no statistics are collected.
+
+#[cfg(feature = "profile")]
+use std::{cell::RefCell, ops::Range, time::Duration};
+
+use crate::types::{
+    ADD_ORDER_EVENT,
+    CANCEL_ORDER_EVENT,
+    DEPTH_BBO_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    FILL_EVENT,
+    MODIFY_ORDER_EVENT,
+    TRADE_EVENT,
+};
+#[cfg(feature = "profile")]
+use crate::{
+    backtest::{
+        models::{L3QueueModel, LatencyModel, QueueModel},
+        BacktestError,
+    },
+    depth::MarketDepth,
+    types::{Event, Order, OrderId, Side},
+};
+
+/// The stage that a [`ProfileRecord`] measures.
+///
+/// The stages of the events processed by the local and the exchange include the time spent in the
+/// queue model and the order latency model while processing them, which are also measured
+/// separately as [`Stage::QueueModel`] and [`Stage::OrderLatency`].
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+#[repr(u64)]
+pub enum Stage {
+    LocalDepth = 0,
+    LocalTrade = 1,
+    LocalDepthClear = 2,
+    LocalDepthSnapshot = 3,
+    LocalDepthBbo = 4,
+    LocalAddOrder = 5,
+    LocalCancelOrder = 6,
+    LocalModifyOrder = 7,
+    LocalFill = 8,
+    LocalOther = 9,
+    ExchDepth = 10,
+    ExchTrade = 11,
+    ExchDepthClear = 12,
+    ExchDepthSnapshot = 13,
+    ExchDepthBbo = 14,
+    ExchAddOrder = 15,
+    ExchCancelOrder = 16,
+    ExchModifyOrder = 17,
+    ExchFill = 18,
+    ExchOther = 19,
+    /// Order responses received by the local.
+    OrderResponse = 20,
+    /// Order requests received by the exchange.
+    OrderRequest = 21,
+    /// Calls to the queue model.
+    QueueModel = 22,
+    /// Calls to the order latency model.
+    OrderLatency = 23,
+    /// Loading the next data, including waiting for it to be loaded in the background.
+    DataLoad = 24,
+    /// Order submissions by the strategy.
+    Submit = 25,
+    /// Order cancellations by the strategy.
+    Cancel = 26,
+    /// The time spent in the strategy between the calls that advance the backtest. It is recorded
+    /// for all assets, with the asset number [`ALL_ASSETS`].
+    Strategy = 27,
+}
+
+/// The number of [`Stage`]s.
+pub const NUM_STAGES: usize = 28;
+
+/// The asset number of the records that are not specific to an asset.
+pub const ALL_ASSETS: u64 = u64::MAX;
+
+impl Stage {
+    #[inline(always)]
+    fn event_offset(ev: u64) -> u64 {
+        match ev & 0xff {
+            DEPTH_EVENT => 0,
+            TRADE_EVENT => 1,
+            DEPTH_CLEAR_EVENT => 2,
+            DEPTH_SNAPSHOT_EVENT => 3,
+            DEPTH_BBO_EVENT => 4,
+            ADD_ORDER_EVENT => 5,
+            CANCEL_ORDER_EVENT => 6,
+            MODIFY_ORDER_EVENT => 7,
+            FILL_EVENT => 8,
+            _ => 9,
+        }
+    }
+
+    /// Returns the stage of the event processed by the local.
+    #[inline(always)]
+    pub fn local_event(ev: u64) -> usize {
+        Stage::LocalDepth as usize + Self::event_offset(ev) as usize
+    }
+
+    /// Returns the stage of the event processed by the exchange.
+    #[inline(always)]
+    pub fn exch_event(ev: u64) -> usize {
+        Stage::ExchDepth as usize + Self::event_offset(ev) as usize
+    }
+}
+
+/// The count of and the cumulative time spent on a [`Stage`] for an asset.
+#[derive(Clone, Copy, Default, Debug)]
+#[repr(C)]
+pub struct ProfileRecord {
+    /// The asset number, or [`ALL_ASSETS`].
+    pub asset_no: u64,
+    /// The [`Stage`].
+    pub stage: u64,
+    /// The number of times that the stage occurred.
+    pub count: u64,
+    /// The cumulative time spent on the stage in nanoseconds.
+    pub elapsed: u64,
+}
+
+/// Measures `$body` as the stage `$stage` of the asset `$asset_no` in `$profile`, a [`Profile`],
+/// when the `profile` feature is enabled. Otherwise, it is just `$body`.
+macro_rules! profiled {
+    ($profile:expr, $asset_no:expr, $stage:expr, $body:expr) => {{
+        #[cfg(feature = "profile")]
+        let start = std::time::Instant::now();
+        let result = $body;
+        #[cfg(feature = "profile")]
+        $profile.record($asset_no, $stage as usize, start.elapsed());
+        result
+    }};
+}
+
+/// Measures `$body` as the stage `$stage` of the asset currently being processed, for the calls
+/// made deep within the processors. It is attributed to the asset when [`Profile::drain`] is called.
+macro_rules! profiled_nested {
+    ($stage:expr, $body:expr) => {{
+        #[cfg(feature = "profile")]
+        let start = std::time::Instant::now();
+        let result = $body;
+        #[cfg(feature = "profile")]
+        $crate::backtest::profile::record_nested($stage, start.elapsed());
+        result
+    }};
+}
+
+#[cfg(feature = "profile")]
+thread_local! {
+    static NESTED: RefCell<Vec<(Stage, u64)>> = const { RefCell::new(Vec::new()) };
+}
+
+#[cfg(feature = "profile")]
+pub(crate) fn record_nested(stage: Stage, elapsed: Duration) {
+    NESTED.with_borrow_mut(|nested| nested.push((stage, elapsed.as_nanos() as u64)));
+}
+
+/// Collects the [`ProfileRecord`]s of a backtest.
+#[cfg(feature = "profile")]
+pub(crate) struct Profile {
+    num_assets: usize,
+    records: Vec<ProfileRecord>,
+    returned_at: Option<std::time::Instant>,
+}
+
+#[cfg(feature = "profile")]
+impl Profile {
+    pub fn new(num_assets: usize) -> Self {
+        let records = (0..=num_assets)
+            .flat_map(|asset_no| {
+                let asset_no = if asset_no == num_assets {
+                    ALL_ASSETS
+                } else {
+                    asset_no as u64
+                };
+                (0..NUM_STAGES).map(move |stage| ProfileRecord {
+                    asset_no,
+                    stage: stage as u64,
+                    count: 0,
+                    elapsed: 0,
+                })
+            })
+            .collect();
+        Self {
+            num_assets,
+            records,
+            returned_at: None,
+        }
+    }
+
+    #[inline(always)]
+    pub fn record(&mut self, asset_no: usize, stage: usize, elapsed: Duration) {
+        let record = unsafe {
+            self.records
+                .get_unchecked_mut(asset_no * NUM_STAGES + stage)
+        };
+        record.count += 1;
+        record.elapsed += elapsed.as_nanos() as u64;
+    }
+
+    /// Attributes the stages recorded by [`profiled_nested`] since the last call to the asset.
+    #[inline]
+    pub fn drain(&mut self, asset_no: usize) {
+        NESTED.with_borrow_mut(|nested| {
+            for (stage, elapsed) in nested.drain(..) {
+                let record = &mut self.records[asset_no * NUM_STAGES + stage as usize];
+                record.count += 1;
+                record.elapsed += elapsed;
+            }
+        });
+    }
+
+    /// Marks that the control enters the backtest from the strategy.
+    #[inline]
+    pub fn enter(&mut self) {
+        if let Some(returned_at) = self.returned_at.take() {
+            self.record(
+                self.num_assets,
+                Stage::Strategy as usize,
+                returned_at.elapsed(),
+            );
+        }
+    }
+
+    /// Marks that the control returns to the strategy.
+    #[inline]
+    pub fn exit(&mut self) {
+        self.returned_at = Some(std::time::Instant::now());
+    }
+
+    /// Adds the records of the assets in `asset_nos` of `other` to those of this, and resets them
+    /// in `other`.
+    pub fn merge(&mut self, other: &mut Profile, asset_nos: Range<usize>) {
+        let range = asset_nos.start * NUM_STAGES..asset_nos.end * NUM_STAGES;
+        for (record, other) in self.records[range.clone()]
+            .iter_mut()
+            .zip(other.records[range].iter_mut())
+        {
+            record.count += other.count;
+            record.elapsed += other.elapsed;
+            other.count = 0;
+            other.elapsed = 0;
+        }
+    }
+
+    pub fn records(&self) -> &[ProfileRecord] {
+        &self.records
+    }
+}
+
+/// Wraps a queue model or an order latency model to measure the calls to it as
+/// [`Stage::QueueModel`] or [`Stage::OrderLatency`].
+#[cfg(feature = "profile")]
+#[derive(Clone)]
+pub(crate) struct Profiled<T>(pub T);
+
+#[cfg(feature = "profile")]
+impl<T: LatencyModel> LatencyModel for Profiled<T> {
+    fn entry(&mut self, timestamp: i64, order: &Order) -> i64 {
+        profiled_nested!(Stage::OrderLatency, self.0.entry(timestamp, order))
+    }
+
+    fn response(&mut self, timestamp: i64, order: &Order) -> i64 {
+        profiled_nested!(Stage::OrderLatency, self.0.response(timestamp, order))
+    }
+}
+
+#[cfg(feature = "profile")]
+impl<T, MD> QueueModel<MD> for Profiled<T>
+where
+    T: QueueModel<MD>,
+    MD: MarketDepth,
+{
+    fn new_order(&self, order: &mut Order, depth: &MD) {
+        profiled_nested!(Stage::QueueModel, self.0.new_order(order, depth))
+    }
+
+    fn trade(&self, order: &mut Order, qty: f64, depth: &MD) {
+        profiled_nested!(Stage::QueueModel, self.0.trade(order, qty, depth))
+    }
+
+    fn depth(&self, order: &mut Order, prev_qty: f64, new_qty: f64, depth: &MD) {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.depth(order, prev_qty, new_qty, depth)
+        )
+    }
+
+    fn is_filled(&self, order: &Order, depth: &MD) -> f64 {
+        profiled_nested!(Stage::QueueModel, self.0.is_filled(order, depth))
+    }
+}
+
+#[cfg(feature = "profile")]
+impl<T, MD> L3QueueModel<MD> for Profiled<T>
+where
+    T: L3QueueModel<MD>,
+{
+    fn contains_backtest_order(&self, order_id: OrderId) -> bool {
+        self.0.contains_backtest_order(order_id)
+    }
+
+    fn on_best_bid_update(
+        &mut self,
+        prev_best_tick: i64,
+        new_best_tick: i64,
+    ) -> Result<Vec<Order>, BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.on_best_bid_update(prev_best_tick, new_best_tick)
+        )
+    }
+
+    fn on_best_ask_update(
+        &mut self,
+        prev_best_tick: i64,
+        new_best_tick: i64,
+    ) -> Result<Vec<Order>, BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.on_best_ask_update(prev_best_tick, new_best_tick)
+        )
+    }
+
+    fn add_backtest_order(&mut self, order: Order, depth: &MD) -> Result<(), BacktestError> {
+        profiled_nested!(Stage::QueueModel, self.0.add_backtest_order(order, depth))
+    }
+
+    fn add_market_feed_order(&mut self, order: &Event, depth: &MD) -> Result<(), BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.add_market_feed_order(order, depth)
+        )
+    }
+
+    fn cancel_backtest_order(
+        &mut self,
+        order_id: OrderId,
+        depth: &MD,
+    ) -> Result<Order, BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.cancel_backtest_order(order_id, depth)
+        )
+    }
+
+    fn cancel_market_feed_order(
+        &mut self,
+        order_id: OrderId,
+        depth: &MD,
+    ) -> Result<(), BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.cancel_market_feed_order(order_id, depth)
+        )
+    }
+
+    fn modify_backtest_order(
+        &mut self,
+        order_id: OrderId,
+        order: Order,
+        depth: &MD,
+    ) -> Result<(), BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.modify_backtest_order(order_id, order, depth)
+        )
+    }
+
+    fn modify_market_feed_order(
+        &mut self,
+        order_id: OrderId,
+        order: &Event,
+        depth: &MD,
+    ) -> Result<(), BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0.modify_market_feed_order(order_id, order, depth)
+        )
+    }
+
+    fn fill_market_feed_order<const DELETE: bool>(
+        &mut self,
+        order_id: OrderId,
+        order: &Event,
+        depth: &MD,
+    ) -> Result<Vec<Order>, BacktestError> {
+        profiled_nested!(
+            Stage::QueueModel,
+            self.0
+                .fill_market_feed_order::<DELETE>(order_id, order, depth)
+        )
+    }
+
+    fn clear_orders(&mut self, side: Side) -> Vec<Order> {
+        profiled_nested!(Stage::QueueModel, self.0.clear_orders(side))
+    }
+}
+
+#[cfg(all(test, feature = "profile"))]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_profile() {
+        let mut profile = Profile::new(2);
+        assert_eq!(profile.records().len(), 3 * NUM_STAGES);
+
+        profile.record(1, Stage::exch_event(TRADE_EVENT), Duration::from_nanos(10));
+        profile.record(1, Stage::exch_event(TRADE_EVENT), Duration::from_nanos(5));
+        let _ = profiled_nested!(Stage::QueueModel, 1 + 1);
+        let _ = profiled_nested!(Stage::QueueModel, 1 + 1);
+        profile.drain(0);
+        profile.drain(1);
+
+        let record = profile.records()[NUM_STAGES + Stage::ExchTrade as usize];
+        assert_eq!(record.asset_no, 1);
+        assert_eq!(record.count, 2);
+        assert_eq!(record.elapsed, 15);
+        assert_eq!(profile.records()[Stage::QueueModel as usize].count, 2);
+        assert_eq!(
+            profile.records()[NUM_STAGES + Stage::QueueModel as usize].count,
+            0
+        );
+
+        profile.exit();
+        profile.enter();
+        let record = profile.records()[2 * NUM_STAGES + Stage::Strategy as usize];
+        assert_eq!(record.asset_no, ALL_ASSETS);
+        assert_eq!(record.count, 1);
+    }
+}
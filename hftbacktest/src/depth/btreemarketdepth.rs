@@ -12,7 +12,7 @@ use super::{
 use crate::{
     backtest::{data::Data, BacktestError},
     prelude::{OrderId, Side},
-    types::{Event, BUY_EVENT, SELL_EVENT},
+    types::{Event, BUY_EVENT, DEPTH_SNAPSHOT_EVENT, EXCH_EVENT, LOCAL_EVENT, SELL_EVENT},
 };
 
 /// L2 Market depth implementation based on a B-Tree map.
@@ -231,7 +231,37 @@ impl ApplySnapshot for BTreeMarketDepth {
     }
 
     fn snapshot(&self) -> Vec<Event> {
-        todo!()
+        let mut events = Vec::with_capacity(self.bid_depth.len() + self.ask_depth.len());
+
+        for (&px_tick, &qty) in self.bid_depth.iter().rev() {
+            events.push(Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | BUY_EVENT | DEPTH_SNAPSHOT_EVENT,
+                // todo: it's not a problem now, but it would be better to have valid timestamps.
+                exch_ts: 0,
+                local_ts: 0,
+                px: px_tick as f64 * self.tick_size,
+                qty,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            });
+        }
+
+        for (&px_tick, &qty) in self.ask_depth.iter() {
+            events.push(Event {
+                ev: EXCH_EVENT | LOCAL_EVENT | SELL_EVENT | DEPTH_SNAPSHOT_EVENT,
+                // todo: it's not a problem now, but it would be better to have valid timestamps.
+                exch_ts: 0,
+                local_ts: 0,
+                px: px_tick as f64 * self.tick_size,
+                qty,
+                order_id: 0,
+                ival: 0,
+                fval: 0.0,
+            });
+        }
+
+        events
     }
 }
 
@@ -434,8 +464,16 @@ impl L3MarketDepth for BTreeMarketDepth {
 #[cfg(test)]
 mod tests {
     use crate::{
-        depth::{BTreeMarketDepth, L3MarketDepth, MarketDepth, INVALID_MAX, INVALID_MIN},
-        types::Side,
+        depth::{
+            ApplySnapshot,
+            BTreeMarketDepth,
+            L2MarketDepth,
+            L3MarketDepth,
+            MarketDepth,
+            INVALID_MAX,
+            INVALID_MIN,
+        },
+        types::{Side, BUY_EVENT, SELL_EVENT},
     };
 
     macro_rules! assert_eq_qty {
@@ -658,4 +696,35 @@ mod tests {
         assert_eq_qty!(depth.ask_qty_at_tick(4981), 0.0, lot_size);
         assert_eq_qty!(depth.ask_qty_at_tick(5002), 0.002, lot_size);
     }
+
+    #[test]
+    fn test_snapshot() {
+        let lot_size = 0.001;
+        let mut depth = BTreeMarketDepth::new(0.1, lot_size);
+        depth.update_bid_depth(500.1, 0.001, 0);
+        depth.update_bid_depth(500.3, 0.002, 0);
+        depth.update_ask_depth(500.7, 0.003, 0);
+        depth.update_ask_depth(500.5, 0.004, 0);
+
+        let snapshot = depth.snapshot();
+        let levels: Vec<_> = snapshot
+            .iter()
+            .map(|ev| {
+                (
+                    ev.ev & (BUY_EVENT | SELL_EVENT),
+                    (ev.px / 0.1).round() as i64,
+                    (ev.qty / lot_size).round() as i64,
+                )
+            })
+            .collect();
+        assert_eq!(
+            levels,
+            vec![
+                (BUY_EVENT, 5003, 2),
+                (BUY_EVENT, 5001, 1),
+                (SELL_EVENT, 5005, 4),
+                (SELL_EVENT, 5007, 3),
+            ]
+        );
+    }
 }
@@ -12,6 +12,10 @@ use crate::{
 /// This is a variant of the HashMap-based market depth implementation, which only handles the
 /// specific range of interest. By doing so, it improves performance, especially when the strategy
 /// requires computing values based on the order book around the mid-price.
+///
+/// By default, the range of interest is fixed. With [`ROIVectorMarketDepth::with_recentering`],
+/// the range of interest becomes a sliding window of a fixed width that follows the mid-price, so a
+/// small range can be used even if the price trends far away from where it started.
 pub struct ROIVectorMarketDepth {
     pub tick_size: f64,
     pub lot_size: f64,
@@ -24,6 +28,9 @@ pub struct ROIVectorMarketDepth {
     pub high_ask_tick: i64,
     pub roi_ub: i64,
     pub roi_lb: i64,
+    /// The distance in ticks that the mid-price may drift from the center of the range of interest
+    /// before it is recentered. `None` if the range of interest is fixed.
+    pub recenter_threshold: Option<i64>,
     pub orders: HashMap<OrderId, L3Order>,
 }
 
@@ -77,10 +84,130 @@ impl ROIVectorMarketDepth {
             high_ask_tick: INVALID_MIN,
             roi_lb,
             roi_ub,
+            recenter_threshold: None,
             orders: HashMap::new(),
         }
     }
 
+    /// Turns the range of interest into a sliding window. The window keeps the width given by
+    /// `roi_lb` and `roi_ub`, and is recentered around the mid-price whenever the mid-price drifts
+    /// more than `threshold` away from the center of the window. `threshold` is clamped to less
+    /// than half of the width, so that the best bid and ask never leave the window.
+    ///
+    /// When the window moves, the price levels entering the window are rebuilt from the orders for
+    /// Level-3 depth. For Level-2 depth, their quantities are unknown until the feed updates them,
+    /// so the width should leave enough room for the levels the strategy actually uses.
+    pub fn with_recentering(mut self, threshold: f64) -> Self {
+        let half = (self.roi_ub - self.roi_lb) / 2;
+        let threshold = ((threshold / self.tick_size).round() as i64).clamp(0, (half - 1).max(0));
+        self.recenter_threshold = Some(threshold);
+        self
+    }
+
+    /// Recenters the range of interest if the mid-price has drifted past the threshold. If the
+    /// market depth is empty, the price of the incoming update is used as the mid-price instead.
+    #[inline(always)]
+    fn recenter_if_drifted(&mut self, price_tick: i64, qty: f64) {
+        let Some(threshold) = self.recenter_threshold else {
+            return;
+        };
+        let mid_tick = match (
+            self.best_bid_tick != INVALID_MIN,
+            self.best_ask_tick != INVALID_MAX,
+        ) {
+            (true, true) => (self.best_bid_tick + self.best_ask_tick) / 2,
+            (true, false) => self.best_bid_tick,
+            (false, true) => self.best_ask_tick,
+            (false, false) => {
+                if (qty / self.lot_size).round() as i64 == 0 {
+                    return;
+                }
+                price_tick
+            }
+        };
+        let half = (self.roi_ub - self.roi_lb) / 2;
+        if (mid_tick - (self.roi_lb + half)).abs() > threshold {
+            self.recenter(mid_tick - half);
+        }
+    }
+
+    /// Moves the range of interest so that it starts at `roi_lb`, keeping its width.
+    #[cold]
+    fn recenter(&mut self, roi_lb: i64) {
+        let prev_roi_lb = self.roi_lb;
+        let prev_roi_ub = self.roi_ub;
+        let len = self.bid_depth.len();
+        let shift = roi_lb - prev_roi_lb;
+        for depth in [&mut self.bid_depth, &mut self.ask_depth] {
+            let n = shift.unsigned_abs() as usize;
+            if n >= len {
+                depth.fill(0.0);
+            } else if shift > 0 {
+                depth.copy_within(n.., 0);
+                depth[(len - n)..].fill(0.0);
+            } else {
+                depth.copy_within(..(len - n), n);
+                depth[..n].fill(0.0);
+            }
+        }
+        self.roi_lb = roi_lb;
+        self.roi_ub = roi_lb + len as i64 - 1;
+
+        if self.best_bid_tick != INVALID_MIN {
+            if self.best_bid_tick < self.roi_lb {
+                self.best_bid_tick = INVALID_MIN;
+            } else if self.best_bid_tick > self.roi_ub {
+                self.best_bid_tick = self
+                    .bid_depth
+                    .iter()
+                    .rposition(|&qty| qty > 0.0)
+                    .map_or(INVALID_MIN, |t| t as i64 + self.roi_lb);
+            }
+        }
+        if self.best_ask_tick != INVALID_MAX {
+            if self.best_ask_tick > self.roi_ub {
+                self.best_ask_tick = INVALID_MAX;
+            } else if self.best_ask_tick < self.roi_lb {
+                self.best_ask_tick = self
+                    .ask_depth
+                    .iter()
+                    .position(|&qty| qty > 0.0)
+                    .map_or(INVALID_MAX, |t| t as i64 + self.roi_lb);
+            }
+        }
+
+        // Level-3 depth knows the quantities outside the previous range of interest.
+        for order in self.orders.values() {
+            if order.price_tick < self.roi_lb
+                || order.price_tick > self.roi_ub
+                || (order.price_tick >= prev_roi_lb && order.price_tick <= prev_roi_ub)
+            {
+                continue;
+            }
+            let t = (order.price_tick - self.roi_lb) as usize;
+            if order.side == Side::Buy {
+                unsafe {
+                    *self.bid_depth.get_unchecked_mut(t) += order.qty;
+                }
+                self.best_bid_tick = self.best_bid_tick.max(order.price_tick);
+                self.low_bid_tick = self.low_bid_tick.min(order.price_tick);
+            } else {
+                unsafe {
+                    *self.ask_depth.get_unchecked_mut(t) += order.qty;
+                }
+                self.best_ask_tick = self.best_ask_tick.min(order.price_tick);
+                self.high_ask_tick = self.high_ask_tick.max(order.price_tick);
+            }
+        }
+
+        if self.best_bid_tick == INVALID_MIN {
+            self.low_bid_tick = INVALID_MAX;
+        }
+        if self.best_ask_tick == INVALID_MAX {
+            self.high_ask_tick = INVALID_MIN;
+        }
+    }
+
     fn add(&mut self, order: L3Order) -> Result<(), BacktestError> {
         let order = match self.orders.entry(order.order_id) {
             Entry::Occupied(_) => return Err(BacktestError::OrderIdExist),
@@ -121,6 +248,7 @@ impl L2MarketDepth for ROIVectorMarketDepth {
     ) -> (i64, i64, i64, f64, f64, i64) {
         let price_tick = (price / self.tick_size).round() as i64;
         let qty_lot = (qty / self.lot_size).round() as i64;
+        self.recenter_if_drifted(price_tick, qty);
         let prev_best_bid_tick = self.best_bid_tick;
         let prev_qty;
 
@@ -188,6 +316,7 @@ impl L2MarketDepth for ROIVectorMarketDepth {
     ) -> (i64, i64, i64, f64, f64, i64) {
         let price_tick = (price / self.tick_size).round() as i64;
         let qty_lot = (qty / self.lot_size).round() as i64;
+        self.recenter_if_drifted(price_tick, qty);
         let prev_best_ask_tick = self.best_ask_tick;
         let prev_qty;
 
@@ -422,6 +551,30 @@ impl ApplySnapshot for ROIVectorMarketDepth {
         for qty in &mut self.ask_depth {
             *qty = 0.0;
         }
+        if self.recenter_threshold.is_some() {
+            // Centers the range of interest on the snapshot's mid-price before filling it.
+            let mut best_bid_tick = INVALID_MIN;
+            let mut best_ask_tick = INVALID_MAX;
+            for row_num in 0..data.len() {
+                let price_tick = (data[row_num].px / self.tick_size).round() as i64;
+                if data[row_num].ev & BUY_EVENT == BUY_EVENT {
+                    best_bid_tick = best_bid_tick.max(price_tick);
+                } else if data[row_num].ev & SELL_EVENT == SELL_EVENT {
+                    best_ask_tick = best_ask_tick.min(price_tick);
+                }
+            }
+            let mid_tick = match (best_bid_tick != INVALID_MIN, best_ask_tick != INVALID_MAX) {
+                (true, true) => Some((best_bid_tick + best_ask_tick) / 2),
+                (true, false) => Some(best_bid_tick),
+                (false, true) => Some(best_ask_tick),
+                (false, false) => None,
+            };
+            if let Some(mid_tick) = mid_tick {
+                let half = (self.roi_ub - self.roi_lb) / 2;
+                self.roi_ub += mid_tick - half - self.roi_lb;
+                self.roi_lb = mid_tick - half;
+            }
+        }
         for row_num in 0..data.len() {
             let price = data[row_num].px;
             let qty = data[row_num].qty;
@@ -464,6 +617,7 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         timestamp: i64,
     ) -> Result<(i64, i64), Self::Error> {
         let price_tick = (px / self.tick_size).round() as i64;
+        self.recenter_if_drifted(price_tick, qty);
         self.add(L3Order {
             order_id,
             side: Side::Buy,
@@ -496,6 +650,7 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         timestamp: i64,
     ) -> Result<(i64, i64), Self::Error> {
         let price_tick = (px / self.tick_size).round() as i64;
+        self.recenter_if_drifted(price_tick, qty);
         self.add(L3Order {
             order_id,
             side: Side::Sell,
@@ -587,6 +742,7 @@ impl L3MarketDepth for ROIVectorMarketDepth {
         qty: f64,
         timestamp: i64,
     ) -> Result<(Side, i64, i64), Self::Error> {
+        self.recenter_if_drifted((px / self.tick_size).round() as i64, qty);
         let order = self
             .orders
             .get_mut(&order_id)
@@ -754,7 +910,14 @@ impl L3MarketDepth for ROIVectorMarketDepth {
 #[cfg(test)]
 mod tests {
     use crate::{
-        depth::{L3MarketDepth, MarketDepth, ROIVectorMarketDepth, INVALID_MAX, INVALID_MIN},
+        depth::{
+            L2MarketDepth,
+            L3MarketDepth,
+            MarketDepth,
+            ROIVectorMarketDepth,
+            INVALID_MAX,
+            INVALID_MIN,
+        },
         types::Side,
     };
 
@@ -978,4 +1141,73 @@ mod tests {
         assert_eq_qty!(depth.ask_qty_at_tick(4981), 0.0, lot_size);
         assert_eq_qty!(depth.ask_qty_at_tick(5002), 0.002, lot_size);
     }
+
+    #[test]
+    fn test_l2_recentering() {
+        let lot_size = 0.001;
+        let mut depth = ROIVectorMarketDepth::new(0.1, lot_size, 99.0, 101.0).with_recentering(0.5);
+        assert_eq!(depth.recenter_threshold, Some(5));
+
+        depth.update_bid_depth(100.0, 0.001, 0);
+        depth.update_bid_depth(99.8, 0.002, 0);
+        depth.update_ask_depth(100.1, 0.001, 0);
+        depth.update_ask_depth(100.1, 0.0, 0);
+        depth.update_ask_depth(100.7, 0.001, 0);
+        depth.update_bid_depth(100.0, 0.0, 0);
+        depth.update_bid_depth(100.6, 0.001, 0);
+        assert_eq!(depth.roi_lb, 990);
+        assert_eq!(depth.roi_ub, 1010);
+
+        // The mid-price is now 100.6, which is past the threshold.
+        depth.update_ask_depth(100.8, 0.001, 0);
+        assert_eq!(depth.roi_lb, 996);
+        assert_eq!(depth.roi_ub, 1016);
+        assert_eq!(depth.bid_depth().len(), 21);
+        assert_eq!(depth.best_bid_tick(), 1006);
+        assert_eq!(depth.best_ask_tick(), 1007);
+        assert_eq_qty!(depth.bid_qty_at_tick(998), 0.002, lot_size);
+        assert_eq_qty!(depth.bid_qty_at_tick(1006), 0.001, lot_size);
+        assert_eq_qty!(depth.ask_qty_at_tick(1007), 0.001, lot_size);
+        assert_eq_qty!(depth.ask_qty_at_tick(1008), 0.001, lot_size);
+        assert_eq_qty!(depth.ask_qty_at_tick(1016), 0.0, lot_size);
+        assert!(depth.bid_qty_at_tick(995).is_nan());
+
+        depth.update_ask_depth(100.7, 0.0, 0);
+        assert_eq!(depth.best_ask_tick(), 1008);
+        depth.update_bid_depth(100.6, 0.0, 0);
+        assert_eq!(depth.best_bid_tick(), 998);
+    }
+
+    #[test]
+    fn test_l3_recentering() {
+        let lot_size = 0.001;
+        let mut depth = ROIVectorMarketDepth::new(0.1, lot_size, 99.0, 101.0).with_recentering(0.5);
+
+        depth.add_buy_order(1, 100.0, 0.001, 0).unwrap();
+        depth.add_sell_order(2, 100.1, 0.001, 0).unwrap();
+        // This is outside the range of interest, so it is only kept in the orders.
+        depth.add_sell_order(3, 101.5, 0.002, 0).unwrap();
+        assert!(depth.ask_qty_at_tick(1015).is_nan());
+
+        depth.delete_order(2, 0).unwrap();
+        depth.add_sell_order(4, 100.8, 0.001, 0).unwrap();
+        depth.delete_order(1, 0).unwrap();
+        assert_eq!(depth.best_bid_tick(), INVALID_MIN);
+        assert_eq!(depth.roi_lb, 990);
+
+        // Only the ask side remains, at 100.8, which is past the threshold.
+        let (prev_best, best) = depth.add_buy_order(5, 100.6, 0.001, 0).unwrap();
+        assert_eq!(prev_best, INVALID_MIN);
+        assert_eq!(best, 1006);
+        assert_eq!(depth.roi_lb, 998);
+        assert_eq!(depth.roi_ub, 1018);
+        assert_eq!(depth.best_ask_tick(), 1008);
+        assert_eq_qty!(depth.ask_qty_at_tick(1008), 0.001, lot_size);
+        assert_eq_qty!(depth.ask_qty_at_tick(1015), 0.002, lot_size);
+
+        let (side, prev_best, best) = depth.delete_order(4, 0).unwrap();
+        assert_eq!(side, Side::Sell);
+        assert_eq!(prev_best, 1008);
+        assert_eq!(best, 1015);
+    }
 }
@@ -8,6 +8,7 @@ use crate::{
 
 mod config;
 pub mod iceoryx;
+pub mod shm;
 
 pub const TO_ALL: u64 = 0;
 
@@ -0,0 +1,289 @@
+//! Market depth snapshots shared by a connector with the bots on the same host.
+//!
+//! The connector maintains the market depth of each instrument anyway, so it can publish the top
+//! levels of the book in a shared-memory region per instrument, and any number of bots can read
+//! them without rebuilding the book from the feed or resynchronizing it on startup.
+//!
+//! The region is a file, typically in `/dev/shm`, made of 8-byte words. The first
+//! [`HEADER_WORDS`] words are the header:
+//!
+//! | Word | Field                                                    |
+//! |------|----------------------------------------------------------|
+//! | 0    | Sequence number, odd while the snapshot is being written |
+//! | 1    | [`SHARED_BOOK_MAGIC`], written once the region is ready  |
+//! | 2    | The number of levels per side, `n`                       |
+//! | 3    | The tick size as `f64`                                   |
+//! | 4    | The exchange timestamp of the latest update              |
+//! | 5    | The number of valid bid levels                           |
+//! | 6    | The number of valid ask levels                           |
+//! | 7    | Reserved                                                 |
+//!
+//! It is followed by `n` bid levels from the best bid downward and `n` ask levels from the best
+//! ask upward, each of which is the price and the quantity as `f64`.
+//!
+//! The snapshot is protected by a sequence lock. The writer makes the sequence number odd before
+//! writing the snapshot and even after, so the reader retries until it reads the same even
+//! sequence number before and after copying the snapshot, up to [`MAX_READ_RETRIES`] times, so that
+//! a reader does not spin forever on an odd sequence number left by a connector that died while
+//! writing.
+
+use std::{
+    fs::{remove_file, OpenOptions},
+    io::{Error as IoError, ErrorKind},
+    mem::size_of,
+    path::{Path, PathBuf},
+    sync::atomic::{fence, AtomicU64, Ordering},
+};
+
+use memmap2::MmapMut;
+use thiserror::Error;
+
+/// The magic number that marks a region as an initialized shared book.
+pub const SHARED_BOOK_MAGIC: u64 = u64::from_le_bytes(*b"HBTBOOK1");
+
+/// The number of words of the header.
+pub const HEADER_WORDS: usize = 8;
+
+/// The number of times [`read_shared_book`] retries while the snapshot is being written before it
+/// gives up. Writing a snapshot takes far less time than this many retries, so running out of them
+/// means that the writer died in the middle of writing.
+pub const MAX_READ_RETRIES: usize = 100_000;
+
+const SEQ: usize = 0;
+const MAGIC: usize = 1;
+const NUM_LEVELS: usize = 2;
+const TICK_SIZE: usize = 3;
+const TIMESTAMP: usize = 4;
+const NUM_BIDS: usize = 5;
+const NUM_ASKS: usize = 6;
+
+/// Returns the path of the shared book of the instrument published by the connector.
+pub fn shared_book_path(dir: impl AsRef<Path>, connector_name: &str, symbol: &str) -> PathBuf {
+    dir.as_ref()
+        .join(format!("hftbacktest.{connector_name}.{symbol}.book"))
+}
+
+/// Returns the size in bytes of a shared book with the given number of levels per side.
+pub fn shared_book_size(num_levels: usize) -> usize {
+    (HEADER_WORDS + 4 * num_levels) * size_of::<u64>()
+}
+
+/// Publishes the snapshots of the market depth of an instrument to a shared book.
+pub struct SharedBookWriter {
+    mmap: MmapMut,
+    num_levels: usize,
+    seq: u64,
+}
+
+impl SharedBookWriter {
+    /// Creates the shared book file with the given number of levels per side. An existing file is
+    /// replaced rather than truncated, since truncating it would fault the readers that still
+    /// map it; they keep reading the stale snapshot until they reopen the file.
+    pub fn create(
+        path: impl AsRef<Path>,
+        num_levels: usize,
+        tick_size: f64,
+    ) -> Result<Self, IoError> {
+        let path = path.as_ref();
+        match remove_file(path) {
+            Err(error) if error.kind() != ErrorKind::NotFound => return Err(error),
+            _ => {}
+        }
+        let file = OpenOptions::new()
+            .read(true)
+            .write(true)
+            .create_new(true)
+            .open(path)?;
+        file.set_len(shared_book_size(num_levels) as u64)?;
+        let mmap = unsafe { MmapMut::map_mut(&file)? };
+
+        let writer = Self {
+            mmap,
+            num_levels,
+            seq: 0,
+        };
+        let words = writer.words();
+        words[NUM_LEVELS].store(num_levels as u64, Ordering::Relaxed);
+        words[TICK_SIZE].store(tick_size.to_bits(), Ordering::Relaxed);
+        words[MAGIC].store(SHARED_BOOK_MAGIC, Ordering::Release);
+        Ok(writer)
+    }
+
+    fn words(&self) -> &[AtomicU64] {
+        // The mapping is page-aligned and its length is a multiple of the word size.
+        unsafe {
+            std::slice::from_raw_parts(
+                self.mmap.as_ptr() as *const AtomicU64,
+                self.mmap.len() / size_of::<u64>(),
+            )
+        }
+    }
+
+    /// Writes a snapshot made of the bid levels from the best bid downward and the ask levels
+    /// from the best ask upward, as `(price, qty)`. The levels beyond the number of levels of the
+    /// shared book are ignored.
+    pub fn write<B, A>(&mut self, timestamp: i64, bids: B, asks: A)
+    where
+        B: IntoIterator<Item = (f64, f64)>,
+        A: IntoIterator<Item = (f64, f64)>,
+    {
+        let seq = self.seq;
+        let num_levels = self.num_levels;
+        let words = self.words();
+
+        words[SEQ].store(seq + 1, Ordering::Relaxed);
+        fence(Ordering::Release);
+
+        let mut num_bids = 0;
+        for (i, (px, qty)) in bids.into_iter().take(num_levels).enumerate() {
+            words[HEADER_WORDS + 2 * i].store(px.to_bits(), Ordering::Relaxed);
+            words[HEADER_WORDS + 2 * i + 1].store(qty.to_bits(), Ordering::Relaxed);
+            num_bids += 1;
+        }
+        let ask_offset = HEADER_WORDS + 2 * num_levels;
+        let mut num_asks = 0;
+        for (i, (px, qty)) in asks.into_iter().take(num_levels).enumerate() {
+            words[ask_offset + 2 * i].store(px.to_bits(), Ordering::Relaxed);
+            words[ask_offset + 2 * i + 1].store(qty.to_bits(), Ordering::Relaxed);
+            num_asks += 1;
+        }
+        words[TIMESTAMP].store(timestamp as u64, Ordering::Relaxed);
+        words[NUM_BIDS].store(num_bids, Ordering::Relaxed);
+        words[NUM_ASKS].store(num_asks, Ordering::Relaxed);
+
+        words[SEQ].store(seq + 2, Ordering::Release);
+        self.seq = seq + 2;
+    }
+}
+
+/// The header of a snapshot read by [`read_shared_book`].
+#[derive(Clone, Copy, Debug, PartialEq)]
+pub struct SharedBookSnapshot {
+    pub timestamp: i64,
+    pub num_bids: usize,
+    pub num_asks: usize,
+}
+
+/// The error of [`read_shared_book`].
+#[derive(Error, Clone, Copy, Debug, PartialEq, Eq)]
+pub enum SharedBookError {
+    #[error("the shared book is not initialized")]
+    NotInitialized,
+    #[error("the shared book is still being written after the retries")]
+    Busy,
+}
+
+/// Reads a consistent snapshot from the shared book region at `region`, copying up to
+/// `bids.len() / 2` and `asks.len() / 2` levels as `[price, qty, price, qty, ...]`. Returns
+/// [`SharedBookError::NotInitialized`] if the region is not initialized, and
+/// [`SharedBookError::Busy`] if no consistent snapshot is read within [`MAX_READ_RETRIES`]
+/// retries, in which case the output may be partially overwritten.
+///
+/// # Safety
+///
+/// `region` must point to a mapping of a shared book file that is at least as large as the size
+/// given by its number of levels.
+pub unsafe fn read_shared_book(
+    region: *const u8,
+    bids: &mut [f64],
+    asks: &mut [f64],
+) -> Result<SharedBookSnapshot, SharedBookError> {
+    let header = std::slice::from_raw_parts(region as *const AtomicU64, HEADER_WORDS);
+    if header[MAGIC].load(Ordering::Acquire) != SHARED_BOOK_MAGIC {
+        return Err(SharedBookError::NotInitialized);
+    }
+    let num_levels = header[NUM_LEVELS].load(Ordering::Relaxed) as usize;
+    let words =
+        std::slice::from_raw_parts(region as *const AtomicU64, HEADER_WORDS + 4 * num_levels);
+    let ask_offset = HEADER_WORDS + 2 * num_levels;
+
+    for _ in 0..=MAX_READ_RETRIES {
+        let seq = words[SEQ].load(Ordering::Acquire);
+        if seq & 1 == 1 {
+            std::hint::spin_loop();
+            continue;
+        }
+
+        let num_bids = (words[NUM_BIDS].load(Ordering::Relaxed) as usize).min(bids.len() / 2);
+        let num_asks = (words[NUM_ASKS].load(Ordering::Relaxed) as usize).min(asks.len() / 2);
+        let timestamp = words[TIMESTAMP].load(Ordering::Relaxed) as i64;
+        for i in 0..(2 * num_bids.min(num_levels)) {
+            bids[i] = f64::from_bits(words[HEADER_WORDS + i].load(Ordering::Relaxed));
+        }
+        for i in 0..(2 * num_asks.min(num_levels)) {
+            asks[i] = f64::from_bits(words[ask_offset + i].load(Ordering::Relaxed));
+        }
+
+        fence(Ordering::Acquire);
+        if words[SEQ].load(Ordering::Relaxed) == seq {
+            return Ok(SharedBookSnapshot {
+                timestamp,
+                num_bids: num_bids.min(num_levels),
+                num_asks: num_asks.min(num_levels),
+            });
+        }
+    }
+    Err(SharedBookError::Busy)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_write_and_read() {
+        let dir = std::env::temp_dir();
+        let path = shared_book_path(&dir, "test", &format!("BTCUSDT-{}", std::process::id()));
+        let mut writer = SharedBookWriter::create(&path, 3, 0.1).unwrap();
+
+        let mut bids = [0.0; 6];
+        let mut asks = [0.0; 4];
+        let snapshot = unsafe { read_shared_book(writer.mmap.as_ptr(), &mut bids, &mut asks) };
+        assert_eq!(
+            snapshot,
+            Ok(SharedBookSnapshot {
+                timestamp: 0,
+                num_bids: 0,
+                num_asks: 0
+            })
+        );
+
+        writer.write(
+            10,
+            [(100.0, 1.0), (99.9, 2.0), (99.8, 3.0), (99.7, 4.0)],
+            [(100.1, 5.0)],
+        );
+        let snapshot = unsafe { read_shared_book(writer.mmap.as_ptr(), &mut bids, &mut asks) };
+        assert_eq!(
+            snapshot,
+            Ok(SharedBookSnapshot {
+                timestamp: 10,
+                num_bids: 3,
+                num_asks: 1
+            })
+        );
+        assert_eq!(bids, [100.0, 1.0, 99.9, 2.0, 99.8, 3.0]);
+        assert_eq!(&asks[..2], &[100.1, 5.0]);
+
+        // Only as many levels as fit in the output are copied.
+        let mut bids = [0.0; 2];
+        let snapshot = unsafe { read_shared_book(writer.mmap.as_ptr(), &mut bids, &mut asks) };
+        assert_eq!(snapshot.unwrap().num_bids, 1);
+        assert_eq!(bids, [100.0, 1.0]);
+
+        // A writer that dies while writing leaves the sequence number odd.
+        writer.words()[SEQ].store(writer.seq + 1, Ordering::Release);
+        let snapshot = unsafe { read_shared_book(writer.mmap.as_ptr(), &mut bids, &mut asks) };
+        assert_eq!(snapshot, Err(SharedBookError::Busy));
+
+        std::fs::remove_file(path).unwrap();
+    }
+
+    #[test]
+    fn test_not_initialized() {
+        let region = [0u64; HEADER_WORDS];
+        let snapshot =
+            unsafe { read_shared_book(region.as_ptr() as *const u8, &mut [0.0; 2], &mut [0.0; 2]) };
+        assert_eq!(snapshot, Err(SharedBookError::NotInitialized));
+    }
+}
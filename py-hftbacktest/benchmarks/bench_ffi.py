@@ -0,0 +1,107 @@
+from numba import njit
+
+from hftbacktest import HashMapMarketDepthBacktest
+
+from .common import asset, generate_feed
+
+NUM_CALLS = 1_000_000
+
+
+@njit
+def call_current_timestamp(hbt, n):
+    s = 0
+    for _ in range(n):
+        s += hbt.current_timestamp
+    return s
+
+
+@njit
+def call_best_bid(hbt, n):
+    s = 0.0
+    for _ in range(n):
+        s += hbt.depth(0).best_bid
+    return s
+
+
+@njit
+def call_bid_qty_at_tick(hbt, n):
+    depth = hbt.depth(0)
+    tick = depth.best_bid_tick
+    s = 0.0
+    for i in range(n):
+        s += depth.bid_qty_at_tick(tick - i % 20)
+    return s
+
+
+@njit
+def call_position(hbt, n):
+    s = 0.0
+    for _ in range(n):
+        s += hbt.position(0)
+    return s
+
+
+@njit
+def call_state_values(hbt, n):
+    s = 0.0
+    for _ in range(n):
+        s += hbt.state_values(0).balance
+    return s
+
+
+@njit
+def call_orders(hbt, n):
+    s = 0
+    for _ in range(n):
+        s += len(hbt.orders(0))
+    return s
+
+
+@njit
+def call_last_trades(hbt, n):
+    s = 0
+    for _ in range(n):
+        s += len(hbt.last_trades(0))
+    return s
+
+
+@njit
+def call_elapse(hbt, n):
+    s = 0
+    for _ in range(n):
+        s += hbt.elapse(0)
+    return s
+
+
+METHODS = {
+    'current_timestamp': call_current_timestamp,
+    'depth.best_bid': call_best_bid,
+    'depth.bid_qty_at_tick': call_bid_qty_at_tick,
+    'position': call_position,
+    'state_values': call_state_values,
+    'orders': call_orders,
+    'last_trades': call_last_trades,
+    'elapse(0)': call_elapse,
+}
+
+
+@njit
+def warm_up(hbt):
+    hbt.elapse(1_000_000_000)
+
+
+class BindingCall:
+    """Calls a binding method ``NUM_CALLS`` times from an ``njit`` function; the time per call is the cost of the
+    binding, which is paid on every iteration of a strategy."""
+    params = list(METHODS)
+    param_names = ('method',)
+
+    def setup(self, method):
+        self.data = generate_feed(100_000)
+        self.hbt = HashMapMarketDepthBacktest([asset(self.data)])
+        warm_up(self.hbt)
+        self.func = METHODS[method]
+        self.func(self.hbt, 1)
+
+    def time_call(self, method):
+        self.func(self.hbt, NUM_CALLS)
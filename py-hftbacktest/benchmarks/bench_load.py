@@ -0,0 +1,50 @@
+import os
+
+from numba import njit
+
+from hftbacktest import HashMapMarketDepthBacktest
+from hftbacktest.data import load_data, save_data
+from hftbacktest.types import event_dtype
+
+from .common import asset, generate_feed
+
+NUM_EVENTS = 5_000_000
+
+FORMATS = ['.npy', '.npz', '.npy.zst', '.npy.lz4', '.hbtc']
+
+
+@njit
+def first_event(hbt):
+    return hbt.elapse(0)
+
+
+class Load:
+    """Loads ``NUM_EVENTS`` events from a file in each format, both from Python and by the engine, which measures the
+    decompression and decoding time."""
+    params = FORMATS
+    param_names = ('format',)
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup_cache(self):
+        data = generate_feed(NUM_EVENTS)
+        for ext in FORMATS:
+            save_data('feed' + ext, data)
+        return {ext: os.path.getsize('feed' + ext) for ext in FORMATS}
+
+    def setup(self, sizes, ext):
+        first_event(HashMapMarketDepthBacktest([asset(generate_feed(1_000))]))
+
+    def time_load_data(self, sizes, ext):
+        load_data('feed' + ext)
+
+    def time_engine_load(self, sizes, ext):
+        hbt = HashMapMarketDepthBacktest([asset('feed' + ext).parallel_load(False)])
+        first_event(hbt)
+        hbt.close()
+
+    def track_compression_ratio(self, sizes, ext):
+        return NUM_EVENTS * event_dtype.itemsize / sizes[ext]
+
+    track_compression_ratio.unit = 'ratio'
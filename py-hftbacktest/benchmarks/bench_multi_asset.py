@@ -0,0 +1,43 @@
+import time
+
+from numba import njit
+
+from hftbacktest import HashMapMarketDepthBacktest
+
+from .common import asset, generate_feed
+
+NUM_EVENTS = 2_000_000
+
+
+@njit
+def run(hbt):
+    s = 0.0
+    while hbt.elapse(100_000_000) == 0:
+        for asset_no in range(hbt.num_assets):
+            s += hbt.depth(asset_no).best_bid
+    return s
+
+
+class MultiAsset:
+    """Replays the same total number of events split across ``num_assets`` assets, which measures how finding the next
+    event across the assets and iterating over them in the strategy scale."""
+    params = ([1, 4, 16, 64, 256], ['linear', 'tournament_tree'])
+    param_names = ('num_assets', 'event_queue')
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, num_assets, event_queue):
+        self.data = [generate_feed(NUM_EVENTS // num_assets, seed=i) for i in range(num_assets)]
+        run(HashMapMarketDepthBacktest([asset(self.data[0][:1_000])]))
+        self.hbt = HashMapMarketDepthBacktest([asset(data) for data in self.data], event_queue)
+
+    def time_replay(self, num_assets, event_queue):
+        run(self.hbt)
+
+    def track_events_per_second(self, num_assets, event_queue):
+        start = time.perf_counter()
+        run(self.hbt)
+        return NUM_EVENTS / (time.perf_counter() - start)
+
+    track_events_per_second.unit = 'events/s'
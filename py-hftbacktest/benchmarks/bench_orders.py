@@ -0,0 +1,48 @@
+from numba import njit
+
+from hftbacktest import HashMapMarketDepthBacktest, GTX, LIMIT
+
+from .common import asset, generate_feed
+
+
+@njit
+def quote(hbt, num_orders, interval):
+    order_id = 0
+    while hbt.elapse(interval) == 0:
+        hbt.clear_inactive_orders(0)
+        depth = hbt.depth(0)
+        if depth.best_bid_tick <= 0 or depth.best_ask_tick <= 0:
+            continue
+
+        # Cancels all working orders and requotes the ladder, which exercises the whole order path: submission,
+        # latency, queue position, fills and cancellation.
+        orders = hbt.orders(0)
+        values = orders.values()
+        while values.has_next():
+            order = values.get()
+            if order.cancellable:
+                hbt.cancel(0, order.order_id, False)
+
+        for i in range(num_orders):
+            order_id += 1
+            hbt.submit_buy_order(0, order_id, (depth.best_bid_tick - i) * depth.tick_size, 1.0, GTX, LIMIT, False)
+            order_id += 1
+            hbt.submit_sell_order(0, order_id, (depth.best_ask_tick + i) * depth.tick_size, 1.0, GTX, LIMIT, False)
+    return order_id
+
+
+class OrderHeavy:
+    """Requotes a ladder of ``num_orders`` orders on each side at every ``interval``."""
+    params = ([1, 10, 50], [1_000_000, 100_000_000])
+    param_names = ('num_orders', 'interval')
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, num_orders, interval):
+        self.data = generate_feed(1_000_000)
+        quote(HashMapMarketDepthBacktest([asset(self.data[:1_000])]), num_orders, interval)
+        self.hbt = HashMapMarketDepthBacktest([asset(self.data)])
+
+    def time_quote(self, num_orders, interval):
+        quote(self.hbt, num_orders, interval)
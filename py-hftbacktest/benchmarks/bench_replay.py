@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+from numba import njit
+
+from hftbacktest import HashMapMarketDepthBacktest, ROIVectorMarketDepthBacktest
+
+from .common import asset, generate_feed
+
+NUM_EVENTS = 2_000_000
+
+
+@njit
+def run_elapse(hbt, duration):
+    n = 0
+    while hbt.elapse(duration) == 0:
+        n += 1
+    return n
+
+
+@njit
+def run_wait_next_feed(hbt):
+    n = 0
+    while hbt.wait_next_feed(False, 1_000_000_000_000) == 0:
+        n += 1
+    return n
+
+
+def _backtest(depth, data):
+    if depth == 'hashmap':
+        return HashMapMarketDepthBacktest([asset(data)])
+    return ROIVectorMarketDepthBacktest([asset(data).roi_lb(90_000.0).roi_ub(110_000.0)])
+
+
+class FeedReplay:
+    """Replays the feed without any orders, which measures the throughput of the engine itself."""
+    params = (['hashmap', 'roivector'], [100_000, 100_000_000])
+    param_names = ('depth', 'elapse')
+    # The backtest is consumed by a single run, so it is rebuilt in setup for every sample.
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, depth, duration):
+        self.data = generate_feed(NUM_EVENTS)
+        # Compiles before timing.
+        run_elapse(_backtest(depth, self.data[:1_000]), duration)
+        self.hbt = _backtest(depth, self.data)
+
+    def time_elapse(self, depth, duration):
+        run_elapse(self.hbt, duration)
+
+    def track_events_per_second(self, depth, duration):
+        start = time.perf_counter()
+        run_elapse(self.hbt, duration)
+        return len(self.data) / (time.perf_counter() - start)
+
+    track_events_per_second.unit = 'events/s'
+
+
+class WaitNextFeed:
+    """Wakes up on every feed event, which is dominated by the cost of crossing the bindings per event."""
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self):
+        self.data = generate_feed(NUM_EVENTS // 4)
+        run_wait_next_feed(HashMapMarketDepthBacktest([asset(self.data[:1_000])]))
+        self.hbt = HashMapMarketDepthBacktest([asset(self.data)])
+
+    def time_wait_next_feed(self):
+        run_wait_next_feed(self.hbt)
+
+    def track_events_per_second(self):
+        start = time.perf_counter()
+        run_wait_next_feed(self.hbt)
+        return len(self.data) / (time.perf_counter() - start)
+
+    track_events_per_second.unit = 'events/s'
@@ -0,0 +1,26 @@
+from numpy.typing import NDArray
+
+from hftbacktest import BacktestAsset
+from hftbacktest.data.synthetic import generate_l2
+
+TICK_SIZE = 0.1
+LOT_SIZE = 0.001
+
+
+def generate_feed(num_events: int, seed: int = 0) -> NDArray:
+    return generate_l2(num_events, seed=seed, tick_size=TICK_SIZE, lot_size=LOT_SIZE, price=100_000.0)
+
+
+def asset(data: str | NDArray | list) -> BacktestAsset:
+    return (
+        BacktestAsset()
+            .data(data)
+            .linear_asset(1.0)
+            .constant_latency(1_000_000, 1_000_000)
+            .risk_adverse_queue_model()
+            .no_partial_fill_exchange()
+            .trading_value_fee_model(-0.00005, 0.0007)
+            .tick_size(TICK_SIZE)
+            .lot_size(LOT_SIZE)
+            .last_trades_capacity(10_000)
+    )
@@ -1,36 +1,18 @@
-from typing import List, Any
+from importlib import import_module
+from typing import List, Any, Literal, TYPE_CHECKING
 
 import numpy as np
 from numpy.typing import NDArray
 
+from . import _hftbacktest
 from ._hftbacktest import (
     BacktestAsset as BacktestAsset_,
     build_hashmap_backtest,
     build_roivec_backtest,
+    build_btree_backtest,
+    build_fused_backtest,
     LiveInstrument
 )
-from .binding import (
-    HashMapMarketDepthBacktest_,
-    HashMapMarketDepthBacktest as HashMapMarketDepthBacktest_TypeHint,
-    ROIVectorMarketDepthBacktest_,
-    ROIVectorMarketDepthBacktest as ROIVectorMarketDepthBacktest_TypeHint,
-
-    event_dtype
-)
-from .order import (
-    BUY,
-    SELL,
-    NONE,
-    NEW,
-    EXPIRED,
-    FILLED,
-    CANCELED,
-    GTC,
-    GTX,
-    LIMIT,
-    MARKET,
-)
-from .recorder import Recorder
 from .types import (
     ALL_ASSETS,
     EVENT_ARRAY,
@@ -46,31 +28,82 @@ from .types import (
     EXCH_EVENT,
     LOCAL_EVENT,
     BUY_EVENT,
-    SELL_EVENT
+    SELL_EVENT,
+    event_dtype
 )
-try:
-    from ._hftbacktest import (
-        build_hashmap_livebot,
-        build_roivec_livebot
-    )
+
+if TYPE_CHECKING:
     from .binding import (
-        HashMapMarketDepthLiveBot_,
+        HashMapMarketDepthBacktest as HashMapMarketDepthBacktest_TypeHint,
+        ROIVectorMarketDepthBacktest as ROIVectorMarketDepthBacktest_TypeHint,
+        BTreeMarketDepthBacktest as BTreeMarketDepthBacktest_TypeHint,
+        FusedHashMapMarketDepthBacktest as FusedHashMapMarketDepthBacktest_TypeHint,
         HashMapMarketDepthLiveBot as HashMapMarketDepthLiveBot_TypeHint,
-        ROIVectorMarketDepthLiveBot_,
         ROIVectorMarketDepthLiveBot as ROIVectorMarketDepthLiveBot_TypeHint,
     )
-    LIVE_FEATURE = True
-except:
-    LIVE_FEATURE = False
+    from .order import BUY, SELL, NONE, NEW, EXPIRED, FILLED, CANCELED, GTC, GTX, LIMIT, MARKET
+    from .recorder import Recorder, FillRecorder
+    from .histogram import LatencyHistogram
+    from .asyncbot import AsyncLiveBot
+    from .sharedbook import SharedBook
+    from .binding import monotonic_ns
+
+LIVE_FEATURE = hasattr(_hftbacktest, 'build_hashmap_livebot')
+if LIVE_FEATURE:
+    from ._hftbacktest import (
+        build_hashmap_livebot,
+        build_roivec_livebot
+    )
+
+# The following attributes are loaded on first access, since they require Numba and the jitclass definitions of the
+# bindings. This keeps importing the package, or its data utilities and stats submodules, from compiling or initializing
+# the bindings.
+_LAZY_ATTRS = {
+    'BUY': '.order',
+    'SELL': '.order',
+    'NONE': '.order',
+    'NEW': '.order',
+    'EXPIRED': '.order',
+    'FILLED': '.order',
+    'CANCELED': '.order',
+    'GTC': '.order',
+    'GTX': '.order',
+    'LIMIT': '.order',
+    'MARKET': '.order',
+    'Recorder': '.recorder',
+    'FillRecorder': '.recorder',
+    'LatencyHistogram': '.histogram',
+    'AsyncLiveBot': '.asyncbot',
+    'SharedBook': '.sharedbook',
+    'monotonic_ns': '.binding',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = (
     'BacktestAsset',
     'HashMapMarketDepthBacktest',
     'ROIVectorMarketDepthBacktest',
+    'BTreeMarketDepthBacktest',
+    'FusedHashMapMarketDepthBacktest',
 
     'LiveInstrument',
     'HashMapMarketDepthLiveBot',
     'ROIVectorMarketDepthLiveBot',
+    'AsyncLiveBot',
+    'SharedBook',
 
     'ALL_ASSETS',
 
@@ -87,7 +120,7 @@ __all__ = (
     'EXCH_EVENT',
     'LOCAL_EVENT',
     'EXCH_EVENT',
-    'LOCAL_EVENT'
+    'LOCAL_EVENT',
     'BUY_EVENT',
     'SELL_EVENT',
 
@@ -109,7 +142,10 @@ __all__ = (
     'LIMIT',
     'MARKET',
     
-    'Recorder'
+    'Recorder',
+    'FillRecorder',
+    'LatencyHistogram',
+    'monotonic_ns'
 )
 
 __version__ = '2.2.0'
@@ -125,8 +161,13 @@ class BacktestAsset(BacktestAsset_):
         Sets the feed data.
 
         Args:
-            data: A list of file paths for the feed data in `.npz` format, or a list of NumPy arrays containing the feed
-                  data.
+            data: A list of file paths for the feed data in `.npz` or `.npy` format, in `.npy.zst` or `.npy.lz4`
+                  format written by :func:`write_npy_compressed <hftbacktest.data.write_npy_compressed>`, or in the
+                  columnar format, `.hbtc`, written by
+                  :func:`write_columnar <hftbacktest.data.utils.columnar.write_columnar>`, in Parquet, `.parquet`, or
+                  Arrow IPC, `.arrow`, `.feather`, or `.arrows`, format with the columns named after the fields of
+                  :obj:`event_dtype <hftbacktest.types.event_dtype>` if built with the `parquet` feature, or a list of
+                  NumPy arrays containing the feed data.
         """
         if isinstance(data, str):
             self.add_file(data)
@@ -144,7 +185,12 @@ class BacktestAsset(BacktestAsset_):
             raise ValueError
         return self
 
-    def intp_order_latency(self, data: str | NDArray | List[str], latency_offset: int = 0):
+    def intp_order_latency(
+            self,
+            data: str | NDArray | List[str],
+            latency_offset: int = 0,
+            lookup_resolution: int = 0
+    ):
         """
         Uses `IntpOrderLatency <https://docs.rs/hftbacktest/latest/hftbacktest/backtest/models/struct.IntpOrderLatency.html>`_
         for the order latency model.
@@ -159,13 +205,18 @@ class BacktestAsset(BacktestAsset_):
                             specified amount. This is particularly useful in cross-exchange
                             backtesting, where the feed data is collected from a different site than
                             the one where the strategy is intended to run.
+            lookup_resolution: the time resolution of the precomputed lookup grid, which makes finding the latency for
+                               a timestamp nearly constant time on dense latency data. The grid holds one entry per
+                               resolution over the span of each file, so a coarse resolution such as one second is
+                               recommended. The default value is ``0``, which disables the grid; the lookup then uses
+                               a galloping search.
         """
         if isinstance(data, str):
-            super().intp_order_latency([data], latency_offset)
+            super().intp_order_latency([data], latency_offset, lookup_resolution)
         elif isinstance(data, np.ndarray):
-            self._intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset)
+            self._intp_order_latency_ndarray(data.ctypes.data, len(data), latency_offset, lookup_resolution)
         elif isinstance(data, list):
-            super().intp_order_latency(data, latency_offset)
+            super().intp_order_latency(data, latency_offset, lookup_resolution)
         else:
             raise ValueError
         return self
@@ -187,41 +238,161 @@ class BacktestAsset(BacktestAsset_):
 
 
 def HashMapMarketDepthBacktest(
-        assets: List[BacktestAsset]
-) -> HashMapMarketDepthBacktest_TypeHint:
+        assets: List[BacktestAsset],
+        event_queue: Literal['linear', 'tournament_tree'] = 'linear',
+        partitions: int = 1
+) -> 'HashMapMarketDepthBacktest_TypeHint':
     """
     Constructs an instance of `HashMapMarketDepthBacktest`.
 
     Args:
         assets: A list of backtesting assets constructed using :class:`BacktestAsset`.
+        event_queue: The event queue implementation used to find the next event across all assets.
+
+                     * ``linear`` scans the timestamps of all event sources. This is the fastest for a small number
+                       of assets.
+                     * ``tournament_tree`` maintains a tournament tree, which finds the next event in O(1) and updates
+                       it in O(log n). This is faster when backtesting more than a handful of assets, such as
+                       hundreds of assets.
+        partitions: The number of groups into which the assets are partitioned. Each group of consecutive assets is
+                    processed in its own thread while the backtest elapses: the first group in the calling thread
+                    and the others in worker threads, which are started once when the backtest is constructed and
+                    wait between the calls. The strategy sees all assets at the same timestamp when ``elapse``
+                    returns, and the results are identical to those of a single partition. Each ``elapse`` costs a
+                    round trip over a channel to every worker, so this speeds up backtesting many assets with a
+                    strategy that elapses at coarse intervals, such as a portfolio strategy, where the work done per
+                    ``elapse`` outweighs the synchronization. ``wait_next_feed`` and waiting for order responses
+                    process all assets in the calling thread.
 
     Returns:
         A jit`ed `HashMapMarketDepthBacktest` that can be used in an ``njit`` function.
     """
-    ptr = build_hashmap_backtest(assets)
+    from .binding import HashMapMarketDepthBacktest_
+
+    ptr = build_hashmap_backtest(assets, event_queue, partitions)
     return HashMapMarketDepthBacktest_(ptr)
 
 
 def ROIVectorMarketDepthBacktest(
-        assets: List[BacktestAsset]
-) -> ROIVectorMarketDepthBacktest_TypeHint:
+        assets: List[BacktestAsset],
+        event_queue: Literal['linear', 'tournament_tree'] = 'linear',
+        partitions: int = 1
+) -> 'ROIVectorMarketDepthBacktest_TypeHint':
     """
     Constructs an instance of `ROIVectorMarketBacktest`.
 
     Args:
         assets: A list of backtesting assets constructed using :class:`BacktestAsset`.
+        event_queue: The event queue implementation used to find the next event across all assets.
+
+                     * ``linear`` scans the timestamps of all event sources. This is the fastest for a small number
+                       of assets.
+                     * ``tournament_tree`` maintains a tournament tree, which finds the next event in O(1) and updates
+                       it in O(log n). This is faster when backtesting more than a handful of assets, such as
+                       hundreds of assets.
+        partitions: The number of groups into which the assets are partitioned, each processed in its own thread
+                    while the backtest elapses. See :func:`HashMapMarketDepthBacktest`.
 
     Returns:
         A jit`ed `ROIVectorMarketBacktest` that can be used in an ``njit`` function.
     """
-    ptr = build_roivec_backtest(assets)
+    from .binding import ROIVectorMarketDepthBacktest_
+
+    ptr = build_roivec_backtest(assets, event_queue, partitions)
     return ROIVectorMarketDepthBacktest_(ptr)
 
 
+def BTreeMarketDepthBacktest(
+        assets: List[BacktestAsset],
+        event_queue: Literal['linear', 'tournament_tree'] = 'linear',
+        partitions: int = 1
+) -> 'BTreeMarketDepthBacktest_TypeHint':
+    """
+    Constructs an instance of `BTreeMarketDepthBacktest`, which uses the
+    `BTreeMarketDepth <https://docs.rs/hftbacktest/latest/hftbacktest/depth/struct.BTreeMarketDepth.html>`_.
+
+    The B-Tree keeps only the price levels that have quantity, so the next best level is found in O(log n) when the
+    best level is deleted, whereas `HashMapMarketDepth` scans tick by tick across the empty levels in between. This
+    suits wide books with sparse price levels, such as assets whose tick size is small relative to their price.
+    However, since the B-Tree doesn't track the best bid and ask separately, a missing feed can leave a stale level
+    crossing the book until it is deleted.
+
+    Args:
+        assets: A list of backtesting assets constructed using :class:`BacktestAsset`.
+        event_queue: The event queue implementation used to find the next event across all assets.
+
+                     * ``linear`` scans the timestamps of all event sources. This is the fastest for a small number
+                       of assets.
+                     * ``tournament_tree`` maintains a tournament tree, which finds the next event in O(1) and updates
+                       it in O(log n). This is faster when backtesting more than a handful of assets, such as
+                       hundreds of assets.
+        partitions: The number of groups into which the assets are partitioned, each processed in its own thread
+                    while the backtest elapses. See :func:`HashMapMarketDepthBacktest`.
+
+    Returns:
+        A jit`ed `BTreeMarketDepthBacktest` that can be used in an ``njit`` function.
+    """
+    from .binding import BTreeMarketDepthBacktest_
+
+    ptr = build_btree_backtest(assets, event_queue, partitions)
+    return BTreeMarketDepthBacktest_(ptr)
+
+
+def FusedHashMapMarketDepthBacktest(
+        assets: List[BacktestAsset],
+        event_queue: Literal['linear', 'tournament_tree'] = 'linear',
+        partitions: int = 1
+) -> 'FusedHashMapMarketDepthBacktest_TypeHint':
+    """
+    Constructs an instance of `FusedHashMapMarketDepthBacktest`, which uses the `FusedHashMapMarketDepth`.
+
+    The fused market depth keeps the timestamp of each price level and ignores updates older than it, so it can build a
+    single book from multiple feeds of the same asset, such as the BBO stream and the depth stream, which are merged
+    in the feed data. It doesn't support Level-3 data, so :meth:`BacktestAsset.l3_fifo_queue_model` cannot be used.
+
+    Args:
+        assets: A list of backtesting assets constructed using :class:`BacktestAsset`.
+        event_queue: The event queue implementation used to find the next event across all assets.
+
+                     * ``linear`` scans the timestamps of all event sources. This is the fastest for a small number
+                       of assets.
+                     * ``tournament_tree`` maintains a tournament tree, which finds the next event in O(1) and updates
+                       it in O(log n). This is faster when backtesting more than a handful of assets, such as
+                       hundreds of assets.
+        partitions: The number of groups into which the assets are partitioned, each processed in its own thread
+                    while the backtest elapses. See :func:`HashMapMarketDepthBacktest`.
+
+    Returns:
+        A jit`ed `FusedHashMapMarketDepthBacktest` that can be used in an ``njit`` function.
+    """
+    from .binding import FusedHashMapMarketDepthBacktest_
+
+    ptr = build_fused_backtest(assets, event_queue, partitions)
+    return FusedHashMapMarketDepthBacktest_(ptr)
+
+
 if LIVE_FEATURE:
+    def HashMapMarketDepthLiveBot(
+            assets: List[LiveInstrument]
+    ) -> 'HashMapMarketDepthLiveBot_TypeHint':
+        """
+        Constructs an instance of `HashMapMarketDepthLiveBot`.
+
+        Args:
+            assets: A list of live instruments constructed using :class:`LiveInstrument`.
+
+        Returns:
+            A jit`ed `HashMapMarketDepthLiveBot` that can be used in an ``njit`` function. It can be driven from an
+            ``asyncio`` event loop with :class:`AsyncLiveBot`.
+        """
+        from .binding import HashMapMarketDepthLiveBot_
+
+        ptr = build_hashmap_livebot(assets)
+        return HashMapMarketDepthLiveBot_(ptr)
+
     def ROIVectorMarketDepthLiveBot(
             assets: List[LiveInstrument]
-    ) -> ROIVectorMarketDepthLiveBot_TypeHint:
+    ) -> 'ROIVectorMarketDepthLiveBot_TypeHint':
         """
         Constructs an instance of `ROIVectorMarketDepthLiveBot`.
 
@@ -231,5 +402,7 @@ if LIVE_FEATURE:
         Returns:
             A jit`ed `ROIVectorMarketDepthLiveBot` that can be used in an ``njit`` function.
         """
+        from .binding import ROIVectorMarketDepthLiveBot_
+
         ptr = build_roivec_livebot(assets)
         return ROIVectorMarketDepthLiveBot_(ptr)
@@ -0,0 +1,152 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from numba import njit
+
+
+@njit(nogil=True)
+def _wait_next_feed(hbt: Any, include_order_resp: bool, timeout: int) -> int:
+    return hbt.wait_next_feed(include_order_resp, timeout)
+
+
+@njit(nogil=True)
+def _wait_order_response(hbt: Any, asset_no: int, order_id: int, timeout: int) -> int:
+    return hbt.wait_order_response(asset_no, order_id, timeout)
+
+
+@njit(nogil=True)
+def _elapse(hbt: Any, duration: int) -> int:
+    return hbt.elapse(duration)
+
+
+@njit(nogil=True)
+def _close(hbt: Any) -> int:
+    return hbt.close()
+
+
+class AsyncLiveBot:
+    """
+    Drives a live bot, such as :func:`HashMapMarketDepthLiveBot <hftbacktest.HashMapMarketDepthLiveBot>`, from an
+    ``asyncio`` event loop, so that a Python service can multiplex the bot with its own I/O, such as risk checks or
+    serving metrics, in the same process.
+
+    The blocking calls of the bot, which wait for the next feed or an order response over the IPC channel, run in a
+    dedicated thread with the GIL released, and are awaited as coroutines. The event loop keeps serving the other tasks
+    while the bot waits, and they don't delay the bot's reaction to a feed except by the time it takes to acquire the
+    GIL to resume the awaiting coroutine.
+
+    The bot is not thread-safe, so every access to it, including submitting orders and reading the market depth, has to
+    be made through :meth:`run`, which executes it in the bot's thread after the pending waits. Strategy logic is best
+    written as ``njit`` functions that take the bot as the first argument, and run by :meth:`run`.
+
+    This works with the backtesters as well, which have the same interface, so the same service can be tested on
+    historical data.
+
+    **Example**
+
+    .. code-block:: python
+
+        @njit
+        def on_feed(hbt):
+            depth = hbt.depth(0)
+            ...
+
+        async def trade(bot):
+            while await bot.next_feed(timeout=1_000_000_000) == 0:
+                await bot.run(on_feed)
+            await bot.close()
+
+        async def main():
+            bot = AsyncLiveBot(HashMapMarketDepthLiveBot([instrument]))
+            await asyncio.gather(trade(bot), serve_metrics())
+
+    Args:
+        hbt: The live bot, or a backtester.
+    """
+
+    def __init__(self, hbt: Any):
+        self._hbt = hbt
+        # A single thread makes all the calls to the bot, in the order in which they are made.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hftbacktest-bot')
+
+    @property
+    def hbt(self) -> Any:
+        """
+        Returns the wrapped bot. It should only be accessed in the functions executed by :meth:`run`.
+        """
+        return self._hbt
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Calls ``func(hbt, *args)`` in the bot's thread and returns its result. The call is made after all the calls
+        made earlier through this, including the waits, have returned.
+
+        ``func`` holds the GIL while it runs unless it is an ``njit(nogil=True)`` function, so long-running functions
+        should release the GIL to keep the event loop responsive.
+
+        Args:
+            func: The function to call with the bot, such as an ``njit`` function that implements the strategy.
+            args: The additional arguments to ``func``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, self._hbt, *args)
+
+    async def next_feed(self, include_order_resp: bool = False, timeout: int = 1_000_000_000) -> int:
+        """
+        Waits until the next feed is received, or until timeout, without blocking the event loop.
+
+        If the awaiting task is cancelled, the wait itself continues in the bot's thread until it returns, and the
+        calls made afterward are made after it.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to the
+                                next feed.
+            timeout: Timeout for waiting for the next feed or an order response in nanoseconds.
+
+        Returns:
+            The return code of ``wait_next_feed``: ``0`` when it receives a feed or an order response, or reaches the
+            timeout, ``1`` when it reaches the end, and otherwise, an error occurred.
+        """
+        return await self.run(_wait_next_feed, include_order_resp, timeout)
+
+    async def wait_order_response(self, asset_no: int, order_id: int, timeout: int) -> int:
+        """
+        Waits for the response of the order with the given order ID until timeout, without blocking the event loop.
+
+        Args:
+            asset_no: Asset number where an order with ``order_id`` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response in nanoseconds.
+
+        Returns:
+            The return code of ``wait_order_response``.
+        """
+        return await self.run(_wait_order_response, asset_no, order_id, timeout)
+
+    async def elapse(self, duration: int) -> int:
+        """
+        Elapses the specified duration without blocking the event loop.
+
+        Args:
+            duration: Duration to elapse in nanoseconds.
+
+        Returns:
+            The return code of ``elapse``.
+        """
+        return await self.run(_elapse, duration)
+
+    async def close(self) -> int:
+        """
+        Closes the bot and stops its thread. The bot cannot be used afterward.
+
+        Returns:
+            The return code of ``close``.
+        """
+        try:
+            return await self.run(_close)
+        finally:
+            self._executor.shutdown(wait=False)
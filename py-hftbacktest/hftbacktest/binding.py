@@ -26,12 +26,19 @@ from . import _hftbacktest
 from .intrinsic import ptr_from_val, address_as_void_pointer, val_from_ptr, is_null_ptr
 from .order import order_dtype, Order, Order_
 from .state import StateValues, StateValues_
-from .types import event_dtype, state_values_dtype, EVENT_ARRAY
+from .types import event_dtype, state_values_dtype, profile_stats_dtype, EVENT_ARRAY, PROFILE_STATS_ARRAY
 
 LIVE_FEATURE = 'build_hashmap_livebot' in dir(_hftbacktest)
+PROFILE_FEATURE = _hftbacktest.PROFILE_FEATURE
 
 lib = CDLL(_hftbacktest.__file__)
 
+# Returns the nanoseconds elapsed on a monotonic clock since an arbitrary point, which can be called inside ``njit``
+# functions to measure the wall-clock time, such as the time spent in the strategy, while backtesting.
+monotonic_ns = lib.monotonic_ns
+monotonic_ns.restype = c_int64
+monotonic_ns.argtypes = []
+
 hashmapdepth_best_bid_tick = lib.hashmapdepth_best_bid_tick
 hashmapdepth_best_bid_tick.restype = c_int64
 hashmapdepth_best_bid_tick.argtypes = [c_void_p]
@@ -194,6 +201,14 @@ roivecdepth_ask_qty_at_tick = lib.roivecdepth_ask_qty_at_tick
 roivecdepth_ask_qty_at_tick.restype = c_double
 roivecdepth_ask_qty_at_tick.argtypes = [c_void_p, c_int64]
 
+roivecdepth_roi_lb_tick = lib.roivecdepth_roi_lb_tick
+roivecdepth_roi_lb_tick.restype = c_int64
+roivecdepth_roi_lb_tick.argtypes = [c_void_p]
+
+roivecdepth_roi_ub_tick = lib.roivecdepth_roi_ub_tick
+roivecdepth_roi_ub_tick.restype = c_int64
+roivecdepth_roi_ub_tick.argtypes = [c_void_p]
+
 roivecdepth_bid_depth = lib.roivecdepth_bid_depth
 roivecdepth_bid_depth.restype = c_void_p
 roivecdepth_bid_depth.argtypes = [c_void_p, POINTER(c_uint64)]
@@ -275,6 +290,22 @@ class ROIVectorMarketDepth:
         """
         return roivecdepth_ask_qty_at_tick(self.ptr, price_tick)
 
+    @property
+    def roi_lb_tick(self) -> int64:
+        """
+        Returns the lower bound of the range of interest in ticks. If recentering is enabled by
+        :meth:`BacktestAsset.roi_recentering`, it changes as the range of interest follows the mid-price.
+        """
+        return roivecdepth_roi_lb_tick(self.ptr)
+
+    @property
+    def roi_ub_tick(self) -> int64:
+        """
+        Returns the upper bound of the range of interest in ticks. If recentering is enabled by
+        :meth:`BacktestAsset.roi_recentering`, it changes as the range of interest follows the mid-price.
+        """
+        return roivecdepth_roi_ub_tick(self.ptr)
+
     @property
     def bid_depth(self) -> np.ndarray[Any, float64]:
         """
@@ -282,7 +313,8 @@ class ROIVectorMarketDepth:
         `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities at prices from
         the ROI lower bound to the ROI upper bound. The index is calculated as
         `price in ticks - ROI lower bound in ticks`. Respectively, the price is
-        `(index + ROI lower bound in ticks) * tick_size`.
+        `(index + ROI lower bound in ticks) * tick_size`. Use :attr:`roi_lb_tick` for the ROI lower bound in ticks,
+        since it moves if recentering is enabled.
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
@@ -300,7 +332,8 @@ class ROIVectorMarketDepth:
         `ROI upper bound in ticks + 1 - ROI lower bound in ticks`, the array contains the quantities at prices from
         the ROI lower bound to the ROI upper bound. The index is calculated as
         `price in ticks - ROI lower bound in ticks`. Respectively, the price is
-        `(index + ROI lower bound in ticks) * tick_size`.
+        `(index + ROI lower bound in ticks) * tick_size`. Use :attr:`roi_lb_tick` for the ROI lower bound in ticks,
+        since it moves if recentering is enabled.
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
@@ -314,6 +347,266 @@ class ROIVectorMarketDepth:
 
 ROIVectorMarketDepth_ = jitclass(ROIVectorMarketDepth)
 
+
+btreedepth_best_bid_tick = lib.btreedepth_best_bid_tick
+btreedepth_best_bid_tick.restype = c_int64
+btreedepth_best_bid_tick.argtypes = [c_void_p]
+
+btreedepth_best_ask_tick = lib.btreedepth_best_ask_tick
+btreedepth_best_ask_tick.restype = c_int64
+btreedepth_best_ask_tick.argtypes = [c_void_p]
+
+btreedepth_best_bid = lib.btreedepth_best_bid
+btreedepth_best_bid.restype = c_double
+btreedepth_best_bid.argtypes = [c_void_p]
+
+btreedepth_best_ask = lib.btreedepth_best_ask
+btreedepth_best_ask.restype = c_double
+btreedepth_best_ask.argtypes = [c_void_p]
+
+btreedepth_tick_size = lib.btreedepth_tick_size
+btreedepth_tick_size.restype = c_double
+btreedepth_tick_size.argtypes = [c_void_p]
+
+btreedepth_lot_size = lib.btreedepth_lot_size
+btreedepth_lot_size.restype = c_double
+btreedepth_lot_size.argtypes = [c_void_p]
+
+btreedepth_bid_qty_at_tick = lib.btreedepth_bid_qty_at_tick
+btreedepth_bid_qty_at_tick.restype = c_double
+btreedepth_bid_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+btreedepth_ask_qty_at_tick = lib.btreedepth_ask_qty_at_tick
+btreedepth_ask_qty_at_tick.restype = c_double
+btreedepth_ask_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+btreedepth_snapshot = lib.btreedepth_snapshot
+btreedepth_snapshot.restype = c_void_p
+btreedepth_snapshot.argtypes = [c_void_p, POINTER(c_uint64)]
+
+btreedepth_snapshot_free = lib.btreedepth_snapshot_free
+btreedepth_snapshot_free.restype = c_void_p
+btreedepth_snapshot_free.argtypes = [c_void_p, c_uint64]
+
+
+class BTreeMarketDepth:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def best_bid_tick(self) -> int64:
+        """
+        Returns the best bid price in ticks.
+        """
+        return btreedepth_best_bid_tick(self.ptr)
+
+    @property
+    def best_ask_tick(self) -> int64:
+        """
+        Returns the best ask price in ticks.
+        """
+        return btreedepth_best_ask_tick(self.ptr)
+
+    @property
+    def best_bid(self) -> float64:
+        """
+        Returns the best bid price.
+        """
+        return btreedepth_best_bid(self.ptr)
+
+    @property
+    def best_ask(self) -> float64:
+        """
+        Returns the best ask price.
+        """
+        return btreedepth_best_ask(self.ptr)
+
+    @property
+    def tick_size(self) -> float64:
+        """
+        Returns the tick size.
+        """
+        return btreedepth_tick_size(self.ptr)
+
+    @property
+    def lot_size(self) -> float64:
+        """
+        Returns the lot size.
+        """
+        return btreedepth_lot_size(self.ptr)
+
+    def bid_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the bid market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return btreedepth_bid_qty_at_tick(self.ptr, price_tick)
+
+    def ask_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the ask market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return btreedepth_ask_qty_at_tick(self.ptr, price_tick)
+
+    def snapshot(self) -> EVENT_ARRAY:
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = btreedepth_snapshot(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def snapshot_free(self, arr: EVENT_ARRAY):
+        btreedepth_snapshot_free(arr.ctypes.data, len(arr))
+
+
+BTreeMarketDepth_ = jitclass(BTreeMarketDepth)
+
+
+fuseddepth_best_bid_tick = lib.fuseddepth_best_bid_tick
+fuseddepth_best_bid_tick.restype = c_int64
+fuseddepth_best_bid_tick.argtypes = [c_void_p]
+
+fuseddepth_best_ask_tick = lib.fuseddepth_best_ask_tick
+fuseddepth_best_ask_tick.restype = c_int64
+fuseddepth_best_ask_tick.argtypes = [c_void_p]
+
+fuseddepth_best_bid = lib.fuseddepth_best_bid
+fuseddepth_best_bid.restype = c_double
+fuseddepth_best_bid.argtypes = [c_void_p]
+
+fuseddepth_best_ask = lib.fuseddepth_best_ask
+fuseddepth_best_ask.restype = c_double
+fuseddepth_best_ask.argtypes = [c_void_p]
+
+fuseddepth_tick_size = lib.fuseddepth_tick_size
+fuseddepth_tick_size.restype = c_double
+fuseddepth_tick_size.argtypes = [c_void_p]
+
+fuseddepth_lot_size = lib.fuseddepth_lot_size
+fuseddepth_lot_size.restype = c_double
+fuseddepth_lot_size.argtypes = [c_void_p]
+
+fuseddepth_bid_qty_at_tick = lib.fuseddepth_bid_qty_at_tick
+fuseddepth_bid_qty_at_tick.restype = c_double
+fuseddepth_bid_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+fuseddepth_ask_qty_at_tick = lib.fuseddepth_ask_qty_at_tick
+fuseddepth_ask_qty_at_tick.restype = c_double
+fuseddepth_ask_qty_at_tick.argtypes = [c_void_p, c_int64]
+
+fuseddepth_snapshot = lib.fuseddepth_snapshot
+fuseddepth_snapshot.restype = c_void_p
+fuseddepth_snapshot.argtypes = [c_void_p, POINTER(c_uint64)]
+
+fuseddepth_snapshot_free = lib.fuseddepth_snapshot_free
+fuseddepth_snapshot_free.restype = c_void_p
+fuseddepth_snapshot_free.argtypes = [c_void_p, c_uint64]
+
+
+class FusedHashMapMarketDepth:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def best_bid_tick(self) -> int64:
+        """
+        Returns the best bid price in ticks.
+        """
+        return fuseddepth_best_bid_tick(self.ptr)
+
+    @property
+    def best_ask_tick(self) -> int64:
+        """
+        Returns the best ask price in ticks.
+        """
+        return fuseddepth_best_ask_tick(self.ptr)
+
+    @property
+    def best_bid(self) -> float64:
+        """
+        Returns the best bid price.
+        """
+        return fuseddepth_best_bid(self.ptr)
+
+    @property
+    def best_ask(self) -> float64:
+        """
+        Returns the best ask price.
+        """
+        return fuseddepth_best_ask(self.ptr)
+
+    @property
+    def tick_size(self) -> float64:
+        """
+        Returns the tick size.
+        """
+        return fuseddepth_tick_size(self.ptr)
+
+    @property
+    def lot_size(self) -> float64:
+        """
+        Returns the lot size.
+        """
+        return fuseddepth_lot_size(self.ptr)
+
+    def bid_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the bid market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return fuseddepth_bid_qty_at_tick(self.ptr, price_tick)
+
+    def ask_qty_at_tick(self, price_tick: int64) -> float64:
+        """
+        Returns the quantity at the ask market depth for a given price in ticks.
+
+        Args:
+            price_tick: Price in ticks.
+
+        Returns:
+            The quantity at the specified price.
+        """
+        return fuseddepth_ask_qty_at_tick(self.ptr, price_tick)
+
+    def snapshot(self) -> EVENT_ARRAY:
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = fuseddepth_snapshot(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def snapshot_free(self, arr: EVENT_ARRAY):
+        fuseddepth_snapshot_free(arr.ctypes.data, len(arr))
+
+
+FusedHashMapMarketDepth_ = jitclass(FusedHashMapMarketDepth)
+
 orders_get = lib.orders_get
 orders_get.restype = c_void_p
 orders_get.argtypes = [c_void_p, c_uint64]
@@ -432,91 +725,982 @@ class OrderDict:
 
         .. code-block:: python
 
-            values = order_dict.values()
-            while values.has_next():
-                order = values.get()
-                # Do what you need with the order.
+            values = order_dict.values()
+            while values.has_next():
+                order = values.get()
+                # Do what you need with the order.
+
+        """
+        return Values_(orders_values(self.ptr))
+
+    def get(self, order_id: uint64) -> Order | None:
+        """
+        Args:
+            order_id: Order ID
+
+        Returns:
+            Order with the specified order ID; `None` if it does not exist.
+        """
+        order_ptr = orders_get(self.ptr, order_id)
+        if is_null_ptr(order_ptr):
+            return None
+        else:
+            arr = carray(
+                address_as_void_pointer(order_ptr),
+                1,
+                dtype=order_dtype
+            )
+            return Order_(arr)
+
+    def __len__(self) -> uint64:
+        return orders_len(self.ptr)
+
+    def __contains__(self, order_id: uint64) -> bool:
+        """
+        Args:
+            order_id: Order ID
+        Returns:
+            `True` if the order with the specified order ID exists; otherwise, `False`.
+        """
+        return orders_contains(self.ptr, order_id)
+
+
+OrderDict_ = jitclass(OrderDict)
+
+hashmapbt_elapse = lib.hashmapbt_elapse
+hashmapbt_elapse.restype = c_int64
+hashmapbt_elapse.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_elapse_bt = lib.hashmapbt_elapse_bt
+hashmapbt_elapse_bt.restype = c_int64
+hashmapbt_elapse_bt.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_hashmapbt_wait_order_response = lib.hashmapbt_wait_order_response
+hashmapbt_hashmapbt_wait_order_response.restype = c_int64
+hashmapbt_hashmapbt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+
+hashmapbt_wait_next_feed = lib.hashmapbt_wait_next_feed
+hashmapbt_wait_next_feed.restype = c_int64
+hashmapbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+
+hashmapbt_close = lib.hashmapbt_close
+hashmapbt_close.restype = c_int64
+hashmapbt_close.argtypes = [c_void_p]
+
+hashmapbt_position = lib.hashmapbt_position
+hashmapbt_position.restype = c_double
+hashmapbt_position.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_current_timestamp = lib.hashmapbt_current_timestamp
+hashmapbt_current_timestamp.restype = c_int64
+hashmapbt_current_timestamp.argtypes = [c_void_p]
+
+hashmapbt_depth = lib.hashmapbt_depth
+hashmapbt_depth.restype = c_void_p
+hashmapbt_depth.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_last_trades = lib.hashmapbt_last_trades
+hashmapbt_last_trades.restype = c_void_p
+hashmapbt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+
+hashmapbt_num_assets = lib.hashmapbt_num_assets
+hashmapbt_num_assets.restype = c_uint64
+hashmapbt_num_assets.argtypes = [c_void_p]
+
+hashmapbt_submit_buy_order = lib.hashmapbt_submit_buy_order
+hashmapbt_submit_buy_order.restype = c_int64
+hashmapbt_submit_buy_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+hashmapbt_submit_sell_order = lib.hashmapbt_submit_sell_order
+hashmapbt_submit_sell_order.restype = c_int64
+hashmapbt_submit_sell_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+hashmapbt_cancel = lib.hashmapbt_cancel
+hashmapbt_cancel.restype = c_int64
+hashmapbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+
+hashmapbt_clear_last_trades = lib.hashmapbt_clear_last_trades
+hashmapbt_clear_last_trades.restype = c_void_p
+hashmapbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_profile_stats = lib.hashmapbt_profile_stats
+hashmapbt_profile_stats.restype = c_void_p
+hashmapbt_profile_stats.argtypes = [c_void_p, POINTER(c_uint64)]
+
+hashmapbt_clear_inactive_orders = lib.hashmapbt_clear_inactive_orders
+hashmapbt_clear_inactive_orders.restype = c_void_p
+hashmapbt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_orders = lib.hashmapbt_orders
+hashmapbt_orders.restype = c_void_p
+hashmapbt_orders.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_state_values = lib.hashmapbt_state_values
+hashmapbt_state_values.restype = c_void_p
+hashmapbt_state_values.argtypes = [c_void_p, c_uint64]
+
+hashmapbt_feed_latency = lib.hashmapbt_feed_latency
+hashmapbt_feed_latency.restype = c_bool
+hashmapbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+
+hashmapbt_order_latency = lib.hashmapbt_order_latency
+hashmapbt_order_latency.restype = c_bool
+hashmapbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+
+hashmapbt_goto_end = lib.hashmapbt_goto_end
+hashmapbt_goto_end.restype = c_int64
+hashmapbt_goto_end.argtypes = [c_void_p]
+
+
+class HashMapMarketDepthBacktest:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def current_timestamp(self) -> int64:
+        """
+        In backtesting, this timestamp reflects the time at which the backtesting is conducted within the provided data.
+        """
+        return hashmapbt_current_timestamp(self.ptr)
+
+    def depth(self, asset_no: uint64) -> HashMapMarketDepth:
+        """
+        Args:
+            asset_no: Asset number from which the market depth will be retrieved.
+
+        Returns:
+            The depth of market of the specific asset.
+        """
+        return HashMapMarketDepth_(hashmapbt_depth(self.ptr, asset_no))
+
+    @property
+    def num_assets(self) -> uint64:
+        """
+        Returns the number of assets.
+        """
+        return hashmapbt_num_assets(self.ptr)
+
+    def position(self, asset_no: uint64) -> float64:
+        """
+        Args:
+            asset_no: Asset number from which the position will be retrieved.
+
+        Returns:
+            The quantity of the held position.
+        """
+        return hashmapbt_position(self.ptr, asset_no)
+
+    def state_values(self, asset_no: uint64) -> StateValues:
+        """
+        Args:
+            asset_no: Asset number from which the state values will be retrieved.
+
+        Returns:
+            The state’s values.
+        """
+        ptr = hashmapbt_state_values(self.ptr, asset_no)
+        arr = numba.carray(
+            address_as_void_pointer(ptr),
+            1,
+            state_values_dtype
+        )
+        return StateValues_(arr)
+
+    def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
+        """
+        Args:
+            asset_no: Asset number from which the trades will be retrieved.
+
+        Returns:
+            An array of `Event` representing trades occurring in the market for the specific asset.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = hashmapbt_last_trades(self.ptr, asset_no, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def clear_last_trades(self, asset_no: uint64) -> None:
+        """
+        Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all last trades in any assets will be cleared.
+        """
+        hashmapbt_clear_last_trades(self.ptr, asset_no)
+
+    def profile_stats(self) -> PROFILE_STATS_ARRAY:
+        """
+        Returns the count of and the cumulative time in nanoseconds spent on each stage of the backtest by asset, such
+        as processing each type of event, the queue model, the order latency model, loading data, and the strategy
+        between the calls. See :const:`PROFILE_STAGES <hftbacktest.types.PROFILE_STAGES>` for the stages.
+
+        The statistics are collected only if the library is built with the ``profile`` feature, for example,
+        ``maturin develop --release --features profile``, which adds overhead, and ``PROFILE_FEATURE`` is then true.
+        Otherwise, the array is empty.
+
+        Returns:
+            A copy of the statistics as an array of ``profile_stats_dtype``.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = hashmapbt_profile_stats(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            profile_stats_dtype
+        ).copy()
+
+    def orders(self, asset_no: uint64) -> OrderDict:
+        """
+        Args:
+            asset_no: Asset number from which orders will be retrieved.
+
+        Returns:
+            An order dictionary where the keys are order IDs and the corresponding values are
+            :class:`Order <hftbacktest.order.Order>`.
+        """
+        return OrderDict_(hashmapbt_orders(self.ptr, asset_no))
+
+    def submit_buy_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a buy order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to buy.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def submit_sell_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a sell order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to sell.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
+        """
+        Cancels the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to cancel.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully cancels an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_cancel(self.ptr, asset_no, order_id, wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftbacktest.order.NEW>` nor :const:`PARTIALLY_FILLED <hftbacktest.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
+        """
+        hashmapbt_clear_inactive_orders(self.ptr, asset_no)
+
+    def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
+        """
+        Waits for the response of the order with the given order ID until timeout.
+
+        Args:
+            asset_no: Asset number where an order with `order_id` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
+                     be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives an order response for the specified order ID of the specified asset number, or
+              reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_hashmapbt_wait_order_response(self.ptr, asset_no, order_id, timeout)
+
+    def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
+        """
+        Waits until the next feed is received, or until timeout.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to the
+                                next feed.
+            timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
+                     However, unit should be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives a feed or an order response, or reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_wait_next_feed(self.ptr, include_order_resp, timeout)
+
+    def elapse(self, duration: uint64) -> int64:
+        """
+        Elapses the specified duration.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_elapse(self.ptr, duration)
+
+    def elapse_bt(self, duration: int64) -> int64:
+        """
+        Elapses time only in backtesting. In live mode, it is ignored. (Supported only in the Rust implementation)
+
+        The `elapse` method exclusively manages time during backtesting, meaning that factors such as computing time are
+        not properly accounted for. So, this method can be utilized to simulate such processing times.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_elapse_bt(self.ptr, duration)
+
+    def close(self) -> int64:
+        """
+        Closes this backtester or bot.
+
+        Returns:
+            * `0` when it successfully closes the bot.
+            * Otherwise, an error occurred.
+        """
+        return hashmapbt_close(self.ptr)
+
+    def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last feed latency will be retrieved.
+
+        Returns:
+            The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
+            returns `None`.
+        """
+        exch_ts = int64(0)
+        local_ts = int64(0)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        local_ts_ptr = ptr_from_val(local_ts)
+        if hashmapbt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+            return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
+        return None
+
+    def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
+        """
+        Args:
+            asset_no: Asset number from which the last order latency will be retrieved.
+
+        Returns:
+            The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
+            order submission; otherwise, returns `None`.
+        """
+        req_ts = int64(0)
+        exch_ts = int64(0)
+        resp_ts = int64(0)
+        req_ts_ptr = ptr_from_val(req_ts)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        resp_ts_ptr = ptr_from_val(resp_ts)
+        if hashmapbt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+            return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
+        return None
+
+    def _goto_end(self) -> int64:
+        return hashmapbt_goto_end(self.ptr)
+
+
+HashMapMarketDepthBacktest_ = jitclass(HashMapMarketDepthBacktest)
+
+
+roivecbt_elapse = lib.roivecbt_elapse
+roivecbt_elapse.restype = c_int64
+roivecbt_elapse.argtypes = [c_void_p, c_uint64]
+
+roivecbt_elapse_bt = lib.roivecbt_elapse_bt
+roivecbt_elapse_bt.restype = c_int64
+roivecbt_elapse_bt.argtypes = [c_void_p, c_uint64]
+
+roivecbt_roivecbt_wait_order_response = lib.roivecbt_wait_order_response
+roivecbt_roivecbt_wait_order_response.restype = c_int64
+roivecbt_roivecbt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+
+roivecbt_wait_next_feed = lib.roivecbt_wait_next_feed
+roivecbt_wait_next_feed.restype = c_int64
+roivecbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+
+roivecbt_close = lib.roivecbt_close
+roivecbt_close.restype = c_int64
+roivecbt_close.argtypes = [c_void_p]
+
+roivecbt_position = lib.roivecbt_position
+roivecbt_position.restype = c_double
+roivecbt_position.argtypes = [c_void_p, c_uint64]
+
+roivecbt_current_timestamp = lib.roivecbt_current_timestamp
+roivecbt_current_timestamp.restype = c_int64
+roivecbt_current_timestamp.argtypes = [c_void_p]
+
+roivecbt_depth = lib.roivecbt_depth
+roivecbt_depth.restype = c_void_p
+roivecbt_depth.argtypes = [c_void_p, c_uint64]
+
+roivecbt_last_trades = lib.roivecbt_last_trades
+roivecbt_last_trades.restype = c_void_p
+roivecbt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+
+roivecbt_num_assets = lib.roivecbt_num_assets
+roivecbt_num_assets.restype = c_uint64
+roivecbt_num_assets.argtypes = [c_void_p]
+
+roivecbt_submit_buy_order = lib.roivecbt_submit_buy_order
+roivecbt_submit_buy_order.restype = c_int64
+roivecbt_submit_buy_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+roivecbt_submit_sell_order = lib.roivecbt_submit_sell_order
+roivecbt_submit_sell_order.restype = c_int64
+roivecbt_submit_sell_order.argtypes = [
+    c_void_p,
+    c_uint64,
+    c_uint64,
+    c_double,
+    c_double,
+    c_uint8,
+    c_uint8,
+    c_bool
+]
+
+roivecbt_cancel = lib.roivecbt_cancel
+roivecbt_cancel.restype = c_int64
+roivecbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+
+roivecbt_clear_last_trades = lib.roivecbt_clear_last_trades
+roivecbt_clear_last_trades.restype = c_void_p
+roivecbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
+
+roivecbt_profile_stats = lib.roivecbt_profile_stats
+roivecbt_profile_stats.restype = c_void_p
+roivecbt_profile_stats.argtypes = [c_void_p, POINTER(c_uint64)]
+
+roivecbt_clear_inactive_orders = lib.roivecbt_clear_inactive_orders
+roivecbt_clear_inactive_orders.restype = c_void_p
+roivecbt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+
+roivecbt_orders = lib.roivecbt_orders
+roivecbt_orders.restype = c_void_p
+roivecbt_orders.argtypes = [c_void_p, c_uint64]
+
+roivecbt_state_values = lib.roivecbt_state_values
+roivecbt_state_values.restype = c_void_p
+roivecbt_state_values.argtypes = [c_void_p, c_uint64]
+
+roivecbt_feed_latency = lib.roivecbt_feed_latency
+roivecbt_feed_latency.restype = c_bool
+roivecbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+
+roivecbt_order_latency = lib.roivecbt_order_latency
+roivecbt_order_latency.restype = c_bool
+roivecbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+
+
+class ROIVectorMarketDepthBacktest:
+    ptr: voidptr
+
+    def __init__(self, ptr: voidptr):
+        self.ptr = ptr
+
+    @property
+    def current_timestamp(self) -> int64:
+        """
+        In backtesting, this timestamp reflects the time at which the backtesting is conducted within the provided data.
+        """
+        return roivecbt_current_timestamp(self.ptr)
+
+    def depth(self, asset_no: uint64) -> ROIVectorMarketDepth:
+        """
+        Args:
+            asset_no: Asset number from which the market depth will be retrieved.
+
+        Returns:
+            The depth of market of the specific asset.
+        """
+        return ROIVectorMarketDepth_(roivecbt_depth(self.ptr, asset_no))
+
+    @property
+    def num_assets(self) -> uint64:
+        """
+        Returns the number of assets.
+        """
+        return roivecbt_num_assets(self.ptr)
+
+    def position(self, asset_no: uint64) -> float64:
+        """
+        Args:
+            asset_no: Asset number from which the position will be retrieved.
+
+        Returns:
+            The quantity of the held position.
+        """
+        return roivecbt_position(self.ptr, asset_no)
+
+    def state_values(self, asset_no: uint64) -> StateValues:
+        """
+        Args:
+            asset_no: Asset number from which the state values will be retrieved.
+
+        Returns:
+            The state’s values.
+        """
+        ptr = roivecbt_state_values(self.ptr, asset_no)
+        arr = numba.carray(
+            address_as_void_pointer(ptr),
+            1,
+            state_values_dtype
+        )
+        return StateValues_(arr)
+
+    def last_trades(self, asset_no: uint64) -> EVENT_ARRAY:
+        """
+        Args:
+            asset_no: Asset number from which the trades will be retrieved.
+
+        Returns:
+            An array of `Event` representing trades occurring in the market for the specific asset.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = roivecbt_last_trades(self.ptr, asset_no, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            event_dtype
+        )
+
+    def clear_last_trades(self, asset_no: uint64) -> None:
+        """
+        Clears the last trades occurring in the market from the buffer for :func:`last_trades`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all last trades in any assets will be cleared.
+        """
+        roivecbt_clear_last_trades(self.ptr, asset_no)
+
+    def profile_stats(self) -> PROFILE_STATS_ARRAY:
+        """
+        Returns the count of and the cumulative time in nanoseconds spent on each stage of the backtest by asset, such
+        as processing each type of event, the queue model, the order latency model, loading data, and the strategy
+        between the calls. See :const:`PROFILE_STAGES <hftbacktest.types.PROFILE_STAGES>` for the stages.
+
+        The statistics are collected only if the library is built with the ``profile`` feature, for example,
+        ``maturin develop --release --features profile``, which adds overhead, and ``PROFILE_FEATURE`` is then true.
+        Otherwise, the array is empty.
+
+        Returns:
+            A copy of the statistics as an array of ``profile_stats_dtype``.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = roivecbt_profile_stats(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            profile_stats_dtype
+        ).copy()
+
+    def orders(self, asset_no: uint64) -> OrderDict:
+        """
+        Args:
+            asset_no: Asset number from which orders will be retrieved.
+
+        Returns:
+            An order dictionary where the keys are order IDs and the corresponding values are
+            :class:`Order <hftbacktest.order.Order>`.
+        """
+        return OrderDict_(roivecbt_orders(self.ptr, asset_no))
+
+    def submit_buy_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a buy order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to buy.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def submit_sell_order(
+            self,
+            asset_no: uint64,
+            order_id: uint64,
+            price: float64,
+            qty: float64,
+            time_in_force: uint8,
+            order_type: uint8,
+            wait: bool
+    ) -> int64:
+        """
+        Submits a sell order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: The unique order ID; there should not be any existing order with the same ID on both local and
+                      exchange sides.
+            price: Order price.
+            qty: Quantity to sell.
+            time_in_force: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`GTC <hftbacktest.order.GTC>`
+                * :const:`GTX <hftbacktest.order.GTX>`
+                * :const:`FOK <hftbacktest.order.FOK>`
+                * :const:`IOC <hftbacktest.order.IOC>`
+
+            order_type: Available options vary depending on the exchange model. See to the exchange model for details.
+
+                * :const:`LIMIT <hftbacktest.order.LIMIT>`
+                * :const:`MARKET <hftbacktest.order.MARKET>`
+
+            wait: If `True`, wait until the order placement response is received.
+
+        Returns:
+            * `0` when it successfully submits an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+
+    def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
+        """
+        Cancels the specified order.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+            order_id: Order ID to cancel.
+            wait: If `True`, wait until the order cancel response is received.
+
+        Returns:
+            * `0` when it successfully cancels an order.
+            * `1` when it reaches the end of the data, if `wait` is `True`.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_cancel(self.ptr, asset_no, order_id, wait)
+
+    def clear_inactive_orders(self, asset_no: uint64) -> None:
+        """
+        Clears inactive orders from the local order dictionary whose status is neither
+        :const:`NEW <hftbacktest.order.NEW>` nor :const:`PARTIALLY_FILLED <hftbacktest.order.PARTIALLY_FILLED>`.
+
+        Args:
+            asset_no: Asset number at which this command will be executed.
+                      If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
+                      all inactive orders in any assets will be cleared.
+        """
+        roivecbt_clear_inactive_orders(self.ptr, asset_no)
+
+    def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
+        """
+        Waits for the response of the order with the given order ID until timeout.
+
+        Args:
+            asset_no: Asset number where an order with `order_id` exists.
+            order_id: Order ID to wait for the response.
+            timeout: Timeout for waiting for the order response. Nanoseconds is the default unit. However, unit should
+                     be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives an order response for the specified order ID of the specified asset number, or
+              reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_roivecbt_wait_order_response(self.ptr, asset_no, order_id, timeout)
+
+    def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
+        """
+        Waits until the next feed is received, or until timeout.
+
+        Args:
+            include_order_resp: If set to `True`, it will return when any order response is received, in addition to the
+                                next feed.
+            timeout: Timeout for waiting for the next feed or an order response. Nanoseconds is the default unit.
+                     However, unit should be the same as the data’s timestamp unit.
+
+        Returns:
+            * `0` when it receives a feed or an order response, or reaches the timeout.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_wait_next_feed(self.ptr, include_order_resp, timeout)
+
+    def elapse(self, duration: uint64) -> int64:
+        """
+        Elapses the specified duration.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_elapse(self.ptr, duration)
+
+    def elapse_bt(self, duration: int64) -> int64:
+        """
+        Elapses time only in backtesting. In live mode, it is ignored. (Supported only in the Rust implementation)
+
+        The `elapse` method exclusively manages time during backtesting, meaning that factors such as computing time are
+        not properly accounted for. So, this method can be utilized to simulate such processing times.
+
+        Args:
+            duration: Duration to elapse. Nanoseconds is the default unit. However, unit should be the same as the
+                      data’s timestamp unit.
+
+        Returns:
+            * `0` when it successfully elapses the given duration.
+            * `1` when it reaches the end of the data.
+            * Otherwise, an error occurred.
+        """
+        return roivecbt_elapse_bt(self.ptr, duration)
+
+    def close(self) -> int64:
+        """
+        Closes this backtester or bot.
 
+        Returns:
+            * `0` when it successfully closes the bot.
+            * Otherwise, an error occurred.
         """
-        return Values_(orders_values(self.ptr))
+        return roivecbt_close(self.ptr)
 
-    def get(self, order_id: uint64) -> Order | None:
+    def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
         """
         Args:
-            order_id: Order ID
+            asset_no: Asset number from which the last feed latency will be retrieved.
 
         Returns:
-            Order with the specified order ID; `None` if it does not exist.
+            The last feed’s exchange timestamp and local receipt timestamp if a feed has been received; otherwise,
+            returns `None`.
         """
-        order_ptr = orders_get(self.ptr, order_id)
-        if is_null_ptr(order_ptr):
-            return None
-        else:
-            arr = carray(
-                address_as_void_pointer(order_ptr),
-                1,
-                dtype=order_dtype
-            )
-            return Order_(arr)
-
-    def __len__(self) -> uint64:
-        return orders_len(self.ptr)
+        exch_ts = int64(0)
+        local_ts = int64(0)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        local_ts_ptr = ptr_from_val(local_ts)
+        if roivecbt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+            return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
+        return None
 
-    def __contains__(self, order_id: uint64) -> bool:
+    def order_latency(self, asset_no: uint64) -> Tuple[int64, int64, int64] | None:
         """
         Args:
-            order_id: Order ID
+            asset_no: Asset number from which the last order latency will be retrieved.
+
         Returns:
-            `True` if the order with the specified order ID exists; otherwise, `False`.
+            The last order’s request timestamp, exchange timestamp, and response receipt timestamp if there has been an
+            order submission; otherwise, returns `None`.
         """
-        return orders_contains(self.ptr, order_id)
+        req_ts = int64(0)
+        exch_ts = int64(0)
+        resp_ts = int64(0)
+        req_ts_ptr = ptr_from_val(req_ts)
+        exch_ts_ptr = ptr_from_val(exch_ts)
+        resp_ts_ptr = ptr_from_val(resp_ts)
+        if roivecbt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+            return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
+        return None
 
 
-OrderDict_ = jitclass(OrderDict)
+ROIVectorMarketDepthBacktest_ = jitclass(ROIVectorMarketDepthBacktest)
 
-hashmapbt_elapse = lib.hashmapbt_elapse
-hashmapbt_elapse.restype = c_int64
-hashmapbt_elapse.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_elapse_bt = lib.hashmapbt_elapse_bt
-hashmapbt_elapse_bt.restype = c_int64
-hashmapbt_elapse_bt.argtypes = [c_void_p, c_uint64]
+btreebt_elapse = lib.btreebt_elapse
+btreebt_elapse.restype = c_int64
+btreebt_elapse.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_hashmapbt_wait_order_response = lib.hashmapbt_wait_order_response
-hashmapbt_hashmapbt_wait_order_response.restype = c_int64
-hashmapbt_hashmapbt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+btreebt_elapse_bt = lib.btreebt_elapse_bt
+btreebt_elapse_bt.restype = c_int64
+btreebt_elapse_bt.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_wait_next_feed = lib.hashmapbt_wait_next_feed
-hashmapbt_wait_next_feed.restype = c_int64
-hashmapbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+btreebt_btreebt_wait_order_response = lib.btreebt_wait_order_response
+btreebt_btreebt_wait_order_response.restype = c_int64
+btreebt_btreebt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
 
-hashmapbt_close = lib.hashmapbt_close
-hashmapbt_close.restype = c_int64
-hashmapbt_close.argtypes = [c_void_p]
+btreebt_wait_next_feed = lib.btreebt_wait_next_feed
+btreebt_wait_next_feed.restype = c_int64
+btreebt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
 
-hashmapbt_position = lib.hashmapbt_position
-hashmapbt_position.restype = c_double
-hashmapbt_position.argtypes = [c_void_p, c_uint64]
+btreebt_close = lib.btreebt_close
+btreebt_close.restype = c_int64
+btreebt_close.argtypes = [c_void_p]
 
-hashmapbt_current_timestamp = lib.hashmapbt_current_timestamp
-hashmapbt_current_timestamp.restype = c_int64
-hashmapbt_current_timestamp.argtypes = [c_void_p]
+btreebt_position = lib.btreebt_position
+btreebt_position.restype = c_double
+btreebt_position.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_depth = lib.hashmapbt_depth
-hashmapbt_depth.restype = c_void_p
-hashmapbt_depth.argtypes = [c_void_p, c_uint64]
+btreebt_current_timestamp = lib.btreebt_current_timestamp
+btreebt_current_timestamp.restype = c_int64
+btreebt_current_timestamp.argtypes = [c_void_p]
 
-hashmapbt_last_trades = lib.hashmapbt_last_trades
-hashmapbt_last_trades.restype = c_void_p
-hashmapbt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+btreebt_depth = lib.btreebt_depth
+btreebt_depth.restype = c_void_p
+btreebt_depth.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_num_assets = lib.hashmapbt_num_assets
-hashmapbt_num_assets.restype = c_uint64
-hashmapbt_num_assets.argtypes = [c_void_p]
+btreebt_last_trades = lib.btreebt_last_trades
+btreebt_last_trades.restype = c_void_p
+btreebt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
 
-hashmapbt_submit_buy_order = lib.hashmapbt_submit_buy_order
-hashmapbt_submit_buy_order.restype = c_int64
-hashmapbt_submit_buy_order.argtypes = [
+btreebt_num_assets = lib.btreebt_num_assets
+btreebt_num_assets.restype = c_uint64
+btreebt_num_assets.argtypes = [c_void_p]
+
+btreebt_submit_buy_order = lib.btreebt_submit_buy_order
+btreebt_submit_buy_order.restype = c_int64
+btreebt_submit_buy_order.argtypes = [
     c_void_p,
     c_uint64,
     c_uint64,
@@ -527,9 +1711,9 @@ hashmapbt_submit_buy_order.argtypes = [
     c_bool
 ]
 
-hashmapbt_submit_sell_order = lib.hashmapbt_submit_sell_order
-hashmapbt_submit_sell_order.restype = c_int64
-hashmapbt_submit_sell_order.argtypes = [
+btreebt_submit_sell_order = lib.btreebt_submit_sell_order
+btreebt_submit_sell_order.restype = c_int64
+btreebt_submit_sell_order.argtypes = [
     c_void_p,
     c_uint64,
     c_uint64,
@@ -540,40 +1724,44 @@ hashmapbt_submit_sell_order.argtypes = [
     c_bool
 ]
 
-hashmapbt_cancel = lib.hashmapbt_cancel
-hashmapbt_cancel.restype = c_int64
-hashmapbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+btreebt_cancel = lib.btreebt_cancel
+btreebt_cancel.restype = c_int64
+btreebt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
 
-hashmapbt_clear_last_trades = lib.hashmapbt_clear_last_trades
-hashmapbt_clear_last_trades.restype = c_void_p
-hashmapbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
+btreebt_clear_last_trades = lib.btreebt_clear_last_trades
+btreebt_clear_last_trades.restype = c_void_p
+btreebt_clear_last_trades.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_clear_inactive_orders = lib.hashmapbt_clear_inactive_orders
-hashmapbt_clear_inactive_orders.restype = c_void_p
-hashmapbt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+btreebt_profile_stats = lib.btreebt_profile_stats
+btreebt_profile_stats.restype = c_void_p
+btreebt_profile_stats.argtypes = [c_void_p, POINTER(c_uint64)]
 
-hashmapbt_orders = lib.hashmapbt_orders
-hashmapbt_orders.restype = c_void_p
-hashmapbt_orders.argtypes = [c_void_p, c_uint64]
+btreebt_clear_inactive_orders = lib.btreebt_clear_inactive_orders
+btreebt_clear_inactive_orders.restype = c_void_p
+btreebt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_state_values = lib.hashmapbt_state_values
-hashmapbt_state_values.restype = c_void_p
-hashmapbt_state_values.argtypes = [c_void_p, c_uint64]
+btreebt_orders = lib.btreebt_orders
+btreebt_orders.restype = c_void_p
+btreebt_orders.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_feed_latency = lib.hashmapbt_feed_latency
-hashmapbt_feed_latency.restype = c_bool
-hashmapbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+btreebt_state_values = lib.btreebt_state_values
+btreebt_state_values.restype = c_void_p
+btreebt_state_values.argtypes = [c_void_p, c_uint64]
 
-hashmapbt_order_latency = lib.hashmapbt_order_latency
-hashmapbt_order_latency.restype = c_bool
-hashmapbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+btreebt_feed_latency = lib.btreebt_feed_latency
+btreebt_feed_latency.restype = c_bool
+btreebt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
 
-hashmapbt_goto_end = lib.hashmapbt_goto_end
-hashmapbt_goto_end.restype = c_int64
-hashmapbt_goto_end.argtypes = [c_void_p]
+btreebt_order_latency = lib.btreebt_order_latency
+btreebt_order_latency.restype = c_bool
+btreebt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
 
+btreebt_goto_end = lib.btreebt_goto_end
+btreebt_goto_end.restype = c_int64
+btreebt_goto_end.argtypes = [c_void_p]
 
-class HashMapMarketDepthBacktest:
+
+class BTreeMarketDepthBacktest:
     ptr: voidptr
 
     def __init__(self, ptr: voidptr):
@@ -584,9 +1772,9 @@ class HashMapMarketDepthBacktest:
         """
         In backtesting, this timestamp reflects the time at which the backtesting is conducted within the provided data.
         """
-        return hashmapbt_current_timestamp(self.ptr)
+        return btreebt_current_timestamp(self.ptr)
 
-    def depth(self, asset_no: uint64) -> HashMapMarketDepth:
+    def depth(self, asset_no: uint64) -> BTreeMarketDepth:
         """
         Args:
             asset_no: Asset number from which the market depth will be retrieved.
@@ -594,14 +1782,14 @@ class HashMapMarketDepthBacktest:
         Returns:
             The depth of market of the specific asset.
         """
-        return HashMapMarketDepth_(hashmapbt_depth(self.ptr, asset_no))
+        return BTreeMarketDepth_(btreebt_depth(self.ptr, asset_no))
 
     @property
     def num_assets(self) -> uint64:
         """
         Returns the number of assets.
         """
-        return hashmapbt_num_assets(self.ptr)
+        return btreebt_num_assets(self.ptr)
 
     def position(self, asset_no: uint64) -> float64:
         """
@@ -611,7 +1799,7 @@ class HashMapMarketDepthBacktest:
         Returns:
             The quantity of the held position.
         """
-        return hashmapbt_position(self.ptr, asset_no)
+        return btreebt_position(self.ptr, asset_no)
 
     def state_values(self, asset_no: uint64) -> StateValues:
         """
@@ -621,7 +1809,7 @@ class HashMapMarketDepthBacktest:
         Returns:
             The state’s values.
         """
-        ptr = hashmapbt_state_values(self.ptr, asset_no)
+        ptr = btreebt_state_values(self.ptr, asset_no)
         arr = numba.carray(
             address_as_void_pointer(ptr),
             1,
@@ -639,7 +1827,7 @@ class HashMapMarketDepthBacktest:
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
-        ptr = hashmapbt_last_trades(self.ptr, asset_no, len_ptr)
+        ptr = btreebt_last_trades(self.ptr, asset_no, len_ptr)
         return numba.carray(
             address_as_void_pointer(ptr),
             val_from_ptr(len_ptr),
@@ -655,7 +1843,29 @@ class HashMapMarketDepthBacktest:
                       If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
                       all last trades in any assets will be cleared.
         """
-        hashmapbt_clear_last_trades(self.ptr, asset_no)
+        btreebt_clear_last_trades(self.ptr, asset_no)
+
+    def profile_stats(self) -> PROFILE_STATS_ARRAY:
+        """
+        Returns the count of and the cumulative time in nanoseconds spent on each stage of the backtest by asset, such
+        as processing each type of event, the queue model, the order latency model, loading data, and the strategy
+        between the calls. See :const:`PROFILE_STAGES <hftbacktest.types.PROFILE_STAGES>` for the stages.
+
+        The statistics are collected only if the library is built with the ``profile`` feature, for example,
+        ``maturin develop --release --features profile``, which adds overhead, and ``PROFILE_FEATURE`` is then true.
+        Otherwise, the array is empty.
+
+        Returns:
+            A copy of the statistics as an array of ``profile_stats_dtype``.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = btreebt_profile_stats(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            profile_stats_dtype
+        ).copy()
 
     def orders(self, asset_no: uint64) -> OrderDict:
         """
@@ -666,7 +1876,7 @@ class HashMapMarketDepthBacktest:
             An order dictionary where the keys are order IDs and the corresponding values are
             :class:`Order <hftbacktest.order.Order>`.
         """
-        return OrderDict_(hashmapbt_orders(self.ptr, asset_no))
+        return OrderDict_(btreebt_orders(self.ptr, asset_no))
 
     def submit_buy_order(
             self,
@@ -706,7 +1916,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+        return btreebt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
 
     def submit_sell_order(
             self,
@@ -746,7 +1956,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+        return btreebt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
 
     def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
         """
@@ -762,7 +1972,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_cancel(self.ptr, asset_no, order_id, wait)
+        return btreebt_cancel(self.ptr, asset_no, order_id, wait)
 
     def clear_inactive_orders(self, asset_no: uint64) -> None:
         """
@@ -774,7 +1984,7 @@ class HashMapMarketDepthBacktest:
                       If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
                       all inactive orders in any assets will be cleared.
         """
-        hashmapbt_clear_inactive_orders(self.ptr, asset_no)
+        btreebt_clear_inactive_orders(self.ptr, asset_no)
 
     def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
         """
@@ -792,7 +2002,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_hashmapbt_wait_order_response(self.ptr, asset_no, order_id, timeout)
+        return btreebt_btreebt_wait_order_response(self.ptr, asset_no, order_id, timeout)
 
     def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
         """
@@ -809,7 +2019,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_wait_next_feed(self.ptr, include_order_resp, timeout)
+        return btreebt_wait_next_feed(self.ptr, include_order_resp, timeout)
 
     def elapse(self, duration: uint64) -> int64:
         """
@@ -824,7 +2034,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_elapse(self.ptr, duration)
+        return btreebt_elapse(self.ptr, duration)
 
     def elapse_bt(self, duration: int64) -> int64:
         """
@@ -842,7 +2052,7 @@ class HashMapMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_elapse_bt(self.ptr, duration)
+        return btreebt_elapse_bt(self.ptr, duration)
 
     def close(self) -> int64:
         """
@@ -852,7 +2062,7 @@ class HashMapMarketDepthBacktest:
             * `0` when it successfully closes the bot.
             * Otherwise, an error occurred.
         """
-        return hashmapbt_close(self.ptr)
+        return btreebt_close(self.ptr)
 
     def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
         """
@@ -867,7 +2077,7 @@ class HashMapMarketDepthBacktest:
         local_ts = int64(0)
         exch_ts_ptr = ptr_from_val(exch_ts)
         local_ts_ptr = ptr_from_val(local_ts)
-        if hashmapbt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+        if btreebt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
             return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
         return None
 
@@ -886,60 +2096,60 @@ class HashMapMarketDepthBacktest:
         req_ts_ptr = ptr_from_val(req_ts)
         exch_ts_ptr = ptr_from_val(exch_ts)
         resp_ts_ptr = ptr_from_val(resp_ts)
-        if hashmapbt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+        if btreebt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
             return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
         return None
 
     def _goto_end(self) -> int64:
-        return hashmapbt_goto_end(self.ptr)
+        return btreebt_goto_end(self.ptr)
 
 
-HashMapMarketDepthBacktest_ = jitclass(HashMapMarketDepthBacktest)
+BTreeMarketDepthBacktest_ = jitclass(BTreeMarketDepthBacktest)
 
 
-roivecbt_elapse = lib.roivecbt_elapse
-roivecbt_elapse.restype = c_int64
-roivecbt_elapse.argtypes = [c_void_p, c_uint64]
+fusedbt_elapse = lib.fusedbt_elapse
+fusedbt_elapse.restype = c_int64
+fusedbt_elapse.argtypes = [c_void_p, c_uint64]
 
-roivecbt_elapse_bt = lib.roivecbt_elapse_bt
-roivecbt_elapse_bt.restype = c_int64
-roivecbt_elapse_bt.argtypes = [c_void_p, c_uint64]
+fusedbt_elapse_bt = lib.fusedbt_elapse_bt
+fusedbt_elapse_bt.restype = c_int64
+fusedbt_elapse_bt.argtypes = [c_void_p, c_uint64]
 
-roivecbt_roivecbt_wait_order_response = lib.roivecbt_wait_order_response
-roivecbt_roivecbt_wait_order_response.restype = c_int64
-roivecbt_roivecbt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
+fusedbt_fusedbt_wait_order_response = lib.fusedbt_wait_order_response
+fusedbt_fusedbt_wait_order_response.restype = c_int64
+fusedbt_fusedbt_wait_order_response.argtypes = [c_void_p, c_uint64, c_uint64, c_int64]
 
-roivecbt_wait_next_feed = lib.roivecbt_wait_next_feed
-roivecbt_wait_next_feed.restype = c_int64
-roivecbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
+fusedbt_wait_next_feed = lib.fusedbt_wait_next_feed
+fusedbt_wait_next_feed.restype = c_int64
+fusedbt_wait_next_feed.argtypes = [c_void_p, c_bool, c_int64]
 
-roivecbt_close = lib.roivecbt_close
-roivecbt_close.restype = c_int64
-roivecbt_close.argtypes = [c_void_p]
+fusedbt_close = lib.fusedbt_close
+fusedbt_close.restype = c_int64
+fusedbt_close.argtypes = [c_void_p]
 
-roivecbt_position = lib.roivecbt_position
-roivecbt_position.restype = c_double
-roivecbt_position.argtypes = [c_void_p, c_uint64]
+fusedbt_position = lib.fusedbt_position
+fusedbt_position.restype = c_double
+fusedbt_position.argtypes = [c_void_p, c_uint64]
 
-roivecbt_current_timestamp = lib.roivecbt_current_timestamp
-roivecbt_current_timestamp.restype = c_int64
-roivecbt_current_timestamp.argtypes = [c_void_p]
+fusedbt_current_timestamp = lib.fusedbt_current_timestamp
+fusedbt_current_timestamp.restype = c_int64
+fusedbt_current_timestamp.argtypes = [c_void_p]
 
-roivecbt_depth = lib.roivecbt_depth
-roivecbt_depth.restype = c_void_p
-roivecbt_depth.argtypes = [c_void_p, c_uint64]
+fusedbt_depth = lib.fusedbt_depth
+fusedbt_depth.restype = c_void_p
+fusedbt_depth.argtypes = [c_void_p, c_uint64]
 
-roivecbt_last_trades = lib.roivecbt_last_trades
-roivecbt_last_trades.restype = c_void_p
-roivecbt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
+fusedbt_last_trades = lib.fusedbt_last_trades
+fusedbt_last_trades.restype = c_void_p
+fusedbt_last_trades.argtypes = [c_void_p, c_uint64, POINTER(c_uint64)]
 
-roivecbt_num_assets = lib.roivecbt_num_assets
-roivecbt_num_assets.restype = c_uint64
-roivecbt_num_assets.argtypes = [c_void_p]
+fusedbt_num_assets = lib.fusedbt_num_assets
+fusedbt_num_assets.restype = c_uint64
+fusedbt_num_assets.argtypes = [c_void_p]
 
-roivecbt_submit_buy_order = lib.roivecbt_submit_buy_order
-roivecbt_submit_buy_order.restype = c_int64
-roivecbt_submit_buy_order.argtypes = [
+fusedbt_submit_buy_order = lib.fusedbt_submit_buy_order
+fusedbt_submit_buy_order.restype = c_int64
+fusedbt_submit_buy_order.argtypes = [
     c_void_p,
     c_uint64,
     c_uint64,
@@ -950,9 +2160,9 @@ roivecbt_submit_buy_order.argtypes = [
     c_bool
 ]
 
-roivecbt_submit_sell_order = lib.roivecbt_submit_sell_order
-roivecbt_submit_sell_order.restype = c_int64
-roivecbt_submit_sell_order.argtypes = [
+fusedbt_submit_sell_order = lib.fusedbt_submit_sell_order
+fusedbt_submit_sell_order.restype = c_int64
+fusedbt_submit_sell_order.argtypes = [
     c_void_p,
     c_uint64,
     c_uint64,
@@ -963,36 +2173,44 @@ roivecbt_submit_sell_order.argtypes = [
     c_bool
 ]
 
-roivecbt_cancel = lib.roivecbt_cancel
-roivecbt_cancel.restype = c_int64
-roivecbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
+fusedbt_cancel = lib.fusedbt_cancel
+fusedbt_cancel.restype = c_int64
+fusedbt_cancel.argtypes = [c_void_p, c_uint64, c_uint64, c_bool]
 
-roivecbt_clear_last_trades = lib.roivecbt_clear_last_trades
-roivecbt_clear_last_trades.restype = c_void_p
-roivecbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
+fusedbt_clear_last_trades = lib.fusedbt_clear_last_trades
+fusedbt_clear_last_trades.restype = c_void_p
+fusedbt_clear_last_trades.argtypes = [c_void_p, c_uint64]
 
-roivecbt_clear_inactive_orders = lib.roivecbt_clear_inactive_orders
-roivecbt_clear_inactive_orders.restype = c_void_p
-roivecbt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
+fusedbt_profile_stats = lib.fusedbt_profile_stats
+fusedbt_profile_stats.restype = c_void_p
+fusedbt_profile_stats.argtypes = [c_void_p, POINTER(c_uint64)]
 
-roivecbt_orders = lib.roivecbt_orders
-roivecbt_orders.restype = c_void_p
-roivecbt_orders.argtypes = [c_void_p, c_uint64]
+fusedbt_clear_inactive_orders = lib.fusedbt_clear_inactive_orders
+fusedbt_clear_inactive_orders.restype = c_void_p
+fusedbt_clear_inactive_orders.argtypes = [c_void_p, c_uint64]
 
-roivecbt_state_values = lib.roivecbt_state_values
-roivecbt_state_values.restype = c_void_p
-roivecbt_state_values.argtypes = [c_void_p, c_uint64]
+fusedbt_orders = lib.fusedbt_orders
+fusedbt_orders.restype = c_void_p
+fusedbt_orders.argtypes = [c_void_p, c_uint64]
 
-roivecbt_feed_latency = lib.roivecbt_feed_latency
-roivecbt_feed_latency.restype = c_bool
-roivecbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
+fusedbt_state_values = lib.fusedbt_state_values
+fusedbt_state_values.restype = c_void_p
+fusedbt_state_values.argtypes = [c_void_p, c_uint64]
 
-roivecbt_order_latency = lib.roivecbt_order_latency
-roivecbt_order_latency.restype = c_bool
-roivecbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
+fusedbt_feed_latency = lib.fusedbt_feed_latency
+fusedbt_feed_latency.restype = c_bool
+fusedbt_feed_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64)]
 
+fusedbt_order_latency = lib.fusedbt_order_latency
+fusedbt_order_latency.restype = c_bool
+fusedbt_order_latency.argtypes = [c_void_p, c_uint64, POINTER(c_int64), POINTER(c_int64), POINTER(c_int64)]
 
-class ROIVectorMarketDepthBacktest:
+fusedbt_goto_end = lib.fusedbt_goto_end
+fusedbt_goto_end.restype = c_int64
+fusedbt_goto_end.argtypes = [c_void_p]
+
+
+class FusedHashMapMarketDepthBacktest:
     ptr: voidptr
 
     def __init__(self, ptr: voidptr):
@@ -1003,9 +2221,9 @@ class ROIVectorMarketDepthBacktest:
         """
         In backtesting, this timestamp reflects the time at which the backtesting is conducted within the provided data.
         """
-        return roivecbt_current_timestamp(self.ptr)
+        return fusedbt_current_timestamp(self.ptr)
 
-    def depth(self, asset_no: uint64) -> ROIVectorMarketDepth:
+    def depth(self, asset_no: uint64) -> FusedHashMapMarketDepth:
         """
         Args:
             asset_no: Asset number from which the market depth will be retrieved.
@@ -1013,14 +2231,14 @@ class ROIVectorMarketDepthBacktest:
         Returns:
             The depth of market of the specific asset.
         """
-        return ROIVectorMarketDepth_(roivecbt_depth(self.ptr, asset_no))
+        return FusedHashMapMarketDepth_(fusedbt_depth(self.ptr, asset_no))
 
     @property
     def num_assets(self) -> uint64:
         """
         Returns the number of assets.
         """
-        return roivecbt_num_assets(self.ptr)
+        return fusedbt_num_assets(self.ptr)
 
     def position(self, asset_no: uint64) -> float64:
         """
@@ -1030,7 +2248,7 @@ class ROIVectorMarketDepthBacktest:
         Returns:
             The quantity of the held position.
         """
-        return roivecbt_position(self.ptr, asset_no)
+        return fusedbt_position(self.ptr, asset_no)
 
     def state_values(self, asset_no: uint64) -> StateValues:
         """
@@ -1040,7 +2258,7 @@ class ROIVectorMarketDepthBacktest:
         Returns:
             The state’s values.
         """
-        ptr = roivecbt_state_values(self.ptr, asset_no)
+        ptr = fusedbt_state_values(self.ptr, asset_no)
         arr = numba.carray(
             address_as_void_pointer(ptr),
             1,
@@ -1058,7 +2276,7 @@ class ROIVectorMarketDepthBacktest:
         """
         length = uint64(0)
         len_ptr = ptr_from_val(length)
-        ptr = roivecbt_last_trades(self.ptr, asset_no, len_ptr)
+        ptr = fusedbt_last_trades(self.ptr, asset_no, len_ptr)
         return numba.carray(
             address_as_void_pointer(ptr),
             val_from_ptr(len_ptr),
@@ -1074,7 +2292,29 @@ class ROIVectorMarketDepthBacktest:
                       If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
                       all last trades in any assets will be cleared.
         """
-        roivecbt_clear_last_trades(self.ptr, asset_no)
+        fusedbt_clear_last_trades(self.ptr, asset_no)
+
+    def profile_stats(self) -> PROFILE_STATS_ARRAY:
+        """
+        Returns the count of and the cumulative time in nanoseconds spent on each stage of the backtest by asset, such
+        as processing each type of event, the queue model, the order latency model, loading data, and the strategy
+        between the calls. See :const:`PROFILE_STAGES <hftbacktest.types.PROFILE_STAGES>` for the stages.
+
+        The statistics are collected only if the library is built with the ``profile`` feature, for example,
+        ``maturin develop --release --features profile``, which adds overhead, and ``PROFILE_FEATURE`` is then true.
+        Otherwise, the array is empty.
+
+        Returns:
+            A copy of the statistics as an array of ``profile_stats_dtype``.
+        """
+        length = uint64(0)
+        len_ptr = ptr_from_val(length)
+        ptr = fusedbt_profile_stats(self.ptr, len_ptr)
+        return numba.carray(
+            address_as_void_pointer(ptr),
+            val_from_ptr(len_ptr),
+            profile_stats_dtype
+        ).copy()
 
     def orders(self, asset_no: uint64) -> OrderDict:
         """
@@ -1085,7 +2325,7 @@ class ROIVectorMarketDepthBacktest:
             An order dictionary where the keys are order IDs and the corresponding values are
             :class:`Order <hftbacktest.order.Order>`.
         """
-        return OrderDict_(roivecbt_orders(self.ptr, asset_no))
+        return OrderDict_(fusedbt_orders(self.ptr, asset_no))
 
     def submit_buy_order(
             self,
@@ -1125,7 +2365,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return roivecbt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+        return fusedbt_submit_buy_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
 
     def submit_sell_order(
             self,
@@ -1165,7 +2405,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return roivecbt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
+        return fusedbt_submit_sell_order(self.ptr, asset_no, order_id, price, qty, time_in_force, order_type, wait)
 
     def cancel(self, asset_no: uint64, order_id: uint64, wait: bool) -> int64:
         """
@@ -1181,7 +2421,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data, if `wait` is `True`.
             * Otherwise, an error occurred.
         """
-        return roivecbt_cancel(self.ptr, asset_no, order_id, wait)
+        return fusedbt_cancel(self.ptr, asset_no, order_id, wait)
 
     def clear_inactive_orders(self, asset_no: uint64) -> None:
         """
@@ -1193,7 +2433,7 @@ class ROIVectorMarketDepthBacktest:
                       If :const:`ALL_ASSETS <hftbacktest.types.ALL_ASSETS>`,
                       all inactive orders in any assets will be cleared.
         """
-        roivecbt_clear_inactive_orders(self.ptr, asset_no)
+        fusedbt_clear_inactive_orders(self.ptr, asset_no)
 
     def wait_order_response(self, asset_no: uint64, order_id: uint64, timeout: int64) -> int64:
         """
@@ -1211,7 +2451,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return roivecbt_roivecbt_wait_order_response(self.ptr, asset_no, order_id, timeout)
+        return fusedbt_fusedbt_wait_order_response(self.ptr, asset_no, order_id, timeout)
 
     def wait_next_feed(self, include_order_resp: bool, timeout: int64) -> int64:
         """
@@ -1228,7 +2468,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return roivecbt_wait_next_feed(self.ptr, include_order_resp, timeout)
+        return fusedbt_wait_next_feed(self.ptr, include_order_resp, timeout)
 
     def elapse(self, duration: uint64) -> int64:
         """
@@ -1243,7 +2483,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return roivecbt_elapse(self.ptr, duration)
+        return fusedbt_elapse(self.ptr, duration)
 
     def elapse_bt(self, duration: int64) -> int64:
         """
@@ -1261,7 +2501,7 @@ class ROIVectorMarketDepthBacktest:
             * `1` when it reaches the end of the data.
             * Otherwise, an error occurred.
         """
-        return roivecbt_elapse_bt(self.ptr, duration)
+        return fusedbt_elapse_bt(self.ptr, duration)
 
     def close(self) -> int64:
         """
@@ -1271,7 +2511,7 @@ class ROIVectorMarketDepthBacktest:
             * `0` when it successfully closes the bot.
             * Otherwise, an error occurred.
         """
-        return roivecbt_close(self.ptr)
+        return fusedbt_close(self.ptr)
 
     def feed_latency(self, asset_no: uint64) -> Tuple[int64, int64] | None:
         """
@@ -1286,7 +2526,7 @@ class ROIVectorMarketDepthBacktest:
         local_ts = int64(0)
         exch_ts_ptr = ptr_from_val(exch_ts)
         local_ts_ptr = ptr_from_val(local_ts)
-        if roivecbt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
+        if fusedbt_feed_latency(self.ptr, asset_no, exch_ts_ptr, local_ts_ptr):
             return val_from_ptr(exch_ts_ptr), val_from_ptr(local_ts_ptr)
         return None
 
@@ -1305,12 +2545,16 @@ class ROIVectorMarketDepthBacktest:
         req_ts_ptr = ptr_from_val(req_ts)
         exch_ts_ptr = ptr_from_val(exch_ts)
         resp_ts_ptr = ptr_from_val(resp_ts)
-        if roivecbt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
+        if fusedbt_order_latency(self.ptr, asset_no, req_ts_ptr, exch_ts_ptr, resp_ts_ptr):
             return val_from_ptr(req_ts_ptr), val_from_ptr(exch_ts_ptr), val_from_ptr(resp_ts_ptr)
         return None
 
+    def _goto_end(self) -> int64:
+        return fusedbt_goto_end(self.ptr)
+
+
+FusedHashMapMarketDepthBacktest_ = jitclass(FusedHashMapMarketDepthBacktest)
 
-ROIVectorMarketDepthBacktest_ = jitclass(ROIVectorMarketDepthBacktest)
 
 if LIVE_FEATURE:
     hashmaplive_elapse = lib.hashmaplive_elapse
@@ -2146,3 +3390,7 @@ if LIVE_FEATURE:
 
 
     ROIVectorMarketDepthLiveBot_ = jitclass(ROIVectorMarketDepthLiveBot)
+
+    shared_book_read = lib.shared_book_read
+    shared_book_read.restype = c_int64
+    shared_book_read.argtypes = [c_void_p, c_void_p, c_void_p, c_uint64, POINTER(c_uint64), POINTER(c_uint64)]
@@ -1,3 +1,10 @@
+from .container import (
+    write_npy_compressed,
+    read_npy_compressed,
+    open_raw,
+    save_data,
+    load_data
+)
 from .validation import (
     correct_local_timestamp,
     correct_event_order,
@@ -5,6 +12,11 @@ from .validation import (
 )
 
 __all__ = (
+    'write_npy_compressed',
+    'read_npy_compressed',
+    'open_raw',
+    'save_data',
+    'load_data',
     'correct_local_timestamp',
     'correct_event_order',
     'validate_event_order'
@@ -0,0 +1,260 @@
+import io
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# The seek table follows the zstd seekable format. It is stored in a skippable frame, which both zstd and lz4 decoders
+# ignore, so a compressed file remains a valid stream of concatenated frames that the standard tools can decompress.
+_SKIPPABLE_MAGIC = 0x184D2A5E
+_SEEKABLE_MAGIC = 0x8F92EAB1
+_SEEK_TABLE_FOOTER_SIZE = 9
+
+Compression = Literal['zstd', 'lz4']
+
+
+def _compression_of(filename: str) -> Compression | None:
+    if filename.endswith('.npy.zst'):
+        return 'zstd'
+    if filename.endswith('.npy.lz4'):
+        return 'lz4'
+    return None
+
+
+def _codec(compression: Compression, level: int | None):
+    # Returns the functions that compress and decompress a frame. They can be called from multiple threads at the same
+    # time, and both libraries release the GIL while compressing and decompressing.
+    if compression == 'zstd':
+        import zstandard as zstd
+
+        def compress(block):
+            # ZstdCompressor and ZstdDecompressor cannot be shared across threads.
+            return zstd.ZstdCompressor(level=3 if level is None else level).compress(block)
+
+        def decompress(frame):
+            return zstd.ZstdDecompressor().decompress(frame)
+
+        return compress, decompress
+    elif compression == 'lz4':
+        import lz4.frame
+
+        def compress(block):
+            return lz4.frame.compress(block, compression_level=0 if level is None else level, store_size=True)
+
+        return compress, lz4.frame.decompress
+    else:
+        raise ValueError(f'unsupported compression {compression}')
+
+
+def _load_npy(npy: bytes) -> NDArray:
+    # The number of rows is taken from the length of the data, as the header of an unfinished file can count rows that
+    # are not in the file, and a trailing partial row is dropped.
+    f = io.BytesIO(npy)
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        _, _, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        _, _, dtype = np.lib.format.read_array_header_2_0(f)
+    offset = f.tell()
+    return np.frombuffer(npy, dtype, count=(len(npy) - offset) // dtype.itemsize, offset=offset).copy()
+
+
+def _seek_table(buf: bytes) -> List[Tuple[int, int]] | None:
+    if len(buf) < _SEEK_TABLE_FOOTER_SIZE:
+        return None
+    num_frames, descriptor, magic = struct.unpack_from('<IBI', buf, len(buf) - _SEEK_TABLE_FOOTER_SIZE)
+    if magic != _SEEKABLE_MAGIC:
+        return None
+    entry_size = 12 if descriptor & 0x80 else 8
+    frame_size = num_frames * entry_size + _SEEK_TABLE_FOOTER_SIZE
+    start = len(buf) - frame_size - 8
+    if start < 0 or struct.unpack_from('<II', buf, start) != (_SKIPPABLE_MAGIC, frame_size):
+        raise ValueError('invalid seek table')
+    frames = [struct.unpack_from('<II', buf, start + 8 + i * entry_size) for i in range(num_frames)]
+    if sum(compressed for compressed, _ in frames) != start:
+        raise ValueError('invalid seek table')
+    return frames
+
+
+def write_npy_compressed(
+        output_filename: str,
+        data: NDArray,
+        compression: Compression | None = None,
+        block_size: int = 1 << 22,
+        level: int | None = None,
+        threads: int | None = None
+) -> None:
+    r"""
+    Writes the array as a ``numpy`` file compressed by ``zstd`` or ``LZ4``, which the backtester reads directly.
+
+    The ``numpy`` file is divided into blocks that are compressed independently in parallel, followed by a seek table in
+    the ``zstd`` seekable format, so the backtester also decompresses them in parallel directly into place. Compared to
+    ``npz`` compressed by deflate, it decompresses several times faster at a similar or better compression ratio. The
+    file is still a valid ``zstd`` or ``lz4`` stream that the standard tools can decompress into the ``numpy`` file.
+
+    Args:
+        output_filename: The filename to which the data is written. It should end with ``.npy.zst`` for ``zstd`` or
+                         ``.npy.lz4`` for ``LZ4``.
+        data: The array to be written.
+        compression: ``zstd`` or ``lz4``. If not provided, it is chosen by the extension of ``output_filename``.
+        block_size: The size of each block in bytes before compression.
+        level: The compression level. The default is 3 for ``zstd`` and 0 for ``LZ4``.
+        threads: The number of threads used for compression. The default is the number of CPU cores.
+    """
+    if compression is None:
+        compression = _compression_of(output_filename)
+        if compression is None:
+            raise ValueError('the extension should be either .npy.zst or .npy.lz4.')
+    compress, _ = _codec(compression, level)
+
+    buf = io.BytesIO()
+    np.save(buf, data)
+    npy = buf.getbuffer()
+    # The seek table stores the sizes as u32.
+    block_size = max(1, min(block_size, 1 << 30))
+    blocks = [npy[i:i + block_size] for i in range(0, len(npy), block_size)]
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as executor:
+        frames = list(executor.map(compress, blocks))
+
+    seek_table = b''.join(struct.pack('<II', len(frame), len(block)) for frame, block in zip(frames, blocks))
+    seek_table += struct.pack('<IBI', len(frames), 0, _SEEKABLE_MAGIC)
+
+    with open(output_filename, 'wb') as f:
+        for frame in frames:
+            f.write(frame)
+        f.write(struct.pack('<II', _SKIPPABLE_MAGIC, len(seek_table)))
+        f.write(seek_table)
+
+
+def read_npy_compressed(filename: str, compression: Compression | None = None, threads: int | None = None) -> NDArray:
+    r"""
+    Reads the array from a ``numpy`` file compressed by ``zstd`` or ``LZ4``. See :func:`write_npy_compressed`.
+
+    A ``zstd`` file that the collector did not finish, because it was killed, is read up to the last complete frame.
+
+    Args:
+        filename: The filename of the compressed ``numpy`` file.
+        compression: ``zstd`` or ``lz4``. If not provided, it is chosen by the extension of ``filename``.
+        threads: The number of threads used for decompression. The default is the number of CPU cores.
+
+    Returns:
+        The array.
+    """
+    if compression is None:
+        compression = _compression_of(filename)
+        if compression is None:
+            raise ValueError('the extension should be either .npy.zst or .npy.lz4.')
+    _, decompress = _codec(compression, None)
+
+    with open(filename, 'rb') as f:
+        buf = f.read()
+
+    frames = _seek_table(buf)
+    if frames is None:
+        # Without a seek table, such as a file compressed by the standard tools, the frames are decompressed
+        # sequentially.
+        if compression == 'zstd':
+            import zstandard as zstd
+
+            # A file left unfinished by an interrupted writer, such as the collector, can end in an incomplete frame,
+            # which is dropped along with the rows in it.
+            chunks = []
+            while buf:
+                decompressor = zstd.ZstdDecompressor().decompressobj()
+                chunk = decompressor.decompress(buf)
+                if not decompressor.eof:
+                    break
+                chunks.append(chunk)
+                buf = decompressor.unused_data
+            return _load_npy(b''.join(chunks))
+        else:
+            import lz4.frame
+
+            npy = b''
+            while buf:
+                decompressor = lz4.frame.LZ4FrameDecompressor()
+                npy += decompressor.decompress(buf)
+                buf = decompressor.unused_data
+    else:
+        mv = memoryview(buf)
+        offsets = np.cumsum([0] + [compressed for compressed, _ in frames])
+        chunks = [mv[offsets[i]:offsets[i + 1]] for i in range(len(frames))]
+        with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as executor:
+            npy = b''.join(executor.map(decompress, chunks))
+    return np.load(io.BytesIO(npy))
+
+
+def open_raw(filename: str) -> io.BufferedIOBase:
+    r"""
+    Opens a raw feed file written by the collector for reading in binary mode, choosing the decompression by the
+    extension of ``filename``: ``.zst`` by ``zstd``, ``.lz4`` by ``LZ4``, and anything else by gzip, which is the
+    collector's default.
+
+    Args:
+        filename: The filename of the raw feed file.
+
+    Returns:
+        The file object, which reads the decompressed lines.
+    """
+    if filename.endswith('.zst'):
+        import zstandard as zstd
+
+        reader = zstd.ZstdDecompressor().stream_reader(open(filename, 'rb'), read_across_frames=True, closefd=True)
+        return io.BufferedReader(reader)
+    elif filename.endswith('.lz4'):
+        import lz4.frame
+
+        return lz4.frame.open(filename, 'rb')
+    else:
+        import gzip
+
+        return gzip.open(filename, 'rb')
+
+
+def save_data(output_filename: str, data: NDArray) -> None:
+    r"""
+    Saves the data in the format chosen by the extension of ``output_filename``: ``.npy.zst`` and ``.npy.lz4`` by
+    :func:`write_npy_compressed`, ``.hbtc`` by
+    :func:`write_columnar <hftbacktest.data.utils.columnar.write_columnar>`, ``.npy`` as an uncompressed ``numpy``
+    file, and anything else as ``npz`` compressed by deflate, with the array named ``data``.
+
+    Args:
+        output_filename: The filename to which the data is written.
+        data: The array to be written.
+    """
+    if _compression_of(output_filename) is not None:
+        write_npy_compressed(output_filename, data)
+    elif output_filename.endswith('.hbtc'):
+        from .utils.columnar import write_columnar
+
+        write_columnar(data, output_filename)
+    elif output_filename.endswith('.npy'):
+        np.save(output_filename, data)
+    else:
+        np.savez_compressed(output_filename, data=data)
+
+
+def load_data(filename: str) -> NDArray:
+    r"""
+    Loads the data saved by :func:`save_data`, choosing the format by the extension of ``filename``.
+
+    Args:
+        filename: The filename of the data.
+
+    Returns:
+        The array.
+    """
+    if _compression_of(filename) is not None:
+        return read_npy_compressed(filename)
+    elif filename.endswith('.hbtc'):
+        from .utils.columnar import read_columnar
+
+        return read_columnar(filename, None)
+    elif filename.endswith('.npy'):
+        return np.load(filename)
+    else:
+        return np.load(filename)['data']
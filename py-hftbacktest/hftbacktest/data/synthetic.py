@@ -0,0 +1,510 @@
+from typing import Any, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .container import save_data
+from ..types import (
+    ADD_ORDER_EVENT,
+    BUY_EVENT,
+    CANCEL_ORDER_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    FILL_EVENT,
+    LOCAL_EVENT,
+    MODIFY_ORDER_EVENT,
+    SELL_EVENT,
+    TRADE_EVENT,
+    event_dtype,
+    order_latency_dtype
+)
+
+#: 2024-01-01T00:00:00Z in nanoseconds, the default start time of the generated data.
+DEFAULT_START_TS = 1_704_067_200_000_000_000
+
+
+def _timestamps(rng: np.random.Generator, n: int, start_ts: int, interval: float) -> NDArray:
+    # Poisson arrivals at the mean interval.
+    return start_ts + np.cumsum(rng.exponential(interval, n)).astype(np.int64)
+
+
+def _latency(rng: np.random.Generator, n: int, median: int, sigma: float) -> NDArray:
+    if sigma <= 0:
+        return np.full(n, median, np.int64)
+    return (median * np.exp(sigma * rng.standard_normal(n))).astype(np.int64)
+
+
+def _local_ts(exch_ts: NDArray, latency: NDArray, last_local_ts: int) -> NDArray:
+    # Messages are delivered in order, so a message delayed by a latency spike also delays the messages behind it.
+    return np.maximum.accumulate(np.concatenate([[last_local_ts], exch_ts + latency]))[1:]
+
+
+def _levels(rng: np.random.Generator, n: int, num_levels: int) -> NDArray:
+    # Activity concentrates near the best prices.
+    return np.minimum(rng.geometric(0.3, n), num_levels)
+
+
+def _qty(rng: np.random.Generator, n: int, max_lots: int, lot_size: float) -> NDArray:
+    return rng.integers(1, max_lots + 1, n) * lot_size
+
+
+def _apply(book_keys: NDArray, book_qty: NDArray, keys: NDArray, qty: NDArray) -> Tuple[NDArray, NDArray]:
+    keys = np.concatenate([book_keys, keys])[::-1]
+    qty = np.concatenate([book_qty, qty])[::-1]
+    # The last update at each price wins, which is the first one in the reversed order.
+    keys, index = np.unique(keys, return_index=True)
+    qty = qty[index]
+    valid = qty > 0
+    return keys[valid], qty[valid]
+
+
+def _snapshot(
+        book_keys: NDArray,
+        book_qty: NDArray,
+        timestamp: int,
+        num_levels: int,
+        tick_size: float
+) -> NDArray:
+    # A book key is the price in ticks times two, plus one for the ask side.
+    is_ask = (book_keys & 1) == 1
+    bid_ticks = (book_keys[~is_ask] >> 1)[::-1][:num_levels]
+    bid_qty = book_qty[~is_ask][::-1][:num_levels]
+    ask_ticks = (book_keys[is_ask] >> 1)[:num_levels]
+    ask_qty = book_qty[is_ask][:num_levels]
+
+    out = np.zeros(len(bid_ticks) + len(ask_ticks) + 2, event_dtype)
+    i = 0
+    for side, ticks, qty in [(BUY_EVENT, bid_ticks, bid_qty), (SELL_EVENT, ask_ticks, ask_qty)]:
+        if len(ticks) == 0:
+            continue
+        # Clears the market depth up to the farthest level in the snapshot before inserting it.
+        out[i]['ev'] = EXCH_EVENT | LOCAL_EVENT | DEPTH_CLEAR_EVENT | side
+        out[i]['px'] = ticks[-1] * tick_size
+        i += 1
+        out[i:i + len(ticks)]['ev'] = EXCH_EVENT | LOCAL_EVENT | DEPTH_SNAPSHOT_EVENT | side
+        out[i:i + len(ticks)]['px'] = ticks * tick_size
+        out[i:i + len(ticks)]['qty'] = qty
+        i += len(ticks)
+    out = out[:i]
+    out['exch_ts'] = timestamp
+    return out
+
+
+def iter_l2(
+        num_events: int,
+        chunk_size: int = 10_000_000,
+        seed: int | None = None,
+        start_ts: int = DEFAULT_START_TS,
+        price: float = 100_000.0,
+        tick_size: float = 0.1,
+        lot_size: float = 0.001,
+        max_lots: int = 1_000,
+        num_levels: int = 20,
+        interval: float = 100_000,
+        trade_ratio: float = 0.1,
+        move_ratio: float = 0.05,
+        delete_ratio: float = 0.1,
+        snapshot_interval: int | None = None,
+        feed_latency: int = 1_000_000,
+        feed_latency_sigma: float = 0.0
+) -> Iterator[NDArray]:
+    r"""
+    Generates a synthetic Level-2 feed in chunks, so that a feed of any length can be generated and written without
+    holding it in memory.
+
+    The feed starts with a snapshot of ``num_levels`` levels on each side. Each message is then a depth update, a
+    trade, or a move of the mid-price by one tick, arriving as a Poisson process. A depth update sets the quantity at
+    a level near the best price, deleting it at ``delete_ratio``; a trade occurs at the best price on a random side; and
+    a move deletes the best level being crossed and adds a new best level on the other side, so the book never crosses.
+
+    Args:
+        num_events: The number of messages. A mid-price move produces two depth events and a snapshot produces an
+                    event per level, so slightly more events are generated.
+        chunk_size: The number of messages per chunk.
+        seed: The seed of the random number generator. The same arguments with the same seed generate the same feed.
+        start_ts: The exchange timestamp of the initial snapshot in nanoseconds.
+        price: The initial mid-price.
+        tick_size: Minimum price increment.
+        lot_size: Minimum order quantity.
+        max_lots: The maximum quantity of a level or a trade in lots.
+        num_levels: The number of levels on each side.
+        interval: The mean interval between messages in nanoseconds.
+        trade_ratio: The ratio of trades to the messages.
+        move_ratio: The ratio of mid-price moves to the messages.
+        delete_ratio: The ratio of level deletions to the depth updates.
+        snapshot_interval: If provided, a snapshot of the book, cleared and then inserted as
+                           ``DEPTH_SNAPSHOT_EVENT``\s, is inserted at every multiple of this interval in nanoseconds,
+                           as exchanges periodically send.
+        feed_latency: The median feed latency in nanoseconds.
+        feed_latency_sigma: The feed latency follows a log-normal distribution with this sigma, which gives the
+                            occasional latency spikes seen in practice. ``0`` makes it constant. Messages stay in order,
+                            so a delayed message also delays the messages behind it.
+
+    Returns:
+        The chunks of the feed in :obj:`event_dtype <hftbacktest.types.event_dtype>`, in order of both the exchange and
+        local timestamps.
+    """
+    if move_ratio + trade_ratio > 1:
+        raise ValueError('move_ratio + trade_ratio must not exceed 1')
+
+    rng = np.random.default_rng(seed)
+    mid = int(round(price / tick_size))
+
+    level = np.arange(1, num_levels + 1)
+    ticks = np.concatenate([mid - level[::-1], mid + level])
+    book_keys = ticks * 2 + np.concatenate([np.zeros(num_levels, np.int64), np.ones(num_levels, np.int64)])
+    book_qty = _qty(rng, 2 * num_levels, max_lots, lot_size)
+    pending = [_snapshot(book_keys, book_qty, start_ts, num_levels, tick_size)]
+
+    last_ts = start_ts
+    last_local_ts = start_ts
+    next_snapshot_ts = None
+    if snapshot_interval is not None:
+        next_snapshot_ts = (start_ts // snapshot_interval + 1) * snapshot_interval
+
+    remaining = num_events
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        remaining -= n
+
+        u = rng.random(n)
+        is_move = u < move_ratio
+        is_trade = (u >= move_ratio) & (u < move_ratio + trade_ratio)
+        up = rng.random(n) < 0.5
+        move = np.where(is_move, np.where(up, 1, -1), 0)
+        mid_after = mid + np.cumsum(move)
+        mid_before = mid_after - move
+        mid = int(mid_after[-1])
+        timestamps = _timestamps(rng, n, last_ts, interval)
+        last_ts = int(timestamps[-1])
+
+        # A move produces two events: the deletion of the crossed best level and the new best level on the other side.
+        counts = 1 + is_move
+        step = np.repeat(np.arange(n), counts)
+        second = np.zeros(len(step), np.bool_)
+        second[np.cumsum(counts)[is_move] - 1] = True
+        first_move = is_move[step] & ~second
+        second_move = second
+        trade = is_trade[step]
+        depth = ~is_move[step] & ~trade
+        # The first event of an upward move deletes the best ask, and that of a downward move the best bid.
+        buy = np.where(first_move, ~up[step], up[step])
+        offset = np.select(
+            [trade, second_move, first_move],
+            [-1, 0, 1],
+            _levels(rng, n, num_levels)[step]
+        )
+        px_tick = np.where(buy, mid_before[step] - offset, mid_before[step] + offset)
+        delete = depth & (rng.random(n) < delete_ratio)[step]
+
+        data = np.zeros(len(step), event_dtype)
+        data['ev'] = (
+            EXCH_EVENT
+            | LOCAL_EVENT
+            | np.where(trade, TRADE_EVENT, DEPTH_EVENT)
+            | np.where(buy, BUY_EVENT, SELL_EVENT)
+        )
+        data['exch_ts'] = timestamps[step]
+        data['px'] = px_tick * tick_size
+        data['qty'] = np.where(first_move | delete, 0, _qty(rng, n, max_lots, lot_size)[step])
+
+        if next_snapshot_ts is not None:
+            is_depth = ~trade
+            keys = px_tick * 2 + ~buy
+            start = 0
+            while next_snapshot_ts <= last_ts:
+                end = np.searchsorted(data['exch_ts'], next_snapshot_ts, side='right')
+                book_keys, book_qty = _apply(
+                    book_keys,
+                    book_qty,
+                    keys[start:end][is_depth[start:end]],
+                    data['qty'][start:end][is_depth[start:end]]
+                )
+                pending.append(data[start:end])
+                pending.append(_snapshot(book_keys, book_qty, next_snapshot_ts, num_levels, tick_size))
+                start = end
+                next_snapshot_ts += snapshot_interval
+            book_keys, book_qty = _apply(
+                book_keys,
+                book_qty,
+                keys[start:][is_depth[start:]],
+                data['qty'][start:][is_depth[start:]]
+            )
+            pending.append(data[start:])
+        else:
+            pending.append(data)
+
+        chunk = np.concatenate(pending)
+        pending = []
+        chunk['local_ts'] = _local_ts(
+            chunk['exch_ts'],
+            _latency(rng, len(chunk), feed_latency, feed_latency_sigma),
+            last_local_ts
+        )
+        last_local_ts = int(chunk['local_ts'][-1])
+        yield chunk
+
+
+def generate_l2(num_events: int, **kwargs: Any) -> NDArray:
+    r"""
+    Generates a synthetic Level-2 feed. See :func:`iter_l2` for the arguments.
+
+    Args:
+        num_events: The number of messages.
+
+    Returns:
+        The feed in :obj:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    kwargs.setdefault('chunk_size', max(num_events, 1))
+    return np.concatenate(list(iter_l2(num_events, **kwargs)))
+
+
+def _passage(mid: NDArray, ticks: NDArray, steps: NDArray) -> NDArray:
+    # Finds the first step after each of ``steps`` at which the mid-price reaches the price; since the mid-price moves
+    # one tick at a time, this is the first step at which the order would be crossed. Returns ``len(mid)`` if it is
+    # never reached.
+    n = len(mid)
+    base = int(mid.min())
+    keys = np.sort((mid - base) * (n + 1) + np.arange(n))
+    query = (ticks - base) * (n + 1) + steps
+    index = np.searchsorted(keys, query, side='right')
+    found = np.minimum(index, n - 1)
+    reached = (index < n) & (keys[found] // (n + 1) == ticks - base) & (ticks >= base)
+    return np.where(reached, keys[found] % (n + 1), n)
+
+
+def iter_l3(
+        num_orders: int,
+        chunk_size: int = 10_000_000,
+        seed: int | None = None,
+        start_ts: int = DEFAULT_START_TS,
+        price: float = 100_000.0,
+        tick_size: float = 0.1,
+        lot_size: float = 0.001,
+        max_lots: int = 1_000,
+        num_levels: int = 20,
+        interval: float = 100_000,
+        lifetime: float = 10_000_000,
+        move_ratio: float = 0.05,
+        modify_ratio: float = 0.1,
+        feed_latency: int = 1_000_000,
+        feed_latency_sigma: float = 0.0
+) -> Iterator[NDArray]:
+    r"""
+    Generates a synthetic Level-3 Market-By-Order feed in chunks.
+
+    Orders are added near the best price as a Poisson process while the mid-price moves by one tick at a time. Each
+    order is canceled after an exponentially distributed lifetime, unless the mid-price reaches its price first, in
+    which case it is filled: a ``TRADE_EVENT`` on the aggressor's side, a ``FILL_EVENT`` and then a
+    ``CANCEL_ORDER_EVENT`` of the order. Some orders are modified to a smaller quantity before they end. Every order ID
+    is unique and every cancel, modify and fill refers to a live order, and the book never crosses.
+
+    Args:
+        num_orders: The number of orders to be added.
+        chunk_size: The number of orders added per chunk. Orders live across chunks.
+        seed: The seed of the random number generator.
+        start_ts: The start time in nanoseconds.
+        price: The initial mid-price.
+        tick_size: Minimum price increment.
+        lot_size: Minimum order quantity.
+        max_lots: The maximum quantity of an order in lots.
+        num_levels: The number of levels on each side within which orders are added.
+        interval: The mean interval between order additions in nanoseconds.
+        lifetime: The mean lifetime of an order in nanoseconds.
+        move_ratio: The probability that the mid-price moves at each order addition.
+        modify_ratio: The ratio of orders that are modified.
+        feed_latency: The median feed latency in nanoseconds.
+        feed_latency_sigma: The sigma of the log-normal feed latency. ``0`` makes it constant.
+
+    Returns:
+        The chunks of the feed in :obj:`event_dtype <hftbacktest.types.event_dtype>`, in order of both the exchange and
+        local timestamps.
+    """
+    rng = np.random.default_rng(seed)
+    mid = int(round(price / tick_size))
+    last_ts = start_ts
+    last_local_ts = start_ts
+    next_order_id = 1
+    p_end = min(interval / lifetime, 1.0)
+
+    # Orders still open at the end of a chunk: ID, side, price in ticks, quantity, and the remaining lifetime in steps.
+    open_id = np.zeros(0, np.uint64)
+    open_buy = np.zeros(0, np.bool_)
+    open_tick = np.zeros(0, np.int64)
+    open_qty = np.zeros(0, np.float64)
+    open_end = np.zeros(0, np.int64)
+
+    remaining = num_orders
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        remaining -= n
+
+        move = np.where(rng.random(n) < move_ratio, np.where(rng.random(n) < 0.5, 1, -1), 0)
+        mids = mid + np.cumsum(move)
+        mid = int(mids[-1])
+        timestamps = _timestamps(rng, n, last_ts, interval)
+        last_ts = int(timestamps[-1])
+
+        # Orders added in this chunk, one per step, relative to the mid-price after the step's move.
+        step = np.arange(n)
+        buy = rng.random(n) < 0.5
+        levels = _levels(rng, n, num_levels)
+        tick = np.where(buy, mids - levels, mids + levels)
+        qty = _qty(rng, n, max_lots, lot_size)
+        order_id = np.arange(next_order_id, next_order_id + n, dtype=np.uint64)
+        next_order_id += n
+        end = step + rng.geometric(p_end, n)
+
+        # The open orders carried over start before the first step.
+        all_id = np.concatenate([open_id, order_id])
+        all_buy = np.concatenate([open_buy, buy])
+        all_tick = np.concatenate([open_tick, tick])
+        all_qty = np.concatenate([open_qty, qty])
+        all_start = np.concatenate([np.full(len(open_id), -1), step])
+        all_end = np.concatenate([open_end, end])
+        passage = _passage(mids, all_tick, all_start)
+        filled = passage <= np.minimum(all_end, n - 1)
+        term = np.where(filled, passage, all_end)
+        ended = term < n
+
+        # Modifies some of the new orders to a smaller quantity between their addition and end.
+        new_term = term[len(open_id):]
+        modify = (rng.random(n) < modify_ratio) & (new_term > step + 1)
+        modify_step = step + 1 + (rng.random(n) * (np.minimum(new_term, n) - step - 1)).astype(np.int64)
+        modify &= modify_step < n
+        modified_qty = np.maximum(np.floor(qty / lot_size * rng.random(n)), 1) * lot_size
+        all_qty[len(open_id):] = np.where(modify, modified_qty, qty)
+
+        side = np.where(all_buy, BUY_EVENT, SELL_EVENT)
+        aggressor = np.where(all_buy, SELL_EVENT, BUY_EVENT)
+        m = ended & filled
+        c = ended
+        # Events within a step are ordered by phase: trade, fill, cancel, modify and then add.
+        parts = [
+            (term[m], 0, EXCH_EVENT | LOCAL_EVENT | TRADE_EVENT | aggressor[m], all_tick[m], all_qty[m], 0),
+            (term[m], 1, EXCH_EVENT | LOCAL_EVENT | FILL_EVENT | side[m], all_tick[m], all_qty[m], all_id[m]),
+            (term[c], 2, EXCH_EVENT | LOCAL_EVENT | CANCEL_ORDER_EVENT | side[c], all_tick[c], 0, all_id[c]),
+            (
+                modify_step[modify],
+                3,
+                EXCH_EVENT | LOCAL_EVENT | MODIFY_ORDER_EVENT | np.where(buy, BUY_EVENT, SELL_EVENT)[modify],
+                tick[modify],
+                modified_qty[modify],
+                order_id[modify]
+            ),
+            (
+                step,
+                4,
+                EXCH_EVENT | LOCAL_EVENT | ADD_ORDER_EVENT | np.where(buy, BUY_EVENT, SELL_EVENT),
+                tick,
+                qty,
+                order_id
+            ),
+        ]
+
+        num = sum(len(part[0]) for part in parts)
+        chunk = np.zeros(num, event_dtype)
+        event_step = np.zeros(num, np.int64)
+        event_phase = np.zeros(num, np.int64)
+        i = 0
+        for s, phase, ev, px_tick, q, oid in parts:
+            j = i + len(s)
+            event_step[i:j] = s
+            event_phase[i:j] = phase
+            chunk['ev'][i:j] = ev
+            chunk['px'][i:j] = px_tick * tick_size
+            chunk['qty'][i:j] = q
+            chunk['order_id'][i:j] = oid
+            i = j
+        chunk = chunk[np.lexsort((event_phase, event_step))]
+        event_step.sort()
+        chunk['exch_ts'] = timestamps[event_step]
+        chunk['local_ts'] = _local_ts(
+            chunk['exch_ts'],
+            _latency(rng, num, feed_latency, feed_latency_sigma),
+            last_local_ts
+        )
+        last_local_ts = int(chunk['local_ts'][-1])
+
+        still_open = ~ended
+        open_id = all_id[still_open]
+        open_buy = all_buy[still_open]
+        open_tick = all_tick[still_open]
+        open_qty = all_qty[still_open]
+        open_end = all_end[still_open] - n
+        yield chunk
+
+
+def generate_l3(num_orders: int, **kwargs: Any) -> NDArray:
+    r"""
+    Generates a synthetic Level-3 Market-By-Order feed. See :func:`iter_l3` for the arguments.
+
+    Args:
+        num_orders: The number of orders to be added.
+
+    Returns:
+        The feed in :obj:`event_dtype <hftbacktest.types.event_dtype>`.
+    """
+    kwargs.setdefault('chunk_size', max(num_orders, 1))
+    return np.concatenate(list(iter_l3(num_orders, **kwargs)))
+
+
+def generate_order_latency(
+        start_ts: int,
+        end_ts: int,
+        interval: int = 1_000_000_000,
+        entry_latency: int = 2_000_000,
+        response_latency: int = 2_000_000,
+        sigma: float = 0.5,
+        seed: int | None = None
+) -> NDArray:
+    r"""
+    Generates synthetic order latency data covering ``start_ts`` to ``end_ts``, to be used with
+    :meth:`intp_order_latency <hftbacktest.BacktestAsset.intp_order_latency>` along with a synthetic feed over the
+    same period.
+
+    Args:
+        start_ts: The start time in nanoseconds.
+        end_ts: The end time in nanoseconds.
+        interval: The interval between the samples in nanoseconds.
+        entry_latency: The median order entry latency in nanoseconds.
+        response_latency: The median order response latency in nanoseconds.
+        sigma: The latencies follow a log-normal distribution with this sigma. ``0`` makes them constant.
+        seed: The seed of the random number generator.
+
+    Returns:
+        The order latency data in :obj:`order_latency_dtype <hftbacktest.types.order_latency_dtype>`.
+    """
+    rng = np.random.default_rng(seed)
+    req_ts = np.arange(start_ts, end_ts + interval, interval, dtype=np.int64)
+    n = len(req_ts)
+    out = np.zeros(n, order_latency_dtype)
+    out['req_ts'] = req_ts
+    out['exch_ts'] = req_ts + _latency(rng, n, entry_latency, sigma)
+    out['resp_ts'] = out['exch_ts'] + _latency(rng, n, response_latency, sigma)
+    return out
+
+
+def write_chunks(chunks: Iterable[NDArray], output_prefix: str, extension: str = '.npz') -> List[str]:
+    r"""
+    Writes each chunk generated by :func:`iter_l2` or :func:`iter_l3` to its own file, named ``output_prefix``
+    followed by the chunk number, such as ``synthetic_00000.npz``, so that a feed larger than memory can be written and
+    then given to :meth:`BacktestAsset.data <hftbacktest.BacktestAsset.data>` as a list of files.
+
+    Args:
+        chunks: The chunks to be written.
+        output_prefix: The prefix of the filenames, including the directory.
+        extension: The extension of the filenames, which determines the format. See
+                   :func:`save_data <hftbacktest.data.save_data>`.
+
+    Returns:
+        The filenames written, in order.
+    """
+    filenames = []
+    for i, chunk in enumerate(chunks):
+        filename = f'{output_prefix}_{i:05d}{extension}'
+        save_data(filename, chunk)
+        filenames.append(filename)
+    return filenames
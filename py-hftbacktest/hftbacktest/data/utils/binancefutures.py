@@ -1,10 +1,10 @@
-import gzip
 import json
 from typing import Optional, Literal
 
 import numpy as np
 from numpy.typing import NDArray
 
+from ..container import open_raw, save_data
 from ..validation import correct_event_order, correct_local_timestamp, validate_event_order
 from ...types import (
     DEPTH_EVENT,
@@ -46,8 +46,10 @@ def convert(
         1660228023149748 {"stream":"btcusdt@trade","data":{"e":"trade","E":1660228024088,"T":1660228024081,"s":"BTCUSDT","t":2691833667,"p":"24671.00","q":"0.063","X":"MARKET","m":false}}
 
     Args:
-        input_filename: Input filename with path.
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        input_filename: Input filename with path. It can be compressed by gzip, ``zstd``, or ``LZ4``, as chosen by
+                        the collector's ``--compression``. See :func:`open_raw <hftbacktest.data.open_raw>`.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         opt: Additional processing options:
 
              - ``m``: Processes ``markPriceUpdate`` stream with the following custom event IDs.
@@ -81,7 +83,7 @@ def convert(
 
     tmp = np.empty(buffer_size, event_dtype)
     row_num = 0
-    with gzip.open(input_filename, 'r') as f:
+    with open_raw(input_filename) as f:
         while True:
             line = f.readline()
             if not line:
@@ -292,6 +294,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
@@ -4,6 +4,7 @@ from typing import Optional
 import numpy as np
 from numpy.typing import NDArray
 
+from ..container import save_data
 from .. import correct_event_order, validate_event_order
 from ..validation import correct_local_timestamp
 from ...types import (
@@ -33,7 +34,8 @@ def convert_snapshot(
 
     Args:
         snapshot_filename: Snapshot filename
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         feed_latency: Artificial feed latency value to be added to the exchange timestamp to create local timestamp.
         has_header: True if the given file has a header, it will automatically detect it if set to None.
 
@@ -126,7 +128,7 @@ def convert_snapshot(
     snapshot[len(ss_bid):len(ss_bid)+len(ss_ask)] = sorted(ss_ask, key=lambda v: float(v[4]))
 
     if output_filename is not None:
-        np.savez(output_filename, data=snapshot)
+        save_data(output_filename, snapshot)
 
     return snapshot
 
@@ -152,7 +154,8 @@ def convert(
     Args:
         depth_filename: Depth data filename
         trades_filename: Trades data filename
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         buffer_size: Sets a preallocated row size for the buffer.
         feed_latency: Artificial feed latency value to be added to the exchange timestamp to create local timestamp.
         base_latency: The value to be added to the feed latency.
@@ -298,6 +301,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
@@ -8,6 +8,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from ...types import BUY_EVENT, SELL_EVENT, DEPTH_EVENT, DEPTH_CLEAR_EVENT, DEPTH_SNAPSHOT_EVENT, TRADE_EVENT, event_dtype
+from ..container import save_data
 from .. import correct_event_order, validate_event_order
 from ..validation import correct_local_timestamp
 
@@ -33,7 +34,8 @@ def convert(
     Args:
         depth_filename: Depth data filename
         trades_filename: Trades data filename
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         buffer_size: Sets a preallocated row size for the buffer.
         feed_latency: Artificial feed latency value to be added to the exchange timestamp to create local timestamp.
         base_latency: The value to be added to the feed latency.
@@ -170,6 +172,6 @@ def convert(
 
     if output_filename is not None:
         print("Saving to %s" % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
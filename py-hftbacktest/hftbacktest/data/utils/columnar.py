@@ -0,0 +1,250 @@
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+import zstandard as zstd
+from numpy.typing import NDArray
+
+from ...types import event_dtype
+
+_MAGIC = b'\x93HBTCOL'
+_VERSION = 1
+
+_RAW = 0
+_CONSTANT = 1
+_DELTA = 2
+_DICTIONARY = 3
+_FIXED_POINT = 4
+
+_MAX_DICTIONARY_LEN = 1 << 16
+
+
+def _scale_of(unit: float) -> float:
+    # If the reciprocal of the unit is an integer, such as 100 for 0.01, dividing by it reproduces the decimal values
+    # exactly.
+    scale = 1.0 / unit
+    rounded = round(scale)
+    if rounded >= 1 and abs((scale - rounded) / rounded) < 1e-9:
+        return float(rounded)
+    return scale
+
+
+def _shuffle(values: NDArray) -> bytes:
+    return values.astype('<u8').view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def _unshuffle(buf: bytes, n: int) -> NDArray:
+    return np.frombuffer(buf, np.uint8).reshape(8, n).T.copy().view('<u8').reshape(n)
+
+
+def _delta_encode(values: NDArray) -> NDArray:
+    delta = np.diff(values.view('<i8'), prepend=np.int64(0))
+    return ((delta << 1) ^ (delta >> 63)).view('<u8')
+
+
+def _delta_decode(encoded: NDArray) -> NDArray:
+    delta = (encoded >> np.uint64(1)).view('<i8') ^ -(encoded & np.uint64(1)).view('<i8')
+    return np.cumsum(delta, dtype='<i8').view('<u8')
+
+
+def _encode_chunk(
+        values: NDArray,
+        ty: str,
+        scale: float | None,
+        compressor: zstd.ZstdCompressor
+) -> Tuple[int, int, bytes]:
+    if np.all(values == values[0]):
+        return _CONSTANT, int(values[0]), b''
+
+    candidates = [(_RAW, 0, compressor.compress(_shuffle(values)))]
+
+    if ty.endswith('f8'):
+        if scale is not None:
+            floats = values.view('<f8')
+            with np.errstate(invalid='ignore', over='ignore'):
+                scaled = np.round(floats * scale)
+                ticks = scaled.astype('<i8')
+            if np.array_equal((ticks.astype('<f8') / scale).view('<u8'), values):
+                candidates.append((
+                    _FIXED_POINT,
+                    int(np.float64(scale).view('<u8')),
+                    compressor.compress(_shuffle(_delta_encode(ticks)))
+                ))
+    else:
+        candidates.append((_DELTA, 0, compressor.compress(_shuffle(_delta_encode(values)))))
+
+    entries, indices = np.unique(values, return_inverse=True)
+    if len(entries) <= _MAX_DICTIONARY_LEN:
+        index_dtype = np.uint8 if len(entries) <= 256 else '<u2'
+        buf = struct.pack('<I', len(entries)) + entries.astype('<u8').tobytes() + indices.astype(index_dtype).tobytes()
+        candidates.append((_DICTIONARY, 0, compressor.compress(buf)))
+
+    return min(candidates, key=lambda candidate: len(candidate[2]))
+
+
+def _decode_chunk(encoding: int, param: int, payload: bytes, n: int, decompressor: zstd.ZstdDecompressor) -> NDArray:
+    if encoding == _CONSTANT:
+        return np.full(n, param, '<u8')
+    buf = decompressor.decompress(payload)
+    if encoding == _RAW:
+        return _unshuffle(buf, n)
+    if encoding == _DELTA:
+        return _delta_decode(_unshuffle(buf, n))
+    if encoding == _FIXED_POINT:
+        scale = np.array([param], '<u8').view('<f8')[0]
+        return (_delta_decode(_unshuffle(buf, n)).view('<i8').astype('<f8') / scale).view('<u8')
+    if encoding == _DICTIONARY:
+        num_entries, = struct.unpack_from('<I', buf)
+        entries = np.frombuffer(buf, '<u8', num_entries, 4)
+        index_dtype = np.uint8 if num_entries <= 256 else '<u2'
+        indices = np.frombuffer(buf, index_dtype, n, 4 + num_entries * 8)
+        return entries[indices]
+    raise ValueError(f'unknown column encoding {encoding}')
+
+
+def _fields(dtype: np.dtype) -> List[Tuple[str, str]]:
+    fields = []
+    for name in dtype.names:
+        ty = dtype.fields[name][0].str
+        if ty[1:] not in ('i8', 'u8', 'f8'):
+            raise ValueError(f"unsupported field type '{name}: {ty}', only 8-byte fields are supported.")
+        fields.append((name, ty))
+    return fields
+
+
+def write_columnar(
+        data: NDArray,
+        output_filename: str,
+        tick_size: float | None = None,
+        lot_size: float | None = None,
+        block_rows: int = 1 << 20,
+        level: int = 3,
+        threads: int = -1
+) -> None:
+    r"""
+    Writes the structured array, such as the feed data in :obj:`event_dtype <hftbacktest.types.event_dtype>`, in the
+    columnar format, ``.hbtc``, which the backtester reads directly.
+
+    The rows are divided into blocks, and each column of a block is encoded by whichever of the following produces the
+    smallest output, and then compressed by ``zstd``: the values as they are, the deltas between consecutive values
+    such as timestamps, a dictionary of the distinct values such as the event flags, and fixed-point integers in units
+    of the tick size for the price and of the lot size for the quantity. A column with a single value, such as the
+    unused ``order_id``, ``ival``, and ``fval`` of L2 data, takes no space. Every encoding reproduces the values exactly.
+
+    Args:
+        data: The structured array to be written. Only 8-byte fields are supported.
+        output_filename: The filename to which the data is written. It should end with ``.hbtc`` to be recognized by
+                         the backtester.
+        tick_size: If provided, the ``px`` field is stored as fixed-point integers in ticks.
+        lot_size: If provided, the ``qty`` field is stored as fixed-point integers in lots.
+        block_rows: The number of rows in a block. Blocks are decoded in parallel by the backtester.
+        level: The ``zstd`` compression level.
+        threads: The number of threads used for compression. ``-1`` uses all the CPU cores.
+    """
+    fields = _fields(data.dtype)
+    scales: Dict[str, float] = {}
+    if tick_size is not None:
+        scales['px'] = _scale_of(tick_size)
+    if lot_size is not None:
+        scales['qty'] = _scale_of(lot_size)
+    compressor = zstd.ZstdCompressor(level=level, threads=threads)
+
+    index = []
+    payloads = []
+    for start in range(0, len(data), block_rows):
+        block = data[start:start + block_rows]
+        for name, ty in fields:
+            values = np.ascontiguousarray(block[name]).view('<u8')
+            encoding, param, payload = _encode_chunk(values, ty, scales.get(name), compressor)
+            index.append(struct.pack('<BQQ', encoding, param, len(payload)))
+            payloads.append(payload)
+
+    with open(output_filename, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<B', _VERSION))
+        f.write(struct.pack('<I', len(fields)))
+        for name, ty in fields:
+            for s in (name.encode(), ty.encode()):
+                f.write(struct.pack('<H', len(s)))
+                f.write(s)
+        f.write(struct.pack('<QQ', len(data), block_rows))
+        for entry in index:
+            f.write(entry)
+        for payload in payloads:
+            f.write(payload)
+
+
+def read_columnar(filename: str, dtype: np.dtype | None = event_dtype) -> NDArray:
+    r"""
+    Reads the structured array from a file in the columnar format written by :func:`write_columnar`.
+
+    Args:
+        filename: The filename of the file in the columnar format.
+        dtype: The dtype of the structured array. The fields should match those stored in the file. If ``None``, it is
+               built from the fields stored in the file.
+
+    Returns:
+        The structured array.
+    """
+    with open(filename, 'rb') as f:
+        buf = f.read()
+
+    if buf[:len(_MAGIC)] != _MAGIC:
+        raise ValueError('must start with \\x93HBTCOL')
+    pos = len(_MAGIC)
+    version, num_fields = struct.unpack_from('<BI', buf, pos)
+    pos += 5
+    if version != _VERSION:
+        raise ValueError(f'unsupported version {version}')
+
+    fields = []
+    for _ in range(num_fields):
+        strings = []
+        for _ in range(2):
+            length, = struct.unpack_from('<H', buf, pos)
+            strings.append(buf[pos + 2:pos + 2 + length].decode())
+            pos += 2 + length
+        fields.append(tuple(strings))
+    if dtype is None:
+        dtype = np.dtype(fields, align=True)
+    if [ty for _, ty in fields] != [ty for _, ty in _fields(dtype)]:
+        raise ValueError(f'field type mismatch: {fields}')
+
+    num_rows, block_rows = struct.unpack_from('<QQ', buf, pos)
+    pos += 16
+    num_blocks = (num_rows + block_rows - 1) // block_rows if num_rows > 0 else 0
+    index = iter(struct.iter_unpack('<BQQ', buf[pos:pos + num_blocks * num_fields * 17]))
+    pos += num_blocks * num_fields * 17
+
+    data = np.zeros(num_rows, dtype)
+    decompressor = zstd.ZstdDecompressor()
+    for block_no in range(num_blocks):
+        start = block_no * block_rows
+        n = min(block_rows, num_rows - start)
+        for (name, _), (_, ty) in zip(_fields(dtype), fields):
+            encoding, param, length = next(index)
+            values = _decode_chunk(encoding, param, buf[pos:pos + length], n, decompressor)
+            data[name][start:start + n] = values.view(ty)
+            pos += length
+    return data
+
+
+def convert_npz(
+        input_filename: str,
+        output_filename: str,
+        tick_size: float | None = None,
+        lot_size: float | None = None,
+        **kwargs
+) -> None:
+    r"""
+    Converts the data in ``npz`` format, such as those created by the data utilities, into the columnar format.
+
+    Args:
+        input_filename: The filename of the data in ``npz`` format.
+        output_filename: The filename to which the converted data is written. It should end with ``.hbtc``.
+        tick_size: If provided, the ``px`` field is stored as fixed-point integers in ticks.
+        lot_size: If provided, the ``qty`` field is stored as fixed-point integers in lots.
+        kwargs: The other arguments of :func:`write_columnar`.
+    """
+    data = np.load(input_filename)['data']
+    write_columnar(data, output_filename, tick_size=tick_size, lot_size=lot_size, **kwargs)
@@ -5,6 +5,7 @@ import numpy as np
 import polars as pl
 from numpy.typing import NDArray
 
+from ..container import save_data
 from ..validation import correct_event_order, validate_event_order, correct_local_timestamp
 from ...types import (
     event_dtype,
@@ -39,7 +40,8 @@ def convert(
         input_file: DataBento's DBN file. e.g. *.mbo.dbn.zst
         symbol: Specify the symbol to process in the given file. If the file contains multiple symbols, the symbol
                 should be provided; otherwise, the output file will contain mixed symbols.
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         base_latency: The value to be added to the feed latency.
                       See :func:`.correct_local_timestamp`.
         file_type: Currently, only 'mbo' is supported.
@@ -122,6 +124,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
@@ -1,5 +1,5 @@
-import gzip
 from typing import Optional
+from hftbacktest.data.container import open_raw, save_data
 from hftbacktest.data.validation import correct_event_order, correct_local_timestamp, validate_event_order
 import json
 from hftbacktest.data.utils.difforderbooksnapshot import (
@@ -42,8 +42,10 @@ def convert(
         1736682893953775297 {"channel":"l2Book","data":{"coin":"HYPE","time":1736682893796,"levels":[[{"px":"21.277","sz":"80.29","n":2},{"px":"21.276","sz":"317.1","n":2},{"px":"21.273","sz":"4.7","n":1},{"px":"21.271","sz":"1.0","n":1},{"px":"21.27","sz":"3.1","n":1},{"px":"21.268","sz":"94.03","n":1},{"px":"21.266","sz":"424.29","n":3},{"px":"21.265","sz":"97.96","n":3},{"px":"21.264","sz":"2.9","n":1},{"px":"21.263","sz":"23.74","n":2},{"px":"21.262","sz":"74.81","n":3},{"px":"21.261","sz":"494.98","n":2},{"px":"21.26","sz":"193.82","n":1},{"px":"21.259","sz":"54.7","n":2},{"px":"21.258","sz":"127.74","n":3},{"px":"21.255","sz":"194.67","n":2},{"px":"21.254","sz":"187.49","n":3},{"px":"21.251","sz":"0.5","n":1},{"px":"21.249","sz":"81.6","n":2},{"px":"21.247","sz":"28.43","n":1}],[{"px":"21.306","sz":"223.2","n":2},{"px":"21.309","sz":"43.18","n":1},{"px":"21.311","sz":"125.23","n":1},{"px":"21.312","sz":"2.99","n":1},{"px":"21.313","sz":"1.0","n":1},{"px":"21.317","sz":"60.47","n":1},{"px":"21.318","sz":"21.3","n":2},{"px":"21.319","sz":"339.71","n":2},{"px":"21.322","sz":"35.0","n":1},{"px":"21.323","sz":"227.41","n":1},{"px":"21.324","sz":"12.38","n":2},{"px":"21.33","sz":"46.18","n":2},{"px":"21.335","sz":"1.0","n":1},{"px":"21.336","sz":"120.23","n":2},{"px":"21.342","sz":"2.88","n":1},{"px":"21.344","sz":"1562.36","n":3},{"px":"21.345","sz":"391.37","n":2},{"px":"21.347","sz":"292.91","n":1},{"px":"21.348","sz":"13.41","n":3},{"px":"21.349","sz":"669.92","n":3}]]}}
 
     Args:
-        input_filename: Input filename with path.
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        input_filename: Input filename with path. It can be compressed by gzip, ``zstd``, or ``LZ4``, as chosen by
+                        the collector's ``--compression``. See :func:`open_raw <hftbacktest.data.open_raw>`.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         base_latency: The value to be added to the feed latency.
                       See :func:`.correct_local_timestamp`.
         buffer_size: Sets a preallocated row size for the buffer.
@@ -59,7 +61,7 @@ def convert(
     diff = DiffOrderBookSnapshot(num_levels, tick_size, lot_size)
     took_first_snapshot = False
 
-    with gzip.open(input_filename, 'r') as f:
+    with open_raw(input_filename) as f:
         while True:
             line = f.readline()
             if not line:
@@ -192,6 +194,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
@@ -1,6 +1,6 @@
 from typing import Optional
+from hftbacktest.data.container import open_raw, save_data
 from hftbacktest.data.validation import correct_event_order, correct_local_timestamp, validate_event_order
-import gzip
 import numpy as np
 import json
 from numpy.typing import NDArray
@@ -39,8 +39,10 @@ def convert(
         1736682895377438738 {"c":"spot@public.increase.depth.v3.api@SOLUSDT","d":{"bids":[{"p":"186.20","v":"0.00"}],"e":"spot@public.increase.depth.v3.api","r":"4474505334"},"s":"SOLUSDT","t":1736682895251}
 
     Args:
-        input_filename: Input filename with path.
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        input_filename: Input filename with path. It can be compressed by gzip, ``zstd``, or ``LZ4``, as chosen by
+                        the collector's ``--compression``. See :func:`open_raw <hftbacktest.data.open_raw>`.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         base_latency: The value to be added to the feed latency.
                       See :func:`.correct_local_timestamp`.
         buffer_size: Sets a preallocated row size for the buffer.
@@ -53,7 +55,7 @@ def convert(
     row_num = 0
     timestamp_slice = 19
 
-    with gzip.open(input_filename, 'r') as f:
+    with open_raw(input_filename) as f:
         while True:
             line = f.readline()
             if not line:
@@ -192,6 +194,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
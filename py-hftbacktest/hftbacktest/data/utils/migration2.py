@@ -2,6 +2,7 @@ import numpy as np
 from numba import njit
 from numpy.typing import NDArray
 
+from hftbacktest.data.container import save_data
 from hftbacktest import BUY_EVENT, SELL_EVENT, EXCH_EVENT, LOCAL_EVENT, event_dtype
 
 
@@ -40,7 +41,8 @@ def convert(
 
     Args:
         input_file: Input filename for HftBacktest v1 data.
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         ts_mul: The value is multiplied by the v1 format timestamp to adjust the timestamp unit.
                 Typically, v1 uses microseconds, while v2 uses nanoseconds, so the default value is 1000.
 
@@ -53,6 +55,6 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data_v2)
+        save_data(output_filename, data_v2)
 
     return data_v2
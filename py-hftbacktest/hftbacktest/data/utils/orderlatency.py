@@ -0,0 +1,129 @@
+import numpy as np
+from numba import njit
+from numpy.typing import NDArray
+
+from ..container import load_data, save_data
+from ...types import order_latency_dtype
+
+
+@njit
+def _compact_order_latency(data: NDArray, tolerance: float, keep: NDArray) -> int:
+    n = len(data)
+
+    # A row rejected by the exchange has a zero exchange timestamp, and the latency between it and its neighbors is
+    # interpolated differently, so they are kept as they are.
+    forced = np.zeros(n, np.bool_)
+    forced[0] = True
+    forced[n - 1] = True
+    for rn in range(n):
+        if data[rn].exch_ts <= 0:
+            forced[max(rn - 1, 0)] = True
+            forced[rn] = True
+            forced[min(rn + 1, n - 1)] = True
+
+    keep[0] = 0
+    num_kept = 1
+    anchor = 0
+    # The ranges of the slopes of the entry latency over the request timestamp and the response latency over the
+    # exchange timestamp, within which the line from the anchor stays within the tolerance at every skipped row.
+    entry_lo = -np.inf
+    entry_hi = np.inf
+    resp_lo = -np.inf
+    resp_hi = np.inf
+
+    rn = 1
+    while rn < n:
+        a = data[anchor]
+        row = data[rn]
+        dx_entry = row.req_ts - a.req_ts
+        dx_resp = row.exch_ts - a.exch_ts
+        dy_entry = (row.exch_ts - row.req_ts) - (a.exch_ts - a.req_ts)
+        dy_resp = (row.resp_ts - row.exch_ts) - (a.resp_ts - a.exch_ts)
+
+        # Checks if the line from the anchor to this row reproduces all the rows skipped so far.
+        if rn - anchor > 1 and not (
+                dx_entry > 0
+                and dx_resp > 0
+                and entry_lo <= dy_entry / dx_entry <= entry_hi
+                and resp_lo <= dy_resp / dx_resp <= resp_hi
+        ):
+            # The segment ends at the previous row, and the next one starts from there.
+            anchor = rn - 1
+            keep[num_kept] = anchor
+            num_kept += 1
+            entry_lo = -np.inf
+            entry_hi = np.inf
+            resp_lo = -np.inf
+            resp_hi = np.inf
+            continue
+
+        if not forced[rn] and dx_entry > 0 and dx_resp > 0:
+            # This row can be skipped if a later row ends the segment.
+            entry_lo = max(entry_lo, (dy_entry - tolerance) / dx_entry)
+            entry_hi = min(entry_hi, (dy_entry + tolerance) / dx_entry)
+            resp_lo = max(resp_lo, (dy_resp - tolerance) / dx_resp)
+            resp_hi = min(resp_hi, (dy_resp + tolerance) / dx_resp)
+            if entry_lo <= entry_hi and resp_lo <= resp_hi:
+                rn += 1
+                continue
+
+        # This row cannot be skipped, or no later row can end the segment.
+        anchor = rn
+        keep[num_kept] = anchor
+        num_kept += 1
+        entry_lo = -np.inf
+        entry_hi = np.inf
+        resp_lo = -np.inf
+        resp_hi = np.inf
+        rn += 1
+    return num_kept
+
+
+def compact_order_latency(
+        data: NDArray | str,
+        tolerance: float,
+        output_filename: str | None = None
+) -> NDArray:
+    r"""
+    Compacts the historical order latency data by removing the rows that
+    :meth:`intp_order_latency <hftbacktest.BacktestAsset.intp_order_latency>` can reproduce, within the given
+    tolerance, by interpolating between the remaining rows. The result is a piecewise-linear table of the order entry
+    latency over the request timestamp and the order response latency over the exchange timestamp, in the same format
+    as the input, so it can be used by the backtester as it is.
+
+    Latency data collected by submitting probe orders at a fine interval is mostly flat or changes gradually, so it
+    typically shrinks by 10 to 100 times, which reduces the memory and load time of the latency model by as much.
+
+    Rows rejected by the exchange, whose exchange timestamp is zero, and their neighbors are always kept. The rows
+    should be sorted by the request timestamp and the exchange timestamp; a row whose timestamps are not increasing
+    from the previous row is kept as it is.
+
+    Args:
+        data: The historical order latency data, or the path to it in any format supported by
+              :func:`load_data <hftbacktest.data.load_data>`.
+        tolerance: The maximum absolute error of the interpolated order entry and response latencies at the timestamps
+                   of the removed rows. Unit should be the same as the data's timestamp unit. The backtester truncates
+                   the interpolated latency to an integer, which can add less than one unit.
+        output_filename: If provided, the compacted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
+
+    Returns:
+        The compacted order latency data.
+    """
+    if isinstance(data, str):
+        data = load_data(data)
+    if tolerance < 0:
+        raise ValueError('tolerance should be non-negative.')
+    data = np.asarray(data, dtype=order_latency_dtype)
+
+    if len(data) > 2:
+        keep = np.empty(len(data), np.int64)
+        num_kept = _compact_order_latency(data, float(tolerance), keep)
+        compacted = data[keep[:num_kept]]
+    else:
+        compacted = data.copy()
+
+    if output_filename is not None:
+        save_data(output_filename, compacted)
+
+    return compacted
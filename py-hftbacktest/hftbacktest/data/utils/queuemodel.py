@@ -0,0 +1,471 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from numba import njit, types
+from numba.typed import Dict as TypedDict, List as TypedList
+from numpy.typing import NDArray
+
+from ..container import load_data
+from ...types import (
+    ADD_ORDER_EVENT,
+    BUY_EVENT,
+    CANCEL_ORDER_EVENT,
+    DEPTH_CLEAR_EVENT,
+    EXCH_EVENT,
+    FILL_EVENT,
+    MODIFY_ORDER_EVENT,
+    SELL_EVENT,
+    EVENT_ARRAY
+)
+
+queue_observation_dtype = np.dtype(
+    [
+        ('front', 'f8'),
+        ('back', 'f8'),
+        ('qty', 'f8'),
+        ('behind', 'bool')
+    ],
+    align=True
+)
+
+# The statuses of order_record_dtype.
+_NEW = 1
+_EXPIRED = 2
+_FILLED = 3
+_CANCELED = 4
+
+_UNTIL_END = np.iinfo(np.int64).max
+
+# The level key, the quantity, the priority sequence, and the quantity filled but not yet removed from the book.
+_order_type = types.Tuple((types.int64, types.float64, types.int64, types.float64))
+
+
+@njit(inline='always')
+def _level_key(px: float, tick_size: float, ev: int) -> int:
+    return int(round(px / tick_size)) * 2 + (1 if ev & SELL_EVENT == SELL_EVENT else 0)
+
+
+@njit(nogil=True)
+def _replay_queue(
+        data: EVENT_ARRAY,
+        tick_size: float,
+        probe_start: NDArray,
+        probe_end: NDArray,
+        probe_key: NDArray,
+        probe_interval: int,
+        probe_lifetime: int,
+        max_probes: int
+) -> Tuple[NDArray, int, int]:
+    orders = TypedDict.empty(types.uint64, _order_type)
+    levels = TypedDict.empty(types.int64, types.float64)
+    next_seq = 0
+
+    # The active probes, the virtual orders whose true queue positions are tracked.
+    a_key = np.empty(max_probes, np.int64)
+    a_seq = np.empty(max_probes, np.int64)
+    a_front = np.empty(max_probes, np.float64)
+    a_end = np.empty(max_probes, np.int64)
+    num_active = 0
+    num_probes = 0
+    num_filled = 0
+    next_probe = 0
+    next_probe_ts = 0
+
+    obs = np.empty(max(len(data) // 4, 1024), queue_observation_dtype)
+    num_obs = 0
+
+    for row_num in range(len(data)):
+        row = data[row_num]
+        ev = row.ev
+        if ev & EXCH_EVENT != EXCH_EVENT:
+            continue
+        ts = row.exch_ts
+
+        # Expires the probes.
+        i = 0
+        while i < num_active:
+            if a_end[i] <= ts:
+                num_active -= 1
+                a_key[i] = a_key[num_active]
+                a_seq[i] = a_seq[num_active]
+                a_front[i] = a_front[num_active]
+                a_end[i] = a_end[num_active]
+            else:
+                i += 1
+
+        # Places the probes at the back of the queues.
+        if probe_interval > 0:
+            if ts >= next_probe_ts:
+                next_probe_ts = (ts // probe_interval + 1) * probe_interval
+                best_bid = -1
+                best_ask = -1
+                for key, qty in levels.items():
+                    if qty <= 0.0:
+                        continue
+                    if key % 2 == 0:
+                        if best_bid == -1 or key > best_bid:
+                            best_bid = key
+                    elif best_ask == -1 or key < best_ask:
+                        best_ask = key
+                for key in (best_bid, best_ask):
+                    if key != -1 and num_active < max_probes:
+                        a_key[num_active] = key
+                        a_seq[num_active] = next_seq
+                        a_front[num_active] = levels[key]
+                        a_end[num_active] = ts + probe_lifetime
+                        num_active += 1
+                        num_probes += 1
+                        next_seq += 1
+        else:
+            while next_probe < len(probe_start) and probe_start[next_probe] <= ts:
+                if num_active < max_probes and probe_end[next_probe] > ts:
+                    key = probe_key[next_probe]
+                    a_key[num_active] = key
+                    a_seq[num_active] = next_seq
+                    a_front[num_active] = levels.get(key, 0.0)
+                    a_end[num_active] = probe_end[next_probe]
+                    num_active += 1
+                    num_probes += 1
+                    next_seq += 1
+                next_probe += 1
+
+        kind = ev & 0xff
+        if kind == ADD_ORDER_EVENT:
+            key = _level_key(row.px, tick_size, ev)
+            orders[row.order_id] = (key, row.qty, next_seq, 0.0)
+            next_seq += 1
+            levels[key] = levels.get(key, 0.0) + row.qty
+        elif kind == CANCEL_ORDER_EVENT or kind == MODIFY_ORDER_EVENT:
+            if row.order_id not in orders:
+                continue
+            key, qty, seq, pending = orders[row.order_id]
+            if kind == CANCEL_ORDER_EVENT:
+                new_key = key
+                new_qty = 0.0
+                removed = qty
+            else:
+                new_key = _level_key(row.px, tick_size, ev)
+                new_qty = row.qty
+                # The order loses its priority if the price changes or the quantity increases, as in
+                # L3FIFOQueueModel.
+                removed = qty if new_key != key or new_qty > qty else qty - new_qty
+            level_qty = levels.get(key, 0.0)
+
+            # The decrease of the quantity that is not caused by a fill is observed as a cancellation, either in front
+            # of or behind each probe at the level.
+            canceled = removed - min(pending, removed)
+            pending -= min(pending, removed)
+            for i in range(num_active):
+                if a_key[i] != key:
+                    continue
+                if canceled > 0.0:
+                    if num_obs == len(obs):
+                        grown = np.empty(len(obs) * 2, queue_observation_dtype)
+                        grown[:num_obs] = obs[:num_obs]
+                        obs = grown
+                    obs[num_obs].front = a_front[i]
+                    obs[num_obs].back = max(level_qty - a_front[i], 0.0)
+                    obs[num_obs].qty = canceled
+                    obs[num_obs].behind = seq > a_seq[i]
+                    num_obs += 1
+                if seq < a_seq[i]:
+                    a_front[i] = max(a_front[i] - removed, 0.0)
+
+            levels[key] = level_qty - removed
+            if kind == CANCEL_ORDER_EVENT:
+                del orders[row.order_id]
+            elif new_key != key or new_qty > qty:
+                levels[new_key] = levels.get(new_key, 0.0) + new_qty
+                orders[row.order_id] = (new_key, new_qty, next_seq, pending)
+                next_seq += 1
+            else:
+                orders[row.order_id] = (key, new_qty, seq, pending)
+        elif kind == FILL_EVENT:
+            if row.order_id not in orders:
+                continue
+            key, qty, seq, pending = orders[row.order_id]
+            orders[row.order_id] = (key, qty, seq, pending + row.qty)
+            # The probes in front of the filled order at the level, and at better prices, are filled.
+            exec_key = _level_key(row.px, tick_size, ev)
+            i = 0
+            while i < num_active:
+                filled = False
+                if a_key[i] == key:
+                    filled = seq > a_seq[i]
+                elif a_key[i] % 2 == key % 2:
+                    filled = a_key[i] > exec_key if key % 2 == 0 else a_key[i] < exec_key
+                if filled:
+                    num_filled += 1
+                    num_active -= 1
+                    a_key[i] = a_key[num_active]
+                    a_seq[i] = a_seq[num_active]
+                    a_front[i] = a_front[num_active]
+                    a_end[i] = a_end[num_active]
+                else:
+                    i += 1
+        elif kind == DEPTH_CLEAR_EVENT:
+            # The queue positions are lost, so the orders and the probes on the side are cleared.
+            clear_bid = ev & SELL_EVENT != SELL_EVENT
+            clear_ask = ev & BUY_EVENT != BUY_EVENT
+            removed_ids = TypedList.empty_list(types.uint64)
+            for order_id, order in orders.items():
+                if (order[0] % 2 == 0 and clear_bid) or (order[0] % 2 == 1 and clear_ask):
+                    removed_ids.append(order_id)
+            for order_id in removed_ids:
+                del orders[order_id]
+            for key in levels:
+                if (key % 2 == 0 and clear_bid) or (key % 2 == 1 and clear_ask):
+                    levels[key] = 0.0
+            i = 0
+            while i < num_active:
+                if (a_key[i] % 2 == 0 and clear_bid) or (a_key[i] % 2 == 1 and clear_ask):
+                    num_active -= 1
+                    a_key[i] = a_key[num_active]
+                    a_seq[i] = a_seq[num_active]
+                    a_front[i] = a_front[num_active]
+                    a_end[i] = a_end[num_active]
+                else:
+                    i += 1
+    return obs[:num_obs], num_probes, num_filled
+
+
+def _probes_from_orders(orders: NDArray, tick_size: float) -> Tuple[NDArray, NDArray, NDArray]:
+    # Each order is placed at the exchange when it is first recorded as NEW, and leaves the queue when it is first
+    # recorded as filled, canceled, or expired.
+    orders = orders[np.lexsort((orders['exch_timestamp'], orders['order_id']))]
+    order_ids, index = np.unique(orders['order_id'], return_index=True)
+    start = np.full(len(order_ids), _UNTIL_END, np.int64)
+    end = np.full(len(order_ids), _UNTIL_END, np.int64)
+    key = np.zeros(len(order_ids), np.int64)
+    group = np.searchsorted(order_ids, orders['order_id'])
+
+    new = orders['status'] == _NEW
+    np.minimum.at(start, group[new], orders['exch_timestamp'][new])
+    done = np.isin(orders['status'], (_FILLED, _CANCELED, _EXPIRED)) & (orders['exch_timestamp'] > 0)
+    np.minimum.at(end, group[done], orders['exch_timestamp'][done])
+    first = orders[index]
+    key[:] = np.round(first['price_tick'] * first['tick_size'] / tick_size).astype(np.int64) * 2 \
+        + (first['side'] < 0)
+
+    valid = start < end
+    order = np.argsort(start[valid], kind='stable')
+    return start[valid][order], end[valid][order], key[valid][order]
+
+
+def queue_observations(
+        data: EVENT_ARRAY | str,
+        tick_size: float,
+        orders: NDArray | None = None,
+        probe_interval: int = 1_000_000_000,
+        probe_lifetime: int = 60_000_000_000,
+        max_probes: int = 10_000
+) -> Tuple[NDArray, int, int]:
+    r"""
+    Replays the Level-3 Market-By-Order data and observes, for each cancellation at the price level of a probe order,
+    the quantities in front of and behind the probe, and whether the canceled order was behind it. The probe orders
+    are virtual orders that join the back of the queue and are tracked in the FIFO manner of ``L3FIFOQueueModel``:
+    the quantity in front of a probe decreases only when an order in front of it is canceled or reduced, and the probe
+    is filled when an order behind it is filled or a fill occurs at a worse price.
+
+    The decrease of an order's quantity after its fill is attributed to the fill and is not observed as a cancellation,
+    as ``ProbQueueModel`` subtracts the traded quantity from the quantity change.
+
+    Args:
+        data: The L3 data in :obj:`event_dtype <hftbacktest.types.event_dtype>`, such as the output of
+              :func:`databento.convert <hftbacktest.data.utils.databento.convert>`, or its filename.
+        tick_size: The tick size of the asset.
+        orders: The order records of the asset in :obj:`order_record_dtype <hftbacktest.types.order_record_dtype>`,
+                as recorded by :class:`FillRecorder <hftbacktest.recorder.FillRecorder>`. If provided, each order is
+                used as a probe from its acceptance at the exchange until it is filled or canceled. Otherwise, probes
+                are placed at the best bid and the best ask every ``probe_interval``.
+        probe_interval: The interval at which the probes are placed, in nanoseconds.
+        probe_lifetime: The time for which a probe placed at the interval stays in the queue, in nanoseconds.
+        max_probes: The maximum number of the probes tracked at the same time.
+
+    Returns:
+        The observations in :obj:`queue_observation_dtype`, the number of probes, and the number of filled probes.
+    """
+    if isinstance(data, str):
+        data = load_data(data)
+    if orders is not None:
+        probe_start, probe_end, probe_key = _probes_from_orders(orders, tick_size)
+        probe_interval = 0
+    else:
+        probe_start = probe_end = probe_key = np.empty(0, np.int64)
+    return _replay_queue(
+        data,
+        tick_size,
+        probe_start,
+        probe_end,
+        probe_key,
+        probe_interval,
+        probe_lifetime,
+        max_probes
+    )
+
+
+def _power(front: NDArray, back: NDArray, n: float) -> NDArray:
+    f_back = back ** n
+    return f_back / (f_back + front ** n)
+
+
+def _power2(front: NDArray, back: NDArray, n: float) -> NDArray:
+    return back ** n / (back + front) ** n
+
+
+def _power3(front: NDArray, back: NDArray, n: float) -> NDArray:
+    return 1.0 - (front / (front + back)) ** n
+
+
+def _log(front: NDArray, back: NDArray, n: float) -> NDArray:
+    f_back = np.log1p(back)
+    return f_back / (f_back + np.log1p(front))
+
+
+def _log2(front: NDArray, back: NDArray, n: float) -> NDArray:
+    return np.log1p(back) / np.log1p(back + front)
+
+
+# The name, the method of BacktestAsset, the probability function, and whether it has the parameter n.
+MODELS: Dict[str, Tuple[str, Callable[[NDArray, NDArray, float], NDArray], bool]] = {
+    'power': ('power_prob_queue_model', _power, True),
+    'power2': ('power_prob_queue_model2', _power2, True),
+    'power3': ('power_prob_queue_model3', _power3, True),
+    'log': ('log_prob_queue_model', _log, False),
+    'log2': ('log_prob_queue_model2', _log2, False),
+}
+
+
+def log_likelihood(obs: NDArray, model: str, n: float = 0.0) -> float:
+    """
+    Returns the log-likelihood of the observations under the probability model, weighted by the canceled quantity.
+    The model's probability is that of the cancellation occurring behind the order.
+
+    Args:
+        obs: The observations in :obj:`queue_observation_dtype`.
+        model: One of ``power``, ``power2``, ``power3``, ``log``, and ``log2``.
+        n: The parameter of the power models.
+    """
+    _, prob_fn, _ = MODELS[model]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        prob = prob_fn(obs['front'], obs['back'], n)
+    # An infinite probability is regarded as 1, as in ProbQueueModel.
+    prob = np.clip(np.nan_to_num(prob, nan=0.5, posinf=1.0), 1e-12, 1.0 - 1e-12)
+    return float(np.sum(obs['qty'] * np.where(obs['behind'], np.log(prob), np.log1p(-prob))))
+
+
+def _maximize(fn: Callable[[float], float], grid: NDArray, iterations: int = 40) -> Tuple[float, float]:
+    values = np.array([fn(x) for x in grid])
+    i = int(np.argmax(values))
+    lo = np.log(grid[max(i - 1, 0)])
+    hi = np.log(grid[min(i + 1, len(grid) - 1)])
+    # Golden-section search on the log scale between the neighbors of the best point on the grid.
+    ratio = (np.sqrt(5.0) - 1.0) / 2.0
+    a = hi - ratio * (hi - lo)
+    b = lo + ratio * (hi - lo)
+    fa = fn(np.exp(a))
+    fb = fn(np.exp(b))
+    for _ in range(iterations):
+        if fa > fb:
+            hi, b, fb = b, a, fa
+            a = hi - ratio * (hi - lo)
+            fa = fn(np.exp(a))
+        else:
+            lo, a, fa = a, b, fb
+            b = lo + ratio * (hi - lo)
+            fb = fn(np.exp(b))
+    best = [(values[i], grid[i]), (fa, np.exp(a)), (fb, np.exp(b))]
+    value, x = max(best)
+    return float(x), float(value)
+
+
+def fit_queue_model(
+        data: Sequence[EVENT_ARRAY | str],
+        tick_size: float,
+        orders: NDArray | None = None,
+        models: Sequence[str] | None = None,
+        probe_interval: int = 1_000_000_000,
+        probe_lifetime: int = 60_000_000_000,
+        max_probes: int = 10_000,
+        n_grid: NDArray | None = None,
+        max_workers: int | None = None
+) -> List[Dict[str, Any]]:
+    r"""
+    Fits the probability queue models to the true queue positions replayed from Level-3 Market-By-Order data, so that
+    the model and its parameter for :class:`BacktestAsset <hftbacktest.BacktestAsset>` can be chosen on Level-2 data
+    without trial backtests.
+
+    ``ProbQueueModel`` attributes a decrease of the quantity at the order's price level to the queue behind the order
+    with the probability given by the model, and to the queue in front of it otherwise. Each cancellation observed by
+    :func:`queue_observations` tells whether it actually occurred behind, so the parameter ``n`` of each model is
+    fitted by maximizing the log-likelihood of the observations, weighted by the canceled quantity.
+
+    The days are replayed in parallel threads, since the replay releases the GIL.
+
+    **Example**
+
+    .. code-block:: python
+
+        from hftbacktest.data.utils.queuemodel import fit_queue_model
+
+        results = fit_queue_model(['mbo_20240501.npz', 'mbo_20240502.npz'], tick_size=0.25)
+        best = results[0]
+        set_queue_model = getattr(BacktestAsset(), best['method'])
+        # The log models have no parameter.
+        asset = set_queue_model() if best['n'] is None else set_queue_model(best['n'])
+
+    Args:
+        data: The L3 data of each day, or their filenames. The queue positions are replayed for each day separately.
+        tick_size: The tick size of the asset.
+        orders: The order records of the asset used as probes. See :func:`queue_observations`. Records of all days can
+                be given at once.
+        models: The models to fit among ``power``, ``power2``, ``power3``, ``log``, and ``log2``. All of them by
+                default.
+        probe_interval: See :func:`queue_observations`.
+        probe_lifetime: See :func:`queue_observations`.
+        max_probes: See :func:`queue_observations`.
+        n_grid: The values of ``n`` that are evaluated before the refinement. The default is 61 values from 0.01 to 100
+                on the log scale.
+        max_workers: The number of threads. The default is the default of ``ThreadPoolExecutor``.
+
+    Returns:
+        A list of the results of the models sorted by the log-likelihood in descending order. Each result is a
+        dictionary with ``model``, ``method`` (the method of ``BacktestAsset`` that sets the model), ``n`` (``None`` for
+        the models without the parameter), ``log_likelihood``, ``mean_log_likelihood`` (per canceled quantity),
+        ``num_observations``, ``num_probes``, and ``num_filled_probes``.
+    """
+    if models is None:
+        models = list(MODELS)
+    if n_grid is None:
+        n_grid = np.geomspace(0.01, 100.0, 61)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda day: queue_observations(day, tick_size, orders, probe_interval, probe_lifetime, max_probes),
+            data
+        ))
+    obs = np.concatenate([r[0] for r in results])
+    num_probes = sum(r[1] for r in results)
+    num_filled = sum(r[2] for r in results)
+    total_qty = obs['qty'].sum()
+
+    fits = []
+    for model in models:
+        method, _, parametric = MODELS[model]
+        if parametric:
+            n, ll = _maximize(lambda x: log_likelihood(obs, model, x), n_grid)
+        else:
+            n, ll = None, log_likelihood(obs, model)
+        fits.append({
+            'model': model,
+            'method': method,
+            'n': n,
+            'log_likelihood': ll,
+            'mean_log_likelihood': ll / total_qty if total_qty > 0 else np.nan,
+            'num_observations': len(obs),
+            'num_probes': num_probes,
+            'num_filled_probes': num_filled,
+        })
+    fits.sort(key=lambda fit: fit['log_likelihood'], reverse=True)
+    return fits
@@ -1,8 +1,12 @@
-from typing import List
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List
 
 import numpy as np
 from numpy.typing import NDArray
 
+from ..container import save_data
 from ... import BacktestAsset, HashMapMarketDepthBacktest
 
 
@@ -50,6 +54,146 @@ def create_last_snapshot(
     depth.snapshot_free(snapshot)
 
     if output_snapshot_filename is not None:
-        np.savez_compressed(output_snapshot_filename, data=snapshot_copied)
+        save_data(output_snapshot_filename, snapshot_copied)
 
     return snapshot_copied
+
+
+_DAY = 86_400_000_000_000
+
+
+def _take_snapshot(hbt: HashMapMarketDepthBacktest, timestamp: int) -> NDArray:
+    depth = hbt.depth(0)
+    snapshot = depth.snapshot()
+    snapshot_copied = snapshot.copy()
+    depth.snapshot_free(snapshot)
+    snapshot_copied['exch_ts'] = timestamp
+    snapshot_copied['local_ts'] = timestamp
+    return snapshot_copied
+
+
+def create_snapshots(
+        data: List[str],
+        tick_size: float,
+        lot_size: float,
+        output_path: str,
+        interval: int = 3_600_000_000_000,
+        initial_snapshot: str | None = None,
+        prefix: str = 'snapshot',
+        extension: str = '.npz',
+        manifest_filename: str | None = 'manifest.json'
+) -> List[Dict[str, Any]]:
+    r"""
+    Creates snapshots of the market depth at every ``interval`` and at the end of every day, in UTC, by replaying the
+    specified data once, along with a manifest listing them. Unlike :func:`create_last_snapshot`, which has to replay
+    the previous day for each day, this allows a multi-day backtest to be split into independent jobs, such as one per
+    day, that start from the snapshot at their start time without replaying the data before it.
+
+    The snapshot at a given time reflects all the events whose local timestamp is at or before it, and its events have
+    the time as their timestamps. The snapshot at the end of each day, which is at midnight of the following day, can
+    be used as the initial snapshot for the data of the following day.
+
+    Args:
+        data: Data to be processed, in chronological order. The timestamps should be in nanoseconds.
+        tick_size: Minimum price increment for the given asset.
+        lot_size: Minimum order quantity for the given asset.
+        output_path: The directory to which the snapshots and the manifest are written.
+        interval: The interval between the snapshots in nanoseconds, which should be a multiple of one second. The
+                  default is one hour. Snapshots are taken at the multiples of ``interval`` since the epoch, in addition
+                  to midnight of every day.
+        initial_snapshot: The initial market depth snapshot.
+        prefix: The prefix of the snapshot filenames, which are followed by the date and time of the snapshot, such as
+                ``snapshot_20240809_000000.npz``.
+        extension: The extension of the snapshot filenames, which determines the format. See
+                   :func:`save_data <hftbacktest.data.save_data>`.
+        manifest_filename: If provided, the manifest is written to the specified filename, relative to
+                           ``output_path``, in JSON.
+
+    Returns:
+        The manifest, a list of the snapshots in chronological order. Each entry has the ``timestamp`` of the snapshot,
+        the ``filename`` relative to ``output_path``, and ``end_of_day``, which is ``True`` if the snapshot is taken at
+        midnight. The last entry is the snapshot at the end of the last day, which reflects all the data and has
+        ``end_of_data`` set to ``True``.
+    """
+    if interval <= 0 or interval % 1_000_000_000 != 0:
+        raise ValueError('interval must be a positive multiple of one second')
+
+    asset = (
+        BacktestAsset()
+            .data(data)
+            .tick_size(tick_size)
+            .lot_size(lot_size)
+    )
+    if initial_snapshot is not None:
+        asset.initial_snapshot(initial_snapshot)
+
+    hbt = HashMapMarketDepthBacktest([asset])
+    os.makedirs(output_path, exist_ok=True)
+
+    manifest = []
+
+    def save(timestamp: int, end_of_data: bool) -> None:
+        dt = datetime.fromtimestamp(timestamp // 1_000_000_000, timezone.utc)
+        filename = prefix + dt.strftime('_%Y%m%d_%H%M%S') + extension
+        save_data(os.path.join(output_path, filename), _take_snapshot(hbt, timestamp))
+        manifest.append({
+            'timestamp': timestamp,
+            'filename': filename,
+            'end_of_day': timestamp % _DAY == 0,
+            'end_of_data': end_of_data
+        })
+
+    # Moves to the first event.
+    if hbt.elapse(0) not in [0, 1]:
+        raise RuntimeError
+
+    while True:
+        timestamp = hbt.current_timestamp
+        next_timestamp = min(
+            (timestamp // interval + 1) * interval,
+            (timestamp // _DAY + 1) * _DAY
+        )
+        result = hbt.elapse(next_timestamp - timestamp)
+        if result == 0:
+            save(next_timestamp, False)
+        elif result == 1:
+            # The data ends before the next boundary, and the current timestamp is not moved at the end of the data.
+            # The book no longer changes, so the final book is saved at the next boundary and at the end of the day, to
+            # be used as the initial snapshot for the following day.
+            end_of_day = (timestamp // _DAY + 1) * _DAY
+            if next_timestamp != end_of_day:
+                save(next_timestamp, False)
+            save(end_of_day, True)
+            break
+        else:
+            raise RuntimeError
+
+    if manifest_filename is not None:
+        with open(os.path.join(output_path, manifest_filename), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def find_snapshot(manifest: List[Dict[str, Any]] | str, timestamp: int) -> Dict[str, Any] | None:
+    r"""
+    Finds the latest snapshot taken at or before the specified time in the manifest created by
+    :func:`create_snapshots`. The data to be backtested from the snapshot should start after its timestamp.
+
+    Args:
+        manifest: The manifest, or the filename of the manifest.
+        timestamp: The time at which the backtest starts.
+
+    Returns:
+        The manifest entry of the snapshot, or ``None`` if there is no snapshot at or before the specified time.
+    """
+    if isinstance(manifest, str):
+        with open(manifest) as f:
+            manifest = json.load(f)
+    found = None
+    for entry in manifest:
+        if entry['timestamp'] <= timestamp:
+            found = entry
+        else:
+            break
+    return found
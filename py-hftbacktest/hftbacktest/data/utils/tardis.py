@@ -7,6 +7,7 @@ import numpy as np
 from numba import njit
 from numpy.typing import NDArray
 
+from ..container import save_data
 from ..validation import correct_event_order, validate_event_order, correct_local_timestamp
 from ...types import (
     DEPTH_EVENT,
@@ -63,7 +64,8 @@ def convert(
     Args:
         input_files: Input filenames for both incremental book and trades files,
                      e.g. ['incremental_book.csv.gz', 'trades.csv.gz'].
-        output_filename: If provided, the converted data will be saved to the specified filename in ``npz`` format.
+        output_filename: If provided, the converted data will be saved to the specified filename in the format
+                         chosen by the extension. See :func:`save_data <hftbacktest.data.save_data>`.
         buffer_size: Sets a preallocated row size for the buffer.
         ss_buffer_size: Sets a preallocated row size for the snapshot.
         base_latency: The value to be added to the feed latency.
@@ -204,7 +206,7 @@ def convert(
 
     if output_filename is not None:
         print('Saving to %s' % output_filename)
-        np.savez_compressed(output_filename, data=data)
+        save_data(output_filename, data)
 
     return data
 
@@ -0,0 +1,320 @@
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from numba import float64, int64
+from numba.experimental import jitclass
+
+histogram_bucket_dtype = np.dtype(
+    [
+        ('lower', 'i8'),
+        ('upper', 'i8'),
+        ('count', 'i8')
+    ],
+    align=True
+)
+
+
+@jitclass
+class LatencyHistogram_:
+    counts: int64[:]
+    significant_bits: int64
+    sub_bucket_count: int64
+    sub_bucket_half_count: int64
+    highest_trackable_value: int64
+    total_count: int64
+    min_value: int64
+    max_value: int64
+    total_value: float64
+    num_clamped: int64
+    last_timestamp: int64
+
+    def __init__(self, highest_trackable_value: int64, significant_bits: int64):
+        if significant_bits < 1 or significant_bits > 16:
+            raise ValueError('significant_bits must be between 1 and 16.')
+        if highest_trackable_value < 1:
+            raise ValueError('highest_trackable_value must be positive.')
+        self.significant_bits = significant_bits
+        self.sub_bucket_count = 1 << significant_bits
+        self.sub_bucket_half_count = self.sub_bucket_count >> 1
+        self.highest_trackable_value = highest_trackable_value
+        self.counts = np.zeros(self.bucket_index(highest_trackable_value) + 1, np.int64)
+        self.total_count = 0
+        self.min_value = 0
+        self.max_value = 0
+        self.total_value = 0.0
+        self.num_clamped = 0
+        self.last_timestamp = 0
+
+    def bucket_index(self, value: int64) -> int64:
+        if value < self.sub_bucket_count:
+            return value
+        # The value falls in the bucket of the most significant bits, which are the top bits starting from the highest
+        # set bit. The buckets double in width each time the highest set bit moves up.
+        shift = 1
+        while (value >> shift) >= self.sub_bucket_count:
+            shift += 1
+        return self.sub_bucket_count + (shift - 1) * self.sub_bucket_half_count \
+            + (value >> shift) - self.sub_bucket_half_count
+
+    def bucket_lower(self, index: int64) -> int64:
+        """
+        Returns the lowest value that falls in the bucket.
+        """
+        if index < self.sub_bucket_count:
+            return index
+        i = index - self.sub_bucket_count
+        shift = i // self.sub_bucket_half_count + 1
+        return (self.sub_bucket_half_count + i % self.sub_bucket_half_count) << shift
+
+    def bucket_upper(self, index: int64) -> int64:
+        """
+        Returns the lowest value that falls in the next bucket.
+        """
+        if index < self.sub_bucket_count:
+            return index + 1
+        i = index - self.sub_bucket_count
+        shift = i // self.sub_bucket_half_count + 1
+        return (self.sub_bucket_half_count + i % self.sub_bucket_half_count + 1) << shift
+
+    def record(self, value: int64) -> None:
+        """
+        Records the value. The values outside of ``[0, highest_trackable_value]`` are clamped into the range in the
+        buckets, and counted in ``num_clamped``.
+
+        Args:
+            value: The value to record, such as a latency in nanoseconds.
+        """
+        if self.total_count == 0:
+            self.min_value = value
+            self.max_value = value
+        else:
+            self.min_value = min(self.min_value, value)
+            self.max_value = max(self.max_value, value)
+        self.total_count += 1
+        self.total_value += value
+        if value < 0:
+            value = 0
+            self.num_clamped += 1
+        elif value > self.highest_trackable_value:
+            value = self.highest_trackable_value
+            self.num_clamped += 1
+        self.counts[self.bucket_index(value)] += 1
+
+    def record_feed_latency(self, hbt, asset_no: int64) -> None:
+        """
+        Records the latency of the latest feed of the asset, that is, the local receipt timestamp minus the exchange
+        timestamp, if it has not been recorded yet. The histogram should be used for a single asset.
+
+        Args:
+            hbt: The backtest or the live bot.
+            asset_no: Asset number from which the feed latency will be retrieved.
+        """
+        latency = hbt.feed_latency(asset_no)
+        if latency is not None:
+            exch_ts, local_ts = latency
+            if local_ts != self.last_timestamp:
+                self.last_timestamp = local_ts
+                self.record(local_ts - exch_ts)
+
+    def record_order_latency(self, hbt, asset_no: int64) -> None:
+        """
+        Records the round-trip latency of the latest order response of the asset, that is, the response receipt
+        timestamp minus the request timestamp, if it has not been recorded yet. The histogram should be used for a
+        single asset.
+
+        Args:
+            hbt: The backtest or the live bot.
+            asset_no: Asset number from which the order latency will be retrieved.
+        """
+        latency = hbt.order_latency(asset_no)
+        if latency is not None:
+            req_ts, _, resp_ts = latency
+            if resp_ts != self.last_timestamp:
+                self.last_timestamp = resp_ts
+                self.record(resp_ts - req_ts)
+
+    def value_at_percentile(self, percentile: float64) -> int64:
+        """
+        Args:
+            percentile: The percentile between 0 and 100.
+
+        Returns:
+            The highest value that falls in the same bucket as the value at the percentile, limited by the minimum and
+            the maximum recorded values. Its relative error is at most ``2 ** (1 - significant_bits)``. Returns 0 if no
+            value has been recorded.
+        """
+        if self.total_count == 0:
+            return 0
+        if percentile <= 0.0:
+            return self.min_value
+        rank = max(int64(np.ceil(percentile / 100.0 * self.total_count)), 1)
+        cum_count = 0
+        for i in range(len(self.counts)):
+            cum_count += self.counts[i]
+            if cum_count >= rank:
+                return min(max(self.bucket_upper(i) - 1, self.min_value), self.max_value)
+        return self.max_value
+
+    @property
+    def mean(self) -> float64:
+        if self.total_count == 0:
+            return np.nan
+        return self.total_value / self.total_count
+
+    def merge(self, other: 'LatencyHistogram_') -> None:
+        """
+        Adds the values recorded in the other histogram, which must have the same configuration.
+        """
+        if other.significant_bits != self.significant_bits \
+                or other.highest_trackable_value != self.highest_trackable_value:
+            raise ValueError('Histograms with different configurations cannot be merged.')
+        if other.total_count == 0:
+            return
+        if self.total_count == 0:
+            self.min_value = other.min_value
+            self.max_value = other.max_value
+        else:
+            self.min_value = min(self.min_value, other.min_value)
+            self.max_value = max(self.max_value, other.max_value)
+        self.counts += other.counts
+        self.total_count += other.total_count
+        self.total_value += other.total_value
+        self.num_clamped += other.num_clamped
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+        self.total_count = 0
+        self.min_value = 0
+        self.max_value = 0
+        self.total_value = 0.0
+        self.num_clamped = 0
+        self.last_timestamp = 0
+
+
+class LatencyHistogram:
+    """
+    A fixed-memory histogram of latencies, which can be recorded inside ``njit`` functions without keeping every sample.
+
+    As in HdrHistogram, the values are counted in log-linear buckets: the values below ``2 ** significant_bits`` have
+    their own bucket, and above that, the bucket width doubles each time the value doubles, so that each bucket keeps
+    the ``significant_bits`` most significant bits of its values. The relative error of the percentiles is therefore at
+    most ``2 ** (1 - significant_bits)``, about 0.8% with the default, regardless of the magnitude of the values.
+
+    Pass :attr:`histogram` to the ``njit`` function to record the values.
+
+    .. code-block:: python
+
+        from hftbacktest import LatencyHistogram, monotonic_ns
+
+        @njit
+        def strategy(hbt, feed_hist, order_hist, compute_hist):
+            while hbt.elapse(100_000_000) == 0:
+                feed_hist.record_feed_latency(hbt, 0)
+                order_hist.record_order_latency(hbt, 0)
+
+                start = monotonic_ns()
+                ...
+                compute_hist.record(monotonic_ns() - start)
+
+        feed_hist = LatencyHistogram()
+        order_hist = LatencyHistogram()
+        compute_hist = LatencyHistogram()
+        strategy(hbt, feed_hist.histogram, order_hist.histogram, compute_hist.histogram)
+        print(feed_hist.percentiles())
+
+    Args:
+        highest_trackable_value: The highest value that can be distinguished. Higher values are counted as this value.
+                                 The default is one hour in nanoseconds.
+        significant_bits: The number of the most significant bits kept for each value, between 1 and 16. Each bucket
+                          is counted in 8 bytes, and there are about
+                          ``2 ** (significant_bits - 1) * (log2(highest_trackable_value) - significant_bits + 2)``
+                          buckets: 4,562 buckets, or about 36KB, with the defaults, and about 7MB with 16 significant
+                          bits.
+    """
+
+    def __init__(self, highest_trackable_value: int = 3_600_000_000_000, significant_bits: int = 8):
+        self._histogram = LatencyHistogram_(highest_trackable_value, significant_bits)
+
+    @property
+    def histogram(self) -> LatencyHistogram_:
+        return self._histogram
+
+    @property
+    def count(self) -> int:
+        return self._histogram.total_count
+
+    @property
+    def min(self) -> int:
+        return self._histogram.min_value
+
+    @property
+    def max(self) -> int:
+        return self._histogram.max_value
+
+    @property
+    def mean(self) -> float:
+        return self._histogram.mean
+
+    @property
+    def num_clamped(self) -> int:
+        return self._histogram.num_clamped
+
+    def percentile(self, percentile: float) -> int:
+        """
+        Args:
+            percentile: The percentile between 0 and 100.
+
+        Returns:
+            The value at the percentile.
+        """
+        return self._histogram.value_at_percentile(percentile)
+
+    def percentiles(self, percentiles: Sequence[float] = (50, 90, 99, 99.9, 99.99)) -> Dict[float, int]:
+        """
+        Args:
+            percentiles: The percentiles between 0 and 100.
+
+        Returns:
+            A dictionary of the values at the percentiles.
+        """
+        return {p: self._histogram.value_at_percentile(p) for p in percentiles}
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Adds the values recorded in the other histogram, for example, recorded in another process or in another
+        session, into this histogram.
+
+        Args:
+            other: The histogram with the same ``highest_trackable_value`` and ``significant_bits``.
+
+        Returns:
+            This histogram.
+        """
+        self._histogram.merge(other.histogram)
+        return self
+
+    def reset(self) -> None:
+        self._histogram.reset()
+
+    def to_numpy(self) -> np.ndarray[Any, histogram_bucket_dtype]:
+        """
+        Returns:
+            The non-empty buckets as an array of ``histogram_bucket_dtype``, with the lowest value of each bucket, the
+            lowest value of the next bucket, and the count.
+        """
+        hist = self._histogram
+        index = np.flatnonzero(hist.counts)
+        buckets = np.empty(len(index), histogram_bucket_dtype)
+        buckets['lower'] = [hist.bucket_lower(i) for i in index]
+        buckets['upper'] = [hist.bucket_upper(i) for i in index]
+        buckets['count'] = hist.counts[index]
+        return buckets
+
+    def to_polars(self):
+        """
+        Returns:
+            The non-empty buckets as a Polars DataFrame with the columns ``lower``, ``upper``, and ``count``.
+        """
+        import polars as pl
+
+        return pl.DataFrame(self.to_numpy())
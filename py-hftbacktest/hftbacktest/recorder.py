@@ -1,10 +1,11 @@
 from typing import Any
 
 import numpy as np
-from numba import uint64, from_dtype
+from numba import float64, int64, uint64, from_dtype, types
 from numba.experimental import jitclass
+from numba.typed import Dict, List
 
-from .types import record_dtype
+from .types import order_record_dtype, record_dtype
 
 
 @jitclass
@@ -51,3 +52,186 @@ class Recorder:
 
     def get(self, asset_no: int) -> np.ndarray[Any, record_dtype]:
         return self._recorder.records[:self._recorder.i, asset_no]
+
+
+_order_key_type = types.UniTuple(uint64, 2)
+# The status, the request, the leaves quantity, the exchange timestamp, and the local timestamp last recorded for the
+# order, and the call to ``record`` in which the order was last seen.
+_order_state_type = types.Tuple((uint64, uint64, float64, int64, int64, int64))
+_order_record_array_type = from_dtype(order_record_dtype)[:]
+
+
+@jitclass
+class FillRecorder_:
+    records: _order_record_array_type
+    chunks: types.ListType(_order_record_array_type)
+    i: uint64
+    last_states: types.DictType(_order_key_type, _order_state_type)
+    num_calls: int64
+
+    def __init__(self, chunk_size: uint64):
+        self.records = np.empty(chunk_size, order_record_dtype)
+        self.chunks = List.empty_list(_order_record_array_type)
+        self.i = 0
+        self.last_states = Dict.empty(_order_key_type, _order_state_type)
+        self.num_calls = 0
+
+    def record(self, hbt):
+        self.num_calls += 1
+        timestamp = hbt.current_timestamp
+        num_orders = 0
+        for asset_no in range(hbt.num_assets):
+            values = hbt.orders(asset_no).values()
+            while values.has_next():
+                order = values.get().arr[0]
+                num_orders += 1
+                key = (uint64(asset_no), uint64(order.order_id))
+                last_state = self.last_states.get(key)
+                if last_state is None:
+                    prev_leaves_qty = order.qty
+                    changed = True
+                else:
+                    status, req, prev_leaves_qty, exch_timestamp, local_timestamp, _ = last_state
+                    changed = (
+                        status != order.status
+                        or req != order.req
+                        or prev_leaves_qty != order.leaves_qty
+                        or exch_timestamp != order.exch_timestamp
+                        or local_timestamp != order.local_timestamp
+                    )
+                self.last_states[key] = (
+                    uint64(order.status),
+                    uint64(order.req),
+                    float64(order.leaves_qty),
+                    int64(order.exch_timestamp),
+                    int64(order.local_timestamp),
+                    self.num_calls
+                )
+                if changed:
+                    self._append(timestamp, asset_no, order, max(prev_leaves_qty - order.leaves_qty, 0.0))
+
+        # Forgets the orders that have been removed by clear_inactive_orders.
+        if len(self.last_states) > num_orders:
+            removed = List.empty_list(_order_key_type)
+            for key, state in self.last_states.items():
+                if state[5] != self.num_calls:
+                    removed.append(key)
+            for key in removed:
+                del self.last_states[key]
+
+    def _append(self, timestamp, asset_no, order, fill_qty):
+        if self.i == len(self.records):
+            self.chunks.append(self.records)
+            self.records = np.empty(len(self.records), order_record_dtype)
+            self.i = 0
+        rec = self.records[self.i:self.i + 1]
+        rec[0].timestamp = timestamp
+        rec[0].asset_no = asset_no
+        rec[0].order_id = order.order_id
+        rec[0].side = order.side
+        rec[0].price_tick = order.price_tick
+        rec[0].tick_size = order.tick_size
+        rec[0].qty = order.qty
+        rec[0].leaves_qty = order.leaves_qty
+        rec[0].fill_qty = fill_qty
+        rec[0].exec_qty = order.exec_qty
+        rec[0].exec_price_tick = order.exec_price_tick
+        rec[0].maker = order.maker
+        rec[0].status = order.status
+        rec[0].req = order.req
+        rec[0].order_type = order.order_type
+        rec[0].time_in_force = order.time_in_force
+        rec[0].exch_timestamp = order.exch_timestamp
+        rec[0].local_timestamp = order.local_timestamp
+        self.i += 1
+
+    def clear(self):
+        self.chunks = List.empty_list(_order_record_array_type)
+        self.i = 0
+
+
+class FillRecorder:
+    """
+    Records every change of the orders observed in the backtest or the live bot, including the fills, so that they can
+    be analyzed without running the backtest again.
+
+    Pass :attr:`recorder` to the ``njit`` function and call its ``record`` method with ``hbt`` after every call that
+    advances the time, such as ``elapse``, ``wait_order_response``, and ``wait_next_feed``, and before
+    ``clear_inactive_orders``. A record is added for each order whose status, request, leaves quantity, or timestamps
+    have changed since the previous call, with the state of the order at the time of the call. ``fill_qty`` is the
+    quantity filled since the previous record of the order. Fills that occur between two calls are merged into one
+    record, and ``exec_price_tick`` is the price of the last of them.
+
+    The records are appended to a buffer that grows in chunks without copying the recorded data, so the memory is
+    bounded only by the number of records. For long runs, :meth:`spill` writes out the records and releases the memory.
+
+    Args:
+        chunk_size: The number of records allocated at a time.
+    """
+
+    def __init__(self, chunk_size: uint64 = 100_000):
+        self._recorder = FillRecorder_(chunk_size)
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    def get(self, asset_no: int | None = None) -> np.ndarray[Any, order_record_dtype]:
+        """
+        Args:
+            asset_no: Asset number from which the records will be retrieved. If ``None``, the records of all assets are
+                      returned.
+
+        Returns:
+            The records in :obj:`order_record_dtype <hftbacktest.types.order_record_dtype>`.
+        """
+        data = np.concatenate([*self._recorder.chunks, self._recorder.records[:self._recorder.i]])
+        if asset_no is not None:
+            data = data[data['asset_no'] == asset_no]
+        return data
+
+    def fills(self, asset_no: int | None = None) -> np.ndarray[Any, order_record_dtype]:
+        """
+        Returns:
+            The records with a fill, that is, with a positive ``fill_qty``.
+        """
+        data = self.get(asset_no)
+        return data[data['fill_qty'] > 0]
+
+    def to_npz(self, file: str):
+        data = self.get()
+        kwargs = {
+            str(asset_no): data[data['asset_no'] == asset_no]
+            for asset_no in np.unique(data['asset_no'])
+        }
+        np.savez_compressed(file, **kwargs)
+
+    def to_columnar(self, file: str):
+        """
+        Writes the records of all assets in the columnar format, which can be read by
+        :func:`read_columnar <hftbacktest.data.utils.columnar.read_columnar>` with
+        :obj:`order_record_dtype <hftbacktest.types.order_record_dtype>`.
+        """
+        from .data.utils.columnar import write_columnar
+
+        write_columnar(self.get(), file)
+
+    def to_polars(self):
+        """
+        Returns:
+            The records of all assets as a Polars DataFrame.
+        """
+        import polars as pl
+
+        return pl.DataFrame(self.get())
+
+    def spill(self, file: str):
+        """
+        Writes the records of all assets in the columnar format, as :meth:`to_columnar`, and then clears them. Orders
+        continue to be tracked, so the records written by successive calls can be concatenated.
+        """
+        self.to_columnar(file)
+        self.clear()
+
+    def clear(self):
+        self._recorder.clear()
@@ -0,0 +1,135 @@
+import os
+from typing import Tuple
+
+import numpy as np
+from numba import int64, njit, uint64
+from numpy.typing import NDArray
+
+from .binding import LIVE_FEATURE
+
+if not LIVE_FEATURE:
+    raise ImportError(
+        'hftbacktest.sharedbook requires the live feature. Build hftbacktest with it, for example, '
+        '`maturin develop --features live`.'
+    )
+
+from .binding import shared_book_read
+from .intrinsic import address_as_void_pointer, ptr_from_val, val_from_ptr
+
+SHARED_BOOK_MAGIC = int.from_bytes(b'HBTBOOK1', 'little')
+HEADER_WORDS = 8
+
+# The timestamps returned instead of the exchange timestamp when a snapshot cannot be read.
+NOT_INITIALIZED = -1
+BUSY = -2
+
+
+def shared_book_path(connector_name: str, symbol: str, directory: str = '/dev/shm') -> str:
+    """
+    Returns the path of the shared book of the instrument published by the connector.
+
+    Args:
+        connector_name: Name of the connector.
+        symbol: Symbol of the instrument.
+        directory: Directory of the shared books, given to the connector by ``--book-dir``.
+
+    Returns:
+        The path of the shared book.
+    """
+    return os.path.join(directory, f'hftbacktest.{connector_name}.{symbol}.book')
+
+
+@njit
+def read_shared_book(
+        ptr: int,
+        bids: NDArray[np.float64],
+        asks: NDArray[np.float64]
+) -> Tuple[int, int, int]:
+    """
+    Copies a consistent snapshot of the shared book into ``bids`` and ``asks``. It can be called in ``njit`` functions,
+    given :attr:`SharedBook.ptr`.
+
+    Args:
+        ptr: Address of the shared book region.
+        bids: C-contiguous ``float64`` array of shape ``(n, 2)`` that receives the bid levels, as ``(price, qty)``, from
+              the best bid downward.
+        asks: C-contiguous ``float64`` array of shape ``(n, 2)`` that receives the ask levels, as ``(price, qty)``, from
+              the best ask upward.
+
+    Returns:
+        The exchange timestamp of the latest update, the number of bid levels, and the number of ask levels read. The
+        timestamp is :data:`NOT_INITIALIZED`, ``-1``, if the shared book is not initialized, and :data:`BUSY`,
+        ``-2``, if the snapshot is still being written after a bounded number of retries, which means that the
+        connector died while writing it. No levels are returned in either case.
+    """
+    max_levels = min(bids.shape[0], asks.shape[0])
+    num_bids = uint64(0)
+    num_asks = uint64(0)
+    num_bids_ptr = ptr_from_val(num_bids)
+    num_asks_ptr = ptr_from_val(num_asks)
+    timestamp = shared_book_read(
+        address_as_void_pointer(ptr),
+        address_as_void_pointer(bids.ctypes.data),
+        address_as_void_pointer(asks.ctypes.data),
+        max_levels,
+        num_bids_ptr,
+        num_asks_ptr
+    )
+    if timestamp < 0:
+        return timestamp, 0, 0
+    return timestamp, int64(val_from_ptr(num_bids_ptr)), int64(val_from_ptr(num_asks_ptr))
+
+
+class SharedBook:
+    """
+    Reads the market depth snapshots that the connector publishes to the shared memory, when it runs with
+    ``--book-levels``. Any number of bots on the same host can read the top levels of the book of an instrument without
+    subscribing to its feed and rebuilding the market depth.
+
+    The shared book is mapped read-only and each read copies the levels under a sequence lock, so it never sees a
+    partially updated snapshot. If the connector restarts, the shared book has to be reopened.
+
+    **Example**
+
+    .. code-block:: python
+
+        book = SharedBook('bf', 'BTCUSDT')
+        timestamp, bids, asks = book.read()
+        best_bid, best_bid_qty = bids[0]
+
+    Args:
+        connector_name: Name of the connector.
+        symbol: Symbol of the instrument.
+        directory: Directory of the shared books, given to the connector by ``--book-dir``.
+    """
+
+    def __init__(self, connector_name: str, symbol: str, directory: str = '/dev/shm'):
+        self.path = shared_book_path(connector_name, symbol, directory)
+        self._region = np.memmap(self.path, dtype=np.uint64, mode='r')
+        if len(self._region) < HEADER_WORDS or self._region[1] != SHARED_BOOK_MAGIC:
+            raise ValueError(f'{self.path} is not a shared book.')
+        self.num_levels = int(self._region[2])
+        self.tick_size = float(self._region[3:4].view(np.float64)[0])
+        self._bids = np.zeros((self.num_levels, 2), np.float64)
+        self._asks = np.zeros((self.num_levels, 2), np.float64)
+
+    @property
+    def ptr(self) -> int:
+        """
+        Returns the address of the shared book region, to read it with :func:`read_shared_book` in ``njit``
+        functions. It is valid as long as this object is alive.
+        """
+        return self._region.ctypes.data
+
+    def read(self) -> Tuple[int, NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Reads the latest snapshot.
+
+        Returns:
+            The exchange timestamp of the latest update, the bid levels as ``(price, qty)`` from the best bid downward,
+            and the ask levels as ``(price, qty)`` from the best ask upward. The levels are views into buffers that are
+            overwritten by the next read. The timestamp is :data:`BUSY` with no levels if the connector died while
+            writing the snapshot; see :func:`read_shared_book`.
+        """
+        timestamp, num_bids, num_asks = read_shared_book(self.ptr, self._bids, self._asks)
+        return timestamp, self._bids[:num_bids], self._asks[:num_asks]
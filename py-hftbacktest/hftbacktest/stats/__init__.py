@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import Any, List
+
 from .stats import (
     Stats,
     InverseAssetRecord,
@@ -21,7 +24,8 @@ from .metrics import (
     MaxPositionValue,
     MeanPositionValue,
     MedianPositionValue,
-    MaxLeverage
+    MaxLeverage,
+    Markout
 )
 
 __all__ = (
@@ -46,5 +50,28 @@ __all__ = (
     'MaxPositionValue',
     'MeanPositionValue',
     'MedianPositionValue',
-    'MaxLeverage'
+    'MaxLeverage',
+    'Markout',
+
+    'markout',
+    'mid_price_series'
 )
+
+# The markout analytics are loaded on first access, since they require Numba.
+_LAZY_ATTRS = {
+    'markout': '.markout',
+    'mid_price_series': '.markout',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
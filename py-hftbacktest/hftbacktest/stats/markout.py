@@ -0,0 +1,267 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import polars as pl
+from numba import njit
+from numpy.typing import NDArray
+
+from ..types import (
+    BUY_EVENT,
+    DEPTH_BBO_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    EXCH_EVENT,
+    LOCAL_EVENT,
+    SELL_EVENT,
+    EVENT_ARRAY
+)
+
+DEFAULT_HORIZONS = (1_000_000_000, 10_000_000_000, 60_000_000_000)
+
+# The number of price levels above which the book cannot be built on dense arrays without specifying the range.
+_MAX_LEVELS = 50_000_000
+
+
+@njit
+def _tick_range(data: EVENT_ARRAY, tick_size: float, flag: int) -> Tuple[int, int]:
+    min_tick = np.iinfo(np.int64).max
+    max_tick = np.iinfo(np.int64).min
+    for row_num in range(len(data)):
+        ev = data[row_num].ev
+        kind = ev & 0xff
+        if ev & flag == flag and (kind == DEPTH_EVENT or kind == DEPTH_SNAPSHOT_EVENT or kind == DEPTH_BBO_EVENT):
+            tick = int(round(data[row_num].px / tick_size))
+            min_tick = min(min_tick, tick)
+            max_tick = max(max_tick, tick)
+    return min_tick, max_tick
+
+
+@njit
+def _clear_bid(bid_qty: NDArray, best_bid: int, upto: int) -> int:
+    # Clears the bids from the best bid down to the index ``upto``, and returns the new best bid.
+    for i in range(max(upto, 0), best_bid + 1):
+        bid_qty[i] = 0.0
+    best_bid = min(best_bid, upto - 1)
+    while best_bid >= 0 and bid_qty[best_bid] == 0.0:
+        best_bid -= 1
+    return best_bid
+
+
+@njit
+def _clear_ask(ask_qty: NDArray, best_ask: int, upto: int) -> int:
+    # Clears the asks from the best ask up to the index ``upto``, and returns the new best ask.
+    for i in range(best_ask, min(upto, len(ask_qty) - 1) + 1):
+        ask_qty[i] = 0.0
+    best_ask = max(best_ask, upto + 1)
+    while best_ask < len(ask_qty) and ask_qty[best_ask] == 0.0:
+        best_ask += 1
+    return best_ask
+
+
+@njit
+def _update_mid(
+        data: EVENT_ARRAY,
+        tick_size: float,
+        flag: int,
+        local: bool,
+        base_tick: int,
+        bid_qty: NDArray,
+        ask_qty: NDArray,
+        best: NDArray,
+        out_ts: NDArray,
+        out_mid: NDArray,
+        num_out: int
+) -> int:
+    best_bid = best[0]
+    best_ask = best[1]
+    num_levels = len(bid_qty)
+    for row_num in range(len(data)):
+        row = data[row_num]
+        ev = row.ev
+        if ev & flag != flag:
+            continue
+        kind = ev & 0xff
+        if kind == DEPTH_EVENT or kind == DEPTH_SNAPSHOT_EVENT or kind == DEPTH_BBO_EVENT:
+            i = int(round(row.px / tick_size)) - base_tick
+            if i < 0 or i >= num_levels:
+                continue
+            if ev & BUY_EVENT == BUY_EVENT:
+                bid_qty[i] = row.qty
+                if row.qty > 0.0:
+                    best_bid = max(best_bid, i)
+                elif i == best_bid:
+                    best_bid = _clear_bid(bid_qty, best_bid, i)
+            elif ev & SELL_EVENT == SELL_EVENT:
+                ask_qty[i] = row.qty
+                if row.qty > 0.0:
+                    best_ask = min(best_ask, i)
+                elif i == best_ask:
+                    best_ask = _clear_ask(ask_qty, best_ask, i)
+        elif kind == DEPTH_CLEAR_EVENT:
+            if ev & BUY_EVENT == BUY_EVENT:
+                upto = int(round(row.px / tick_size)) - base_tick if np.isfinite(row.px) else -1
+                best_bid = _clear_bid(bid_qty, best_bid, upto if upto >= 0 else 0)
+            elif ev & SELL_EVENT == SELL_EVENT:
+                upto = int(round(row.px / tick_size)) - base_tick if np.isfinite(row.px) else num_levels
+                best_ask = _clear_ask(ask_qty, best_ask, upto if upto < num_levels else num_levels - 1)
+            else:
+                best_bid = _clear_bid(bid_qty, best_bid, 0)
+                best_ask = _clear_ask(ask_qty, best_ask, num_levels - 1)
+        else:
+            continue
+
+        if best_bid >= 0 and best_ask < num_levels:
+            mid = (best_bid + best_ask + 2 * base_tick) * tick_size / 2.0
+        else:
+            mid = np.nan
+        ts = row.local_ts if local else row.exch_ts
+        if num_out > 0 and out_ts[num_out - 1] >= ts:
+            # Keeps the last mid-price among the events with the same timestamp, and the series sorted even if the
+            # timestamps are slightly out of order.
+            out_mid[num_out - 1] = mid
+        elif num_out == 0 or not (out_mid[num_out - 1] == mid or (np.isnan(mid) and np.isnan(out_mid[num_out - 1]))):
+            out_ts[num_out] = ts
+            out_mid[num_out] = mid
+            num_out += 1
+    best[0] = best_bid
+    best[1] = best_ask
+    return num_out
+
+
+def mid_price_series(
+        feed: EVENT_ARRAY | List[EVENT_ARRAY],
+        tick_size: float,
+        local: bool = False,
+        roi: Tuple[float, float] | None = None
+) -> Tuple[NDArray, NDArray]:
+    """
+    Reconstructs the mid-price series from the feed data in a single compiled pass.
+
+    Args:
+        feed: The feed data in :obj:`event_dtype <hftbacktest.types.event_dtype>`, or a list of consecutive feed data,
+              such as daily files loaded by :func:`load_data <hftbacktest.data.load_data>`.
+        tick_size: The tick size of the asset.
+        local: If ``True``, the book is built from the local events and the series is indexed by the local timestamp;
+               otherwise, from the exchange events by the exchange timestamp.
+        roi: The price range within which the book is built. The levels outside of the range are ignored. If ``None``,
+             the range of the prices in the feed data is used.
+
+    Returns:
+        The timestamps at which the mid-price changes and the mid-prices, which are ``nan`` while either side of the
+        book is empty.
+    """
+    if isinstance(feed, np.ndarray):
+        feed = [feed]
+    flag = LOCAL_EVENT if local else EXCH_EVENT
+
+    if roi is None:
+        ranges = [_tick_range(data, tick_size, flag) for data in feed]
+        base_tick = min(r[0] for r in ranges)
+        max_tick = max(r[1] for r in ranges)
+        if base_tick > max_tick:
+            return np.empty(0, np.int64), np.empty(0, np.float64)
+    else:
+        base_tick = int(round(roi[0] / tick_size))
+        max_tick = int(round(roi[1] / tick_size))
+    num_levels = max_tick - base_tick + 1
+    if num_levels > _MAX_LEVELS:
+        raise ValueError(f'The price range spans {num_levels} ticks. Specify roi to limit it.')
+
+    bid_qty = np.zeros(num_levels, np.float64)
+    ask_qty = np.zeros(num_levels, np.float64)
+    best = np.array([-1, num_levels], np.int64)
+
+    timestamps = []
+    mids = []
+    for data in feed:
+        out_ts = np.empty(len(data), np.int64)
+        out_mid = np.empty(len(data), np.float64)
+        num_out = _update_mid(data, tick_size, flag, local, base_tick, bid_qty, ask_qty, best, out_ts, out_mid, 0)
+        timestamps.append(out_ts[:num_out])
+        mids.append(out_mid[:num_out])
+    return np.concatenate(timestamps), np.concatenate(mids)
+
+
+def horizon_name(horizon: int) -> str:
+    for unit, scale in (('s', 1_000_000_000), ('ms', 1_000_000), ('us', 1_000)):
+        if horizon % scale == 0:
+            return f'{horizon // scale}{unit}'
+    return f'{horizon}ns'
+
+
+def markout(
+        fills: NDArray | pl.DataFrame,
+        feed: EVENT_ARRAY | List[EVENT_ARRAY],
+        horizons: Sequence[int] = DEFAULT_HORIZONS,
+        tick_size: float | None = None,
+        local: bool = False,
+        roi: Tuple[float, float] | None = None
+) -> pl.DataFrame:
+    """
+    Computes the markouts of the fills, which are the changes of the mid-price from the fill price over the horizons
+    after the fills, in the direction of the fills. Persistently negative markouts indicate adverse selection.
+
+    The mid-price series is reconstructed from the feed once, and the mid-prices at all horizons are looked up by
+    binary search, so it scales to feeds of hundreds of millions of events.
+
+    **Example**
+
+    .. code-block:: python
+
+        from hftbacktest.stats import markout
+
+        df = markout(fill_recorder.fills(0), feed, horizons=[1_000_000_000, 10_000_000_000])
+        df.select(pl.col('^markout_.*$').mean())
+
+    Args:
+        fills: The fills in :obj:`order_record_dtype <hftbacktest.types.order_record_dtype>` as recorded by
+               :class:`FillRecorder <hftbacktest.recorder.FillRecorder>`, or its DataFrame. Records without a fill,
+               that is, with a zero ``fill_qty``, are ignored.
+        feed: The feed data of the asset in :obj:`event_dtype <hftbacktest.types.event_dtype>`, or a list of
+              consecutive feed data.
+        horizons: The horizons in nanoseconds, or in the unit of the timestamps.
+        tick_size: The tick size of the asset. If ``None``, the tick size of the fills is used.
+        local: If ``True``, the markouts are measured from the local receipt of the fill responses on the mid-price
+               seen locally; otherwise, from the fills at the exchange on the exchange's mid-price. The local receipt
+               time of a fill is approximated by the time at which it was recorded.
+        roi: The price range within which the book is built. See :func:`mid_price_series`.
+
+    Returns:
+        A DataFrame with a row for each fill with the columns ``timestamp``, ``side``, ``price``, ``qty``, ``maker``,
+        ``mid`` at the fill, and for each horizon, ``markout_{horizon}`` in price units and ``markout_{horizon}_bps``
+        in basis points of the fill price, such as ``markout_1s`` and ``markout_1s_bps``. The markouts are ``null``
+        if the mid-price is unavailable at the horizon.
+    """
+    if isinstance(fills, pl.DataFrame):
+        fills = fills.to_numpy(structured=True)
+    fills = fills[fills['fill_qty'] > 0]
+    if tick_size is None:
+        if len(fills) == 0:
+            raise ValueError('tick_size should be specified if there is no fill.')
+        tick_size = float(fills['tick_size'][0])
+
+    mid_ts, mid = mid_price_series(feed, tick_size, local, roi)
+
+    timestamp = fills['timestamp'] if local else fills['exch_timestamp']
+    side = fills['side'].astype(np.float64)
+    price = fills['exec_price_tick'] * fills['tick_size']
+
+    def mid_at(ts: NDArray) -> NDArray:
+        index = np.searchsorted(mid_ts, ts, side='right') - 1
+        return np.where(index >= 0, mid[np.maximum(index, 0)], np.nan)
+
+    columns = {
+        'timestamp': timestamp,
+        'side': fills['side'],
+        'price': price,
+        'qty': fills['fill_qty'],
+        'maker': fills['maker'].astype(bool),
+        'mid': mid_at(timestamp),
+    }
+    for horizon in horizons:
+        name = horizon_name(horizon)
+        value = side * (mid_at(timestamp + horizon) - price)
+        columns[f'markout_{name}'] = value
+        columns[f'markout_{name}_bps'] = value / price * 10_000
+    return pl.DataFrame(columns).fill_nan(None)
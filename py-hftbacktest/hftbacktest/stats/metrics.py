@@ -1,10 +1,13 @@
 import warnings
 from abc import ABC, abstractmethod
-from typing import Mapping, Dict, Any
+from typing import Mapping, Dict, Any, List, Sequence, Tuple
 
 import polars as pl
 import numpy as np
+from numpy.typing import NDArray
+
 from .utils import get_total_days, get_num_samples_per_day
+from ..types import EVENT_ARRAY
 
 
 class Metric(ABC):
@@ -291,3 +294,64 @@ class MaxLeverage(Metric):
 
     def compute(self, df: pl.DataFrame, context: Dict[str, Any]) -> Mapping[str, Any]:
         return {self.name: (df['position'].abs() * df['price']).max() / self.book_size}
+
+
+class Markout(Metric):
+    """
+    Markouts of the fills in basis points, averaged with the fill quantities as weights, for each horizon. The markouts
+    are computed once by :func:`markout <hftbacktest.stats.markout>` when this metric is constructed, and each period
+    takes the fills within it.
+
+    Parameters:
+        fills: The fills in :obj:`order_record_dtype <hftbacktest.types.order_record_dtype>` as recorded by
+               :class:`FillRecorder <hftbacktest.recorder.FillRecorder>`, or its DataFrame.
+        feed: The feed data of the asset, or a list of consecutive feed data.
+        horizons: The horizons in nanoseconds.
+        name: The prefix of the names of this metric, followed by the horizon, such as `Markout1s`. The default value is
+              `Markout`.
+        tick_size: The tick size of the asset. If ``None``, the tick size of the fills is used.
+        local: Measures the markouts on the local side. See :func:`markout <hftbacktest.stats.markout>`.
+        roi: The price range within which the book is built. See :func:`markout <hftbacktest.stats.markout>`.
+        time_unit: The unit of the timestamps, which should be the same as the time unit of the record.
+    """
+
+    def __init__(
+            self,
+            fills: NDArray | pl.DataFrame,
+            feed: EVENT_ARRAY | List[EVENT_ARRAY],
+            horizons: Sequence[int] = (1_000_000_000, 10_000_000_000, 60_000_000_000),
+            name: str = None,
+            tick_size: float | None = None,
+            local: bool = False,
+            roi: Tuple[float, float] | None = None,
+            time_unit: str = 'ns'
+    ):
+        # Imported here since it compiles the book reconstruction with Numba.
+        from .markout import horizon_name, markout
+
+        self.name = name if name is not None else 'Markout'
+        self.horizons = [horizon_name(horizon) for horizon in horizons]
+        self.markouts = markout(fills, feed, horizons, tick_size, local, roi).with_columns(
+            pl.from_epoch('timestamp', time_unit=time_unit)
+        )
+
+    def compute(self, df: pl.DataFrame, context: Dict[str, Any]) -> Mapping[str, Any]:
+        start = df['timestamp'][0]
+        end = df['timestamp'][-1]
+        # The timestamps of the resampled record are the start of the intervals, so the fills in the last interval are
+        # included by extending the period by the interval.
+        interval = df['timestamp'].diff().median() if len(df) > 1 else None
+        if interval:
+            fills = self.markouts.filter(pl.col('timestamp').is_between(start, end + interval, closed='left'))
+        else:
+            fills = self.markouts.filter(pl.col('timestamp').is_between(start, end))
+
+        ret = {}
+        for horizon in self.horizons:
+            value = fills.select(
+                pl.col(f'markout_{horizon}_bps'), pl.col('qty')
+            ).drop_nulls()
+            qty = value['qty'].sum()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret[f'{self.name}{horizon}'] = np.divide((value[f'markout_{horizon}_bps'] * value['qty']).sum(), qty)
+        return ret
@@ -87,6 +87,16 @@ event_dtype = np.dtype(
 
 EVENT_ARRAY = np.ndarray[Any, event_dtype]
 
+order_latency_dtype = np.dtype(
+    [
+        ('req_ts', 'i8'),
+        ('exch_ts', 'i8'),
+        ('resp_ts', 'i8'),
+        ('_padding', 'i8')
+    ],
+    align=True
+)
+
 order_dtype = np.dtype(
     [
         ('qty', 'f8'),
@@ -123,3 +133,74 @@ record_dtype = np.dtype(
     ],
     align=True
 )
+
+# Every field is 8 bytes wide so that the records can be written by
+# :func:`write_columnar <hftbacktest.data.utils.columnar.write_columnar>`.
+order_record_dtype = np.dtype(
+    [
+        ('timestamp', 'i8'),
+        ('asset_no', 'u8'),
+        ('order_id', 'u8'),
+        ('side', 'i8'),
+        ('price_tick', 'i8'),
+        ('tick_size', 'f8'),
+        ('qty', 'f8'),
+        ('leaves_qty', 'f8'),
+        ('fill_qty', 'f8'),
+        ('exec_qty', 'f8'),
+        ('exec_price_tick', 'i8'),
+        ('maker', 'u8'),
+        ('status', 'u8'),
+        ('req', 'u8'),
+        ('order_type', 'u8'),
+        ('time_in_force', 'u8'),
+        ('exch_timestamp', 'i8'),
+        ('local_timestamp', 'i8')
+    ],
+    align=True
+)
+
+profile_stats_dtype = np.dtype(
+    [
+        ('asset_no', 'u8'),
+        ('stage', 'u8'),
+        ('count', 'u8'),
+        ('elapsed', 'u8')
+    ],
+    align=True
+)
+
+PROFILE_STATS_ARRAY = np.ndarray[Any, profile_stats_dtype]
+
+# The names of the stages in ``profile_stats_dtype``, indexed by ``stage``. The asset number of the records that are not
+# specific to an asset, such as ``strategy``, is :const:`ALL_ASSETS`.
+PROFILE_STAGES = (
+    'local_depth',
+    'local_trade',
+    'local_depth_clear',
+    'local_depth_snapshot',
+    'local_depth_bbo',
+    'local_add_order',
+    'local_cancel_order',
+    'local_modify_order',
+    'local_fill',
+    'local_other',
+    'exch_depth',
+    'exch_trade',
+    'exch_depth_clear',
+    'exch_depth_snapshot',
+    'exch_depth_bbo',
+    'exch_add_order',
+    'exch_cancel_order',
+    'exch_modify_order',
+    'exch_fill',
+    'exch_other',
+    'order_response',
+    'order_request',
+    'queue_model',
+    'order_latency',
+    'data_load',
+    'submit',
+    'cancel',
+    'strategy',
+)
@@ -3,14 +3,16 @@
 use std::{collections::HashMap, mem};
 
 use hftbacktest::{
-    backtest::{Backtest, BacktestError},
-    depth::{HashMapMarketDepth, ROIVectorMarketDepth},
+    backtest::{profile::ProfileRecord, Backtest, BacktestError},
+    depth::{BTreeMarketDepth, FusedHashMapMarketDepth, HashMapMarketDepth, ROIVectorMarketDepth},
     prelude::{Bot, Event, Order, StateValues},
     types::{OrdType, TimeInForce},
 };
 
 type HashMapMarketDepthBacktest = Backtest<HashMapMarketDepth>;
 type ROIVectorMarketDepthBacktest = Backtest<ROIVectorMarketDepth>;
+type BTreeMarketDepthBacktest = Backtest<BTreeMarketDepth>;
+type FusedHashMapMarketDepthBacktest = Backtest<FusedHashMapMarketDepth>;
 
 #[no_mangle]
 pub extern "C" fn hashmapbt_current_timestamp(hbt_ptr: *const HashMapMarketDepthBacktest) -> i64 {
@@ -249,6 +251,19 @@ pub extern "C" fn hashmapbt_clear_last_trades(
     }
 }
 
+#[no_mangle]
+pub extern "C" fn hashmapbt_profile_stats(
+    hbt_ptr: *const HashMapMarketDepthBacktest,
+    len_ptr: *mut usize,
+) -> *const ProfileRecord {
+    let hbt = unsafe { &*hbt_ptr };
+    let stats = hbt.profile_stats();
+    unsafe {
+        *len_ptr = stats.len();
+    }
+    stats.as_ptr()
+}
+
 #[no_mangle]
 pub extern "C" fn hashmapbt_clear_inactive_orders(
     hbt_ptr: *mut HashMapMarketDepthBacktest,
@@ -578,6 +593,19 @@ pub extern "C" fn roivecbt_clear_last_trades(
     }
 }
 
+#[no_mangle]
+pub extern "C" fn roivecbt_profile_stats(
+    hbt_ptr: *const ROIVectorMarketDepthBacktest,
+    len_ptr: *mut usize,
+) -> *const ProfileRecord {
+    let hbt = unsafe { &*hbt_ptr };
+    let stats = hbt.profile_stats();
+    unsafe {
+        *len_ptr = stats.len();
+    }
+    stats.as_ptr()
+}
+
 #[no_mangle]
 pub extern "C" fn roivecbt_clear_inactive_orders(
     hbt_ptr: *mut ROIVectorMarketDepthBacktest,
@@ -650,3 +678,685 @@ pub extern "C" fn roivecbt_order_latency(
         },
     }
 }
+
+#[no_mangle]
+pub extern "C" fn btreebt_current_timestamp(hbt_ptr: *const BTreeMarketDepthBacktest) -> i64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.current_timestamp()
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_depth(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const BTreeMarketDepth {
+    let hbt = unsafe { &*hbt_ptr };
+    let depth = hbt.depth(asset_no);
+    depth as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_last_trades(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    len_ptr: *mut usize,
+) -> *const Event {
+    let hbt = unsafe { &*hbt_ptr };
+    let trade = hbt.last_trades(asset_no);
+    unsafe {
+        *len_ptr = trade.len();
+    }
+    trade.as_ptr() as *mut _
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_position(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> f64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.position(asset_no)
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_close(hbt_ptr: *mut BTreeMarketDepthBacktest) -> i64 {
+    let mut hbt = unsafe { Box::from_raw(hbt_ptr) };
+    match hbt.close() {
+        Ok(()) => 0,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_elapse(hbt_ptr: *mut BTreeMarketDepthBacktest, duration: i64) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.elapse(duration) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_elapse_bt(hbt_ptr: *mut BTreeMarketDepthBacktest, duration: i64) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.elapse_bt(duration) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_num_assets(hbt_ptr: *const BTreeMarketDepthBacktest) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.num_assets()
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_wait_order_response(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.wait_order_response(asset_no, order_id, timeout) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_wait_next_feed(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    include_resp: bool,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.wait_next_feed(include_resp, timeout) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_submit_buy_order(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let tif = unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) };
+    match hbt.submit_buy_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        tif,
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_submit_sell_order(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.submit_sell_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) },
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_cancel(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.cancel(asset_no, order_id, wait) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_clear_last_trades(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_last_trades(None);
+    } else {
+        hbt.clear_last_trades(Some(asset_no));
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_profile_stats(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    len_ptr: *mut usize,
+) -> *const ProfileRecord {
+    let hbt = unsafe { &*hbt_ptr };
+    let stats = hbt.profile_stats();
+    unsafe {
+        *len_ptr = stats.len();
+    }
+    stats.as_ptr()
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_clear_inactive_orders(
+    hbt_ptr: *mut BTreeMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_inactive_orders(None);
+    } else {
+        hbt.clear_inactive_orders(Some(asset_no));
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_orders(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const HashMap<u64, Order> {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.orders(asset_no) as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_state_values(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+) -> *const StateValues {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.state_values(asset_no) as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_feed_latency(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    exch_ts: *mut i64,
+    local_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.feed_latency(asset_no) {
+        None => false,
+        Some((exch_ts_, local_ts_)) => {
+            unsafe {
+                *exch_ts = exch_ts_;
+                *local_ts = local_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_order_latency(
+    hbt_ptr: *const BTreeMarketDepthBacktest,
+    asset_no: usize,
+    req_ts: *mut i64,
+    exch_ts: *mut i64,
+    resp_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.order_latency(asset_no) {
+        None => false,
+        Some((req_ts_, exch_ts_, resp_ts_)) => {
+            unsafe {
+                *req_ts = req_ts_;
+                *exch_ts = exch_ts_;
+                *resp_ts = resp_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn btreebt_goto_end(hbt_ptr: *mut BTreeMarketDepthBacktest) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.goto_end() {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_current_timestamp(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+) -> i64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.current_timestamp()
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_depth(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) -> *const FusedHashMapMarketDepth {
+    let hbt = unsafe { &*hbt_ptr };
+    let depth = hbt.depth(asset_no);
+    depth as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_last_trades(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    len_ptr: *mut usize,
+) -> *const Event {
+    let hbt = unsafe { &*hbt_ptr };
+    let trade = hbt.last_trades(asset_no);
+    unsafe {
+        *len_ptr = trade.len();
+    }
+    trade.as_ptr() as *mut _
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_position(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) -> f64 {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.position(asset_no)
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_close(hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest) -> i64 {
+    let mut hbt = unsafe { Box::from_raw(hbt_ptr) };
+    match hbt.close() {
+        Ok(()) => 0,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_elapse(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    duration: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.elapse(duration) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_elapse_bt(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    duration: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.elapse_bt(duration) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_num_assets(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+) -> usize {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.num_assets()
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_wait_order_response(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.wait_order_response(asset_no, order_id, timeout) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_wait_next_feed(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    include_resp: bool,
+    timeout: i64,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.wait_next_feed(include_resp, timeout) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_submit_buy_order(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    let tif = unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) };
+    match hbt.submit_buy_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        tif,
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_submit_sell_order(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    price: f64,
+    qty: f64,
+    time_in_force: u8,
+    order_type: u8,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.submit_sell_order(
+        asset_no,
+        order_id,
+        price,
+        qty,
+        unsafe { mem::transmute::<u8, TimeInForce>(time_in_force) },
+        unsafe { mem::transmute::<u8, OrdType>(order_type) },
+        wait,
+    ) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_cancel(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    order_id: u64,
+    wait: bool,
+) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.cancel(asset_no, order_id, wait) {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_clear_last_trades(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_last_trades(None);
+    } else {
+        hbt.clear_last_trades(Some(asset_no));
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_profile_stats(
+    hbt_ptr: *const FusedHashMapMarketDepthBacktest,
+    len_ptr: *mut usize,
+) -> *const ProfileRecord {
+    let hbt = unsafe { &*hbt_ptr };
+    let stats = hbt.profile_stats();
+    unsafe {
+        *len_ptr = stats.len();
+    }
+    stats.as_ptr()
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_clear_inactive_orders(
+    hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) {
+    let hbt = unsafe { &mut *hbt_ptr };
+    if asset_no == usize::MAX {
+        hbt.clear_inactive_orders(None);
+    } else {
+        hbt.clear_inactive_orders(Some(asset_no));
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_orders(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) -> *const HashMap<u64, Order> {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.orders(asset_no) as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_state_values(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+) -> *const StateValues {
+    let hbt = unsafe { &*hbt_ptr };
+    hbt.state_values(asset_no) as *const _
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_feed_latency(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    exch_ts: *mut i64,
+    local_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.feed_latency(asset_no) {
+        None => false,
+        Some((exch_ts_, local_ts_)) => {
+            unsafe {
+                *exch_ts = exch_ts_;
+                *local_ts = local_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_order_latency(
+    hbt_ptr: *const FusedFusedHashMapMarketDepthBacktest,
+    asset_no: usize,
+    req_ts: *mut i64,
+    exch_ts: *mut i64,
+    resp_ts: *mut i64,
+) -> bool {
+    let hbt = unsafe { &*hbt_ptr };
+    match hbt.order_latency(asset_no) {
+        None => false,
+        Some((req_ts_, exch_ts_, resp_ts_)) => {
+            unsafe {
+                *req_ts = req_ts_;
+                *exch_ts = exch_ts_;
+                *resp_ts = resp_ts_;
+            }
+            true
+        },
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn fusedbt_goto_end(hbt_ptr: *mut FusedFusedHashMapMarketDepthBacktest) -> i64 {
+    let hbt = unsafe { &mut *hbt_ptr };
+    match hbt.goto_end() {
+        Ok(true) => 0,
+        Ok(false) => 1,
+        Err(BacktestError::OrderIdExist) => 10,
+        Err(BacktestError::OrderRequestInProcess) => 11,
+        Err(BacktestError::OrderNotFound) => 12,
+        Err(BacktestError::InvalidOrderRequest) => 13,
+        Err(BacktestError::InvalidOrderStatus) => 14,
+        Err(BacktestError::EndOfData) => 15,
+        Err(BacktestError::DataError(_)) => 100,
+    }
+}
@@ -3,7 +3,7 @@
 use std::mem::forget;
 
 use hftbacktest::{
-    depth::HashMapMarketDepth,
+    depth::{BTreeMarketDepth, FusedHashMapMarketDepth, HashMapMarketDepth},
     prelude::{ApplySnapshot, Event, MarketDepth, ROIVectorMarketDepth},
 };
 
@@ -136,6 +136,18 @@ pub extern "C" fn roivecdepth_ask_qty_at_tick(
     depth.ask_qty_at_tick(price_tick)
 }
 
+#[no_mangle]
+pub extern "C" fn roivecdepth_roi_lb_tick(ptr: *const ROIVectorMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.roi_lb
+}
+
+#[no_mangle]
+pub extern "C" fn roivecdepth_roi_ub_tick(ptr: *const ROIVectorMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.roi_ub
+}
+
 #[no_mangle]
 pub extern "C" fn roivecdepth_bid_depth(
     ptr: *const ROIVectorMarketDepth,
@@ -155,3 +167,147 @@ pub extern "C" fn roivecdepth_ask_depth(
     unsafe { *len = depth.ask_depth().len() }
     depth.ask_depth().as_ptr()
 }
+
+#[no_mangle]
+pub extern "C" fn btreedepth_best_bid_tick(ptr: *const BTreeMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid_tick()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_best_ask_tick(ptr: *const BTreeMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask_tick()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_best_bid(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_best_ask(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_tick_size(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.tick_size()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_lot_size(ptr: *const BTreeMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.lot_size()
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_bid_qty_at_tick(ptr: *const BTreeMarketDepth, price_tick: i64) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.bid_qty_at_tick(price_tick)
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_ask_qty_at_tick(ptr: *const BTreeMarketDepth, price_tick: i64) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.ask_qty_at_tick(price_tick)
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_snapshot(
+    ptr: *const BTreeMarketDepth,
+    len: *mut usize,
+) -> *const Event {
+    let depth = unsafe { &*ptr };
+    let mut snapshot = depth.snapshot();
+    snapshot.shrink_to_fit();
+    let ptr = snapshot.as_ptr();
+    unsafe {
+        *len = snapshot.len();
+        forget(snapshot);
+    }
+    ptr
+}
+
+#[no_mangle]
+pub extern "C" fn btreedepth_snapshot_free(event_ptr: *mut Event, len: usize) {
+    let _ = unsafe { Vec::from_raw_parts(event_ptr, len, len) };
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_best_bid_tick(ptr: *const FusedHashMapMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid_tick()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_best_ask_tick(ptr: *const FusedHashMapMarketDepth) -> i64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask_tick()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_best_bid(ptr: *const FusedHashMapMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_bid()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_best_ask(ptr: *const FusedHashMapMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.best_ask()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_tick_size(ptr: *const FusedHashMapMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.tick_size()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_lot_size(ptr: *const FusedHashMapMarketDepth) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.lot_size()
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_bid_qty_at_tick(
+    ptr: *const FusedHashMapMarketDepth,
+    price_tick: i64,
+) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.bid_qty_at_tick(price_tick)
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_ask_qty_at_tick(
+    ptr: *const FusedHashMapMarketDepth,
+    price_tick: i64,
+) -> f64 {
+    let depth = unsafe { &*ptr };
+    depth.ask_qty_at_tick(price_tick)
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_snapshot(
+    ptr: *const FusedHashMapMarketDepth,
+    len: *mut usize,
+) -> *const Event {
+    let depth = unsafe { &*ptr };
+    let mut snapshot = depth.snapshot();
+    snapshot.shrink_to_fit();
+    let ptr = snapshot.as_ptr();
+    unsafe {
+        *len = snapshot.len();
+        forget(snapshot);
+    }
+    ptr
+}
+
+#[no_mangle]
+pub extern "C" fn fuseddepth_snapshot_free(event_ptr: *mut Event, len: usize) {
+    let _ = unsafe { Vec::from_raw_parts(event_ptr, len, len) };
+}
@@ -1,4 +1,10 @@
-use std::{ffi::c_void, mem::size_of, ptr::slice_from_raw_parts_mut};
+use std::{
+    ffi::c_void,
+    mem::size_of,
+    ptr::slice_from_raw_parts_mut,
+    sync::OnceLock,
+    time::Instant,
+};
 
 pub use backtest::*;
 pub use depth::*;
@@ -7,7 +13,7 @@ use hftbacktest::live::{Instrument, LiveBotBuilder};
 use hftbacktest::{
     backtest::{
         assettype::{InverseAsset, LinearAsset},
-        data::{read_npz_file, Data, DataPtr, FeedLatencyAdjustment, Reader},
+        data::{read_data_file, Data, DataPtr, FeedLatencyAdjustment, Reader},
         models::{
             CommonFees,
             ConstantLatency,
@@ -39,7 +45,9 @@ use hftbacktest::{
         Asset,
         Backtest,
         DataSource,
+        EventQueueKind,
     },
+    depth::{BTreeMarketDepth, FusedHashMapMarketDepth},
     prelude::{ApplySnapshot, Event, HashMapMarketDepth, ROIVectorMarketDepth},
 };
 use hftbacktest_derive::build_asset;
@@ -70,6 +78,7 @@ pub enum LatencyModel {
     IntpOrderLatency {
         data: Vec<DataSource<OrderLatencyRow>>,
         latency_offset: i64,
+        lookup_resolution: i64,
     },
 }
 
@@ -110,10 +119,14 @@ pub struct BacktestAsset {
     last_trades_cap: usize,
     roi_lb: f64,
     roi_ub: f64,
+    roi_recenter_threshold: Option<f64>,
     initial_snapshot: Option<DataSource<Event>>,
     fee_model: FeeModel,
     latency_offset: i64,
     parallel_load: bool,
+    prefetch: usize,
+    block_size: usize,
+    prefetch_depth: usize,
 }
 
 unsafe impl Send for BacktestAsset {}
@@ -139,12 +152,16 @@ impl BacktestAsset {
             last_trades_cap: 0,
             roi_lb: 0.0,
             roi_ub: 0.0,
+            roi_recenter_threshold: None,
             initial_snapshot: None,
             fee_model: FeeModel::TradingValueFeeModel {
                 fees: CommonFees::new(0.0, 0.0),
             },
             latency_offset: 0,
             parallel_load: true,
+            prefetch: 1,
+            block_size: 0,
+            prefetch_depth: 2,
         }
     }
 
@@ -159,6 +176,43 @@ impl BacktestAsset {
         slf
     }
 
+    /// Sets the number of files loaded in advance if `parallel_load` is enabled. The files are
+    /// loaded by a pool of loader threads shared by all the assets, so prefetching more files hides
+    /// the loading time at file boundaries in backtests over many assets with short files, at the
+    /// cost of holding up to that many more files in memory per asset.
+    ///
+    /// Args:
+    ///     prefetch: the number of files loaded in advance. The default value is `1`.
+    pub fn prefetch(mut slf: PyRefMut<Self>, prefetch: usize) -> PyRefMut<Self> {
+        slf.prefetch = prefetch;
+        slf
+    }
+
+    /// Sets the number of events in a block to read the feed data files in blocks instead of as a
+    /// whole. Each file is streamed by a separate thread a few blocks ahead of the backtest, so
+    /// the memory usage is bounded by the block size rather than by the size of the files, which
+    /// matters when backtesting many assets. If `parallel_load` is enabled, the first blocks of
+    /// the next file are also loaded in advance.
+    ///
+    /// Args:
+    ///     block_size: the number of events in a block. The default value is `0`, which reads each
+    ///                 file as a whole.
+    pub fn block_size(mut slf: PyRefMut<Self>, block_size: usize) -> PyRefMut<Self> {
+        slf.block_size = block_size;
+        slf
+    }
+
+    /// Sets the number of blocks loaded in advance of the block being read when reading the feed
+    /// data files in blocks. A larger depth absorbs slower storage at the cost of holding more
+    /// blocks in memory. Only valid if `block_size` is set.
+    ///
+    /// Args:
+    ///     prefetch_depth: the number of blocks loaded in advance. The default value is `2`.
+    pub fn prefetch_depth(mut slf: PyRefMut<Self>, prefetch_depth: usize) -> PyRefMut<Self> {
+        slf.prefetch_depth = prefetch_depth;
+        slf
+    }
+
     /// Sets the latency offset to adjust the feed latency by the specified amount. This is
     /// particularly useful in cross-exchange backtesting, where the feed data is collected from a
     /// different site than the one where the strategy is intended to run.
@@ -191,6 +245,26 @@ impl BacktestAsset {
         slf
     }
 
+    /// Makes the range of interest of the `ROIVectorMarketDepth <https://docs.rs/hftbacktest/latest/hftbacktest/depth/struct.ROIVectorMarketDepth.html>`_
+    /// a sliding window that follows the mid-price. The window keeps the width set by
+    /// :meth:`roi_lb` and :meth:`roi_ub`, and is recentered around the mid-price whenever the
+    /// mid-price drifts more than `threshold` away from its center. This allows a small range of
+    /// interest, which keeps the depth scans cache-friendly, regardless of where the price goes.
+    /// Only valid if `ROIVectorMarketDepthBacktest` is built.
+    ///
+    /// For Level-2 feeds, the quantities at the price levels entering the window are unknown
+    /// until the feed updates them, so the window should be wide enough to cover the levels your
+    /// strategy uses, plus the threshold.
+    ///
+    /// Args:
+    ///     threshold: the distance from the center of the range of interest, in price, that the
+    ///                mid-price may drift before the range of interest is recentered. It is
+    ///                clamped to less than half of the width.
+    pub fn roi_recentering(mut slf: PyRefMut<Self>, threshold: f64) -> PyRefMut<Self> {
+        slf.roi_recenter_threshold = Some(threshold);
+        slf
+    }
+
     pub fn add_file(mut slf: PyRefMut<Self>, data: String) -> PyRefMut<Self> {
         slf.data.push(DataSource::File(data));
         slf
@@ -253,10 +327,18 @@ impl BacktestAsset {
     ///                     specified amount. This is particularly useful in cross-exchange
     ///                     backtesting, where the feed data is collected from a different site than
     ///                     the one where the strategy is intended to run.
+    ///     lookup_resolution: the time resolution of the precomputed lookup grid, which makes
+    ///                        finding the latency for a timestamp nearly constant time on dense
+    ///                        latency data. The grid holds one entry per resolution over the span
+    ///                        of each file, so a coarse resolution such as one second is
+    ///                        recommended. The default value is `0`, which disables the grid; the
+    ///                        lookup then uses a galloping search.
+    #[pyo3(signature = (data, latency_offset, lookup_resolution = 0))]
     pub fn intp_order_latency(
         mut slf: PyRefMut<Self>,
         data: Vec<String>,
         latency_offset: i64,
+        lookup_resolution: i64,
     ) -> PyRefMut<Self> {
         slf.latency_model = LatencyModel::IntpOrderLatency {
             data: data
@@ -264,6 +346,7 @@ impl BacktestAsset {
                 .map(|file| DataSource::File(file.to_string()))
                 .collect(),
             latency_offset,
+            lookup_resolution,
         };
         slf
     }
@@ -273,12 +356,14 @@ impl BacktestAsset {
         data: usize,
         len: usize,
         latency_offset: i64,
+        lookup_resolution: i64,
     ) -> PyRefMut<Self> {
         let arr = slice_from_raw_parts_mut(data as *mut u8, len * size_of::<OrderLatencyRow>());
         let data = unsafe { Data::<OrderLatencyRow>::from_data_ptr(DataPtr::from_ptr(arr), 0) };
         slf.latency_model = LatencyModel::IntpOrderLatency {
             data: vec![DataSource::Data(data)],
             latency_offset,
+            lookup_resolution,
         };
         slf
     }
@@ -453,19 +538,40 @@ impl BacktestAsset {
     }
 }
 
+/// Returns the nanoseconds elapsed on a monotonic clock since the first call, for measuring the
+/// wall-clock time inside Numba functions, which cannot access a clock.
+#[no_mangle]
+pub extern "C" fn monotonic_ns() -> i64 {
+    static START: OnceLock<Instant> = OnceLock::new();
+    START.get_or_init(Instant::now).elapsed().as_nanos() as i64
+}
+
 #[pymodule]
 fn _hftbacktest(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(build_hashmap_backtest, m)?)?;
     m.add_function(wrap_pyfunction!(build_roivec_backtest, m)?)?;
+    m.add_function(wrap_pyfunction!(build_btree_backtest, m)?)?;
+    m.add_function(wrap_pyfunction!(build_fused_backtest, m)?)?;
     #[cfg(feature = "live")]
     m.add_function(wrap_pyfunction!(build_hashmap_livebot, m)?)?;
     #[cfg(feature = "live")]
     m.add_function(wrap_pyfunction!(build_roivec_livebot, m)?)?;
     m.add_class::<BacktestAsset>()?;
     m.add_class::<LiveInstrument>()?;
+    m.add("PROFILE_FEATURE", cfg!(feature = "profile"))?;
     Ok(())
 }
 
+fn parse_event_queue(event_queue: &str) -> PyResult<EventQueueKind> {
+    match event_queue {
+        "linear" => Ok(EventQueueKind::Linear),
+        "tournament_tree" => Ok(EventQueueKind::TournamentTree),
+        _ => Err(PyErr::new::<PyValueError, _>(format!(
+            "{event_queue} is an unsupported event queue."
+        ))),
+    }
+}
+
 type LogProbQueueModelFunc = LogProbQueueFunc;
 type LogProbQueueModel2Func = LogProbQueueFunc2;
 type PowerProbQueueModelFunc = PowerProbQueueFunc;
@@ -473,10 +579,19 @@ type PowerProbQueueModel2Func = PowerProbQueueFunc2;
 type PowerProbQueueModel3Func = PowerProbQueueFunc3;
 
 #[pyfunction]
-pub fn build_hashmap_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
-    let mut local = Vec::new();
-    let mut exch = Vec::new();
-    let mut readers = Vec::new();
+#[pyo3(signature = (assets, event_queue = "linear", partitions = 1))]
+pub fn build_hashmap_backtest(
+    assets: Vec<PyRefMut<BacktestAsset>>,
+    event_queue: &str,
+    partitions: usize,
+) -> PyResult<usize> {
+    // SAFETY: Each asset is built from a distinct `BacktestAsset` with its own processors and data
+    // reader, so the assets don't share state with each other.
+    let mut builder = unsafe {
+        Backtest::builder()
+            .event_queue(parse_event_queue(event_queue)?)
+            .partitions(partitions)
+    };
     for asset in assets {
         if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
             (&asset.queue_model, &asset.exch_kind)
@@ -500,7 +615,8 @@ pub fn build_hashmap_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<
                 },
                 IntpOrderLatency {
                     data,
-                    latency_offset
+                    latency_offset,
+                    lookup_resolution
                 }
             ],
             [
@@ -519,20 +635,29 @@ pub fn build_hashmap_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<
                 FlatPerTradeFeeModel { fees },
             ]
         );
-        local.push(asst.local);
-        exch.push(asst.exch);
-        readers.push(asst.reader);
+        builder = builder.add_asset(asst);
     }
 
-    let hbt = Backtest::new(local, exch, readers);
+    let hbt = builder
+        .build()
+        .map_err(|error| PyErr::new::<PyValueError, _>(error.to_string()))?;
     Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
 }
 
 #[pyfunction]
-pub fn build_roivec_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<usize> {
-    let mut local = Vec::new();
-    let mut exch = Vec::new();
-    let mut readers = Vec::new();
+#[pyo3(signature = (assets, event_queue = "linear", partitions = 1))]
+pub fn build_roivec_backtest(
+    assets: Vec<PyRefMut<BacktestAsset>>,
+    event_queue: &str,
+    partitions: usize,
+) -> PyResult<usize> {
+    // SAFETY: Each asset is built from a distinct `BacktestAsset` with its own processors and data
+    // reader, so the assets don't share state with each other.
+    let mut builder = unsafe {
+        Backtest::builder()
+            .event_queue(parse_event_queue(event_queue)?)
+            .partitions(partitions)
+    };
 
     for asset in assets {
         if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
@@ -557,7 +682,8 @@ pub fn build_roivec_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<u
                 },
                 IntpOrderLatency {
                     data,
-                    latency_offset
+                    latency_offset,
+                    lookup_resolution
                 }
             ],
             [
@@ -576,12 +702,143 @@ pub fn build_roivec_backtest(assets: Vec<PyRefMut<BacktestAsset>>) -> PyResult<u
                 FlatPerTradeFeeModel { fees },
             ]
         );
-        local.push(asst.local);
-        exch.push(asst.exch);
-        readers.push(asst.reader);
+        builder = builder.add_asset(asst);
     }
 
-    let hbt = Backtest::new(local, exch, readers);
+    let hbt = builder
+        .build()
+        .map_err(|error| PyErr::new::<PyValueError, _>(error.to_string()))?;
+    Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
+}
+
+#[pyfunction]
+#[pyo3(signature = (assets, event_queue = "linear", partitions = 1))]
+pub fn build_btree_backtest(
+    assets: Vec<PyRefMut<BacktestAsset>>,
+    event_queue: &str,
+    partitions: usize,
+) -> PyResult<usize> {
+    // SAFETY: Each asset is built from a distinct `BacktestAsset` with its own processors and data
+    // reader, so the assets don't share state with each other.
+    let mut builder = unsafe {
+        Backtest::builder()
+            .event_queue(parse_event_queue(event_queue)?)
+            .partitions(partitions)
+    };
+
+    for asset in assets {
+        if let (QueueModel::L3FIFOQueueModel {}, ExchangeKind::PartialFillExchange {}) =
+            (&asset.queue_model, &asset.exch_kind)
+        {
+            return PyResult::Err(PyErr::new::<PyValueError, _>(
+                "L3PartialFillExchange is unsupported.",
+            ));
+        }
+
+        let asst = build_asset!(
+            asset,
+            BTreeMarketDepth,
+            [
+                LinearAsset { contract_size },
+                InverseAsset { contract_size }
+            ],
+            [
+                ConstantLatency {
+                    entry_latency,
+                    resp_latency
+                },
+                IntpOrderLatency {
+                    data,
+                    latency_offset,
+                    lookup_resolution
+                }
+            ],
+            [
+                RiskAdverseQueueModel {},
+                LogProbQueueModel {},
+                LogProbQueueModel2 {},
+                PowerProbQueueModel { n },
+                PowerProbQueueModel2 { n },
+                PowerProbQueueModel3 { n },
+                L3FIFOQueueModel {}
+            ],
+            [NoPartialFillExchange {}, PartialFillExchange {}],
+            [
+                TradingValueFeeModel { fees },
+                TradingQtyFeeModel { fees },
+                FlatPerTradeFeeModel { fees },
+            ]
+        );
+        builder = builder.add_asset(asst);
+    }
+
+    let hbt = builder
+        .build()
+        .map_err(|error| PyErr::new::<PyValueError, _>(error.to_string()))?;
+    Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
+}
+
+#[pyfunction]
+#[pyo3(signature = (assets, event_queue = "linear", partitions = 1))]
+pub fn build_fused_backtest(
+    assets: Vec<PyRefMut<BacktestAsset>>,
+    event_queue: &str,
+    partitions: usize,
+) -> PyResult<usize> {
+    // SAFETY: Each asset is built from a distinct `BacktestAsset` with its own processors and data
+    // reader, so the assets don't share state with each other.
+    let mut builder = unsafe {
+        Backtest::builder()
+            .event_queue(parse_event_queue(event_queue)?)
+            .partitions(partitions)
+    };
+
+    for asset in assets {
+        if let QueueModel::L3FIFOQueueModel {} = &asset.queue_model {
+            return PyResult::Err(PyErr::new::<PyValueError, _>(
+                "FusedHashMapMarketDepth doesn't support L3FIFOQueueModel.",
+            ));
+        }
+
+        let asst = build_asset!(
+            asset,
+            FusedHashMapMarketDepth,
+            [
+                LinearAsset { contract_size },
+                InverseAsset { contract_size }
+            ],
+            [
+                ConstantLatency {
+                    entry_latency,
+                    resp_latency
+                },
+                IntpOrderLatency {
+                    data,
+                    latency_offset,
+                    lookup_resolution
+                }
+            ],
+            [
+                RiskAdverseQueueModel {},
+                LogProbQueueModel {},
+                LogProbQueueModel2 {},
+                PowerProbQueueModel { n },
+                PowerProbQueueModel2 { n },
+                PowerProbQueueModel3 { n }
+            ],
+            [NoPartialFillExchange {}, PartialFillExchange {}],
+            [
+                TradingValueFeeModel { fees },
+                TradingQtyFeeModel { fees },
+                FlatPerTradeFeeModel { fees },
+            ]
+        );
+        builder = builder.add_asset(asst);
+    }
+
+    let hbt = builder
+        .build()
+        .map_err(|error| PyErr::new::<PyValueError, _>(error.to_string()))?;
     Ok(Box::into_raw(Box::new(hbt)) as *mut c_void as usize)
 }
 
@@ -595,6 +852,7 @@ pub struct LiveInstrument {
     last_trades_cap: usize,
     roi_lb: f64,
     roi_ub: f64,
+    roi_recenter_threshold: Option<f64>,
 }
 
 unsafe impl Send for LiveInstrument {}
@@ -613,6 +871,7 @@ impl LiveInstrument {
             last_trades_cap: 0,
             roi_lb: 0.0,
             roi_ub: 0.0,
+            roi_recenter_threshold: None,
         }
     }
 
@@ -666,6 +925,26 @@ impl LiveInstrument {
         slf.roi_ub = roi_ub;
         slf
     }
+
+    /// Makes the range of interest of the `ROIVectorMarketDepth <https://docs.rs/hftbacktest/latest/hftbacktest/depth/struct.ROIVectorMarketDepth.html>`_
+    /// a sliding window that follows the mid-price. The window keeps the width set by
+    /// :meth:`roi_lb` and :meth:`roi_ub`, and is recentered around the mid-price whenever the
+    /// mid-price drifts more than `threshold` away from its center. This allows a small range of
+    /// interest, which keeps the depth scans cache-friendly, regardless of where the price goes.
+    /// Only valid if `ROIVectorMarketDepthLiveBot` is built.
+    ///
+    /// For Level-2 feeds, the quantities at the price levels entering the window are unknown
+    /// until the feed updates them, so the window should be wide enough to cover the levels your
+    /// strategy uses, plus the threshold.
+    ///
+    /// Args:
+    ///     threshold: the distance from the center of the range of interest, in price, that the
+    ///                mid-price may drift before the range of interest is recentered. It is
+    ///                clamped to less than half of the width.
+    pub fn roi_recentering(mut slf: PyRefMut<Self>, threshold: f64) -> PyRefMut<Self> {
+        slf.roi_recenter_threshold = Some(threshold);
+        slf
+    }
 }
 
 #[cfg(feature = "live")]
@@ -701,12 +980,18 @@ pub fn build_roivec_livebot(instruments: Vec<PyRefMut<LiveInstrument>>) -> PyRes
             &instrument.symbol,
             instrument.tick_size,
             instrument.lot_size,
-            ROIVectorMarketDepth::new(
-                instrument.tick_size,
-                instrument.lot_size,
-                instrument.roi_lb,
-                instrument.roi_ub,
-            ),
+            {
+                let depth = ROIVectorMarketDepth::new(
+                    instrument.tick_size,
+                    instrument.lot_size,
+                    instrument.roi_lb,
+                    instrument.roi_ub,
+                );
+                match instrument.roi_recenter_threshold {
+                    Some(threshold) => depth.with_recentering(threshold),
+                    None => depth,
+                }
+            },
             instrument.last_trades_cap,
         ));
     }
@@ -4,7 +4,14 @@ use std::{collections::HashMap, mem};
 
 use hftbacktest::{
     depth::{HashMapMarketDepth, ROIVectorMarketDepth},
-    live::{ipc::iceoryx::IceoryxUnifiedChannel, BotError, LiveBot},
+    live::{
+        ipc::{
+            iceoryx::IceoryxUnifiedChannel,
+            shm::{read_shared_book, SharedBookError},
+        },
+        BotError,
+        LiveBot,
+    },
     prelude::{Bot, Event, Order, StateValues},
     types::{OrdType, TimeInForce},
 };
@@ -637,3 +644,27 @@ pub extern "C" fn roiveclive_order_latency(
         },
     }
 }
+
+#[no_mangle]
+pub extern "C" fn shared_book_read(
+    region: *const u8,
+    bids: *mut f64,
+    asks: *mut f64,
+    max_levels: usize,
+    num_bids: *mut usize,
+    num_asks: *mut usize,
+) -> i64 {
+    let bids = unsafe { std::slice::from_raw_parts_mut(bids, 2 * max_levels) };
+    let asks = unsafe { std::slice::from_raw_parts_mut(asks, 2 * max_levels) };
+    match unsafe { read_shared_book(region, bids, asks) } {
+        Err(SharedBookError::NotInitialized) => -1,
+        Err(SharedBookError::Busy) => -2,
+        Ok(snapshot) => {
+            unsafe {
+                *num_bids = snapshot.num_bids;
+                *num_asks = snapshot.num_asks;
+            }
+            snapshot.timestamp
+        },
+    }
+}
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from numba import njit
+
+from hftbacktest import AsyncLiveBot, BacktestAsset, HashMapMarketDepthBacktest
+from hftbacktest.data.synthetic import generate_l2
+
+
+@njit
+def current_timestamp(hbt):
+    return hbt.current_timestamp
+
+
+class TestAsyncLiveBot(unittest.TestCase):
+    def test_drive_backtest(self):
+        asset = (
+            BacktestAsset()
+                .data(generate_l2(10_000, seed=0))
+                .linear_asset(1.0)
+                .constant_latency(1_000_000, 1_000_000)
+                .risk_adverse_queue_model()
+                .no_partial_fill_exchange()
+                .trading_value_fee_model(0.0, 0.0)
+                .tick_size(0.1)
+                .lot_size(0.001)
+        )
+        bot = AsyncLiveBot(HashMapMarketDepthBacktest([asset]))
+
+        async def trade():
+            timestamps = []
+            while await bot.next_feed(timeout=1_000_000_000) == 0:
+                timestamps.append(await bot.run(current_timestamp))
+            self.assertEqual(await bot.close(), 0)
+            return timestamps
+
+        async def count(task):
+            # Keeps running on the event loop while the bot waits.
+            num_ticks = 0
+            while not task.done():
+                num_ticks += 1
+                await asyncio.sleep(0)
+            return num_ticks
+
+        async def main():
+            task = asyncio.create_task(trade())
+            return await asyncio.gather(task, count(task))
+
+        timestamps, num_ticks = asyncio.run(main())
+        self.assertGreater(len(timestamps), 1_000)
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertGreater(num_ticks, 0)
@@ -0,0 +1,27 @@
+import unittest
+
+from numba import njit
+
+
+class TestBinding(unittest.TestCase):
+    def test_call_from_python(self):
+        # The bindings are ctypes functions, so they can be called from plain Python as well as from njit functions.
+        from hftbacktest import monotonic_ns
+
+        start = monotonic_ns()
+        self.assertIsInstance(start, int)
+        self.assertGreaterEqual(monotonic_ns(), start)
+
+    def test_call_from_njit(self):
+        from hftbacktest import monotonic_ns
+
+        @njit
+        def elapsed():
+            start = monotonic_ns()
+            return monotonic_ns() - start
+
+        self.assertGreaterEqual(elapsed(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest import DEPTH_EVENT, TRADE_EVENT, EXCH_EVENT, LOCAL_EVENT, BUY_EVENT
+from hftbacktest.data.utils.columnar import write_columnar, read_columnar
+from hftbacktest.types import event_dtype, order_latency_dtype
+
+
+def events(n):
+    rng = np.random.default_rng(1)
+    data = np.zeros(n, event_dtype)
+    data['ev'] = np.where(
+        rng.random(n) < 0.1,
+        EXCH_EVENT | LOCAL_EVENT | TRADE_EVENT,
+        EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | BUY_EVENT
+    )
+    data['exch_ts'] = 1_700_000_000_000_000_000 + np.cumsum(rng.integers(0, 1_000, n))
+    data['local_ts'] = data['exch_ts'] + rng.integers(1_000_000, 1_001_000, n)
+    data['px'] = (100_000 + np.cumsum(rng.integers(-3, 4, n))) / 100
+    data['qty'] = rng.integers(0, 1_000, n) / 1_000
+    return data
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        data = events(100_000)
+        filename = os.path.join(self.tmp.name, 'data.hbtc')
+        write_columnar(data, filename, tick_size=0.01, lot_size=0.001, block_rows=30_000)
+        self.assertLess(os.path.getsize(filename), data.nbytes // 5)
+        np.testing.assert_array_equal(read_columnar(filename).view(np.uint8), data.view(np.uint8))
+
+        # The price cannot be stored in coarser units, so it falls back to another encoding without loss.
+        write_columnar(data, filename, tick_size=0.1)
+        np.testing.assert_array_equal(read_columnar(filename).view(np.uint8), data.view(np.uint8))
+
+    def test_other_dtype(self):
+        data = np.zeros(1_000, order_latency_dtype)
+        data['req_ts'] = 1_000_000_000 * np.arange(1_000)
+        data['exch_ts'] = data['req_ts'] + 5_000_000
+        data['resp_ts'] = data['exch_ts'] + 3_000_000
+        filename = os.path.join(self.tmp.name, 'latency.hbtc')
+        write_columnar(data, filename)
+        np.testing.assert_array_equal(read_columnar(filename, order_latency_dtype), data)
+
+    def test_empty(self):
+        filename = os.path.join(self.tmp.name, 'empty.hbtc')
+        write_columnar(np.zeros(0, event_dtype), filename)
+        self.assertEqual(len(read_columnar(filename)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import os
+import subprocess
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest import DEPTH_EVENT, EXCH_EVENT, LOCAL_EVENT, BUY_EVENT
+from hftbacktest.data import save_data, load_data, write_npy_compressed, read_npy_compressed, open_raw
+from hftbacktest.data.container import _seek_table
+from hftbacktest.types import event_dtype
+
+
+def events(n):
+    rng = np.random.default_rng(1)
+    data = np.zeros(n, event_dtype)
+    data['ev'] = EXCH_EVENT | LOCAL_EVENT | DEPTH_EVENT | BUY_EVENT
+    data['exch_ts'] = 1_700_000_000_000_000_000 + np.cumsum(rng.integers(0, 1_000, n))
+    data['local_ts'] = data['exch_ts'] + rng.integers(1_000_000, 1_001_000, n)
+    data['px'] = (100_000 + np.cumsum(rng.integers(-3, 4, n))) / 100
+    data['qty'] = rng.integers(0, 1_000, n) / 1_000
+    return data
+
+
+class TestContainer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        data = events(100_000)
+        for ext in ['.npy.zst', '.npy.lz4', '.hbtc', '.npy', '.npz']:
+            filename = os.path.join(self.tmp.name, 'data' + ext)
+            save_data(filename, data)
+            np.testing.assert_array_equal(load_data(filename), data)
+
+    def test_blocks(self):
+        data = events(10_000)
+        filename = os.path.join(self.tmp.name, 'data.npy.zst')
+        write_npy_compressed(filename, data, block_size=4096, threads=4)
+        self.assertLess(os.path.getsize(filename), data.nbytes // 2)
+        np.testing.assert_array_equal(read_npy_compressed(filename), data)
+
+    def test_unfinished_file(self):
+        data = events(10_100)
+        filename = os.path.join(self.tmp.name, 'data.npy.zst')
+        # The block size is not a multiple of the row size, so the last complete frame ends in a partial row.
+        write_npy_compressed(filename, data, block_size=4000)
+        with open(filename, 'rb') as f:
+            buf = f.read()
+
+        # Drops the seek table and cuts off the last frame in the middle, as a writer interrupted before finishing the
+        # file would leave it.
+        frames = _seek_table(buf)
+        end = sum(compressed for compressed, _ in frames)
+        buf = buf[:end - frames[-1][0] // 2]
+        with open(filename, 'wb') as f:
+            f.write(buf)
+
+        npy = io.BytesIO()
+        np.save(npy, data)
+        header_len = len(npy.getvalue()) - data.nbytes
+        complete = (sum(decompressed for _, decompressed in frames[:-1]) - header_len) // data.itemsize
+        np.testing.assert_array_equal(read_npy_compressed(filename), data[:complete])
+
+    def test_open_raw(self):
+        import gzip
+        import lz4.frame
+        import zstandard as zstd
+
+        lines = [b'1713571200009000000 {"e":"trade"}\n', b'1713571200010000000 {"e":"bookTicker"}\n']
+        for ext, compress in [
+            ('.gz', gzip.compress),
+            # The collector writes a frame per file, but a file can also be made of several frames.
+            ('.zst', lambda data: b''.join(zstd.ZstdCompressor(level=1).compress(line) for line in lines)),
+            ('.lz4', lz4.frame.compress),
+        ]:
+            filename = os.path.join(self.tmp.name, 'btcusdt_20240420' + ext)
+            with open(filename, 'wb') as f:
+                f.write(compress(b''.join(lines)))
+            with open_raw(filename) as f:
+                self.assertEqual(f.readline(), lines[0])
+                self.assertEqual(f.readline(), lines[1])
+                self.assertEqual(f.readline(), b'')
+
+    def test_standard_tools(self):
+        data = events(10_000)
+        npy_filename = os.path.join(self.tmp.name, 'data.npy')
+        np.save(npy_filename, data)
+        for tool, ext in [('zstd', '.zst'), ('lz4', '.lz4')]:
+            if shutil.which(tool) is None:
+                continue
+            # A file compressed by the standard tool has no seek table.
+            filename = npy_filename + ext
+            with open(filename, 'wb') as f:
+                subprocess.run([tool, '-q', '-c', npy_filename], stdout=f, check=True)
+            np.testing.assert_array_equal(read_npy_compressed(filename), data)
+
+            # A file written by write_npy_compressed can be decompressed by the standard tool.
+            write_npy_compressed(filename, data, block_size=4096)
+            output_filename = os.path.join(self.tmp.name, 'decompressed.npy')
+            with open(output_filename, 'wb') as f:
+                subprocess.run([tool, '-q', '-d', '-c', filename], stdout=f, check=True)
+            np.testing.assert_array_equal(np.load(output_filename), data)
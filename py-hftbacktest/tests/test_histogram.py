@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+from numba import njit
+
+from hftbacktest.histogram import LatencyHistogram
+
+
+@njit
+def record_all(hist, values):
+    for value in values:
+        hist.record(value)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets(self):
+        hist = LatencyHistogram().histogram
+        for i in range(len(hist.counts) - 1):
+            self.assertEqual(hist.bucket_upper(i), hist.bucket_lower(i + 1))
+
+        values = np.random.default_rng(0).integers(0, hist.highest_trackable_value, 10_000)
+        for value in np.concatenate([np.arange(1_000), values]):
+            i = hist.bucket_index(value)
+            self.assertLessEqual(hist.bucket_lower(i), value)
+            self.assertLess(value, hist.bucket_upper(i))
+
+    def test_memory(self):
+        # The figures in the docstring of LatencyHistogram.
+        self.assertEqual(len(LatencyHistogram().histogram.counts), 4_562)
+        self.assertEqual(LatencyHistogram().histogram.counts.nbytes, 36_496)
+
+    def test_percentiles(self):
+        values = np.random.default_rng(1).lognormal(14, 1, 100_000).astype(np.int64)
+        hist = LatencyHistogram(significant_bits=8)
+        record_all(hist.histogram, values)
+
+        self.assertEqual(hist.count, len(values))
+        self.assertEqual(hist.min, values.min())
+        self.assertEqual(hist.max, values.max())
+        self.assertAlmostEqual(hist.mean, values.mean())
+        self.assertEqual(hist.percentile(0), values.min())
+        self.assertEqual(hist.percentile(100), values.max())
+        for p in (50, 90, 99, 99.9):
+            expected = np.percentile(values, p, method='inverted_cdf')
+            self.assertLessEqual(abs(hist.percentile(p) - expected) / expected, 2 ** -7)
+
+    def test_clamp(self):
+        hist = LatencyHistogram(highest_trackable_value=1_000)
+        record_all(hist.histogram, np.array([-5, 10, 5_000], np.int64))
+
+        self.assertEqual(hist.num_clamped, 2)
+        self.assertEqual(hist.min, -5)
+        self.assertEqual(hist.max, 5_000)
+        self.assertEqual(hist.to_numpy()['count'].sum(), 3)
+
+    def test_merge(self):
+        rng = np.random.default_rng(2)
+        a = rng.integers(0, 1_000_000, 1_000)
+        b = rng.integers(0, 10_000_000, 2_000)
+
+        hist_a = LatencyHistogram()
+        hist_b = LatencyHistogram()
+        hist_all = LatencyHistogram()
+        record_all(hist_a.histogram, a)
+        record_all(hist_b.histogram, b)
+        record_all(hist_all.histogram, np.concatenate([a, b]))
+        hist_a.merge(hist_b)
+
+        self.assertEqual(hist_a.count, hist_all.count)
+        self.assertEqual(hist_a.percentiles(), hist_all.percentiles())
+        np.testing.assert_array_equal(hist_a.to_numpy(), hist_all.to_numpy())
+
+        with self.assertRaises(ValueError):
+            hist_a.merge(LatencyHistogram(significant_bits=4))
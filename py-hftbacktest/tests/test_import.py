@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import unittest
+
+# Upper bound on the wall time of ``import hftbacktest`` in a fresh interpreter. It is generous enough for slow CI
+# machines but fails if the bindings or polars are imported eagerly again.
+MAX_IMPORT_SECONDS = 3.0
+
+
+def import_in_subprocess(statement: str) -> tuple[float, set[str]]:
+    code = (
+        'import sys, time\n'
+        't = time.perf_counter()\n'
+        f'{statement}\n'
+        'print(time.perf_counter() - t)\n'
+        'print(",".join(sys.modules))\n'
+    )
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    elapsed, modules = out.strip().split('\n')
+    return float(elapsed), set(modules.split(','))
+
+
+class TestImport(unittest.TestCase):
+    def test_import_package_is_lazy(self):
+        elapsed, modules = import_in_subprocess('import hftbacktest')
+
+        self.assertNotIn('hftbacktest.binding', modules)
+        self.assertNotIn('hftbacktest.recorder', modules)
+        self.assertNotIn('numba', modules)
+        self.assertNotIn('polars', modules)
+        self.assertLess(elapsed, MAX_IMPORT_SECONDS, f'import hftbacktest took {elapsed:.3f}s')
+
+    def test_import_stats_does_not_load_bindings(self):
+        _, modules = import_in_subprocess('import hftbacktest.stats')
+        self.assertNotIn('hftbacktest.binding', modules)
+        self.assertNotIn('numba', modules)
+
+    def test_lazy_attributes(self):
+        _, modules = import_in_subprocess('from hftbacktest import BUY, Recorder')
+        self.assertIn('hftbacktest.recorder', modules)
+        self.assertNotIn('hftbacktest.binding', modules)
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from hftbacktest.data.synthetic import generate_l2
+from hftbacktest.stats import markout, mid_price_series
+from hftbacktest.types import (
+    BUY_EVENT,
+    DEPTH_CLEAR_EVENT,
+    EXCH_EVENT,
+    SELL_EVENT,
+    order_record_dtype
+)
+
+
+def replay_mid(feed, tick_size):
+    # Rebuilds the book event by event and returns the mid-price after each exchange event.
+    bids = {}
+    asks = {}
+    timestamps = []
+    mids = []
+    for row in feed:
+        ev = int(row['ev'])
+        if ev & EXCH_EVENT == 0:
+            continue
+        if ev & 0xff == DEPTH_CLEAR_EVENT:
+            if ev & BUY_EVENT or not ev & SELL_EVENT:
+                bids.clear()
+            if ev & SELL_EVENT or not ev & BUY_EVENT:
+                asks.clear()
+        else:
+            book = bids if ev & BUY_EVENT else asks
+            tick = round(row['px'] / tick_size)
+            if row['qty'] > 0:
+                book[tick] = row['qty']
+            else:
+                book.pop(tick, None)
+        timestamps.append(row['exch_ts'])
+        mids.append((max(bids) + min(asks)) * tick_size / 2.0 if bids and asks else np.nan)
+    return np.array(timestamps), np.array(mids)
+
+
+class TestMarkout(unittest.TestCase):
+    def setUp(self):
+        self.tick_size = 0.1
+        self.feed = generate_l2(100_000, seed=0, tick_size=self.tick_size, trade_ratio=0.0)
+
+    def test_mid_price_series(self):
+        ts, mid = mid_price_series([self.feed[:50_000], self.feed[50_000:]], self.tick_size)
+        self.assertTrue(np.all(np.diff(ts) > 0))
+
+        expected_ts, expected_mid = replay_mid(self.feed, self.tick_size)
+        at = np.unique(expected_ts)
+        np.testing.assert_allclose(
+            mid[np.searchsorted(ts, at, side='right') - 1],
+            expected_mid[np.searchsorted(expected_ts, at, side='right') - 1]
+        )
+
+    def test_markout(self):
+        index = np.arange(1_000, 90_000, 1_000)
+        fills = np.zeros(len(index), order_record_dtype)
+        fills['exch_timestamp'] = self.feed['exch_ts'][index]
+        fills['side'] = np.where(np.arange(len(index)) % 2 == 0, 1, -1)
+        fills['tick_size'] = self.tick_size
+        fills['exec_price_tick'] = 1_000_000
+        fills['fill_qty'] = 1.0
+        fills['fill_qty'][0] = 0.0
+
+        df = markout(fills, self.feed, horizons=[0, 1_000_000_000])
+        self.assertEqual(len(df), len(index) - 1)
+
+        expected_ts, expected_mid = replay_mid(self.feed, self.tick_size)
+        ts = fills['exch_timestamp'][1:] + 1_000_000_000
+        mid = expected_mid[np.searchsorted(expected_ts, ts, side='right') - 1]
+        expected = fills['side'][1:] * (mid - 100_000.0)
+        np.testing.assert_allclose(df['markout_1s'].to_numpy(), expected)
+        np.testing.assert_allclose(df['markout_1s_bps'].to_numpy(), expected / 100_000.0 * 10_000)
+        np.testing.assert_allclose(df['markout_0s'].to_numpy(), fills['side'][1:] * (df['mid'].to_numpy() - 100_000.0))
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.data import save_data
+from hftbacktest.data.utils.orderlatency import compact_order_latency
+from hftbacktest.types import order_latency_dtype
+
+
+def interpolate(data, timestamp, x, y):
+    # Reproduces the linear interpolation of IntpOrderLatency between the rows bracketing the timestamp.
+    rn = np.searchsorted(data[x], timestamp, side='right') - 1
+    row = data[rn]
+    if rn + 1 == len(data):
+        return row[y]
+    next_row = data[rn + 1]
+    return (next_row[y] - row[y]) / (next_row[x] - row[x]) * (timestamp - row[x]) + row[y]
+
+
+class TestOrderLatency(unittest.TestCase):
+    def test_compact_order_latency(self):
+        rng = np.random.default_rng(1)
+        n = 10_000
+        data = np.zeros(n, order_latency_dtype)
+        data['req_ts'] = 1_000_000_000 * np.arange(n)
+        entry_latency = 5_000_000 + np.cumsum(rng.integers(-20_000, 20_001, n))
+        resp_latency = 3_000_000 + np.cumsum(rng.integers(-20_000, 20_001, n))
+        data['exch_ts'] = data['req_ts'] + entry_latency
+        data['resp_ts'] = data['exch_ts'] + resp_latency
+
+        tolerance = 500_000
+        compacted = compact_order_latency(data, tolerance)
+        self.assertLess(len(compacted), n // 10)
+        self.assertEqual(compacted[0], data[0])
+        self.assertEqual(compacted[-1], data[-1])
+
+        table = np.zeros(len(compacted), [('req_ts', 'i8'), ('exch_ts', 'i8'), ('entry', 'f8'), ('resp', 'f8')])
+        table['req_ts'] = compacted['req_ts']
+        table['exch_ts'] = compacted['exch_ts']
+        table['entry'] = compacted['exch_ts'] - compacted['req_ts']
+        table['resp'] = compacted['resp_ts'] - compacted['exch_ts']
+        for rn in range(n):
+            entry = interpolate(table, data[rn]['req_ts'], 'req_ts', 'entry')
+            resp = interpolate(table, data[rn]['exch_ts'], 'exch_ts', 'resp')
+            self.assertLessEqual(abs(entry - entry_latency[rn]), tolerance + 1e-6)
+            self.assertLessEqual(abs(resp - resp_latency[rn]), tolerance + 1e-6)
+
+    def test_keep_rejected_rows(self):
+        data = np.zeros(100, order_latency_dtype)
+        data['req_ts'] = 1_000 * np.arange(100)
+        data['exch_ts'] = data['req_ts'] + 100
+        data['resp_ts'] = data['exch_ts'] + 100
+        data[50]['exch_ts'] = 0
+
+        compacted = compact_order_latency(data, 0)
+        np.testing.assert_array_equal(compacted['req_ts'], [0, 49_000, 50_000, 51_000, 99_000])
+
+    def test_load_from_file(self):
+        data = np.zeros(100, order_latency_dtype)
+        data['req_ts'] = 1_000 * np.arange(100)
+        data['exch_ts'] = data['req_ts'] + 100
+        data['resp_ts'] = data['exch_ts'] + 100
+        expected = compact_order_latency(data, 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for filename in ['latency.npz', 'latency.npy']:
+                path = os.path.join(tmp, filename)
+                save_data(path, data)
+                np.testing.assert_array_equal(compact_order_latency(path, 0), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+from numba import njit
+
+from hftbacktest import (
+    BacktestAsset,
+    BTreeMarketDepthBacktest,
+    FusedHashMapMarketDepthBacktest,
+    HashMapMarketDepthBacktest,
+    ROIVectorMarketDepthBacktest,
+    ALL_ASSETS,
+    GTX,
+    LIMIT
+)
+from hftbacktest.binding import PROFILE_FEATURE
+from hftbacktest.data.synthetic import generate_l2
+from hftbacktest.types import PROFILE_STAGES, profile_stats_dtype
+
+BACKTESTS = [
+    HashMapMarketDepthBacktest,
+    ROIVectorMarketDepthBacktest,
+    BTreeMarketDepthBacktest,
+    FusedHashMapMarketDepthBacktest,
+]
+
+
+@njit
+def quote(hbt):
+    order_id = 0
+    while hbt.elapse(100_000_000) == 0:
+        hbt.clear_inactive_orders(ALL_ASSETS)
+        if len(hbt.orders(0)) == 0:
+            depth = hbt.depth(0)
+            hbt.submit_buy_order(0, order_id, depth.best_bid, 1.0, GTX, LIMIT, False)
+            order_id += 1
+    return hbt.profile_stats()
+
+
+def run(backtest):
+    asset = (
+        BacktestAsset()
+            .data(generate_l2(20_000, seed=0, tick_size=0.1, lot_size=0.001))
+            .linear_asset(1.0)
+            .constant_latency(1_000_000, 1_000_000)
+            .risk_adverse_queue_model()
+            .no_partial_fill_exchange()
+            .trading_value_fee_model(0.0, 0.0)
+            .tick_size(0.1)
+            .lot_size(0.001)
+            .roi_lb(99_000.0)
+            .roi_ub(101_000.0)
+    )
+    hbt = backtest([asset])
+    stats = quote(hbt)
+    hbt.close()
+    return stats
+
+
+class TestProfileStats(unittest.TestCase):
+    @unittest.skipIf(PROFILE_FEATURE, 'built with the profile feature')
+    def test_without_profile_feature(self):
+        for backtest in BACKTESTS:
+            with self.subTest(backtest.__name__):
+                stats = run(backtest)
+                self.assertEqual(stats.dtype, profile_stats_dtype)
+                self.assertEqual(len(stats), 0)
+
+    @unittest.skipUnless(PROFILE_FEATURE, 'requires the profile feature')
+    def test_with_profile_feature(self):
+        stage = {name: no for no, name in enumerate(PROFILE_STAGES)}
+        for backtest in BACKTESTS:
+            with self.subTest(backtest.__name__):
+                stats = run(backtest)
+                self.assertEqual(stats.dtype, profile_stats_dtype)
+
+                # A record for each stage of the asset, followed by those not specific to an asset.
+                self.assertEqual(len(stats), 2 * len(PROFILE_STAGES))
+                np.testing.assert_array_equal(stats['asset_no'][:len(PROFILE_STAGES)], 0)
+                np.testing.assert_array_equal(stats['asset_no'][len(PROFILE_STAGES):], ALL_ASSETS)
+                np.testing.assert_array_equal(stats['stage'], np.tile(np.arange(len(PROFILE_STAGES)), 2))
+
+                asset_stats = stats[:len(PROFILE_STAGES)]
+                for name in ['local_depth', 'exch_depth', 'submit', 'order_request', 'order_response']:
+                    self.assertGreater(asset_stats[stage[name]]['count'], 0, name)
+                self.assertGreater(stats[len(PROFILE_STAGES) + stage['strategy']]['count'], 0)
+                self.assertTrue(np.all((stats['count'] > 0) | (stats['elapsed'] == 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
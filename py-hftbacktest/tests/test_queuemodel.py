@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from hftbacktest.data.synthetic import generate_l3
+from hftbacktest.data.utils.queuemodel import fit_queue_model, queue_observations
+from hftbacktest.types import (
+    ADD_ORDER_EVENT,
+    BUY_EVENT,
+    CANCEL_ORDER_EVENT,
+    EXCH_EVENT,
+    FILL_EVENT,
+    LOCAL_EVENT,
+    event_dtype,
+    order_record_dtype
+)
+
+
+class TestQueueModel(unittest.TestCase):
+    def test_queue_observations(self):
+        bid = EXCH_EVENT | LOCAL_EVENT | BUY_EVENT
+        data = np.zeros(7, event_dtype)
+        data['ev'] = [
+            bid | ADD_ORDER_EVENT,
+            bid | ADD_ORDER_EVENT,
+            bid | ADD_ORDER_EVENT,
+            bid | CANCEL_ORDER_EVENT,
+            bid | CANCEL_ORDER_EVENT,
+            bid | FILL_EVENT,
+            bid | CANCEL_ORDER_EVENT,
+        ]
+        data['exch_ts'] = np.arange(1, 8) * 10
+        data['local_ts'] = data['exch_ts'] + 1
+        data['px'] = 10.0
+        data['qty'] = [1.0, 2.0, 4.0, 0.0, 0.0, 2.0, 0.0]
+        data['order_id'] = [1, 2, 3, 1, 3, 2, 2]
+
+        # The probe order joins the queue behind the orders 1 and 2 and ahead of the order 3.
+        orders = np.zeros(2, order_record_dtype)
+        orders['order_id'] = 100
+        orders['side'] = 1
+        orders['price_tick'] = 100
+        orders['tick_size'] = 0.1
+        orders['status'] = [1, 4]
+        orders['exch_timestamp'] = [25, 75]
+
+        obs, num_probes, num_filled = queue_observations(data, 0.1, orders)
+        self.assertEqual(num_probes, 1)
+        self.assertEqual(num_filled, 0)
+        # The cancellation following the fill of the order 2 is not observed.
+        self.assertEqual(len(obs), 2)
+        np.testing.assert_array_equal(obs['front'], [3.0, 2.0])
+        np.testing.assert_array_equal(obs['back'], [4.0, 4.0])
+        np.testing.assert_array_equal(obs['qty'], [1.0, 4.0])
+        np.testing.assert_array_equal(obs['behind'], [False, True])
+
+    def test_fit_queue_model(self):
+        data = [generate_l3(50_000, seed=seed, tick_size=0.1) for seed in range(2)]
+        results = fit_queue_model(data, 0.1, probe_interval=10_000_000, probe_lifetime=1_000_000_000, max_workers=2)
+
+        self.assertEqual(
+            {r['model'] for r in results},
+            {'power', 'power2', 'power3', 'log', 'log2'}
+        )
+        log_likelihood = [r['log_likelihood'] for r in results]
+        self.assertEqual(log_likelihood, sorted(log_likelihood, reverse=True))
+        for r in results:
+            self.assertGreater(r['num_observations'], 0)
+            self.assertTrue(r['method'].endswith(('queue_model', 'queue_model2', 'queue_model3')))
+            if r['model'].startswith('power'):
+                self.assertGreater(r['n'], 0.0)
+            else:
+                self.assertIsNone(r['n'])
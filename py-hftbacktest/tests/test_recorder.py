@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numba import njit
+
+from hftbacktest import BacktestAsset, HashMapMarketDepthBacktest, ALL_ASSETS, BUY, GTX, LIMIT
+from hftbacktest.data.synthetic import generate_l2
+from hftbacktest.data.utils.columnar import read_columnar
+from hftbacktest.recorder import FillRecorder
+from hftbacktest.types import order_record_dtype
+
+
+@njit
+def quote(hbt, recorder):
+    order_id = 0
+    while hbt.elapse(100_000_000) == 0:
+        recorder.record(hbt)
+        hbt.clear_inactive_orders(ALL_ASSETS)
+        if len(hbt.orders(0)) == 0:
+            depth = hbt.depth(0)
+            hbt.submit_buy_order(0, order_id, depth.best_bid, 1.0, GTX, LIMIT, False)
+            order_id += 1
+            hbt.submit_sell_order(0, order_id, depth.best_ask, 1.0, GTX, LIMIT, False)
+            order_id += 1
+    recorder.record(hbt)
+    return hbt.position(0)
+
+
+class TestFillRecorder(unittest.TestCase):
+    def test_record_fills(self):
+        asset = (
+            BacktestAsset()
+                .data(generate_l2(200_000, seed=0, tick_size=0.1, lot_size=0.001))
+                .linear_asset(1.0)
+                .constant_latency(1_000_000, 1_000_000)
+                .risk_adverse_queue_model()
+                .no_partial_fill_exchange()
+                .trading_value_fee_model(0.0, 0.0)
+                .tick_size(0.1)
+                .lot_size(0.001)
+        )
+        hbt = HashMapMarketDepthBacktest([asset])
+        recorder = FillRecorder(chunk_size=100)
+        position = quote(hbt, recorder.recorder)
+        hbt.close()
+
+        records = recorder.get()
+        self.assertGreater(len(records), 100)
+        self.assertTrue(np.all(np.diff(records['timestamp']) >= 0))
+
+        fills = recorder.fills(0)
+        self.assertGreater(len(fills), 0)
+        signed_qty = np.where(fills['side'] == BUY, fills['fill_qty'], -fills['fill_qty'])
+        self.assertAlmostEqual(signed_qty.sum(), position)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'orders.hbtc')
+            recorder.spill(filename)
+            np.testing.assert_array_equal(read_columnar(filename, order_record_dtype), records)
+        self.assertEqual(len(recorder.get()), 0)
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numba import njit
+
+from hftbacktest import LIVE_FEATURE
+
+
+@unittest.skipUnless(LIVE_FEATURE, 'requires the live feature')
+class TestSharedBook(unittest.TestCase):
+    def setUp(self):
+        from hftbacktest.sharedbook import HEADER_WORDS, SHARED_BOOK_MAGIC, shared_book_path
+
+        # Lays out the region as the connector publishes it.
+        num_levels = 3
+        region = np.zeros(HEADER_WORDS + 4 * num_levels, np.uint64)
+        region[1] = SHARED_BOOK_MAGIC
+        region[2] = num_levels
+        region[3:4].view(np.float64)[0] = 0.1
+        region[4] = 10
+        region[5] = 2
+        region[6] = 1
+        levels = region[HEADER_WORDS:].view(np.float64)
+        levels[:4] = [100.0, 1.0, 99.9, 2.0]
+        levels[2 * num_levels:2 * num_levels + 2] = [100.1, 5.0]
+
+        self.dir = tempfile.TemporaryDirectory()
+        region.tofile(shared_book_path('test', 'BTCUSDT', self.dir.name))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_read(self):
+        from hftbacktest.sharedbook import SharedBook, read_shared_book
+
+        @njit
+        def best_bid_ask(ptr, bids, asks):
+            timestamp, _, _ = read_shared_book(ptr, bids, asks)
+            return timestamp, bids[0, 0], asks[0, 0]
+
+        book = SharedBook('test', 'BTCUSDT', self.dir.name)
+        self.assertEqual(book.num_levels, 3)
+        self.assertEqual(book.tick_size, 0.1)
+
+        timestamp, bids, asks = book.read()
+        self.assertEqual(timestamp, 10)
+        np.testing.assert_array_equal(bids, [[100.0, 1.0], [99.9, 2.0]])
+        np.testing.assert_array_equal(asks, [[100.1, 5.0]])
+
+        self.assertEqual(best_bid_ask(book.ptr, np.zeros((1, 2)), np.zeros((1, 2))), (10, 100.0, 100.1))
+
+    def test_busy(self):
+        from hftbacktest.sharedbook import BUSY, SharedBook, shared_book_path
+
+        # A connector that dies while writing leaves the sequence number odd.
+        region = np.fromfile(shared_book_path('test', 'BTCUSDT', self.dir.name), np.uint64)
+        region[0] = 1
+        region.tofile(shared_book_path('test', 'BTCUSDT', self.dir.name))
+
+        timestamp, bids, asks = SharedBook('test', 'BTCUSDT', self.dir.name).read()
+        self.assertEqual(timestamp, BUSY)
+        self.assertEqual(len(bids), 0)
+        self.assertEqual(len(asks), 0)
+
+    def test_not_shared_book(self):
+        from hftbacktest.sharedbook import SharedBook
+
+        with open(os.path.join(self.dir.name, 'hftbacktest.test.ETHUSDT.book'), 'wb') as f:
+            f.write(bytes(64))
+        with self.assertRaises(ValueError):
+            SharedBook('test', 'ETHUSDT', self.dir.name)
+
+
+@unittest.skipIf(LIVE_FEATURE, 'built with the live feature')
+class TestSharedBookWithoutLiveFeature(unittest.TestCase):
+    def test_import(self):
+        with self.assertRaisesRegex(ImportError, 'requires the live feature'):
+            import hftbacktest.sharedbook  # noqa: F401
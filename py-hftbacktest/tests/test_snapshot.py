@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest.data import load_data
+from hftbacktest.data.synthetic import generate_l2
+from hftbacktest.data.utils.snapshot import create_last_snapshot, create_snapshots, find_snapshot
+
+DAY = 86_400_000_000_000
+HOUR = 3_600_000_000_000
+# 2024-01-01 20:00:00 UTC, so that the data spans midnight twice.
+START_TS = 1_704_067_200_000_000_000 + 20 * HOUR
+
+
+def sorted_levels(snapshot):
+    # Compares the levels regardless of their order and the timestamps of the snapshot events.
+    return sorted(zip(snapshot['ev'].tolist(), snapshot['px'].tolist(), snapshot['qty'].tolist()))
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        # About 33 hours of data, from 20:00 on the first day to about 05:00 on the third day.
+        self.data = generate_l2(2_000, seed=7, start_ts=START_TS, interval=60_000_000_000)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_manifest(self):
+        interval = 6 * HOUR
+        manifest = create_snapshots([self.data], 0.1, 0.001, self.tmp.name, interval=interval)
+
+        with open(os.path.join(self.tmp.name, 'manifest.json')) as f:
+            self.assertEqual(json.load(f), manifest)
+
+        timestamps = [entry['timestamp'] for entry in manifest]
+        self.assertTrue(all(a < b for a, b in zip(timestamps[:-1], timestamps[1:])))
+        self.assertEqual(len({entry['filename'] for entry in manifest}), len(manifest))
+        for entry in manifest:
+            self.assertEqual(entry['timestamp'] % interval, 0)
+            self.assertEqual(entry['end_of_day'], entry['timestamp'] % DAY == 0)
+            self.assertTrue(os.path.exists(os.path.join(self.tmp.name, entry['filename'])))
+
+        # The snapshots are taken at every boundary after the first event, up to the end of the last day.
+        last_ts = int(self.data['local_ts'][-1])
+        end_of_data = (last_ts // DAY + 1) * DAY
+        self.assertEqual(timestamps[0], (int(self.data['exch_ts'][0]) // interval + 1) * interval)
+        self.assertEqual(timestamps[-1], end_of_data)
+        self.assertEqual([entry['end_of_data'] for entry in manifest], [False] * (len(manifest) - 1) + [True])
+        self.assertEqual(sum(entry['end_of_day'] for entry in manifest), 3)
+        self.assertIn((last_ts // interval + 1) * interval, timestamps)
+
+        self.assertIsNone(find_snapshot(manifest, timestamps[0] - 1))
+        self.assertEqual(find_snapshot(manifest, end_of_data + DAY), manifest[-1])
+        self.assertEqual(find_snapshot(manifest, timestamps[1] + 1), manifest[1])
+
+    def test_end_of_day(self):
+        manifest = create_snapshots([self.data], 0.1, 0.001, self.tmp.name)
+        # Midnight of the second and the third day, and the end of the data at midnight of the fourth day.
+        snapshots = [entry for entry in manifest if entry['end_of_day']]
+        self.assertEqual(len(snapshots), 3)
+
+        for entry in snapshots:
+            # The snapshot at midnight is the same as the last snapshot of the data up to midnight.
+            expected = create_last_snapshot(
+                [self.data[self.data['local_ts'] <= entry['timestamp']]],
+                0.1,
+                0.001
+            )
+            snapshot = load_data(os.path.join(self.tmp.name, entry['filename']))
+            self.assertTrue(np.all(snapshot['exch_ts'] == entry['timestamp']))
+            self.assertEqual(sorted_levels(snapshot), sorted_levels(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
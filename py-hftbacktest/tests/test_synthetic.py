@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hftbacktest import (
+    ADD_ORDER_EVENT,
+    BUY_EVENT,
+    CANCEL_ORDER_EVENT,
+    DEPTH_CLEAR_EVENT,
+    DEPTH_EVENT,
+    DEPTH_SNAPSHOT_EVENT,
+    FILL_EVENT,
+    MODIFY_ORDER_EVENT,
+)
+from hftbacktest.data import load_data
+from hftbacktest.data.synthetic import (
+    generate_l2,
+    generate_l3,
+    generate_order_latency,
+    iter_l2,
+    iter_l3,
+    write_chunks
+)
+
+
+def replay_l2(data, tick_size):
+    # Returns the number of events at which the book is crossed.
+    bids = {}
+    asks = {}
+    crossed = 0
+    for row in data:
+        ev = int(row['ev'])
+        tick = round(row['px'] / tick_size)
+        book = bids if ev & BUY_EVENT else asks
+        if ev & 0xff in (DEPTH_EVENT, DEPTH_SNAPSHOT_EVENT):
+            if row['qty'] == 0:
+                book.pop(tick, None)
+            else:
+                book[tick] = row['qty']
+        elif ev & 0xff == DEPTH_CLEAR_EVENT:
+            for k in list(book):
+                if (k >= tick) if ev & BUY_EVENT else (k <= tick):
+                    del book[k]
+        if bids and asks and max(bids) >= min(asks):
+            crossed += 1
+    return crossed
+
+
+class TestSynthetic(unittest.TestCase):
+    def assert_ordered(self, data):
+        self.assertTrue(np.all(np.diff(data['exch_ts']) >= 0))
+        self.assertTrue(np.all(np.diff(data['local_ts']) >= 0))
+        self.assertTrue(np.all(data['local_ts'] >= data['exch_ts']))
+
+    def test_l2(self):
+        kwargs = dict(seed=1, snapshot_interval=1_000_000_000, feed_latency_sigma=0.5)
+        data = generate_l2(50_000, **kwargs)
+        self.assert_ordered(data)
+        self.assertGreaterEqual(len(data), 50_000)
+        self.assertGreater(np.count_nonzero(data['ev'] & 0xff == DEPTH_CLEAR_EVENT), 2)
+        self.assertEqual(replay_l2(data, 0.1), 0)
+
+        np.testing.assert_array_equal(data, generate_l2(50_000, **kwargs))
+
+    def test_l2_chunks(self):
+        chunks = list(iter_l2(50_000, chunk_size=7_000, seed=2, snapshot_interval=1_000_000_000))
+        self.assertEqual(len(chunks), 8)
+        data = np.concatenate(chunks)
+        self.assert_ordered(data)
+        self.assertEqual(replay_l2(data, 0.1), 0)
+
+    def test_l3(self):
+        data = np.concatenate(list(iter_l3(10_000, chunk_size=3_000, seed=3, lifetime=50_000_000)))
+        self.assert_ordered(data)
+        self.assertEqual(np.count_nonzero(data['ev'] & 0xff == ADD_ORDER_EVENT), 10_000)
+
+        live = set()
+        for row in data:
+            ev = int(row['ev']) & 0xff
+            order_id = int(row['order_id'])
+            if ev == ADD_ORDER_EVENT:
+                self.assertNotIn(order_id, live)
+                live.add(order_id)
+            elif ev in (MODIFY_ORDER_EVENT, FILL_EVENT, CANCEL_ORDER_EVENT):
+                self.assertIn(order_id, live)
+                if ev == CANCEL_ORDER_EVENT:
+                    live.remove(order_id)
+
+        self.assertGreater(np.count_nonzero(generate_l3(1_000, seed=4)['ev'] & 0xff == FILL_EVENT), 0)
+
+    def test_order_latency(self):
+        data = generate_order_latency(0, 10_000_000_000, seed=5)
+        self.assertEqual(len(data), 11)
+        self.assertTrue(np.all(data['exch_ts'] > data['req_ts']))
+        self.assertTrue(np.all(data['resp_ts'] > data['exch_ts']))
+
+    def test_write_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            chunks = list(iter_l2(10_000, chunk_size=4_000, seed=6))
+            filenames = write_chunks(chunks, os.path.join(tmp, 'synthetic'))
+            self.assertEqual([os.path.basename(f) for f in filenames], [
+                'synthetic_00000.npz',
+                'synthetic_00001.npz',
+                'synthetic_00002.npz'
+            ])
+            for chunk, filename in zip(chunks, filenames):
+                np.testing.assert_array_equal(load_data(filename), chunk)